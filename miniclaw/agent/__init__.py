@@ -1,9 +1,40 @@
-"""Agent core module for miniclaw."""
+"""Agent core module for miniclaw.
 
-from miniclaw.agent.loop import AgentLoop
-from miniclaw.agent.router import AgentRouter
-from miniclaw.agent.context import ContextBuilder
-from miniclaw.agent.memory import MemoryStore
-from miniclaw.agent.skills import SkillsLoader
+Re-exports are resolved lazily so that importing a tool module does not
+drag in the full agent loop and its provider dependencies.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from miniclaw.agent.context import ContextBuilder
+    from miniclaw.agent.loop import AgentLoop
+    from miniclaw.agent.memory import MemoryStore
+    from miniclaw.agent.router import AgentRouter
+    from miniclaw.agent.skills import SkillsLoader
+
+_EXPORTS = {
+    "AgentLoop": "miniclaw.agent.loop",
+    "AgentRouter": "miniclaw.agent.router",
+    "ContextBuilder": "miniclaw.agent.context",
+    "MemoryStore": "miniclaw.agent.memory",
+    "SkillsLoader": "miniclaw.agent.skills",
+}
 
 __all__ = ["AgentLoop", "AgentRouter", "ContextBuilder", "MemoryStore", "SkillsLoader"]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
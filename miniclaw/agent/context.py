@@ -98,7 +98,7 @@ You are miniclaw, a helpful AI assistant. You have access to tools that allow yo
 - Execute shell commands
 - Search the web and fetch web pages
 - Send messages to users on chat channels
-- Spawn subagents for complex background tasks
+- Spawn subagents for complex background tasks, or map_reduce one instruction over many inputs
 - Interpret image attachments when available
 {vision_note}
 
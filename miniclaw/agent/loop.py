@@ -19,6 +19,7 @@ from miniclaw.agent.subagent import SubagentManager
 from miniclaw.agent.tools.apply_patch import ApplyPatchTool
 from miniclaw.agent.tools.cron import CronTool
 from miniclaw.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from miniclaw.agent.tools.map_reduce import MapReduceTool
 from miniclaw.agent.tools.message import MessageTool
 from miniclaw.agent.tools.process import ProcessTool
 from miniclaw.agent.tools.registry import ToolRegistry
@@ -29,10 +30,13 @@ from miniclaw.audit.logger import AuditLogger
 from miniclaw.bus.events import InboundMessage, OutboundMessage
 from miniclaw.bus.queue import MessageBus
 from miniclaw.hooks.runner import HookRunner
+from miniclaw.monitoring import metrics, tracing
 from miniclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from miniclaw.providers.errors import CONTEXT_OVERFLOW
 from miniclaw.ratelimit.limiter import RateLimiter
+from miniclaw.ratelimit.tokens import TokenRateLimiter, TokenReservation
 from miniclaw.session.manager import RunState, Session, SessionManager
-from miniclaw.session.run_store import RunStore
+from miniclaw.session.run_store import RunStore, run_store_timestamp
 
 if TYPE_CHECKING:
     from miniclaw.config.schema import (
@@ -40,9 +44,11 @@ if TYPE_CHECKING:
         HooksConfig,
         QueueConfig,
         SessionsPolicyConfig,
+        SubagentPoolConfig,
         ToolApprovalConfig,
     )
     from miniclaw.cron.service import CronService
+    from miniclaw.distributed.remote import RemoteRunner
     from miniclaw.heartbeat.service import HeartbeatService
     from miniclaw.processes.manager import ProcessManager
 
@@ -83,6 +89,7 @@ class AgentLoop:
         approval_timeout_s: float = 60.0,
         audit_logger: AuditLogger | None = None,
         rate_limiter: RateLimiter | None = None,
+        token_limiter: TokenRateLimiter | None = None,
         context_window: int = 32768,
         embedding_model: str = "",
         supports_vision: bool = True,
@@ -96,6 +103,9 @@ class AgentLoop:
         hook_config: "HooksConfig | None" = None,
         secret_store: Any | None = None,
         usage_tracker: Any | None = None,
+        remote_runner: "RemoteRunner | None" = None,
+        subagent_config: "SubagentPoolConfig | None" = None,
+        session_manager: SessionManager | None = None,
     ):
         from miniclaw.config.schema import ExecToolConfig, HooksConfig, QueueConfig, SessionsPolicyConfig
 
@@ -125,6 +135,7 @@ class AgentLoop:
         self.approval_timeout_s = approval_timeout_s
         self.audit_logger = audit_logger
         self.rate_limiter = rate_limiter
+        self.token_limiter = token_limiter
         self.context_window = context_window
         self.embedding_model = embedding_model
 
@@ -133,6 +144,7 @@ class AgentLoop:
         self.reply_shaping = bool(reply_shaping)
         self.no_reply_token = no_reply_token or "NO_REPLY"
         self.usage_tracker = usage_tracker
+        self.remote_runner = remote_runner
 
         self.queue_config = queue_config or QueueConfig()
         self.session_policy = session_policy or SessionsPolicyConfig()
@@ -154,7 +166,8 @@ class AgentLoop:
         )
 
         self.context = ContextBuilder(workspace, supports_vision=supports_vision, secret_store=secret_store)
-        self.sessions = SessionManager(
+        # Replicas of one agent pass a shared manager so every reader sees one session cache.
+        self.sessions = session_manager or SessionManager(
             workspace,
             idle_reset_minutes=self.session_policy.idle_reset_minutes,
         )
@@ -181,6 +194,8 @@ class AgentLoop:
             sandbox_prune_idle_seconds=self.sandbox_prune_idle_seconds,
             sandbox_prune_max_age_seconds=self.sandbox_prune_max_age_seconds,
             restrict_to_workspace=restrict_to_workspace,
+            remote_runner=remote_runner,
+            pool_config=subagent_config,
         )
 
         self._running = False
@@ -189,11 +204,12 @@ class AgentLoop:
         self._active_runs: dict[str, RunState] = {}
         self._run_messages: dict[str, InboundMessage] = {}
         self._steer_buffers: dict[str, deque[dict[str, Any]]] = {}
+        self._token_reservations: dict[str, TokenReservation] = {}
         self._recent_runs: deque[RunState] = deque(maxlen=200)
         self._cancel_requested: set[str] = set()
         self._closed_run_set: set[str] = set()
         self._closed_run_order: deque[str] = deque(maxlen=2000)
-        self._run_store = RunStore(max_records=5000)
+        self._run_store = RunStore(max_records=self.session_policy.max_run_records)
         self._load_persisted_runs()
 
         self._register_default_tools()
@@ -236,6 +252,7 @@ class AgentLoop:
         # Spawn tool (for subagents)
         spawn_tool = SpawnTool(manager=self.subagents)
         self.tools.register(spawn_tool)
+        self.tools.register(MapReduceTool(manager=self.subagents, emit_event=self._emit_run_event))
 
         # Cron tool (for scheduling)
         if self.cron_service:
@@ -487,6 +504,51 @@ class AgentLoop:
 
         return [r.to_dict() for r in runs[:limit]]
 
+    def list_active_runs(self, *, since: Any = None, until: Any = None, **filters: Any) -> list[dict[str, Any]]:
+        """In-flight runs matching the same filters as `query_run_history`, newest first."""
+        since_ts = run_store_timestamp(since)
+        until_ts = run_store_timestamp(until)
+        out: list[dict[str, Any]] = []
+        for run in sorted(self._active_runs.values(), key=lambda r: r.created_at, reverse=True):
+            item = run.to_dict()
+            item["agent_id"] = self.agent_id
+            created = run.created_at.timestamp()
+            if since_ts is not None and created < since_ts:
+                continue
+            if until_ts is not None and created >= until_ts:
+                continue
+            if all(self._run_filter_matches(item.get(key), value) for key, value in filters.items()):
+                out.append(item)
+        return out
+
+    @staticmethod
+    def _run_filter_matches(actual: Any, wanted: Any) -> bool:
+        if wanted is None or wanted == "":
+            return True
+        allowed = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+        return str(actual or "") in {str(value) for value in allowed}
+
+    def query_run_history(self, **kwargs: Any) -> dict[str, Any]:
+        """Filtered, cursor-paginated page of persisted runs (see `RunStore.query`)."""
+        return self._run_store.query(**kwargs)
+
+    def run_stats(self, **kwargs: Any) -> list[dict[str, Any]]:
+        """Aggregate run duration and error rate (see `RunStore.stats`)."""
+        return self._run_store.stats(**kwargs)
+
+    def query_runs(self, *, limit: int = 50, cursor: str | None = None, **filters: Any) -> dict[str, Any]:
+        """Active runs (first page only) followed by persisted history."""
+        page = self.query_run_history(limit=limit, cursor=cursor, **filters)
+        if not cursor:
+            active = self.list_active_runs(**filters)
+            active_ids = {item["run_id"] for item in active}
+            page["items"] = active + [item for item in page["items"] if item.get("run_id") not in active_ids]
+        return page
+
+    def subagent_stats(self) -> dict[str, Any]:
+        """Subagent pool stats for the dashboard (see `SubagentManager.stats`)."""
+        return self.subagents.stats()
+
     def get_queue_snapshot(self) -> dict[str, Any]:
         """Return queue/backlog state grouped by session."""
         sessions: dict[str, dict[str, Any]] = {}
@@ -612,11 +674,43 @@ class AgentLoop:
         response = await task
         return response.content if response else ""
 
+    def direct_target(
+        self,
+        session_key: str,
+        *,
+        channel: str = "cli",
+        chat_id: str = "direct",
+        content: str = "",
+    ) -> tuple["AgentLoop", str]:
+        """The loop and session key `process_direct` uses for these arguments (this loop, unchanged)."""
+        del channel, chat_id, content
+        return self, session_key
+
+    def delete_session(self, session_key: str, channel: str = "cli", chat_id: str = "direct") -> bool:
+        """Delete a session created by `process_direct` with the same arguments."""
+        del channel, chat_id
+        return self.sessions.delete(session_key)
+
     async def _run_with_lifecycle(
         self,
         msg: InboundMessage,
         run_id: str,
         publish_outbound: bool,
+    ) -> OutboundMessage | None:
+        with tracing.TRACER.span(
+            "run",
+            trace_id=run_id,
+            agent=self.agent_id,
+            channel=msg.channel,
+            chat_id=msg.chat_id,
+        ):
+            return await self._run_lifecycle(msg, run_id=run_id, publish_outbound=publish_outbound)
+
+    async def _run_lifecycle(
+        self,
+        msg: InboundMessage,
+        run_id: str,
+        publish_outbound: bool,
     ) -> OutboundMessage | None:
         run = self._active_runs.get(run_id) or self._register_run_state(run_id, msg)
         session_key = run.session_key
@@ -628,12 +722,15 @@ class AgentLoop:
         session_started = False
         response: OutboundMessage | None = None
         typing_started = False
+        run_started_mono: float | None = None
 
         async def _execute_started() -> OutboundMessage | None:
-            nonlocal session_started, typing_started
+            nonlocal session_started, typing_started, run_started_mono
             self._check_cancelled(run_id)
             run.status = "running"
             run.started_at = datetime.now()
+            run_started_mono = time.monotonic()
+            metrics.ACTIVE_RUNS.inc(agent=self.agent_id)
             await self._emit_lifecycle_event("run_start", run_id=run_id, session_key=session_key, msg=msg)
             if publish_outbound and self._supports_typing_control(msg.channel):
                 await self._emit_typing_control(
@@ -743,6 +840,20 @@ class AgentLoop:
                     session_key=session_key,
                 )
             run.ended_at = datetime.now()
+            root_span = tracing.current_span()
+            if root_span is not None:
+                root_span.set_attributes(session_key=session_key, status=run.status)
+                if run.status == "error":
+                    root_span.status = "error"
+                    root_span.error = run.error
+            if run_started_mono is not None and metrics.REGISTRY.enabled:
+                metrics.ACTIVE_RUNS.dec(agent=self.agent_id)
+                metrics.RUNS_TOTAL.inc(agent=self.agent_id, status=run.status)
+                metrics.RUN_DURATION.observe(
+                    time.monotonic() - run_started_mono,
+                    agent=self.agent_id,
+                    status=run.status,
+                )
             if session_started:
                 await self._run_hook(
                     "SessionEnd",
@@ -763,6 +874,18 @@ class AgentLoop:
             self._cancel_requested.discard(run_id)
             self._mark_run_closed(run_id)
 
+            reservation = self._token_reservations.pop(run_id, None)
+            # Without reported usage (e.g. a failed run) the estimate stays reserved.
+            if reservation is not None and self.token_limiter and int(run.usage_total_tokens or 0) > 0:
+                self.token_limiter.reconcile(
+                    reservation,
+                    {
+                        "prompt_tokens": run.usage_prompt_tokens,
+                        "completion_tokens": run.usage_completion_tokens,
+                        "total_tokens": run.usage_total_tokens,
+                    },
+                )
+
             if self.usage_tracker and int(run.usage_total_tokens or 0) > 0:
                 try:
                     self.usage_tracker.record(
@@ -799,7 +922,9 @@ class AgentLoop:
                 sender=msg.sender_id,
             )
 
-        if self.rate_limiter and not self.rate_limiter.check_message(msg.sender_id):
+        with tracing.TRACER.span("ratelimit.check", kind="message"):
+            message_allowed = not self.rate_limiter or self.rate_limiter.check_message(msg.sender_id)
+        if not message_allowed:
             return OutboundMessage(
                 channel=msg.channel,
                 chat_id=msg.chat_id,
@@ -832,25 +957,57 @@ class AgentLoop:
         if m:
             thinking_override = m.group(1).lower()
             content = content[m.end() :].lstrip()
+        active_model = model_override or self.model
 
-        final_content, usage = await self._run_dialog(
-            session=session,
-            content=content,
-            channel=msg.channel,
-            chat_id=msg.chat_id,
-            sender_id=msg.sender_id,
-            media=msg.media if msg.media else None,
-            run_id=run_id,
-            thinking_override=thinking_override,
-            model_override=model_override,
-        )
+        if self.token_limiter is not None:
+            prompt_estimate, completion_estimate = self.token_limiter.estimate(content, session=session.key)
+            with tracing.TRACER.span("ratelimit.check", kind="tokens"):
+                reservation = self.token_limiter.admit(
+                    user=msg.sender_id,
+                    session=session.key,
+                    model=active_model,
+                    prompt_tokens=prompt_estimate,
+                    completion_tokens=completion_estimate,
+                )
+            if reservation is None:
+                return OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content="You've used up your token allowance for now. Please try again later.",
+                    reply_to=self._reply_to_for_msg(msg),
+                )
+            self._token_reservations[run_id] = reservation
+
+        remote = None
+        if self.remote_runner is not None and self.remote_runner.handles("runs") and not msg.media:
+            remote = await self._run_remote_dialog(
+                session=session,
+                content=content,
+                msg=msg,
+                run_id=run_id,
+                model=active_model,
+            )
+        if remote is not None:
+            final_content, usage = remote
+        else:
+            final_content, usage = await self._run_dialog(
+                session=session,
+                content=content,
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                sender_id=msg.sender_id,
+                media=msg.media if msg.media else None,
+                run_id=run_id,
+                thinking_override=thinking_override,
+                model_override=model_override,
+            )
         total_tokens = int(usage.get("total_tokens") or 0)
-        active_model = model_override or self.model
 
         session.add_message("user", content)
         if final_content is not None and final_content.strip():
             session.add_message("assistant", final_content)
-        self.sessions.save(session)
+        with tracing.TRACER.span("session.save", messages=len(session.messages)):
+            self.sessions.save(session)
 
         run_state = self._active_runs.get(run_id)
         if run_state is not None:
@@ -945,6 +1102,38 @@ class AgentLoop:
             return None
         return OutboundMessage(channel=origin_channel, chat_id=origin_chat_id, content=final_content)
 
+    async def _run_remote_dialog(
+        self,
+        *,
+        session: Session,
+        content: str,
+        msg: InboundMessage,
+        run_id: str,
+        model: str,
+    ) -> tuple[str | None, dict[str, int]] | None:
+        """Run the turn on a worker node; returns None when no worker is online."""
+        assert self.remote_runner is not None
+        result = await self.remote_runner.run(
+            kind="agent_run",
+            payload={
+                "content": content,
+                "history": session.get_history(),
+                "model": model,
+                "agent_id": self.agent_id,
+                "session_key": session.key,
+                "channel": msg.channel,
+                "chat_id": msg.chat_id,
+            },
+            run_id=run_id,
+            affinity_key=session.key,
+        )
+        if result is None:
+            return None
+        usage = result.get("usage") or {}
+        return result.get("content"), {
+            key: int(usage.get(key) or 0) for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+        }
+
     async def _run_dialog(
         self,
         *,
@@ -994,96 +1183,100 @@ class AgentLoop:
         while iteration < max_iters:
             self._check_cancelled(run_id)
             iteration += 1
-            messages = await self._inject_steer_updates(
-                run_id=run_id,
-                session_key=session.key,
-                channel=channel,
-                chat_id=chat_id,
-                messages=messages,
-            )
-
-            response, streamed = await self._chat_with_optional_stream(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=active_model,
-                thinking=thinking_override,
-                run_id=run_id,
-                session_key=session.key,
-                channel=channel,
-                chat_id=chat_id,
-            )
-            usage_totals = self._merge_usage(usage_totals, response.usage if hasattr(response, "usage") else {})
-
-            if response.finish_reason == "overloaded":
-                logger.warning(f"Run {run_id}: model overloaded, compacting and retrying")
-                did_compact = await self._compact_session(
-                    session,
+            with tracing.TRACER.span("dialog.iteration", iteration=iteration):
+                messages = await self._inject_steer_updates(
                     run_id=run_id,
-                    reason="overloaded_retry",
+                    session_key=session.key,
+                    channel=channel,
+                    chat_id=chat_id,
+                    messages=messages,
                 )
-                if did_compact:
-                    messages = self.context.build_messages(
-                        history=session.get_history(),
-                        current_message=content,
-                        media=media,
-                        channel=channel,
-                        chat_id=chat_id,
-                    )
-                    asked_visible_reply = False
-                    continue
-                raise RuntimeError("Model overloaded and compaction failed")
 
-            if response.content and response.content.strip() and not streamed:
-                await self._emit_assistant_deltas(
+                response, streamed = await self._chat_with_optional_stream(
+                    messages=messages,
+                    tools=self.tools.get_definitions(),
+                    model=active_model,
+                    thinking=thinking_override,
                     run_id=run_id,
                     session_key=session.key,
                     channel=channel,
                     chat_id=chat_id,
-                    text=response.content,
                 )
+                usage_totals = self._merge_usage(usage_totals, response.usage if hasattr(response, "usage") else {})
+
+                error_kind = response.error.kind if getattr(response, "error", None) else None
+                if response.finish_reason == "overloaded" or error_kind == CONTEXT_OVERFLOW:
+                    reason = "context_overflow_retry" if error_kind == CONTEXT_OVERFLOW else "overloaded_retry"
+                    logger.warning(f"Run {run_id}: {reason.removesuffix('_retry')}, compacting and retrying")
+                    did_compact = await self._compact_session(
+                        session,
+                        run_id=run_id,
+                        reason=reason,
+                    )
+                    if did_compact:
+                        messages = self.context.build_messages(
+                            history=session.get_history(),
+                            current_message=content,
+                            media=media,
+                            channel=channel,
+                            chat_id=chat_id,
+                        )
+                        asked_visible_reply = False
+                        continue
+                    raise RuntimeError("Model overloaded and compaction failed")
 
-            if response.has_tool_calls:
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments, ensure_ascii=False),
-                        },
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(messages, response.content, tool_call_dicts)
-
-                for tool_call in response.tool_calls:
-                    result = await self._execute_tool_call(
-                        tool_call=tool_call,
+                if response.content and response.content.strip() and not streamed:
+                    await self._emit_assistant_deltas(
                         run_id=run_id,
                         session_key=session.key,
                         channel=channel,
                         chat_id=chat_id,
-                        sender_id=sender_id,
+                        text=response.content,
                     )
-                    messages = self.context.add_tool_result(messages, tool_call.id, tool_call.name, result)
-                continue
 
-            shaped = self._shape_reply(response.content or "", run_id=run_id)
-            if shaped is None:
-                suppressed = True
-                break
-            if shaped.strip():
-                final_content = shaped
-                break
+                if response.has_tool_calls:
+                    tool_call_dicts = [
+                        {
+                            "id": tc.id,
+                            "type": "function",
+                            "function": {
+                                "name": tc.name,
+                                "arguments": json.dumps(tc.arguments, ensure_ascii=False),
+                            },
+                        }
+                        for tc in response.tool_calls
+                    ]
+                    messages = self.context.add_assistant_message(messages, response.content, tool_call_dicts)
+
+                    for tool_call in response.tool_calls:
+                        with tracing.TRACER.span("tool", tool=tool_call.name, tool_call_id=tool_call.id):
+                            result = await self._execute_tool_call(
+                                tool_call=tool_call,
+                                run_id=run_id,
+                                session_key=session.key,
+                                channel=channel,
+                                chat_id=chat_id,
+                                sender_id=sender_id,
+                            )
+                        messages = self.context.add_tool_result(messages, tool_call.id, tool_call.name, result)
+                    continue
 
-            if asked_visible_reply:
-                final_content = "Completed; no user-visible output."
-                break
+                shaped = self._shape_reply(response.content or "", run_id=run_id)
+                if shaped is None:
+                    suppressed = True
+                    break
+                if shaped.strip():
+                    final_content = shaped
+                    break
 
-            asked_visible_reply = True
-            messages = self.context.add_assistant_message(messages, response.content or "")
-            messages.append({"role": "user", "content": "[system: please provide a user-visible reply.]"})
-            logger.warning(f"Run {run_id}: empty response from LLM, nudging for visible reply")
+                if asked_visible_reply:
+                    final_content = "Completed; no user-visible output."
+                    break
+
+                asked_visible_reply = True
+                messages = self.context.add_assistant_message(messages, response.content or "")
+                messages.append({"role": "user", "content": "[system: please provide a user-visible reply.]"})
+                logger.warning(f"Run {run_id}: empty response from LLM, nudging for visible reply")
 
         if final_content is None and not suppressed:
             self._check_cancelled(run_id)
@@ -1226,7 +1419,9 @@ class AgentLoop:
             return blocked_msg
 
         self._check_cancelled(run_id)
-        if self.rate_limiter and not self.rate_limiter.check_tool_call(sender_id):
+        with tracing.TRACER.span("ratelimit.check", kind="tool_call"):
+            tool_allowed = not self.rate_limiter or self.rate_limiter.check_tool_call(sender_id)
+        if not tool_allowed:
             rate_msg = "Error: Rate limit exceeded for tool calls. Please try again later."
             await self._emit_run_event(
                 {
@@ -1452,7 +1647,8 @@ class AgentLoop:
                 hb_running = bool(heartbeat_status.get("running"))
                 hb_interval = heartbeat_status.get("interval_s")
                 hb_state = "running" if hb_running else "stopped"
-                hb_line = f"Heartbeat: {hb_state}, interval={hb_interval}s"
+                hb_avoided = int(heartbeat_status.get("avoided_calls") or 0)
+                hb_line = f"Heartbeat: {hb_state}, interval={hb_interval}s, avoided_calls={hb_avoided}"
 
             lines = [
                 f"Model: {self.model}",
@@ -1606,7 +1802,7 @@ class AgentLoop:
     def _archive_run(self, run: RunState) -> None:
         self._active_runs.pop(run.run_id, None)
         self._recent_runs.appendleft(run)
-        self._run_store.append(run)
+        self._run_store.append(run, agent_id=self.agent_id)
 
     def _store_run_on_session(self, run: RunState) -> None:
         try:
@@ -1779,7 +1975,10 @@ class AgentLoop:
         await self._emit_run_event(payload)
 
     async def _run_hook(self, event: str, payload: dict[str, Any]) -> Any:
-        result = await self.hooks.run(event, payload)
+        with tracing.TRACER.span("hook", hook_event=event) as span:
+            result = await self.hooks.run(event, payload)
+            if span is not None:
+                span.set_attributes(blocked=bool(getattr(result, "blocked", False)))
         if result.errors:
             await self._emit_run_event(
                 {
@@ -1832,7 +2031,7 @@ class AgentLoop:
             self._closed_run_set.discard(old)
 
     def _load_persisted_runs(self) -> None:
-        rows = self._run_store.load_recent(limit=200)
+        rows = self._run_store.load_recent(limit=200, agent_id=self.agent_id)
         for row in reversed(rows):
             try:
                 run = RunState.from_dict(row)
@@ -1853,6 +2052,45 @@ class AgentLoop:
         session_key: str,
         channel: str,
         chat_id: str,
+    ) -> tuple[LLMResponse, bool]:
+        started = time.monotonic()
+        with tracing.TRACER.span("llm.call", model=model) as span:
+            response, streamed = await self._chat_once(
+                messages=messages,
+                tools=tools,
+                model=model,
+                thinking=thinking,
+                run_id=run_id,
+                session_key=session_key,
+                channel=channel,
+                chat_id=chat_id,
+            )
+            if span is not None:
+                usage = response.usage or {}
+                span.set_attributes(
+                    streamed=streamed,
+                    finish_reason=response.finish_reason,
+                    tool_calls=len(response.tool_calls),
+                    prompt_tokens=int(usage.get("prompt_tokens", 0) or 0),
+                    completion_tokens=int(usage.get("completion_tokens", 0) or 0),
+                )
+                if response.error is not None:
+                    span.status = "error"
+                    span.error = f"{response.error.kind}: {response.error.message}"
+        metrics.record_llm_call(model, time.monotonic() - started, response)
+        return response, streamed
+
+    async def _chat_once(
+        self,
+        *,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str,
+        thinking: str | None,
+        run_id: str,
+        session_key: str,
+        channel: str,
+        chat_id: str,
     ) -> tuple[LLMResponse, bool]:
         had_deltas = False
         if self.stream_events and hasattr(self.provider, "stream_chat"):
@@ -1867,6 +2105,13 @@ class AgentLoop:
                 ):
                     if event.type == "delta" and event.delta:
                         self._check_cancelled(run_id)
+                        if not had_deltas:
+                            llm_span = tracing.current_span()
+                            if llm_span is not None:
+                                llm_span.set_attribute(
+                                    "ttft_ms", round((time.monotonic() - llm_span.start_mono) * 1000.0, 3)
+                                )
+                                llm_span.add_event("first_token")
                         had_deltas = True
                         await self._emit_run_event(
                             {
@@ -3,8 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import hashlib
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Iterator
 
 from loguru import logger
 
@@ -16,8 +21,51 @@ if TYPE_CHECKING:
     from miniclaw.config.schema import AgentRoutingRule
 
 
+# Points per replica on the consistent-hash ring; more points even out the spread.
+RING_POINTS_PER_REPLICA = 64
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    order: int
+    agent: str
+    channel: frozenset[str] | None
+    chat_id: frozenset[str] | None
+    sender_id: frozenset[str] | None
+    is_group: bool | None
+
+    def matches(self, msg: InboundMessage) -> bool:
+        if self.channel is not None and msg.channel not in self.channel:
+            return False
+        if self.chat_id is not None and msg.chat_id not in self.chat_id:
+            return False
+        if self.sender_id is not None and msg.sender_id not in self.sender_id:
+            return False
+        if self.is_group is not None:
+            metadata = msg.metadata or {}
+            is_group = bool(metadata.get("is_group"))
+            if "isGroup" in metadata:
+                is_group = bool(metadata.get("isGroup"))
+            if is_group != self.is_group:
+                return False
+        return True
+
+
 class AgentRouter:
-    """Routes messages to one of up to three agent loops."""
+    """Routes messages to agent loops.
+
+    Routing rules are compiled into per-field indexes (chat id, sender id,
+    channel) so a message is only checked against rules that could match
+    it, still honouring first-match-wins rule order. Conversation to agent
+    bindings are kept in an LRU bounded by `max_session_bindings`. An agent
+    with `replicas` spreads its sessions over several loops by consistent
+    hashing, so a session always lands on the same replica and adding one
+    only moves about 1/n of the sessions.
+    """
 
     def __init__(
         self,
@@ -26,21 +74,34 @@ class AgentRouter:
         agents: dict[str, "AgentLoop"],
         default_agent_id: str = "default",
         routing_rules: list["AgentRoutingRule"] | None = None,
+        replicas: dict[str, list["AgentLoop"]] | None = None,
+        max_session_bindings: int = 10_000,
     ):
         if not agents:
             raise ValueError("AgentRouter requires at least one agent instance.")
-        if len(agents) > 3:
-            raise ValueError("AgentRouter supports at most 3 agent instances.")
         if default_agent_id not in agents:
             raise ValueError(f"Default agent '{default_agent_id}' is not configured.")
+        unknown = sorted(set(replicas or {}) - set(agents))
+        if unknown:
+            raise ValueError(f"Replicas configured for unknown agents: {', '.join(unknown)}.")
 
         self.bus = bus
         self.agents = dict(agents)
         self.default_agent_id = default_agent_id
         self.routing_rules = list(routing_rules or [])
+        self.max_session_bindings = max(1, int(max_session_bindings))
 
         self._running = False
-        self._session_bindings: dict[str, str] = {}
+        self._session_bindings: OrderedDict[str, str] = OrderedDict()
+        self._replicas: dict[str, list["AgentLoop"]] = {
+            agent_id: [agent, *(replicas or {}).get(agent_id, [])] for agent_id, agent in self.agents.items()
+        }
+        self._rings: dict[str, tuple[list[int], list[int]]] = {
+            agent_id: self._build_ring(agent_id, len(loops))
+            for agent_id, loops in self._replicas.items()
+            if len(loops) > 1
+        }
+        self._compile_rules()
 
     @property
     def default_agent(self) -> "AgentLoop":
@@ -67,14 +128,41 @@ class AgentRouter:
                 chat_id=namespace_chat_id,
             )
             routed_msg = self._with_session_override(msg=msg, session_key=session_key)
-            self.agents[agent_id].submit_inbound(routed_msg, publish_outbound=True)
+            self.loop_for(agent_id, session_key).submit_inbound(routed_msg, publish_outbound=True)
 
     def stop(self) -> None:
         """Stop router dispatch and all managed agents."""
         self._running = False
-        for agent in self.agents.values():
+        for _, agent in self._all_loops():
             agent.stop()
 
+    def loop_for(self, agent_id: str, session_key: str) -> "AgentLoop":
+        """The replica of `agent_id` that owns `session_key`."""
+        loops = self._replicas[agent_id]
+        ring = self._rings.get(agent_id)
+        if ring is None:
+            return loops[0]
+        points, owners = ring
+        index = bisect.bisect(points, _hash64(session_key)) % len(points)
+        return loops[owners[index]]
+
+    def replica_counts(self) -> dict[str, int]:
+        return {agent_id: len(loops) for agent_id, loops in self._replicas.items()}
+
+    def _all_loops(self) -> Iterator[tuple[str, "AgentLoop"]]:
+        for agent_id, loops in self._replicas.items():
+            for loop in loops:
+                yield agent_id, loop
+
+    @staticmethod
+    def _build_ring(agent_id: str, replicas: int) -> tuple[list[int], list[int]]:
+        entries = sorted(
+            (_hash64(f"{agent_id}#{replica}#{point}"), replica)
+            for replica in range(replicas)
+            for point in range(RING_POINTS_PER_REPLICA)
+        )
+        return [point for point, _ in entries], [replica for _, replica in entries]
+
     async def process_direct(
         self,
         content: str,
@@ -88,6 +176,24 @@ class AgentRouter:
 
         Explicit session keys are preserved under an agent namespace.
         """
+        loop, namespaced = self.direct_target(session_key, channel=channel, chat_id=chat_id, content=content)
+        return await loop.process_direct(
+            content=content,
+            session_key=namespaced,
+            channel=channel,
+            chat_id=chat_id,
+            model_override=model_override,
+        )
+
+    def direct_target(
+        self,
+        session_key: str,
+        *,
+        channel: str = "cli",
+        chat_id: str = "direct",
+        content: str = "",
+    ) -> tuple["AgentLoop", str]:
+        """The loop and namespaced session key `process_direct` uses for these arguments."""
         binding_key = session_key or f"{channel}:{chat_id}"
         synthetic = InboundMessage(
             channel=channel,
@@ -97,23 +203,29 @@ class AgentRouter:
             metadata={"is_group": False},
         )
         agent_id = self._resolve_agent_id(msg=synthetic, binding_key=binding_key)
+        namespaced = self._direct_session_key(agent_id, binding_key, channel=channel, chat_id=chat_id)
+        return self.loop_for(agent_id, namespaced), namespaced
+
+    def delete_session(self, session_key: str, channel: str = "cli", chat_id: str = "direct") -> bool:
+        """Delete a session created by `process_direct` with the same arguments, and its binding."""
+        binding_key = session_key or f"{channel}:{chat_id}"
+        bound = self._session_bindings.pop(binding_key, None)
+        deleted = False
+        for agent_id in [bound] if bound in self.agents else list(self.agents):
+            namespaced = self._direct_session_key(agent_id, binding_key, channel=channel, chat_id=chat_id)
+            deleted = self.loop_for(agent_id, namespaced).sessions.delete(namespaced) or deleted
+        return deleted
+
+    def _direct_session_key(self, agent_id: str, binding_key: str, *, channel: str, chat_id: str) -> str:
         if binding_key == f"{channel}:{chat_id}":
-            namespaced = self._namespaced_session_key(agent_id=agent_id, channel=channel, chat_id=chat_id)
-        else:
-            namespaced = f"agent:{agent_id}:{binding_key}"
-        return await self.agents[agent_id].process_direct(
-            content=content,
-            session_key=namespaced,
-            channel=channel,
-            chat_id=chat_id,
-            model_override=model_override,
-        )
+            return self._namespaced_session_key(agent_id=agent_id, channel=channel, chat_id=chat_id)
+        return f"agent:{agent_id}:{binding_key}"
 
     def list_runs(self, limit: int = 50) -> list[dict[str, Any]]:
         """List recent runs across agents, newest-first."""
         limit = max(1, min(500, int(limit)))
         merged: list[dict[str, Any]] = []
-        for agent_id, agent in self.agents.items():
+        for agent_id, agent in self._all_loops():
             for run in agent.list_runs(limit=limit):
                 item = dict(run)
                 item["agent_id"] = agent_id
@@ -131,16 +243,34 @@ class AgentRouter:
         merged.sort(key=_created_ts, reverse=True)
         return merged[:limit]
 
+    def query_runs(self, *, limit: int = 50, cursor: str | None = None, **filters: Any) -> dict[str, Any]:
+        """Filtered run history across agents; in-flight runs lead the first page.
+
+        All agents persist to the same run store, so one query covers them.
+        """
+        page = self.default_agent.query_run_history(limit=limit, cursor=cursor, **filters)
+        if not cursor:
+            active: list[dict[str, Any]] = []
+            for _, agent in self._all_loops():
+                active.extend(agent.list_active_runs(**filters))
+            active.sort(key=lambda item: str(item.get("created_at") or ""), reverse=True)
+            active_ids = {item["run_id"] for item in active}
+            page["items"] = active + [item for item in page["items"] if item.get("run_id") not in active_ids]
+        return page
+
+    def run_stats(self, **kwargs: Any) -> list[dict[str, Any]]:
+        return self.default_agent.run_stats(**kwargs)
+
     def cancel_run(self, run_id: str) -> bool:
         """Cancel a run by id across all routed agents."""
-        for agent in self.agents.values():
+        for _, agent in self._all_loops():
             if agent.cancel_run(run_id):
                 return True
         return False
 
     def steer_run(self, run_id: str, instruction: str, *, source: str = "api", sender_id: str | None = None) -> bool:
         """Steer an in-flight run by id across all routed agents."""
-        for agent in self.agents.values():
+        for _, agent in self._all_loops():
             if hasattr(agent, "steer_run") and agent.steer_run(
                 run_id,
                 instruction,
@@ -156,7 +286,7 @@ class AgentRouter:
         mode = "queue"
         collect_window_ms = 0
         max_backlog = 0
-        for agent_id, agent in self.agents.items():
+        for agent_id, agent in self._all_loops():
             if not hasattr(agent, "get_queue_snapshot"):
                 continue
             snap = agent.get_queue_snapshot()
@@ -175,6 +305,33 @@ class AgentRouter:
             "sessions": sessions,
         }
 
+    def subagent_stats(self) -> dict[str, Any]:
+        """Subagent pool stats summed across agents, with each pool under `agents`."""
+        merged: dict[str, Any] = {}
+        pools: list[dict[str, Any]] = []
+        wait_ms_total = 0.0
+        for _, agent in self._all_loops():
+            stats = agent.subagent_stats()
+            pools.append(stats)
+            wait_ms_total += float(stats.get("avg_wait_ms") or 0.0) * int(stats.get("started") or 0)
+            for key, value in stats.items():
+                if key in {"agent_id", "avg_wait_ms", "max_tool_priority"}:
+                    continue
+                if key == "max_wait_ms":
+                    merged[key] = max(float(merged.get(key, 0.0)), float(value))
+                elif isinstance(value, dict):
+                    bucket = merged.setdefault(key, {})
+                    for name, count in value.items():
+                        bucket[name] = bucket.get(name, 0) + count
+                elif isinstance(value, (int, float)):
+                    merged[key] = merged.get(key, 0) + value
+        by_priority = merged.get("queued_by_priority") or {}
+        merged["queued_by_priority"] = dict(sorted(by_priority.items(), key=lambda item: int(item[0]), reverse=True))
+        started = int(merged.get("started") or 0)
+        merged["avg_wait_ms"] = round(wait_ms_total / started, 1) if started else 0.0
+        merged["agents"] = pools
+        return merged
+
     def send_agent_message(
         self,
         *,
@@ -205,7 +362,7 @@ class AgentRouter:
                 **dict(metadata or {}),
             },
         )
-        self.agents[target].submit_inbound(msg, publish_outbound=False)
+        self.loop_for(target, session_key).submit_inbound(msg, publish_outbound=False)
         event = {
             "type": "agent_message",
             "kind": "agent",
@@ -225,19 +382,69 @@ class AgentRouter:
     def _resolve_agent_id(self, *, msg: InboundMessage, binding_key: str) -> str:
         existing = self._session_bindings.get(binding_key)
         if existing in self.agents:
+            self._session_bindings.move_to_end(binding_key)
             return existing
 
         selected = self.default_agent_id
-        for rule in self.routing_rules:
-            if self._rule_matches(rule=rule, msg=msg):
-                selected = rule.agent.strip()
-                break
+        rule = self._match_rule(msg)
+        if rule is not None:
+            selected = rule.agent
 
         if selected not in self.agents:
             selected = self.default_agent_id
         self._session_bindings[binding_key] = selected
+        self._session_bindings.move_to_end(binding_key)
+        while len(self._session_bindings) > self.max_session_bindings:
+            self._session_bindings.popitem(last=False)
         return selected
 
+    def _compile_rules(self) -> None:
+        """Index each rule under its most selective field: chat id, then sender id, then channel."""
+        self._rules_by_chat: dict[str, list[_CompiledRule]] = {}
+        self._rules_by_sender: dict[str, list[_CompiledRule]] = {}
+        self._rules_by_channel: dict[str, list[_CompiledRule]] = {}
+        self._unkeyed_rules: list[_CompiledRule] = []
+
+        def values(raw: str | list[str] | None) -> frozenset[str] | None:
+            if raw is None:
+                return None
+            return frozenset(str(v) for v in raw) if isinstance(raw, list) else frozenset([str(raw)])
+
+        for order, rule in enumerate(self.routing_rules):
+            compiled = _CompiledRule(
+                order=order,
+                agent=rule.agent.strip(),
+                channel=values(rule.channel),
+                chat_id=values(rule.chat_id),
+                sender_id=values(rule.sender_id),
+                is_group=rule.is_group,
+            )
+            for field_values, index in (
+                (compiled.chat_id, self._rules_by_chat),
+                (compiled.sender_id, self._rules_by_sender),
+                (compiled.channel, self._rules_by_channel),
+            ):
+                if field_values is not None:
+                    for value in field_values:
+                        index.setdefault(value, []).append(compiled)
+                    break
+            else:
+                self._unkeyed_rules.append(compiled)
+
+    def _match_rule(self, msg: InboundMessage) -> _CompiledRule | None:
+        """First matching rule in configuration order, checking only indexed candidates."""
+        candidates = heapq.merge(
+            self._rules_by_chat.get(msg.chat_id, ()),
+            self._rules_by_sender.get(msg.sender_id, ()),
+            self._rules_by_channel.get(msg.channel, ()),
+            self._unkeyed_rules,
+            key=lambda rule: rule.order,
+        )
+        for rule in candidates:
+            if rule.matches(msg):
+                return rule
+        return None
+
     @staticmethod
     def _with_session_override(msg: InboundMessage, session_key: str) -> InboundMessage:
         metadata = dict(msg.metadata or {})
@@ -268,29 +475,3 @@ class AgentRouter:
             key = f"{origin_channel}:{origin_chat_id}"
             return key, origin_channel, origin_chat_id
         return msg.session_key, msg.channel, msg.chat_id
-
-    @staticmethod
-    def _match_value(rule_value: str | list[str] | None, actual: str) -> bool:
-        if rule_value is None:
-            return True
-        if isinstance(rule_value, list):
-            return actual in {str(v) for v in rule_value}
-        return actual == str(rule_value)
-
-    @classmethod
-    def _rule_matches(cls, *, rule: "AgentRoutingRule", msg: InboundMessage) -> bool:
-        if not cls._match_value(rule.channel, msg.channel):
-            return False
-        if not cls._match_value(rule.chat_id, msg.chat_id):
-            return False
-        if not cls._match_value(rule.sender_id, msg.sender_id):
-            return False
-
-        if rule.is_group is not None:
-            metadata = msg.metadata or {}
-            is_group = bool(metadata.get("is_group"))
-            if "isGroup" in metadata:
-                is_group = bool(metadata.get("isGroup"))
-            if is_group != rule.is_group:
-                return False
-        return True
@@ -3,8 +3,12 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
 import json
+import time
 import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -16,10 +20,25 @@ from miniclaw.agent.tools.shell import ExecTool
 from miniclaw.agent.tools.web import WebFetchTool, WebSearchTool
 from miniclaw.bus.events import InboundMessage
 from miniclaw.bus.queue import MessageBus
+from miniclaw.monitoring import metrics
 from miniclaw.providers.base import LLMProvider
 
 if TYPE_CHECKING:
-    from miniclaw.config.schema import ExecToolConfig
+    from miniclaw.config.schema import ExecToolConfig, SubagentPoolConfig
+    from miniclaw.distributed.remote import RemoteRunner
+
+
+@dataclass(order=True)
+class _SubagentJob:
+    sort_key: tuple[int, int]
+    task_id: str = field(compare=False)
+    task: str = field(compare=False)
+    label: str = field(compare=False)
+    origin: dict[str, str] = field(compare=False)
+    parent: str = field(compare=False)
+    priority: int = field(compare=False, default=0)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    future: asyncio.Future[dict[str, Any]] | None = field(compare=False, default=None)
 
 
 class SubagentManager:
@@ -29,6 +48,12 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+
+    At most `max_concurrency` subagents run at once; further spawns wait in
+    a bounded priority queue (higher priority first, FIFO within a
+    priority) and are only rejected once that queue is full or their
+    parent conversation already has `max_per_parent` subagents in flight.
+    Tool registries are pre-warmed and reused between subagents.
     """
 
     def __init__(
@@ -47,8 +72,10 @@ class SubagentManager:
         sandbox_prune_idle_seconds: int = 1800,
         sandbox_prune_max_age_seconds: int = 21600,
         restrict_to_workspace: bool = False,
+        remote_runner: RemoteRunner | None = None,
+        pool_config: SubagentPoolConfig | None = None,
     ):
-        from miniclaw.config.schema import ExecToolConfig
+        from miniclaw.config.schema import ExecToolConfig, SubagentPoolConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -69,10 +96,23 @@ class SubagentManager:
         self.sandbox_prune_idle_seconds = max(30, int(sandbox_prune_idle_seconds))
         self.sandbox_prune_max_age_seconds = max(60, int(sandbox_prune_max_age_seconds))
         self.restrict_to_workspace = restrict_to_workspace
-        self._max_concurrency = 3
-        self._task_timeout_s = 15 * 60
-        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self.remote_runner = remote_runner
+        pool = pool_config or SubagentPoolConfig()
+        self._max_concurrency = pool.max_concurrency
+        self._max_queue = pool.max_queue
+        self._max_per_parent = pool.max_per_parent
+        self._task_timeout_s = pool.task_timeout_s
+        # Priorities chosen by the model (spawn tool) are capped here; server-side callers are not.
+        self.max_tool_priority = pool.max_tool_priority
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self._queue: list[_SubagentJob] = []
+        self._seq = itertools.count()
+        self._parent_load: dict[str, int] = {}
+        self._idle_tools: list[ToolRegistry] = [self._build_tools() for _ in range(pool.prewarm)]
+        self._counts = {"spawned": 0, "rejected": 0, "enqueued": 0, "completed": 0, "failed": 0, "timed_out": 0}
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._started = 0
         self._task_usage: dict[str, dict[str, int]] = {}
         self._usage_totals: dict[str, int] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
 
@@ -82,6 +122,8 @@ class SubagentManager:
         label: str | None = None,
         origin_channel: str = "cli",
         origin_chat_id: str = "direct",
+        priority: int = 0,
+        parent: str | None = None,
     ) -> str:
         """
         Spawn a subagent to execute a task in the background.
@@ -91,180 +133,334 @@ class SubagentManager:
             label: Optional human-readable label for the task.
             origin_channel: The channel to announce results to.
             origin_chat_id: The chat ID to announce results to.
+            priority: Queue priority when the pool is busy (higher runs first).
+            parent: Fan-out accounting key; defaults to the origin chat.
 
         Returns:
-            Status message indicating the subagent was started.
+            Status message indicating the subagent was started or queued.
         """
-        if len(self._running_tasks) >= self._max_concurrency:
-            return (
-                f"Subagent capacity reached ({self._max_concurrency}). "
-                "Wait for an active task to finish before spawning another."
-            )
-
-        task_id = str(uuid.uuid4())[:8]
-        display_label = label or task[:30] + ("..." if len(task) > 30 else "")
-
-        origin = {
-            "channel": origin_channel,
-            "chat_id": origin_chat_id,
-        }
-
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent_guarded(task_id, task, display_label, origin)
+        origin = {"channel": origin_channel, "chat_id": origin_chat_id}
+        job = self._admit(task, label, origin, priority=priority, parent=parent)
+        if isinstance(job, str):
+            return job
+        if job.task_id in self._running_tasks:
+            return f"Subagent [{job.label}] started (id: {job.task_id}). I'll notify you when it completes."
+        return (
+            f"Subagent [{job.label}] queued (id: {job.task_id}, {len(self._queue)} waiting). "
+            "I'll notify you when it completes."
         )
-        self._running_tasks[task_id] = bg_task
-
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
 
-        logger.info(f"Spawned subagent [{task_id}]: {display_label}")
-        return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
-
-    async def _run_subagent_guarded(
+    async def spawn_many(
         self,
-        task_id: str,
-        task: str,
-        label: str,
-        origin: dict[str, str],
-    ) -> None:
-        async with self._semaphore:
-            try:
-                await asyncio.wait_for(
-                    self._run_subagent(task_id, task, label, origin),
-                    timeout=float(self._task_timeout_s),
-                )
-            except asyncio.TimeoutError:
-                timeout_msg = (
-                    f"Subagent timed out after {self._task_timeout_s} seconds before completing the task."
-                )
-                logger.warning(f"Subagent [{task_id}] timed out")
-                await self._announce_result(task_id, label, task, timeout_msg, origin, "error")
-            finally:
-                self._task_usage.pop(task_id, None)
+        tasks: list[str | dict[str, Any]],
+        origin_channel: str = "cli",
+        origin_chat_id: str = "direct",
+        priority: int = 0,
+        parent: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Fan out several subagent tasks through the pool and wait for all of them.
+
+        Each entry is a task string or a dict with ``task`` and optional
+        ``label``/``priority``. Results come back in input order as dicts
+        with ``id``, ``label``, ``status`` (ok, error or rejected),
+        ``result`` and ``usage``; nothing is announced on the bus.
+        """
+        origin = {"channel": origin_channel, "chat_id": origin_chat_id}
+        loop = asyncio.get_running_loop()
+        results: list[dict[str, Any] | None] = []
+        jobs: list[_SubagentJob] = []
+        for item in tasks:
+            spec = item if isinstance(item, dict) else {"task": item}
+            job = self._admit(
+                str(spec.get("task") or ""),
+                spec.get("label"),
+                origin,
+                priority=int(spec.get("priority", priority)),
+                parent=parent,
+                future=loop.create_future(),
+            )
+            if isinstance(job, str):
+                results.append({"id": None, "label": spec.get("label") or "", "status": "rejected", "result": job})
+                continue
+            jobs.append(job)
+            results.append(None)
 
-    async def _run_subagent(
+        try:
+            done = await asyncio.gather(*(job.future for job in jobs))
+        except asyncio.CancelledError:
+            self._cancel_jobs(jobs)
+            raise
+        gathered = iter(done)
+        return [row if row is not None else next(gathered) for row in results]
+
+    def _admit(
         self,
-        task_id: str,
         task: str,
-        label: str,
+        label: str | None,
         origin: dict[str, str],
-    ) -> None:
-        """Execute the subagent task and announce the result."""
-        logger.info(f"Subagent [{task_id}] starting task: {label}")
+        *,
+        priority: int = 0,
+        parent: str | None = None,
+        future: asyncio.Future[dict[str, Any]] | None = None,
+    ) -> _SubagentJob | str:
+        """Start or enqueue a job, or return the reason it was rejected."""
+        parent_key = parent or f"{origin['channel']}:{origin['chat_id']}"
+        if self._parent_load.get(parent_key, 0) >= self._max_per_parent:
+            self._counts["rejected"] += 1
+            return (
+                f"Subagent fan-out limit reached ({self._max_per_parent} per conversation). "
+                "Wait for some of them to finish before spawning more."
+            )
+        if len(self._running_tasks) >= self._max_concurrency and len(self._queue) >= self._max_queue:
+            self._counts["rejected"] += 1
+            return (
+                f"Subagent queue full ({self._max_concurrency} running, {len(self._queue)} waiting). "
+                "Wait for an active task to finish before spawning another."
+            )
 
+        job = _SubagentJob(
+            sort_key=(-int(priority), next(self._seq)),
+            task_id=self._new_task_id(),
+            task=task,
+            label=label or task[:30] + ("..." if len(task) > 30 else ""),
+            origin=origin,
+            parent=parent_key,
+            priority=int(priority),
+            future=future,
+        )
+        self._parent_load[parent_key] = self._parent_load.get(parent_key, 0) + 1
+        self._counts["spawned"] += 1
+        if len(self._running_tasks) < self._max_concurrency:
+            self._start(job)
+        else:
+            heapq.heappush(self._queue, job)
+            self._counts["enqueued"] += 1
+            logger.info(f"Queued subagent [{job.task_id}] (priority {job.priority}): {job.label}")
+        self._report_depth()
+        return job
+
+    def _new_task_id(self) -> str:
+        while True:
+            task_id = str(uuid.uuid4())[:8]
+            if task_id not in self._running_tasks and all(job.task_id != task_id for job in self._queue):
+                return task_id
+
+    def _start(self, job: _SubagentJob) -> None:
+        wait_ms = (time.monotonic() - job.enqueued_at) * 1000
+        self._started += 1
+        self._wait_ms_total += wait_ms
+        self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+        metrics.SUBAGENT_QUEUE_WAIT.observe(wait_ms / 1000, agent=self.agent_id)
+
+        bg_task = asyncio.create_task(self._run_subagent_guarded(job))
+        self._running_tasks[job.task_id] = bg_task
+        bg_task.add_done_callback(lambda _, job=job: self._on_job_done(job))
+        logger.info(f"Spawned subagent [{job.task_id}]: {job.label}")
+
+    def _on_job_done(self, job: _SubagentJob) -> None:
+        self._running_tasks.pop(job.task_id, None)
+        self._release_parent(job)
+        if job.future is not None and not job.future.done():
+            job.future.cancel()
+        while self._queue and len(self._running_tasks) < self._max_concurrency:
+            self._start(heapq.heappop(self._queue))
+        self._report_depth()
+
+    def _release_parent(self, job: _SubagentJob) -> None:
+        remaining = self._parent_load.get(job.parent, 0) - 1
+        if remaining > 0:
+            self._parent_load[job.parent] = remaining
+        else:
+            self._parent_load.pop(job.parent, None)
+
+    def _cancel_jobs(self, jobs: list[_SubagentJob]) -> None:
+        ids = {job.task_id for job in jobs}
+        queued = [job for job in self._queue if job.task_id in ids]
+        if queued:
+            self._queue = [job for job in self._queue if job.task_id not in ids]
+            heapq.heapify(self._queue)
+            for job in queued:
+                self._release_parent(job)
+        for task_id in ids:
+            task = self._running_tasks.get(task_id)
+            if task is not None:
+                task.cancel()
+        self._report_depth()
+
+    def _report_depth(self) -> None:
+        metrics.SUBAGENTS_ACTIVE.set(len(self._running_tasks), agent=self.agent_id, state="running")
+        metrics.SUBAGENTS_ACTIVE.set(len(self._queue), agent=self.agent_id, state="queued")
+
+    async def _run_subagent_guarded(self, job: _SubagentJob) -> None:
         try:
-            # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
-            allowed_dir = self.workspace if self.restrict_to_workspace else None
-            tools.register(ReadFileTool(allowed_dir=allowed_dir))
-            tools.register(WriteFileTool(allowed_dir=allowed_dir))
-            tools.register(ListDirTool(allowed_dir=allowed_dir))
-            tools.register(ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                sandbox_mode=self.sandbox_mode,
-                sandbox_scope=self.sandbox_scope,
-                sandbox_workspace_access=self.sandbox_workspace_access,
-                sandbox_image=self.sandbox_image,
-                sandbox_prune_idle_seconds=self.sandbox_prune_idle_seconds,
-                sandbox_prune_max_age_seconds=self.sandbox_prune_max_age_seconds,
-                sandbox_agent_id=f"{self.agent_id}:subagent",
-                resource_limits=self.exec_config.resource_limits,
-                restrict_to_workspace=self.restrict_to_workspace,
-            ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
-            tools.set_context(
-                channel="system",
-                chat_id=f"subagent:{task_id}",
-                user_key=f"subagent:{task_id}",
-                run_id=f"subagent:{task_id}",
-                session_key=f"subagent:{self.agent_id}:{task_id}",
+            await asyncio.wait_for(self._run_subagent(job), timeout=float(self._task_timeout_s))
+        except asyncio.TimeoutError:
+            timeout_msg = (
+                f"Subagent timed out after {self._task_timeout_s} seconds before completing the task."
             )
+            logger.warning(f"Subagent [{job.task_id}] timed out")
+            self._counts["timed_out"] += 1
+            await self._deliver(job, timeout_msg, "error", {})
+        finally:
+            self._task_usage.pop(job.task_id, None)
+
+    async def _run_subagent(self, job: _SubagentJob) -> None:
+        """Execute the subagent task and deliver the result."""
+        task_id, task, label = job.task_id, job.task, job.label
+        logger.info(f"Subagent [{task_id}] starting task: {label}")
 
-            # Build messages with subagent-specific prompt
-            system_prompt = self._build_subagent_prompt(task)
-            messages: list[dict[str, Any]] = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": task},
-            ]
-
-            # Run agent loop (limited iterations)
-            max_iterations = 15
-            iteration = 0
-            final_result: str | None = None
-            usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-
-            while iteration < max_iterations:
-                iteration += 1
-
-                response = await self.provider.chat(
-                    messages=messages,
-                    tools=tools.get_definitions(),
-                    model=self.model,
-                )
-                usage = self._accumulate_usage(usage, response.usage if hasattr(response, "usage") else {})
-
-                if response.has_tool_calls:
-                    # Add assistant message with tool calls
-                    tool_call_dicts = [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.name,
-                                "arguments": json.dumps(tc.arguments, ensure_ascii=False),
-                            },
-                        }
-                        for tc in response.tool_calls
-                    ]
-                    messages.append({
-                        "role": "assistant",
-                        "content": response.content or "",
-                        "tool_calls": tool_call_dicts,
-                    })
-
-                    # Execute tools
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                        logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_call.name,
-                            "content": result,
-                        })
-                else:
-                    final_result = response.content
-                    break
-
-            if final_result is None:
-                final_result = "Task completed but no final response was generated."
+        try:
+            final_result, usage = await self._execute(task_id, task)
 
             self._task_usage[task_id] = dict(usage)
             self._usage_totals["prompt_tokens"] += usage.get("prompt_tokens", 0)
             self._usage_totals["completion_tokens"] += usage.get("completion_tokens", 0)
             self._usage_totals["total_tokens"] += usage.get("total_tokens", 0)
 
-            usage_line = ""
-            if usage.get("total_tokens", 0) > 0:
-                usage_line = (
-                    "\n\nUsage: "
-                    f"prompt={usage.get('prompt_tokens', 0)}, "
-                    f"completion={usage.get('completion_tokens', 0)}, "
-                    f"total={usage.get('total_tokens', 0)} tokens"
-                )
-                final_result = (final_result or "") + usage_line
-
             logger.info(f"Subagent [{task_id}] completed successfully")
-            await self._announce_result(task_id, label, task, final_result, origin, "ok")
+            await self._deliver(job, final_result, "ok", usage)
 
         except Exception as e:
             error_msg = f"Error: {str(e)}"
             logger.error(f"Subagent [{task_id}] failed: {e}")
-            await self._announce_result(task_id, label, task, error_msg, origin, "error")
+            await self._deliver(job, error_msg, "error", {})
+
+    async def _deliver(self, job: _SubagentJob, result: str, status: str, usage: dict[str, int]) -> None:
+        """Resolve a `spawn_many` waiter, or announce a `spawn` result on the bus."""
+        self._counts["completed" if status == "ok" else "failed"] += 1
+        metrics.SUBAGENTS_TOTAL.inc(agent=self.agent_id, status=status)
+        if job.future is not None:
+            if not job.future.done():
+                job.future.set_result(
+                    {"id": job.task_id, "label": job.label, "status": status, "result": result, "usage": usage}
+                )
+            return
+        if usage.get("total_tokens", 0) > 0:
+            result = (
+                f"{result or ''}\n\nUsage: "
+                f"prompt={usage.get('prompt_tokens', 0)}, "
+                f"completion={usage.get('completion_tokens', 0)}, "
+                f"total={usage.get('total_tokens', 0)} tokens"
+            )
+        await self._announce_result(job.task_id, job.label, job.task, result, job.origin, status)
+
+    async def _execute(self, task_id: str, task: str) -> tuple[str, dict[str, int]]:
+        if self.remote_runner is not None and self.remote_runner.handles("subagents"):
+            result = await self.remote_runner.run(
+                kind="subagent",
+                payload={"task_id": task_id, "task": task, "model": self.model},
+                run_id=f"subagent:{task_id}",
+                timeout_s=float(self._task_timeout_s),
+            )
+            if result is not None:
+                return str(result.get("content") or ""), self._accumulate_usage({}, result.get("usage"))
+        return await self.run_task(task_id, task)
+
+    def _build_tools(self) -> ToolRegistry:
+        """Build a subagent tool registry (no message tool, no spawn tool)."""
+        tools = ToolRegistry()
+        allowed_dir = self.workspace if self.restrict_to_workspace else None
+        tools.register(ReadFileTool(allowed_dir=allowed_dir))
+        tools.register(WriteFileTool(allowed_dir=allowed_dir))
+        tools.register(ListDirTool(allowed_dir=allowed_dir))
+        tools.register(ExecTool(
+            working_dir=str(self.workspace),
+            timeout=self.exec_config.timeout,
+            sandbox_mode=self.sandbox_mode,
+            sandbox_scope=self.sandbox_scope,
+            sandbox_workspace_access=self.sandbox_workspace_access,
+            sandbox_image=self.sandbox_image,
+            sandbox_prune_idle_seconds=self.sandbox_prune_idle_seconds,
+            sandbox_prune_max_age_seconds=self.sandbox_prune_max_age_seconds,
+            sandbox_agent_id=f"{self.agent_id}:subagent",
+            resource_limits=self.exec_config.resource_limits,
+            restrict_to_workspace=self.restrict_to_workspace,
+        ))
+        tools.register(WebSearchTool(api_key=self.brave_api_key))
+        tools.register(WebFetchTool())
+        return tools
+
+    async def run_task(self, task_id: str, task: str) -> tuple[str, dict[str, int]]:
+        """Run the subagent tool loop in this process and return (result, usage)."""
+        tools = self._idle_tools.pop() if self._idle_tools else self._build_tools()
+        try:
+            return await self._run_tool_loop(tools, task_id, task)
+        finally:
+            if len(self._idle_tools) < self._max_concurrency:
+                self._idle_tools.append(tools)
+
+    async def _run_tool_loop(self, tools: ToolRegistry, task_id: str, task: str) -> tuple[str, dict[str, int]]:
+        tools.set_context(
+            channel="system",
+            chat_id=f"subagent:{task_id}",
+            user_key=f"subagent:{task_id}",
+            run_id=f"subagent:{task_id}",
+            session_key=f"subagent:{self.agent_id}:{task_id}",
+        )
+
+        # Build messages with subagent-specific prompt
+        system_prompt = self._build_subagent_prompt(task)
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": task},
+        ]
+
+        # Run agent loop (limited iterations)
+        max_iterations = 15
+        iteration = 0
+        final_result: str | None = None
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+        while iteration < max_iterations:
+            iteration += 1
+
+            started = time.monotonic()
+            response = await self.provider.chat(
+                messages=messages,
+                tools=tools.get_definitions(),
+                model=self.model,
+            )
+            metrics.record_llm_call(self.model, time.monotonic() - started, response)
+            usage = self._accumulate_usage(usage, response.usage if hasattr(response, "usage") else {})
+
+            if response.has_tool_calls:
+                # Add assistant message with tool calls
+                tool_call_dicts = [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.name,
+                            "arguments": json.dumps(tc.arguments, ensure_ascii=False),
+                        },
+                    }
+                    for tc in response.tool_calls
+                ]
+                messages.append({
+                    "role": "assistant",
+                    "content": response.content or "",
+                    "tool_calls": tool_call_dicts,
+                })
+
+                # Execute tools
+                for tool_call in response.tool_calls:
+                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+                    logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
+                    result = await tools.execute(tool_call.name, tool_call.arguments)
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "name": tool_call.name,
+                        "content": result,
+                    })
+            else:
+                final_result = response.content
+                break
+
+        if final_result is None:
+            final_result = "Task completed but no final response was generated."
+        return final_result, usage
 
     async def _announce_result(
         self,
@@ -344,3 +540,39 @@ Your workspace is at: {self.workspace}
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
         return len(self._running_tasks)
+
+    @property
+    def max_per_parent(self) -> int:
+        """Running plus queued subagents allowed per parent conversation."""
+        return self._max_per_parent
+
+    def parent_headroom(self, parent: str) -> int:
+        """How many more subagents `parent` may have running or queued right now."""
+        return max(0, self._max_per_parent - self._parent_load.get(parent, 0))
+
+    def get_queued_count(self) -> int:
+        """Return the number of subagents waiting for a free slot."""
+        return len(self._queue)
+
+    def stats(self) -> dict[str, Any]:
+        """Pool configuration, occupancy and queueing counters for the dashboard."""
+        by_priority: dict[int, int] = {}
+        for job in self._queue:
+            by_priority[job.priority] = by_priority.get(job.priority, 0) + 1
+        return {
+            "agent_id": self.agent_id,
+            "max_concurrency": self._max_concurrency,
+            "max_queue": self._max_queue,
+            "max_per_parent": self._max_per_parent,
+            "max_tool_priority": self.max_tool_priority,
+            "running": len(self._running_tasks),
+            "queued": len(self._queue),
+            "queued_by_priority": {str(p): n for p, n in sorted(by_priority.items(), reverse=True)},
+            "parents": dict(self._parent_load),
+            "idle_tool_registries": len(self._idle_tools),
+            **self._counts,
+            "started": self._started,
+            "avg_wait_ms": round(self._wait_ms_total / self._started, 1) if self._started else 0.0,
+            "max_wait_ms": round(self._wait_ms_max, 1),
+            "usage": dict(self._usage_totals),
+        }
@@ -0,0 +1,263 @@
+"""Map-reduce tool: run one instruction over many inputs with subagents, then combine."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from miniclaw.agent.tools.base import Tool
+
+if TYPE_CHECKING:
+    from miniclaw.agent.subagent import SubagentManager
+
+MAX_ITEMS = 200
+# Spawns rejected by a full pool are retried after 0.25s, 0.5s, 1s, ... without
+# counting against the item's own retries.
+REJECT_BACKOFF_S = 0.25
+MAX_REJECT_RETRIES = 5
+# Upper bound on item outputs quoted into the reduce prompt.
+REDUCE_INPUT_CHARS = 60_000
+
+
+class MapReduceTool(Tool):
+    """
+    Fan a per-item instruction out to subagents and reduce their outputs.
+
+    Items go through the `SubagentManager` pool at most `concurrency` at a
+    time, counted against the conversation's fan-out limit like any other
+    spawn. Failed items are retried, the map stops
+    early once `max_failures` is exceeded or `token_budget` is spent, and
+    the reduce step sees only the successful outputs. Progress is published
+    as ``map_reduce_progress`` run events.
+    """
+
+    def __init__(
+        self,
+        manager: "SubagentManager",
+        emit_event: Callable[[dict[str, Any]], Awaitable[None] | None] | None = None,
+        default_concurrency: int = 4,
+    ):
+        self._manager = manager
+        self._emit_event = emit_event
+        self._default_concurrency = max(1, int(default_concurrency))
+        self._channel = "cli"
+        self._chat_id = "direct"
+        self._session_key = ""
+        self._run_id = ""
+
+    def set_registry_context(
+        self,
+        *,
+        channel: str,
+        chat_id: str,
+        session_key: str,
+        user_key: str,
+        run_id: str,
+    ) -> None:
+        del user_key
+        self._channel = channel or "cli"
+        self._chat_id = chat_id or "direct"
+        self._session_key = session_key
+        self._run_id = run_id
+
+    @property
+    def name(self) -> str:
+        return "map_reduce"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Apply one instruction to each of many inputs (URLs, files, records) in parallel "
+            "subagents, then optionally combine the outputs with a reduce instruction. "
+            "Use this instead of calling spawn repeatedly or handling items one by one."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "inputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": f"Items to process (at most {MAX_ITEMS})",
+                },
+                "instruction": {
+                    "type": "string",
+                    "description": "Per-item instruction; '{item}' is replaced by the input, otherwise it is appended",
+                },
+                "reduce_instruction": {
+                    "type": "string",
+                    "description": "How to combine the per-item outputs; omit to get the outputs back as-is",
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Items processed at once (capped by the conversation's remaining subagent fan-out)",
+                },
+                "token_budget": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Stop starting new items (and skip the reduce) once this many tokens are used",
+                },
+                "max_failures": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Abort the remaining items once more than this many have failed",
+                },
+                "retries": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": 3,
+                    "description": "Retries per failed item (default 1)",
+                },
+            },
+            "required": ["inputs", "instruction"],
+        }
+
+    async def execute(
+        self,
+        inputs: list[str],
+        instruction: str,
+        reduce_instruction: str | None = None,
+        concurrency: int | None = None,
+        token_budget: int | None = None,
+        max_failures: int | None = None,
+        retries: int = 1,
+        **kwargs: Any,
+    ) -> str:
+        items = [str(item) for item in inputs or [] if str(item).strip()]
+        if not items:
+            return "Error: inputs is empty"
+        if len(items) > MAX_ITEMS:
+            return f"Error: too many inputs ({len(items)}); the limit is {MAX_ITEMS}"
+
+        parent = f"{self._channel}:{self._chat_id}"
+        headroom = self._manager.parent_headroom(parent)
+        if headroom <= 0:
+            return (
+                f"Error: this conversation already has {self._manager.max_per_parent} subagents in flight; "
+                "wait for some of them to finish"
+            )
+        limit = max(1, min(int(concurrency or self._default_concurrency), headroom))
+        origin = {"origin_channel": self._channel, "origin_chat_id": self._chat_id}
+        retries = max(0, min(int(retries), 3))
+        state = {"tokens": 0, "ok": 0, "failed": 0, "skipped": 0, "aborted": ""}
+        rows: list[dict[str, Any]] = [{} for _ in items]
+        semaphore = asyncio.Semaphore(limit)
+        started = time.monotonic()
+
+        def out_of_budget() -> bool:
+            return bool(token_budget) and state["tokens"] >= int(token_budget)
+
+        async def run_item(index: int, item: str) -> None:
+            async with semaphore:
+                if state["aborted"] or out_of_budget():
+                    state["skipped"] += 1
+                    rows[index] = {"status": "skipped", "result": state["aborted"] or "token budget exhausted"}
+                    await self._progress("item", index=index, status="skipped", total=len(items), **state)
+                    return
+                prompt = instruction.replace("{item}", item) if "{item}" in instruction else f"{instruction}\n\n{item}"
+                row: dict[str, Any] = {}
+                attempts = rejections = 0
+                while attempts <= retries:
+                    [row] = await self._manager.spawn_many(
+                        [{"task": prompt, "label": item[:40]}], parent=parent, **origin
+                    )
+                    if row["status"] == "rejected":
+                        if rejections >= MAX_REJECT_RETRIES:
+                            break
+                        await asyncio.sleep(REJECT_BACKOFF_S * 2**rejections)
+                        rejections += 1
+                        continue
+                    attempts += 1
+                    state["tokens"] += int((row.get("usage") or {}).get("total_tokens") or 0)
+                    if row["status"] == "ok" or out_of_budget():
+                        break
+                rows[index] = row
+                if row["status"] == "ok":
+                    state["ok"] += 1
+                else:
+                    state["failed"] += 1
+                    if max_failures is not None and state["failed"] > max_failures and not state["aborted"]:
+                        state["aborted"] = f"aborted after {state['failed']} failures"
+                await self._progress("item", index=index, status=row["status"], total=len(items), **state)
+
+        await self._progress("start", total=len(items), concurrency=limit, **state)
+        await asyncio.gather(*(run_item(i, item) for i, item in enumerate(items)))
+
+        problems = [
+            f"- [{i}] {items[i - 1][:80]}: {row['status']}: {str(row.get('result') or '')[:200]}"
+            for i, row in enumerate(rows, 1)
+            if row.get("status") != "ok"
+        ]
+        successes = [(i, items[i - 1], row["result"]) for i, row in enumerate(rows, 1) if row.get("status") == "ok"]
+
+        result = ""
+        if not successes:
+            result = "Error: every item failed or was skipped."
+        elif not reduce_instruction:
+            result = "\n\n".join(f"## [{i}] {item[:80]}\n{output}" for i, item, output in successes)
+        elif out_of_budget():
+            result = "Reduce skipped: token budget exhausted. Item outputs:\n\n" + "\n\n".join(
+                f"## [{i}] {item[:80]}\n{output}" for i, item, output in successes
+            )
+        else:
+            await self._progress("reduce", total=len(items), **state)
+            [reduced] = await self._manager.spawn_many(
+                [{"task": self._reduce_prompt(reduce_instruction, successes, problems), "label": "reduce"}],
+                parent=parent,
+                **origin,
+            )
+            state["tokens"] += int((reduced.get("usage") or {}).get("total_tokens") or 0)
+            result = reduced["result"] if reduced["status"] == "ok" else f"Reduce step failed: {reduced['result']}"
+
+        await self._progress(
+            "done", total=len(items), duration_ms=round((time.monotonic() - started) * 1000, 1), **state
+        )
+        summary = (
+            f"Map-reduce: {state['ok']}/{len(items)} items ok, {state['failed']} failed, "
+            f"{state['skipped']} skipped, {state['tokens']} tokens"
+        )
+        if state["aborted"]:
+            summary += f" ({state['aborted']})"
+        parts = [summary]
+        if problems:
+            parts.append("Not processed:\n" + "\n".join(problems))
+        parts.append(result)
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def _reduce_prompt(instruction: str, successes: list[tuple[int, str, str]], problems: list[str]) -> str:
+        per_item = max(500, REDUCE_INPUT_CHARS // max(1, len(successes)))
+        blocks = []
+        for i, item, output in successes:
+            text = output if len(output) <= per_item else output[:per_item] + "... (truncated)"
+            blocks.append(f"### [{i}] {item}\n{text}")
+        missing = "\n\nThese inputs have no output:\n" + "\n".join(problems) if problems else ""
+        return f"{instruction}\n\nOutputs, one per input:\n\n" + "\n\n".join(blocks) + missing
+
+    async def _progress(self, phase: str, **fields: Any) -> None:
+        if not self._emit_event:
+            return
+        fields.pop("aborted", None)
+        payload = {
+            "type": "map_reduce_progress",
+            "kind": "tool",
+            "tool_name": self.name,
+            "run_id": self._run_id,
+            "session_key": self._session_key,
+            "channel": self._channel,
+            "chat_id": self._chat_id,
+            "phase": phase,
+            **fields,
+            "ts": time.time(),
+        }
+        try:
+            maybe = self._emit_event(payload)
+            if inspect.isawaitable(maybe):
+                await maybe
+        except Exception:
+            pass
@@ -10,6 +10,7 @@ from miniclaw.bus.events import OutboundMessage
 from miniclaw.config.schema import ToolApprovalConfig
 from miniclaw.audit.logger import AuditLogger
 from miniclaw.bus.queue import MessageBus
+from miniclaw.monitoring import metrics, tracing
 
 from miniclaw.agent.tools.base import Tool
 
@@ -127,7 +128,10 @@ class ToolRegistry:
         if approval_mode == "always_deny":
             return f"Error: Tool '{name}' is not allowed by policy"
         if approval_mode == "always_ask":
-            approved = await self._request_approval(name, params)
+            with tracing.TRACER.span("approval.wait", tool=name) as approval_span:
+                approved = await self._request_approval(name, params)
+                if approval_span is not None:
+                    approval_span.set_attribute("approved", approved)
             if not approved:
                 return f"Error: Tool '{name}' denied or approval timed out"
 
@@ -152,6 +156,7 @@ class ToolRegistry:
             return result
         finally:
             duration = (time.monotonic() - start) * 1000
+            metrics.TOOL_DURATION.observe(duration / 1000.0, tool=name, ok=str(ok).lower())
             sanitized_params = self._sanitize(params, max_str_len=500)
             sanitized_result = self._sanitize(result, max_str_len=1200)
             self._last_execution = {
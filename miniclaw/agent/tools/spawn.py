@@ -35,7 +35,9 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "Pass `tasks` instead to fan out several independent subtasks in parallel "
+            "and get all their results back in this tool call."
         )
     
     @property
@@ -51,15 +53,50 @@ class SpawnTool(Tool):
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "tasks": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Several independent subtasks to run in parallel and wait for",
+                },
+                "priority": {
+                    "type": "integer",
+                    "description": (
+                        "Queue priority when all subagent slots are busy (higher runs first; "
+                        "values above the server's cap are lowered to it)"
+                    ),
+                },
             },
-            "required": ["task"],
         }
     
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
-        """Spawn a subagent to execute the given task."""
+    async def execute(
+        self,
+        task: str | None = None,
+        label: str | None = None,
+        tasks: list[str] | None = None,
+        priority: int = 0,
+        **kwargs: Any,
+    ) -> str:
+        """Spawn a subagent to execute the given task, or fan out `tasks` and gather them."""
+        try:
+            priority = min(int(priority), self._manager.max_tool_priority)
+        except (TypeError, ValueError):
+            priority = 0
+        if tasks:
+            results = await self._manager.spawn_many(
+                [str(item) for item in tasks],
+                origin_channel=self._origin_channel,
+                origin_chat_id=self._origin_chat_id,
+                priority=priority,
+            )
+            return "\n\n".join(
+                f"## [{i}] {row['label']} ({row['status']})\n{row['result']}" for i, row in enumerate(results, 1)
+            )
+        if not task:
+            return "Error: provide either 'task' or 'tasks'"
         return await self._manager.spawn(
             task=task,
             label=label,
             origin_channel=self._origin_channel,
             origin_chat_id=self._origin_chat_id,
+            priority=priority,
         )
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import secrets
 import tempfile
 import time
@@ -16,14 +17,19 @@ from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, UploadF
 from miniclaw.providers.base import LLMProvider
 from miniclaw.providers.transcription import TranscriptionManager
 from miniclaw.providers.tts import KokoroTTSAdapter
+from miniclaw.ratelimit.tokens import TokenRateLimiter
 
 
 class _OpenAIRateLimiter:
-    """Simple in-memory 60-second fixed window limiter."""
+    """Simple in-memory 60-second fixed window limiter.
 
-    def __init__(self, *, requests_per_minute: int, tokens_per_minute: int):
+    With `tokens_per_minute=None` only requests are counted; token budgets are
+    then left to a `TokenRateLimiter` that sees real usage.
+    """
+
+    def __init__(self, *, requests_per_minute: int, tokens_per_minute: int | None):
         self.requests_per_minute = max(1, int(requests_per_minute))
-        self.tokens_per_minute = max(1, int(tokens_per_minute))
+        self.tokens_per_minute = max(1, int(tokens_per_minute)) if tokens_per_minute is not None else None
         self._request_times: deque[float] = deque()
         self._token_times: deque[tuple[float, int]] = deque()
         self._lock = asyncio.Lock()
@@ -39,14 +45,15 @@ class _OpenAIRateLimiter:
             while self._token_times and self._token_times[0][0] < cutoff:
                 self._token_times.popleft()
 
-            used_tokens = sum(v for _, v in self._token_times)
             if len(self._request_times) >= self.requests_per_minute:
                 return False
-            if used_tokens + tokens > self.tokens_per_minute:
-                return False
+            if self.tokens_per_minute is not None:
+                used_tokens = sum(v for _, v in self._token_times)
+                if used_tokens + tokens > self.tokens_per_minute:
+                    return False
+                self._token_times.append((now, tokens))
 
             self._request_times.append(now)
-            self._token_times.append((now, tokens))
             return True
 
 
@@ -58,13 +65,20 @@ def create_openai_compat_app(
     transcription_manager: TranscriptionManager | None = None,
     tts_adapter: KokoroTTSAdapter | None = None,
     usage_tracker: Any | None = None,
+    token_limiter: TokenRateLimiter | None = None,
 ) -> FastAPI:
-    """Create OpenAI-compatible app."""
+    """Create OpenAI-compatible app.
+
+    `token_limiter` budgets chat completions by real token usage, keyed on the
+    authenticated caller, and replaces the estimate-based `tokens_per_minute`
+    window; `/v1/responses` runs go through the agent runtime, which applies
+    its own token limiter.
+    """
     app = FastAPI(title="miniclaw openai-compat", docs_url=None, redoc_url=None)
     compat_cfg = config.api.openai_compat
     limiter = _OpenAIRateLimiter(
         requests_per_minute=compat_cfg.rate_limits.requests_per_minute,
-        tokens_per_minute=compat_cfg.rate_limits.tokens_per_minute,
+        tokens_per_minute=None if token_limiter is not None else compat_cfg.rate_limits.tokens_per_minute,
     )
     tts = tts_adapter or KokoroTTSAdapter(
         output_dir=Path(config.transcription.tts.output_dir).expanduser(),
@@ -75,7 +89,8 @@ def create_openai_compat_app(
         groq_api_key=config.providers.groq.api_key or None,
     )
 
-    async def require_auth(authorization: str = Header(default="")) -> None:
+    async def require_auth(authorization: str = Header(default="")) -> str:
+        """Check the bearer token and return the caller's principal id."""
         token = str(compat_cfg.auth_token or "").strip()
         if not token:
             raise HTTPException(
@@ -88,6 +103,7 @@ def create_openai_compat_app(
         provided_token = parts[1].strip()
         if not provided_token or not secrets.compare_digest(provided_token, token):
             raise HTTPException(status_code=401, detail="Unauthorized")
+        return _principal_id(token)
 
     async def check_limit(payload: Any) -> None:
         estimated_tokens = _estimate_payload_tokens(payload)
@@ -104,8 +120,8 @@ def create_openai_compat_app(
         data = [{"id": model, "object": "model", "owned_by": "miniclaw"} for model in names]
         return {"object": "list", "data": data}
 
-    @app.post("/v1/chat/completions", dependencies=[Depends(require_auth)])
-    async def chat_completions(body: dict[str, Any]) -> dict[str, Any]:
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict[str, Any], principal: str = Depends(require_auth)) -> dict[str, Any]:
         await check_limit(body)
         if bool(body.get("stream")):
             raise HTTPException(status_code=400, detail="stream=true is not supported yet.")
@@ -115,6 +131,21 @@ def create_openai_compat_app(
         tools = body.get("tools") if isinstance(body.get("tools"), list) else None
         max_tokens = int(body.get("max_tokens") or body.get("max_completion_tokens") or config.agents.defaults.max_tokens)
         temperature = float(body.get("temperature", config.agents.defaults.temperature))
+        metadata = body.get("metadata") if isinstance(body.get("metadata"), dict) else {}
+        session_key = str(body.get("session_key") or metadata.get("session_key", "") or "openai:chat_completions")
+
+        reservation = None
+        if token_limiter is not None:
+            reservation = token_limiter.admit(
+                # Clients choose body["user"]; budgets follow the token they authenticated with.
+                user=principal,
+                session=session_key,
+                model=model,
+                prompt_tokens=_estimate_payload_tokens(messages),
+                completion_tokens=min(max_tokens, token_limiter.estimate_completion_tokens),
+            )
+            if reservation is None:
+                raise HTTPException(status_code=429, detail="Token rate limit exceeded")
 
         response = await provider.chat(
             messages=messages,
@@ -140,8 +171,9 @@ def create_openai_compat_app(
             "completion_tokens": int(response.usage.get("completion_tokens") or 0),
             "total_tokens": int(response.usage.get("total_tokens") or 0),
         }
+        if reservation is not None:
+            token_limiter.reconcile(reservation, usage)
         if usage_tracker is not None:
-            metadata = body.get("metadata") if isinstance(body.get("metadata"), dict) else {}
             try:
                 usage_tracker.record(
                     source="openai_compat.chat_completions",
@@ -149,11 +181,7 @@ def create_openai_compat_app(
                     prompt_tokens=usage["prompt_tokens"],
                     completion_tokens=usage["completion_tokens"],
                     total_tokens=usage["total_tokens"],
-                    session_key=str(
-                        body.get("session_key")
-                        or metadata.get("session_key", "")
-                        or "openai:chat_completions"
-                    ),
+                    session_key=session_key,
                 )
             except Exception:
                 pass
@@ -368,6 +396,11 @@ def _estimate_payload_tokens(payload: Any) -> int:
     return max(1, len(serialized) // 4)
 
 
+def _principal_id(token: str) -> str:
+    """Stable, non-secret id for the bearer token a caller authenticated with."""
+    return "openai:" + hashlib.sha256(token.encode("utf-8")).hexdigest()[:12]
+
+
 def _safe_json_dump(value: Any) -> str:
     try:
         import json
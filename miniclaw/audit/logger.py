@@ -1,16 +1,41 @@
 """Structured audit logging to JSON lines file."""
 
+import asyncio
+import atexit
 import json
+import os
 import re
+import threading
 import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Callable, Literal
 
 from loguru import logger
 
 
+def audit_log_files(log_path: Path) -> list[Path]:
+    """Return rotated audit logs (oldest first) followed by the live log."""
+    log_path = Path(log_path)
+    rotated = sorted(
+        path
+        for path in log_path.parent.glob(f"{log_path.name}.*")
+        if path.is_file() and not path.name.endswith(".tmp")
+    )
+    return rotated + ([log_path] if log_path.exists() else [])
+
+
 class AuditLogger:
-    """Structured JSON-lines audit logger."""
+    """Structured JSON-lines audit logger.
+
+    Until `start()` is called every entry is written through synchronously.
+    Once started, entries are serialized into an in-memory buffer and written
+    in batches by a background task whenever `batch_size` entries are pending
+    or `flush_interval_ms` has elapsed. A crash loses at most the entries
+    buffered since the last flush; with `fsync_interval_ms >= 0` an OS crash
+    additionally loses at most that many milliseconds of flushed entries
+    (0 fsyncs every batch, -1 leaves durability to the OS).
+    """
 
     _SENSITIVE_KEY_RE = re.compile(
         r"(token|secret|password|passwd|api[_-]?key|access[_-]?key|private[_-]?key|authorization|bearer)",
@@ -26,18 +51,254 @@ class AuditLogger:
         self,
         log_path: Path,
         level: Literal["minimal", "standard", "verbose"] = "standard",
+        *,
+        flush_interval_ms: int = 200,
+        batch_size: int = 256,
+        max_buffer: int = 10_000,
+        fsync_interval_ms: int = 1000,
+        max_bytes: int = 0,
+        rotate_daily: bool = False,
+        backup_count: int = 7,
     ):
         self.log_path = log_path
         self.level = level
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval_ms = max(1, int(flush_interval_ms))
+        self.batch_size = max(1, int(batch_size))
+        self.max_buffer = max(self.batch_size, int(max_buffer))
+        self.fsync_interval_ms = int(fsync_interval_ms)
+        self.max_bytes = max(0, int(max_bytes))
+        self.rotate_daily = bool(rotate_daily)
+        self.backup_count = max(0, int(backup_count))
+
+        self._buffer: deque[str] = deque()
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._handle: Any = None
+        self._handle_day: str | None = None
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.stats = {"written": 0, "batches": 0, "fsyncs": 0, "rotations": 0, "errors": 0}
+
+    @property
+    def buffered(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Switch to buffered mode and start the background flusher."""
+        if self.buffered:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+        atexit.register(self.flush)
+
+    async def stop(self) -> None:
+        """Flush pending entries and return to write-through mode."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.flush)
+        self.close()
+        atexit.unregister(self.flush)
+
+    def flush(self) -> None:
+        """Write every buffered entry now (safe from any thread)."""
+        while True:
+            with self._buffer_lock:
+                if not self._buffer:
+                    return
+                batch = list(self._buffer)
+                self._buffer.clear()
+            self._write_lines(batch)
+
+    def close(self) -> None:
+        with self._file_lock:
+            self._close_handle()
+
+    def remove_entries(self, drop: Callable[[dict[str, Any]], bool]) -> int:
+        """Delete every logged entry matching `drop`; returns how many were removed.
+
+        Buffered entries are flushed first so they are filtered too, and each
+        file is rewritten through a temp file under the writer's lock, so
+        concurrent appends are neither lost nor interleaved with the rewrite.
+        """
+        self.flush()
+        removed = 0
+        with self._file_lock:
+            self._close_handle()
+            for path in audit_log_files(self.log_path):
+                kept: list[str] = []
+                dropped = 0
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        if not line.endswith("\n"):
+                            line += "\n"
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            kept.append(line)
+                            continue
+                        if isinstance(entry, dict) and drop(entry):
+                            dropped += 1
+                        else:
+                            kept.append(line)
+                if not dropped:
+                    continue
+                removed += dropped
+                if not kept and path != self.log_path:
+                    # Fully expired rotated segment.
+                    path.unlink(missing_ok=True)
+                    continue
+                tmp = path.with_name(f"{path.name}.tmp")
+                tmp.write_text("".join(kept), encoding="utf-8")
+                os.replace(tmp, path)
+        return removed
+
+    async def _flush_loop(self) -> None:
+        assert self._wake is not None
+        interval = self.flush_interval_ms / 1000.0
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._buffer or self._unsynced:
+                try:
+                    await asyncio.to_thread(self._flush_and_sync)
+                except Exception as e:
+                    logger.warning(f"Audit flush failed: {e}")
+
+    def _flush_and_sync(self) -> None:
+        self.flush()
+        if self._unsynced and self.fsync_interval_ms >= 0:
+            with self._file_lock:
+                self._maybe_fsync(force=False)
 
     def _write(self, entry: dict[str, Any]) -> None:
         entry["ts"] = time.time()
         try:
-            with open(self.log_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
         except Exception as e:
             logger.warning(f"Audit write failed: {e}")
+            return
+        if not self.buffered:
+            self._write_lines([line])
+            return
+        with self._buffer_lock:
+            self._buffer.append(line)
+            pending = len(self._buffer)
+        if pending >= self.max_buffer:
+            # Backpressure instead of dropping audit entries.
+            self.flush()
+        elif pending == self.batch_size and self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _chunks(self, lines: list[str]) -> list[tuple[str, int, int]]:
+        """Split a batch so no chunk alone overflows `max_bytes`."""
+        if not self.max_bytes:
+            payload = "".join(lines)
+            return [(payload, len(payload.encode("utf-8")), len(lines))]
+        chunks: list[tuple[str, int, int]] = []
+        current: list[str] = []
+        current_bytes = 0
+        for line in lines:
+            size = len(line.encode("utf-8"))
+            if current and current_bytes + size > self.max_bytes:
+                chunks.append(("".join(current), current_bytes, len(current)))
+                current, current_bytes = [], 0
+            current.append(line)
+            current_bytes += size
+        if current:
+            chunks.append(("".join(current), current_bytes, len(current)))
+        return chunks
+
+    def _write_lines(self, lines: list[str]) -> None:
+        with self._file_lock:
+            try:
+                for payload, size, count in self._chunks(lines):
+                    self._maybe_rotate(size)
+                    handle = self._open_handle()
+                    handle.write(payload)
+                    handle.flush()
+                    self.stats["written"] += count
+                self.stats["batches"] += 1
+                if self.buffered:
+                    self._unsynced = True
+                    self._maybe_fsync(force=self.fsync_interval_ms == 0)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Audit write failed: {e}")
+                self._close_handle()
+            if not self.buffered:
+                # Write-through mode keeps no descriptor open between entries.
+                self._close_handle()
+
+    def _open_handle(self) -> Any:
+        if self._handle is None:
+            self._handle = open(self.log_path, "a", encoding="utf-8")
+            self._handle_day = time.strftime("%Y-%m-%d")
+        return self._handle
+
+    def _close_handle(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            if self._unsynced and self.fsync_interval_ms >= 0:
+                self._maybe_fsync(force=True)
+            self._handle.close()
+        except Exception:
+            pass
+        self._handle = None
+
+    def _maybe_fsync(self, *, force: bool) -> None:
+        if self._handle is None or not self._unsynced:
+            return
+        now = time.monotonic()
+        if not force and (now - self._last_fsync) * 1000.0 < self.fsync_interval_ms:
+            return
+        os.fsync(self._handle.fileno())
+        self._last_fsync = now
+        self._unsynced = False
+        self.stats["fsyncs"] += 1
+
+    def _maybe_rotate(self, incoming_bytes: int) -> None:
+        if not (self.max_bytes or self.rotate_daily) or not self.log_path.exists():
+            return
+        size = self.log_path.stat().st_size
+        if size == 0:
+            return
+        too_big = bool(self.max_bytes) and size + incoming_bytes > self.max_bytes
+        if self.rotate_daily:
+            file_day = self._handle_day or time.strftime("%Y-%m-%d", time.localtime(self.log_path.stat().st_mtime))
+            new_day = file_day != time.strftime("%Y-%m-%d")
+        else:
+            new_day = False
+        if not (too_big or new_day):
+            return
+        self._close_handle()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        target = self.log_path.with_name(f"{self.log_path.name}.{stamp}")
+        suffix = 1
+        while target.exists():
+            target = self.log_path.with_name(f"{self.log_path.name}.{stamp}-{suffix}")
+            suffix += 1
+        self.log_path.replace(target)
+        self.stats["rotations"] += 1
+        rotated = audit_log_files(self.log_path)
+        for old in rotated[: max(0, len(rotated) - self.backup_count)]:
+            if old != self.log_path:
+                old.unlink(missing_ok=True)
 
     @staticmethod
     def _looks_binary_string(value: str) -> bool:
@@ -7,6 +7,7 @@ from collections import deque
 from loguru import logger
 
 from miniclaw.bus.events import InboundMessage, OutboundMessage
+from miniclaw.monitoring import metrics
 
 
 class MessageBus:
@@ -39,6 +40,7 @@ class MessageBus:
             future.set_result(msg.content)
             return
         await self.inbound.put(msg)
+        metrics.BUS_MESSAGES.inc(direction="inbound")
     
     async def consume_inbound(self) -> InboundMessage:
         """Consume the next inbound message (blocks until available)."""
@@ -47,6 +49,7 @@ class MessageBus:
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
         await self.outbound.put(msg)
+        metrics.BUS_MESSAGES.inc(direction="outbound")
     
     async def consume_outbound(self) -> OutboundMessage:
         """Consume the next outbound message (blocks until available)."""
@@ -1,6 +1,30 @@
 """Chat channels module for miniclaw."""
 
-from miniclaw.channels.base import BaseChannel
-from miniclaw.channels.manager import ChannelManager
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from miniclaw.channels.base import BaseChannel
+    from miniclaw.channels.manager import ChannelManager
+
+_EXPORTS = {
+    "BaseChannel": "miniclaw.channels.base",
+    "ChannelManager": "miniclaw.channels.manager",
+}
 
 __all__ = ["BaseChannel", "ChannelManager"]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
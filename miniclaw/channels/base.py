@@ -7,6 +7,7 @@ from loguru import logger
 
 from miniclaw.bus.events import InboundMessage, OutboundMessage
 from miniclaw.bus.queue import MessageBus
+from miniclaw.monitoring import metrics
 
 
 class BaseChannel(ABC):
@@ -137,6 +138,7 @@ class BaseChannel(ABC):
             metadata=base_metadata,
         )
         
+        metrics.CHANNEL_MESSAGES.inc(channel=self.name, direction="inbound")
         await self.bus.publish_inbound(msg)
     
     @property
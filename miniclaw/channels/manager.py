@@ -8,6 +8,7 @@ from loguru import logger
 from miniclaw.bus.queue import MessageBus
 from miniclaw.channels.base import BaseChannel
 from miniclaw.config.schema import Config
+from miniclaw.monitoring import metrics
 
 
 class ChannelManager:
@@ -26,6 +27,7 @@ class ChannelManager:
         self.identity_store = identity_store
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self._start_tasks: dict[str, asyncio.Task] = {}
         
         self._init_channels()
     
@@ -87,11 +89,20 @@ class ChannelManager:
         tasks = []
         for name, channel in self.channels.items():
             logger.info(f"Starting {name} channel...")
-            tasks.append(asyncio.create_task(self._start_channel(name, channel)))
+            task = asyncio.create_task(self._start_channel(name, channel))
+            self._start_tasks[name] = task
+            tasks.append(task)
         
         # Wait for all to complete (they should run forever)
         await asyncio.gather(*tasks, return_exceptions=True)
     
+    def all_started(self) -> bool:
+        """Whether every channel is running or has given up starting."""
+        return all(
+            channel.is_running or (name in self._start_tasks and self._start_tasks[name].done())
+            for name, channel in self.channels.items()
+        )
+
     async def stop_all(self) -> None:
         """Stop all channels and the dispatcher."""
         logger.info("Stopping all channels...")
@@ -127,7 +138,9 @@ class ChannelManager:
                 if channel:
                     try:
                         await channel.send(msg)
+                        metrics.CHANNEL_MESSAGES.inc(channel=msg.channel, direction="outbound")
                     except Exception as e:
+                        metrics.CHANNEL_MESSAGES.inc(channel=msg.channel, direction="send_error")
                         logger.error(f"Error sending to {msg.channel}: {e}")
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
@@ -1262,6 +1262,9 @@ def _run_scheduled_session_reset(agent_loops: dict[str, object]) -> int:
 def gateway(
     port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+    profile_startup: bool = typer.Option(
+        False, "--profile-startup", help="Print a per-subsystem startup timeline once ready"
+    ),
 ):
     """Start the miniclaw gateway."""
     from miniclaw.agent.loop import AgentLoop
@@ -1275,13 +1278,17 @@ def gateway(
     from miniclaw.cron.types import CronJob
     from miniclaw.dashboard.auth import generate_token
     from miniclaw.distributed.manager import DistributedNodeManager
+    from miniclaw.distributed.remote import RemoteRunner
     from miniclaw.heartbeat.service import HeartbeatService
     from miniclaw.identity import IdentityStore
+    from miniclaw.monitoring import metrics, tracing
     from miniclaw.monitoring.alerts import AlertService
+    from miniclaw.monitoring.startup import StartupTimeline
     from miniclaw.processes.manager import ProcessManager
     from miniclaw.providers.transcription import TranscriptionManager
     from miniclaw.providers.tts import KokoroTTSAdapter
     from miniclaw.ratelimit.limiter import RateLimiter
+    from miniclaw.ratelimit.tokens import TokenRateLimiter
     from miniclaw.secrets import ScopedSecretStore, SecretStore
     from miniclaw.usage import UsageTracker
 
@@ -1291,61 +1298,98 @@ def gateway(
 
     console.print(f"{__logo__} Starting miniclaw gateway on port {port}...")
 
-    config = load_config()
-    data_dir = get_data_dir()
+    timeline = StartupTimeline()
+    with timeline.span("config"):
+        config = load_config()
+        data_dir = get_data_dir()
+    metrics.configure(enabled=config.metrics.enabled)
+    tracing.configure(config.tracing, data_dir=data_dir)
     bus = MessageBus()
-    secret_store = SecretStore()
-    identity_store = IdentityStore(data_dir / "identity" / "state.json")
-    distributed_manager = DistributedNodeManager(
-        store_path=data_dir / "distributed" / "state.json",
-        local_node_id=config.distributed.node_id,
-        peer_allowlist=config.distributed.peer_allowlist,
-        heartbeat_timeout_s=config.distributed.heartbeat_timeout_s,
-        max_tasks=config.distributed.max_tasks,
-    )
-    if config.distributed.enabled:
-        distributed_manager.register_node(
-            node_id=config.distributed.node_id,
-            capabilities=["agent", "workflow", "process"],
-            metadata={"local": True},
-            address="local",
+    with timeline.span("secrets_and_identity"):
+        secret_store = SecretStore()
+        identity_store = IdentityStore(data_dir / "identity" / "state.json")
+        if config.channels.telegram.enabled and not config.channels.telegram.token:
+            stored_tg_token = secret_store.get(TELEGRAM_TOKEN_SECRET_KEY)
+            if stored_tg_token:
+                config.channels.telegram.token = stored_tg_token
+    with timeline.span("distributed"):
+        distributed_manager = DistributedNodeManager(
+            store_path=data_dir / "distributed" / "state.json",
+            local_node_id=config.distributed.node_id,
+            peer_allowlist=config.distributed.peer_allowlist,
+            heartbeat_timeout_s=config.distributed.heartbeat_timeout_s,
+            max_tasks=config.distributed.max_tasks,
+            task_lease_s=config.distributed.task_lease_s,
+            placement=config.distributed.placement,
+        )
+        if config.distributed.enabled:
+            distributed_manager.register_node(
+                node_id=config.distributed.node_id,
+                capabilities=["agent", "workflow", "process"],
+                metadata={"local": True},
+                address="local",
+            )
+        remote_runner = None
+        if config.distributed.enabled and config.distributed.remote_execution != "off":
+            remote_runner = RemoteRunner(
+                distributed_manager,
+                bus,
+                mode=config.distributed.remote_execution,
+                timeout_s=config.distributed.remote_timeout_s,
+            )
+    with timeline.span("process_manager"):
+        process_manager = ProcessManager(
+            workspace=config.workspace_path,
+            restrict_to_workspace=config.tools.restrict_to_workspace,
         )
-    process_manager = ProcessManager(
-        workspace=config.workspace_path,
-        restrict_to_workspace=config.tools.restrict_to_workspace,
-    )
-    if config.channels.telegram.enabled and not config.channels.telegram.token:
-        stored_tg_token = secret_store.get(TELEGRAM_TOKEN_SECRET_KEY)
-        if stored_tg_token:
-            config.channels.telegram.token = stored_tg_token
 
-    audit_logger = None
-    if config.audit.enabled:
-        audit_logger = AuditLogger(data_dir / "audit.log", level=config.audit.level)
+    with timeline.span("audit_and_rate_limit"):
+        audit_logger = None
+        if config.audit.enabled:
+            audit_logger = AuditLogger(
+                data_dir / "audit.log",
+                level=config.audit.level,
+                flush_interval_ms=config.audit.flush_interval_ms,
+                batch_size=config.audit.batch_size,
+                fsync_interval_ms=config.audit.fsync_interval_ms,
+                max_bytes=config.audit.max_bytes,
+                rotate_daily=config.audit.rotate_daily,
+                backup_count=config.audit.backup_count,
+            )
 
-    rate_limiter = None
-    if config.rate_limit.enabled:
-        rate_limiter = RateLimiter(
-            messages_per_minute=config.rate_limit.messages_per_minute,
-            tool_calls_per_minute=config.rate_limit.tool_calls_per_minute,
-            store_path=data_dir / "ratelimit" / "state.json",
+        rate_limiter = None
+        token_limiter = None
+        if config.rate_limit.enabled:
+            rate_limiter = RateLimiter(
+                messages_per_minute=config.rate_limit.messages_per_minute,
+                tool_calls_per_minute=config.rate_limit.tool_calls_per_minute,
+                store_path=data_dir / "ratelimit" / "state.json",
+                backend=config.rate_limit.backend,
+                snapshot_interval_s=config.rate_limit.snapshot_interval_s,
+            )
+            token_limiter = TokenRateLimiter.from_config(config.rate_limit)
+
+    with timeline.span("cron_usage_compliance"):
+        # Create cron service first (callback set after agent creation)
+        cron_store_path = data_dir / "cron" / "jobs.json"
+        cron = CronService(
+            cron_store_path,
+            max_concurrent=config.cron.max_concurrent,
+            jitter_ms=config.cron.jitter_ms,
         )
-
-    # Create cron service first (callback set after agent creation)
-    cron_store_path = data_dir / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
-    usage_tracker = UsageTracker(
-        store_path=data_dir / "usage" / "events.jsonl",
-        pricing=config.usage.pricing,
-        aggregation_windows=config.usage.aggregation_windows,
-    )
-    compliance_service = ComplianceService(
-        workspace=config.workspace_path,
-        retention=config.retention,
-        data_dir=data_dir,
-        usage_tracker=usage_tracker,
-    )
-    alert_service = AlertService(config.alerts)
+        usage_tracker = UsageTracker(
+            store_path=data_dir / "usage" / "events.jsonl",
+            pricing=config.usage.pricing,
+            aggregation_windows=config.usage.aggregation_windows,
+        )
+        compliance_service = ComplianceService(
+            workspace=config.workspace_path,
+            retention=config.retention,
+            data_dir=data_dir,
+            usage_tracker=usage_tracker,
+            audit_logger=audit_logger,
+        )
+        alert_service = AlertService(config.alerts)
     defaults = config.agents.defaults
 
     def _scoped_secret_store(scope: str | None):
@@ -1366,6 +1410,7 @@ def gateway(
         credential_scope: str,
         reply_shaping: bool,
         no_reply_token: str,
+        session_manager=None,
     ) -> AgentLoop:
         provider = _make_provider(
             config,
@@ -1393,6 +1438,7 @@ def gateway(
             approval_config=config.tools.approval,
             audit_logger=audit_logger,
             rate_limiter=rate_limiter,
+            token_limiter=token_limiter,
             context_window=context_window,
             embedding_model=embedding_model,
             supports_vision=supports_vision,
@@ -1406,92 +1452,118 @@ def gateway(
             hook_config=config.hooks,
             secret_store=_scoped_secret_store(credential_scope),
             usage_tracker=usage_tracker,
+            remote_runner=remote_runner,
+            subagent_config=config.agents.defaults.subagents,
+            session_manager=session_manager,
         )
 
-    agent_loops: dict[str, AgentLoop] = {}
-    if config.agents.instances:
-        for instance in config.agents.instances:
-            instance_id = instance.id.strip()
-            model = instance.model or defaults.model
-            thinking = instance.thinking or defaults.thinking
-            agent_loops[instance_id] = _build_agent_loop(
-                agent_id=instance_id,
-                model=model,
-                thinking=thinking,
-                max_iterations=(
-                    instance.max_tool_iterations
-                    if instance.max_tool_iterations is not None
-                    else defaults.max_tool_iterations
-                ),
-                context_window=(
-                    instance.context_window
-                    if instance.context_window is not None
-                    else defaults.context_window
-                ),
-                embedding_model=(
-                    instance.embedding_model
-                    if instance.embedding_model is not None
-                    else defaults.embedding_model
-                ),
-                supports_vision=(
-                    instance.supports_vision
-                    if instance.supports_vision is not None
-                    else defaults.supports_vision
-                ),
-                timeout_seconds=(
-                    instance.timeout_seconds
-                    if instance.timeout_seconds is not None
-                    else defaults.timeout_seconds
-                ),
-                stream_events=(
-                    instance.stream_events
-                    if instance.stream_events is not None
-                    else defaults.stream_events
-                ),
-                queue_config=instance.queue if instance.queue is not None else defaults.queue,
-                credential_scope=(
-                    instance.credential_scope
-                    if instance.credential_scope is not None
-                    else defaults.credential_scope
-                ),
-                reply_shaping=(
-                    instance.reply_shaping
-                    if instance.reply_shaping is not None
-                    else defaults.reply_shaping
-                ),
-                no_reply_token=(
-                    instance.no_reply_token
-                    if instance.no_reply_token is not None
-                    else defaults.no_reply_token
-                ),
+    with timeline.span("agents"):
+        agent_loops: dict[str, AgentLoop] = {}
+        replica_loops: dict[str, list[AgentLoop]] = {}
+        if config.agents.instances:
+            for instance in config.agents.instances:
+                instance_id = instance.id.strip()
+                model = instance.model or defaults.model
+                thinking = instance.thinking or defaults.thinking
+                options = dict(
+                    agent_id=instance_id,
+                    model=model,
+                    thinking=thinking,
+                    max_iterations=(
+                        instance.max_tool_iterations
+                        if instance.max_tool_iterations is not None
+                        else defaults.max_tool_iterations
+                    ),
+                    context_window=(
+                        instance.context_window
+                        if instance.context_window is not None
+                        else defaults.context_window
+                    ),
+                    embedding_model=(
+                        instance.embedding_model
+                        if instance.embedding_model is not None
+                        else defaults.embedding_model
+                    ),
+                    supports_vision=(
+                        instance.supports_vision
+                        if instance.supports_vision is not None
+                        else defaults.supports_vision
+                    ),
+                    timeout_seconds=(
+                        instance.timeout_seconds
+                        if instance.timeout_seconds is not None
+                        else defaults.timeout_seconds
+                    ),
+                    stream_events=(
+                        instance.stream_events
+                        if instance.stream_events is not None
+                        else defaults.stream_events
+                    ),
+                    queue_config=instance.queue if instance.queue is not None else defaults.queue,
+                    credential_scope=(
+                        instance.credential_scope
+                        if instance.credential_scope is not None
+                        else defaults.credential_scope
+                    ),
+                    reply_shaping=(
+                        instance.reply_shaping
+                        if instance.reply_shaping is not None
+                        else defaults.reply_shaping
+                    ),
+                    no_reply_token=(
+                        instance.no_reply_token
+                        if instance.no_reply_token is not None
+                        else defaults.no_reply_token
+                    ),
+                )
+                first = _build_agent_loop(**options)
+                # Replicas share one SessionManager, so the dashboard and other
+                # readers of the primary loop see sessions served by any replica.
+                loops = [first] + [
+                    _build_agent_loop(**options, session_manager=first.sessions)
+                    for _ in range(instance.replicas - 1)
+                ]
+                agent_loops[instance_id] = loops[0]
+                if len(loops) > 1:
+                    replica_loops[instance_id] = loops[1:]
+            agent_runtime: AgentLoop | AgentRouter = AgentRouter(
+                bus=bus,
+                agents=agent_loops,
+                default_agent_id="default",
+                routing_rules=config.agents.routing.rules,
+                replicas=replica_loops,
+                max_session_bindings=config.agents.routing.max_session_bindings,
             )
-        agent_runtime: AgentLoop | AgentRouter = AgentRouter(
-            bus=bus,
-            agents=agent_loops,
-            default_agent_id="default",
-            routing_rules=config.agents.routing.rules,
-        )
-        console.print(f"[green]✓[/green] Multi-agent routing: {', '.join(agent_loops.keys())}")
-    else:
-        single = _build_agent_loop(
-            agent_id="default",
-            model=defaults.model,
-            thinking=defaults.thinking,
-            max_iterations=defaults.max_tool_iterations,
-            context_window=defaults.context_window,
-            embedding_model=defaults.embedding_model,
-            supports_vision=defaults.supports_vision,
-            timeout_seconds=defaults.timeout_seconds,
-            stream_events=defaults.stream_events,
-            queue_config=defaults.queue,
-            credential_scope=defaults.credential_scope,
-            reply_shaping=defaults.reply_shaping,
-            no_reply_token=defaults.no_reply_token,
-        )
-        agent_loops["default"] = single
-        agent_runtime = single
+            labels = [
+                f"{agent_id}x{len(replica_loops[agent_id]) + 1}" if agent_id in replica_loops else agent_id
+                for agent_id in agent_loops
+            ]
+            console.print(f"[green]✓[/green] Multi-agent routing: {', '.join(labels)}")
+        else:
+            single = _build_agent_loop(
+                agent_id="default",
+                model=defaults.model,
+                thinking=defaults.thinking,
+                max_iterations=defaults.max_tool_iterations,
+                context_window=defaults.context_window,
+                embedding_model=defaults.embedding_model,
+                supports_vision=defaults.supports_vision,
+                timeout_seconds=defaults.timeout_seconds,
+                stream_events=defaults.stream_events,
+                queue_config=defaults.queue,
+                credential_scope=defaults.credential_scope,
+                reply_shaping=defaults.reply_shaping,
+                no_reply_token=defaults.no_reply_token,
+            )
+            agent_loops["default"] = single
+            agent_runtime = single
 
     default_agent = agent_loops["default"]
+    # Every loop, replicas included, for per-loop wiring below.
+    all_loops: dict[str, AgentLoop] = dict(agent_loops)
+    for agent_id, extra in replica_loops.items():
+        for index, loop in enumerate(extra, 1):
+            all_loops[f"{agent_id}#{index}"] = loop
     _reconcile_scheduled_session_reset_job(cron, config.sessions.scheduled_reset_cron)
     _reconcile_retention_sweep_job(cron)
 
@@ -1502,7 +1574,7 @@ def gateway(
         chat_id = job.payload.to or "direct"
 
         if job.payload.kind == "session_reset":
-            reset_count = _run_scheduled_session_reset(agent_loops)
+            reset_count = _run_scheduled_session_reset(all_loops)
             return f"Reset {reset_count} sessions."
 
         if job.payload.kind == "retention_sweep":
@@ -1531,7 +1603,7 @@ def gateway(
         if job.payload.agent_id and hasattr(agent_runtime, "agents"):
             maybe_agent = agent_runtime.agents.get(job.payload.agent_id)  # type: ignore[attr-defined]
             if maybe_agent is not None:
-                target_runtime = maybe_agent
+                target_runtime = agent_runtime.loop_for(job.payload.agent_id, session_key)  # type: ignore[attr-defined]
             else:
                 console.print(
                     f"[yellow]Cron warning:[/yellow] unknown agent_id '{job.payload.agent_id}', using default routing."
@@ -1559,25 +1631,30 @@ def gateway(
         """Execute heartbeat through the agent."""
         return await agent_runtime.process_direct(prompt, session_key="heartbeat")
 
-    heartbeat = HeartbeatService(
-        workspace=config.workspace_path,
-        on_heartbeat=on_heartbeat,
-        interval_s=30 * 60,  # 30 minutes
-        enabled=True
-    )
-    for loop in agent_loops.values():
-        loop.heartbeat_service = heartbeat
+    with timeline.span("heartbeat"):
+        heartbeat = HeartbeatService(
+            workspace=config.workspace_path,
+            on_heartbeat=on_heartbeat,
+            interval_s=config.heartbeat.interval_s,
+            enabled=config.heartbeat.enabled,
+            state_path=data_dir / "heartbeat" / "state.json",
+            max_skip_s=config.heartbeat.max_skip_s,
+        )
+        for loop in all_loops.values():
+            loop.heartbeat_service = heartbeat
 
     # Create channel manager
-    channels = ChannelManager(config, bus, identity_store=identity_store)
-    transcription_manager = TranscriptionManager.from_config(
-        config.transcription,
-        groq_api_key=config.providers.groq.api_key or None,
-    )
-    tts_adapter = KokoroTTSAdapter(
-        output_dir=Path(config.transcription.tts.output_dir).expanduser(),
-        default_voice=config.transcription.tts.default_voice,
-    )
+    with timeline.span("channels"):
+        channels = ChannelManager(config, bus, identity_store=identity_store)
+    with timeline.span("transcription_and_tts"):
+        transcription_manager = TranscriptionManager.from_config(
+            config.transcription,
+            groq_api_key=config.providers.groq.api_key or None,
+        )
+        tts_adapter = KokoroTTSAdapter(
+            output_dir=Path(config.transcription.tts.output_dir).expanduser(),
+            default_voice=config.transcription.tts.default_voice,
+        )
 
     if channels.enabled_channels:
         console.print(f"[green]✓[/green] Channels enabled: {', '.join(channels.enabled_channels)}")
@@ -1594,74 +1671,84 @@ def gateway(
     dashboard_server = None
     openai_server = None
     if config.dashboard.enabled:
-        import uvicorn
-
-        from miniclaw.dashboard.app import create_app
-        token = config.dashboard.token
-        if not token:
-            token = generate_token()
-            config.dashboard.token = token
-            save_config(config, get_config_path())
-            console.print(f"[yellow]Dashboard token generated:[/yellow] {token}")
-        app = create_app(
-            config=config,
-            config_path=get_config_path(),
-            sessions_manager=default_agent.sessions,
-            cron_service=cron,
-            heartbeat_service=heartbeat,
-            skills_loader=default_agent.context.skills,
-            agent_loop=agent_runtime,
-            token=token,
-            bus=bus,
-            channels_manager=channels,
-            memory_store=default_agent.context.memory,
-            secret_store=secret_store,
-            process_manager=process_manager,
-            identity_store=identity_store,
-            distributed_manager=distributed_manager if config.distributed.enabled else None,
-            usage_tracker=usage_tracker,
-            compliance_service=compliance_service,
-            alert_service=alert_service,
-        )
-        uv_config = uvicorn.Config(app, host=config.gateway.host, port=config.dashboard.port, log_level="info")
-        dashboard_server = uvicorn.Server(uv_config)
-        console.print(f"[green]✓[/green] Dashboard: http://{config.gateway.host}:{config.dashboard.port}")
+        with timeline.span("dashboard"):
+            import uvicorn
+
+            from miniclaw.dashboard.app import create_app
+            token = config.dashboard.token
+            if not token:
+                token = generate_token()
+                config.dashboard.token = token
+                save_config(config, get_config_path())
+                console.print(f"[yellow]Dashboard token generated:[/yellow] {token}")
+            app = create_app(
+                config=config,
+                config_path=get_config_path(),
+                sessions_manager=default_agent.sessions,
+                cron_service=cron,
+                heartbeat_service=heartbeat,
+                skills_loader=default_agent.context.skills,
+                agent_loop=agent_runtime,
+                token=token,
+                bus=bus,
+                channels_manager=channels,
+                memory_store=default_agent.context.memory,
+                secret_store=secret_store,
+                process_manager=process_manager,
+                identity_store=identity_store,
+                distributed_manager=distributed_manager if config.distributed.enabled else None,
+                usage_tracker=usage_tracker,
+                compliance_service=compliance_service,
+                alert_service=alert_service,
+                startup_timeline=timeline,
+            )
+            uv_config = uvicorn.Config(app, host=config.gateway.host, port=config.dashboard.port, log_level="info")
+            dashboard_server = uvicorn.Server(uv_config)
+            console.print(f"[green]✓[/green] Dashboard: http://{config.gateway.host}:{config.dashboard.port}")
 
     if config.api.openai_compat.enabled:
-        import uvicorn
-
-        from miniclaw.api.openai_compat import create_openai_compat_app
-
-        openai_app = create_openai_compat_app(
-            config=config,
-            provider=default_agent.provider,
-            agent_runtime=agent_runtime,
-            transcription_manager=transcription_manager,
-            tts_adapter=tts_adapter,
-            usage_tracker=usage_tracker,
-        )
-        openai_config = uvicorn.Config(
-            openai_app,
-            host=config.api.openai_compat.host,
-            port=config.api.openai_compat.port,
-            log_level="info",
-        )
-        openai_server = uvicorn.Server(openai_config)
-        console.print(
-            f"[green]✓[/green] OpenAI compat API: "
-            f"http://{config.api.openai_compat.host}:{config.api.openai_compat.port}"
-        )
+        with timeline.span("openai_compat"):
+            import uvicorn
+
+            from miniclaw.api.openai_compat import create_openai_compat_app
+
+            openai_app = create_openai_compat_app(
+                config=config,
+                provider=default_agent.provider,
+                agent_runtime=agent_runtime,
+                transcription_manager=transcription_manager,
+                tts_adapter=tts_adapter,
+                usage_tracker=usage_tracker,
+                token_limiter=token_limiter,
+            )
+            openai_config = uvicorn.Config(
+                openai_app,
+                host=config.api.openai_compat.host,
+                port=config.api.openai_compat.port,
+                log_level="info",
+            )
+            openai_server = uvicorn.Server(openai_config)
+            console.print(
+                f"[green]✓[/green] OpenAI compat API: "
+                f"http://{config.api.openai_compat.host}:{config.api.openai_compat.port}"
+            )
 
     async def run():
         try:
-            await cron.start()
-            await heartbeat.start()
-            await alert_service.start(
-                bus=bus,
-                agent_loop=agent_runtime,
-                cron_service=cron,
-                channels_manager=channels,
-                distributed_manager=distributed_manager if config.distributed.enabled else None,
+            # These services are independent of one another, so start them concurrently.
+            await timeline.start_all(
+                {
+                    "audit": audit_logger.start() if audit_logger else asyncio.sleep(0),
+                    "cron": cron.start(),
+                    "heartbeat": heartbeat.start(),
+                    "alerts": alert_service.start(
+                        bus=bus,
+                        agent_loop=agent_runtime,
+                        cron_service=cron,
+                        channels_manager=channels,
+                        distributed_manager=distributed_manager if config.distributed.enabled else None,
+                    ),
+                }
             )
             dashboard_task = None
             openai_task = None
@@ -1669,9 +1756,26 @@ def gateway(
                 dashboard_task = asyncio.create_task(dashboard_server.serve())
             if openai_server:
                 openai_task = asyncio.create_task(openai_server.serve())
+            servers = [
+                (server, task)
+                for server, task in ((dashboard_server, dashboard_task), (openai_server, openai_task))
+                if server is not None
+            ]
+
+            async def mark_ready_when_serving() -> None:
+                await timeline.wait_until("channels", channels.all_started)
+                if servers:
+                    await timeline.wait_until(
+                        "servers", lambda: all(server.started or task.done() for server, task in servers)
+                    )
+                timeline.mark_ready()
+                if profile_startup:
+                    _print_startup_timeline(timeline.snapshot())
+
             await asyncio.gather(
                 agent_runtime.run(),
                 channels.start_all(),
+                mark_ready_when_serving(),
                 dashboard_task if dashboard_task else asyncio.sleep(0),
                 openai_task if openai_task else asyncio.sleep(0),
             )
@@ -1686,12 +1790,42 @@ def gateway(
             if openai_server:
                 openai_server.should_exit = True
             await channels.stop_all()
+            usage_tracker.flush()
+            if rate_limiter:
+                rate_limiter.flush()
+            if audit_logger:
+                await audit_logger.stop()
+            await tracing.TRACER.flush()
 
     asyncio.run(run())
 
 
 
 
+def _print_startup_timeline(snapshot: dict) -> None:
+    table = Table(title="Gateway startup timeline")
+    table.add_column("Step", style="cyan")
+    table.add_column("Phase")
+    table.add_column("Start (ms)", justify="right")
+    table.add_column("Duration (ms)", justify="right")
+    table.add_column("Status")
+    for span in snapshot.get("spans", []):
+        duration = span.get("duration_ms")
+        status = span.get("status", "")
+        style = "red" if status == "error" else "green"
+        table.add_row(
+            str(span.get("name", "")),
+            str(span.get("phase", "")),
+            f"{float(span.get('start_ms') or 0.0):.1f}",
+            "-" if duration is None else f"{float(duration):.1f}",
+            f"[{style}]{status}[/{style}]",
+        )
+    console.print(table)
+    ready_ms = snapshot.get("ready_ms")
+    if ready_ms is not None:
+        console.print(f"Ready after [bold]{float(ready_ms):.1f} ms[/bold]")
+
+
 # ============================================================================
 # Agent Commands
 # ============================================================================
@@ -1709,6 +1843,7 @@ def agent(
     from miniclaw.config.loader import get_data_dir, load_config
     from miniclaw.processes.manager import ProcessManager
     from miniclaw.ratelimit.limiter import RateLimiter
+    from miniclaw.ratelimit.tokens import TokenRateLimiter
     from miniclaw.secrets import ScopedSecretStore, SecretStore
     from miniclaw.usage import UsageTracker
 
@@ -1739,7 +1874,10 @@ def agent(
             messages_per_minute=config.rate_limit.messages_per_minute,
             tool_calls_per_minute=config.rate_limit.tool_calls_per_minute,
             store_path=data_dir / "ratelimit" / "state.json",
+            backend=config.rate_limit.backend,
+            snapshot_interval_s=config.rate_limit.snapshot_interval_s,
         )
+    token_limiter = TokenRateLimiter.from_config(config.rate_limit) if config.rate_limit.enabled else None
 
     agent_loop = AgentLoop(
         bus=bus,
@@ -1758,6 +1896,7 @@ def agent(
         approval_config=config.tools.approval,
         audit_logger=audit_logger,
         rate_limiter=rate_limiter,
+        token_limiter=token_limiter,
         context_window=config.agents.defaults.context_window,
         embedding_model=config.agents.defaults.embedding_model,
         supports_vision=config.agents.defaults.supports_vision,
@@ -1803,6 +1942,66 @@ def agent(
         asyncio.run(run_interactive())
 
 
+@app.command()
+def worker(
+    gateway_url: str = typer.Option("", "--gateway", "-g", help="Gateway dashboard URL (default: local dashboard port)"),
+    token: str = typer.Option("", "--token", envvar="MINICLAW_GATEWAY_TOKEN", help="Gateway dashboard token"),
+    node_id: str = typer.Option("", "--node-id", help="Node id to register as (default: worker-<host>-<pid>)"),
+    capabilities: str = typer.Option("", "--capabilities", help="Extra comma-separated capabilities"),
+    slots: int = typer.Option(2, "--slots", min=1, help="Tasks to run concurrently"),
+    heartbeat_s: float = typer.Option(15.0, "--heartbeat", help="Heartbeat interval in seconds"),
+):
+    """Run a headless worker that executes agent runs, subagents and tools for a gateway."""
+    from miniclaw.config.loader import load_config
+    from miniclaw.distributed.worker import HttpWorkerTransport, TaskExecutor, Worker
+    from miniclaw.secrets import SecretStore
+
+    config = load_config()
+    gateway_url = gateway_url or f"http://127.0.0.1:{config.dashboard.port}"
+    token = token or config.dashboard.token
+    if not token:
+        console.print("[red]A gateway token is required (--token or MINICLAW_GATEWAY_TOKEN).[/red]")
+        raise typer.Exit(1)
+    secret_store = SecretStore()
+    config.workspace_path.mkdir(parents=True, exist_ok=True)
+
+    executor = TaskExecutor(
+        workspace=config.workspace_path,
+        provider_factory=lambda model: _make_provider(config, model=model, secret_store=secret_store),
+        agent_options={
+            "brave_api_key": config.tools.web.search.api_key or None,
+            "exec_config": config.tools.exec,
+            "restrict_to_workspace": config.tools.restrict_to_workspace,
+            "max_iterations": config.agents.defaults.max_tool_iterations,
+            "context_window": config.agents.defaults.context_window,
+            "supports_vision": config.agents.defaults.supports_vision,
+            "timeout_seconds": config.agents.defaults.timeout_seconds,
+            "approval_config": config.tools.approval,
+            "sandbox_mode": config.tools.sandbox.mode,
+            "sandbox_scope": config.tools.sandbox.scope,
+            "sandbox_workspace_access": config.tools.sandbox.workspace_access,
+            "sandbox_image": config.tools.sandbox.image,
+            "sandbox_prune_idle_seconds": config.tools.sandbox.prune_idle_seconds,
+            "sandbox_prune_max_age_seconds": config.tools.sandbox.prune_max_age_seconds,
+        },
+        exec_timeout=config.tools.exec.timeout,
+        restrict_to_workspace=config.tools.restrict_to_workspace,
+    )
+    node = Worker(
+        HttpWorkerTransport(gateway_url, token),
+        executor,
+        node_id=node_id or None,
+        capabilities=_parse_csv_values(capabilities),
+        slots=slots,
+        heartbeat_s=heartbeat_s,
+    )
+    console.print(f"{__logo__} Worker {node.node_id} connecting to {gateway_url} ({slots} slots)")
+    try:
+        asyncio.run(node.run())
+    except KeyboardInterrupt:
+        console.print("\nGoodbye!")
+
+
 # ============================================================================
 # Channel Commands
 # ============================================================================
@@ -2014,6 +2213,7 @@ def cron_add(
     deliver: bool = typer.Option(False, "--deliver", "-d", help="Deliver response to channel"),
     to: str = typer.Option(None, "--to", help="Recipient for delivery"),
     channel: str = typer.Option(None, "--channel", help="Channel for delivery (e.g. 'telegram', 'whatsapp')"),
+    overlap: str = typer.Option("skip", "--overlap", help="If still running when due: skip, queue or replace"),
 ):
     """Add a scheduled job."""
     from miniclaw.config.loader import get_data_dir
@@ -2036,14 +2236,19 @@ def cron_add(
     store_path = get_data_dir() / "cron" / "jobs.json"
     service = CronService(store_path)
 
-    job = service.add_job(
-        name=name,
-        schedule=schedule,
-        message=message,
-        deliver=deliver,
-        to=to,
-        channel=channel,
-    )
+    try:
+        job = service.add_job(
+            name=name,
+            schedule=schedule,
+            message=message,
+            deliver=deliver,
+            to=to,
+            channel=channel,
+            overlap=overlap,
+        )
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
 
     console.print(f"[green]✓[/green] Added job '{job.name}' ({job.id})")
 
@@ -2106,6 +2311,119 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+# ============================================================================
+# Workflow Commands
+# ============================================================================
+
+
+workflow_app = typer.Typer(help="Run workflow recipes")
+app.add_typer(workflow_app, name="workflow")
+
+
+@workflow_app.command("run")
+def workflow_run(
+    recipe_ref: str = typer.Argument(..., help="Recipe name or path"),
+    var: list[str] = typer.Option([], "--var", help="Template variable as key=value (repeatable)"),
+    model: str = typer.Option("", "--model", "-m", help="Model override"),
+    replay: bool = typer.Option(False, "--replay", help="Serve every step from the step cache; no agent calls"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Approve steps that require approval"),
+    as_json: bool = typer.Option(False, "--json", help="Print the full run result as JSON"),
+):
+    """Run a workflow recipe once and print its step outputs."""
+    from miniclaw.config.loader import get_data_dir, load_config
+    from miniclaw.usage import UsageTracker
+    from miniclaw.workflows.runtime import LinearWorkflowRuntime
+    from miniclaw.workflows.store import WorkflowStepCache
+
+    config = load_config()
+    data_dir = get_data_dir()
+    vars_dict: dict[str, str] = {}
+    for item in var:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            console.print(f"[red]Invalid --var '{item}' (expected key=value)[/red]")
+            raise typer.Exit(1)
+        vars_dict[key.strip()] = value
+
+    step_cache = None
+    if config.workflows.step_cache_enabled:
+        step_cache = WorkflowStepCache(
+            data_dir / "workflows" / "step_cache.db",
+            max_entries=config.workflows.step_cache_max_entries,
+            max_bytes=config.workflows.step_cache_max_mb * 1024 * 1024,
+            default_ttl_s=config.workflows.step_cache_default_ttl_s,
+        )
+    elif replay:
+        console.print("[red]--replay needs workflows.stepCacheEnabled[/red]")
+        raise typer.Exit(1)
+    usage_tracker = UsageTracker(
+        store_path=data_dir / "usage" / "events.jsonl",
+        pricing=config.usage.pricing,
+        aggregation_windows=config.usage.aggregation_windows,
+    )
+
+    recipe_root = Path(config.workflows.path)
+    if not recipe_root.is_absolute():
+        recipe_root = (config.workspace_path / recipe_root).resolve()
+    runtime = LinearWorkflowRuntime(
+        agent_runtime=None,
+        workspace=config.workspace_path,
+        recipe_root=recipe_root,
+        dag_scheduler=config.workflows.dag_scheduler,
+        step_cache=step_cache,
+        usage_tracker=usage_tracker,
+        default_model=config.agents.defaults.model,
+        record_for_replay=config.workflows.step_cache_record_all,
+    )
+    try:
+        recipe = runtime.load_recipe(recipe_ref)
+    except Exception as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(1)
+
+    if not replay:
+        gated = [step.id for step in recipe.steps if step.require_approval]
+        if gated and not yes:
+            console.print(f"[red]Steps need approval: {', '.join(gated)} (pass --yes to approve)[/red]")
+            raise typer.Exit(1)
+        from miniclaw.agent.loop import AgentLoop
+        from miniclaw.bus.queue import MessageBus
+        from miniclaw.secrets import SecretStore
+
+        runtime.agent_runtime = AgentLoop(
+            bus=MessageBus(),
+            provider=_make_provider(config, secret_store=SecretStore()),
+            workspace=config.workspace_path,
+            model=config.agents.defaults.model,
+            brave_api_key=config.tools.web.search.api_key or None,
+            exec_config=config.tools.exec,
+            restrict_to_workspace=config.tools.restrict_to_workspace,
+            approval_config=config.tools.approval,
+            context_window=config.agents.defaults.context_window,
+            timeout_seconds=config.agents.defaults.timeout_seconds,
+            usage_tracker=usage_tracker,
+        )
+
+    result = asyncio.run(runtime.run_recipe(recipe, vars=vars_dict, model_override=model or None, replay=replay))
+    usage_tracker.flush()
+    if as_json:
+        console.print_json(json.dumps(result, ensure_ascii=False, default=str))
+    else:
+        for row in result["steps"]:
+            tag = " (cached)" if row.get("cached") else ""
+            console.print(f"[bold]{row['id']}[/bold] {row['status']}{tag}")
+            if row.get("output"):
+                console.print(row["output"])
+        cache = result.get("cache")
+        if cache:
+            console.print(
+                f"\nCache: {cache['hits']} hits, {cache['misses']} misses, {cache['tokens_saved']} tokens saved"
+            )
+        console.print(f"Run {result['id']}: {result['status']}")
+    if result["status"] != "completed":
+        raise typer.Exit(1)
+
+
 # ============================================================================
 # Service Commands
 # ============================================================================
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+from miniclaw.audit.logger import AuditLogger, audit_log_files
+from miniclaw.session.run_store import RunStore
 from miniclaw.utils.helpers import get_data_path, workspace_scope_id
 
 
@@ -23,6 +25,7 @@ class ComplianceService:
         retention: Any,
         data_dir: Path | None = None,
         usage_tracker: Any | None = None,
+        audit_logger: AuditLogger | None = None,
     ):
         self.workspace = Path(workspace).expanduser().resolve()
         self.workspace_scope = workspace_scope_id(self.workspace)
@@ -33,7 +36,9 @@ class ComplianceService:
 
         self.sessions_dir = self.data_dir / "sessions"
         self.runs_path = self.data_dir / "runs" / "runs.jsonl"
+        self.runs_db_path = self.data_dir / "runs" / "runs.db"
         self.audit_path = self.data_dir / "audit.log"
+        self.audit_logger = audit_logger
         self.memory_dir = self.workspace / "memory"
         self.identity_path = self.data_dir / "identity" / "state.json"
 
@@ -115,14 +120,20 @@ class ComplianceService:
                     staged / "sessions",
                     self.sessions_glob,
                 )
-            if "runs" in domains and self.runs_path.exists():
-                (staged / "runs").mkdir(parents=True, exist_ok=True)
-                shutil.copy2(self.runs_path, staged / "runs" / self.runs_path.name)
-                files_added += 1
-            if "audit" in domains and self.audit_path.exists():
-                (staged / "audit").mkdir(parents=True, exist_ok=True)
-                shutil.copy2(self.audit_path, staged / "audit" / self.audit_path.name)
-                files_added += 1
+            if "runs" in domains:
+                run_store = self._open_run_store()
+                if run_store is not None:
+                    (staged / "runs").mkdir(parents=True, exist_ok=True)
+                    try:
+                        run_store.export_jsonl(staged / "runs" / "runs.db.jsonl")
+                    finally:
+                        run_store.close()
+                    files_added += 1
+            if "audit" in domains:
+                for audit_file in audit_log_files(self.audit_path):
+                    (staged / "audit").mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(audit_file, staged / "audit" / audit_file.name)
+                    files_added += 1
             if "memory" in domains and self.memory_dir.exists():
                 files_added += self._copy_tree(self.memory_dir, staged / "memory")
             if "identity" in domains and self.identity_path.exists():
@@ -130,8 +141,13 @@ class ComplianceService:
                 shutil.copy2(self.identity_path, staged / "identity" / self.identity_path.name)
                 files_added += 1
             if "usage" in domains and self.usage_tracker is not None:
-                usage_path = Path(getattr(self.usage_tracker, "store_path", ""))
-                if usage_path.exists():
+                if hasattr(self.usage_tracker, "segment_paths"):
+                    usage_paths = list(self.usage_tracker.segment_paths())
+                else:
+                    usage_paths = [Path(getattr(self.usage_tracker, "store_path", ""))]
+                for usage_path in usage_paths:
+                    if not usage_path.is_file():
+                        continue
                     (staged / "usage").mkdir(parents=True, exist_ok=True)
                     shutil.copy2(usage_path, staged / "usage" / usage_path.name)
                     files_added += 1
@@ -232,49 +248,34 @@ class ComplianceService:
                 continue
         return removed
 
+    def _open_run_store(self) -> RunStore | None:
+        # Opening the store imports a legacy runs.jsonl left by an older version.
+        if not self.runs_db_path.exists() and not self.runs_path.exists():
+            return None
+        return RunStore(path=self.runs_db_path)
+
     def _prune_runs_file(self, *, before_dt: datetime) -> int:
-        if not self.runs_path.exists():
-            return 0
-        lines = self.runs_path.read_text(encoding="utf-8").splitlines()
-        kept: list[str] = []
         removed = 0
-        for line in lines:
-            if not line.strip():
-                continue
+        run_store = self._open_run_store()
+        if run_store is not None:
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                kept.append(line)
-                continue
-            created_at = self._parse_iso_dt(obj.get("created_at"))
-            if created_at is not None and created_at < before_dt:
-                removed += 1
-                continue
-            kept.append(line)
-        self._rewrite_jsonl(self.runs_path, kept)
+                removed += run_store.purge(before_ts=before_dt.timestamp())
+            finally:
+                run_store.close()
         return removed
 
     def _prune_audit_file(self, *, before_ts: float) -> int:
-        if not self.audit_path.exists():
-            return 0
-        lines = self.audit_path.read_text(encoding="utf-8").splitlines()
-        kept: list[str] = []
-        removed = 0
-        for line in lines:
-            if not line.strip():
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                kept.append(line)
-                continue
-            ts = float(obj.get("ts") or 0.0)
-            if ts > 0 and ts < before_ts:
-                removed += 1
-                continue
-            kept.append(line)
-        self._rewrite_jsonl(self.audit_path, kept)
-        return removed
+        def expired(entry: dict[str, Any]) -> bool:
+            ts = float(entry.get("ts") or 0.0)
+            return ts > 0 and ts < before_ts
+
+        return self._audit_writer().remove_entries(expired)
+
+    def _audit_writer(self) -> AuditLogger:
+        """Rewrites go through the live logger so they serialize with its appends."""
+        if self.audit_logger is not None and Path(self.audit_logger.log_path) == self.audit_path:
+            return self.audit_logger
+        return AuditLogger(self.audit_path)
 
     def _prune_memory_files(self, *, before_date) -> int:
         if not self.memory_dir.exists():
@@ -289,22 +290,6 @@ class ComplianceService:
                 removed += 1
         return removed
 
-    @staticmethod
-    def _rewrite_jsonl(path: Path, lines: list[str]) -> None:
-        if lines:
-            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
-        else:
-            path.write_text("", encoding="utf-8")
-
-    @staticmethod
-    def _parse_iso_dt(value: Any) -> datetime | None:
-        if isinstance(value, str) and value.strip():
-            try:
-                return datetime.fromisoformat(value)
-            except ValueError:
-                return None
-        return None
-
     @staticmethod
     def _memory_date(path: Path):
         try:
@@ -420,34 +405,13 @@ class ComplianceService:
         user_id: str | None,
         before_ts: float | None,
     ) -> int:
-        if not self.runs_path.exists():
-            return 0
-        lines = self.runs_path.read_text(encoding="utf-8").splitlines()
-        kept: list[str] = []
         removed = 0
-        for line in lines:
-            if not line.strip():
-                continue
+        run_store = self._open_run_store()
+        if run_store is not None:
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                kept.append(line)
-                continue
-            created = self._parse_iso_dt(obj.get("created_at"))
-            ts = created.timestamp() if created else 0.0
-            run_session = str(obj.get("session_key") or "")
-            if self._matches_filters(
-                session=run_session,
-                user="",
-                ts=ts,
-                session_key=session_key,
-                user_id=user_id,
-                before_ts=before_ts,
-            ):
-                removed += 1
-                continue
-            kept.append(line)
-        self._rewrite_jsonl(self.runs_path, kept)
+                removed += run_store.purge(session_key=session_key, user_id=user_id, before_ts=before_ts)
+            finally:
+                run_store.close()
         return removed
 
     def _purge_audit(
@@ -457,36 +421,18 @@ class ComplianceService:
         user_id: str | None,
         before_ts: float | None,
     ) -> int:
-        if not self.audit_path.exists():
-            return 0
-        lines = self.audit_path.read_text(encoding="utf-8").splitlines()
-        kept: list[str] = []
-        removed = 0
-        for line in lines:
-            if not line.strip():
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                kept.append(line)
-                continue
-            ts = float(obj.get("ts") or 0.0)
-            data = obj.get("data") if isinstance(obj.get("data"), dict) else {}
-            event_session = str(data.get("session_key") or "")
-            sender = str(data.get("sender_id") or "")
-            if self._matches_filters(
-                session=event_session,
-                user=sender,
-                ts=ts,
+        def matches(entry: dict[str, Any]) -> bool:
+            data = entry.get("data") if isinstance(entry.get("data"), dict) else {}
+            return self._matches_filters(
+                session=str(data.get("session_key") or ""),
+                user=str(data.get("sender_id") or ""),
+                ts=float(entry.get("ts") or 0.0),
                 session_key=session_key,
                 user_id=user_id,
                 before_ts=before_ts,
-            ):
-                removed += 1
-                continue
-            kept.append(line)
-        self._rewrite_jsonl(self.audit_path, kept)
-        return removed
+            )
+
+        return self._audit_writer().remove_entries(matches)
 
     def _purge_memory(self, *, before_ts: float | None) -> int:
         if before_ts is None or not self.memory_dir.exists():
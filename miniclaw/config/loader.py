@@ -210,11 +210,24 @@ def _migrate_config(data: dict) -> dict:
         plugins.setdefault("manifestRequired", True)
         plugins.setdefault("signatureMode", "optional")
 
+    cron = data.setdefault("cron", {})
+    if isinstance(cron, dict):
+        cron.setdefault("maxConcurrent", 4)
+        cron.setdefault("jitterMs", 3000)
+
     workflows = data.setdefault("workflows", {})
     if isinstance(workflows, dict):
         workflows.setdefault("enabled", True)
         workflows.setdefault("path", "workspace/workflows")
         workflows.setdefault("approvalSessionKey", "dashboard:approvals")
+        workflows.setdefault("dagScheduler", "eager")
+        workflows.setdefault("keepRunSessions", False)
+        workflows.setdefault("checkpointRuns", True)
+        workflows.setdefault("maxStoredRuns", 500)
+        workflows.setdefault("stepCacheEnabled", True)
+        workflows.setdefault("stepCacheMaxEntries", 2000)
+        workflows.setdefault("stepCacheMaxMb", 64)
+        workflows.setdefault("stepCacheDefaultTtlS", 7 * 86400)
 
     distributed = data.setdefault("distributed", {})
     if isinstance(distributed, dict):
@@ -223,6 +236,10 @@ def _migrate_config(data: dict) -> dict:
         distributed.setdefault("peerAllowlist", [])
         distributed.setdefault("heartbeatTimeoutS", 90)
         distributed.setdefault("maxTasks", 1000)
+        distributed.setdefault("taskLeaseS", 300)
+        distributed.setdefault("placement", "least_outstanding")
+        distributed.setdefault("remoteExecution", "off")
+        distributed.setdefault("remoteTimeoutS", 900)
         mtls = distributed.setdefault("mtls", {})
         if isinstance(mtls, dict):
             mtls.setdefault("enabled", False)
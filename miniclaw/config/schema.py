@@ -73,6 +73,17 @@ class QueueConfig(BaseModel):
         return "queue"
 
 
+class SubagentPoolConfig(BaseModel):
+    """Background subagent pool limits."""
+
+    max_concurrency: int = Field(default=3, ge=1, le=64)
+    max_queue: int = Field(default=32, ge=0, le=1000)  # Spawns beyond this while all slots are busy are rejected
+    max_per_parent: int = Field(default=8, ge=1, le=256)  # Running + queued per originating conversation
+    prewarm: int = Field(default=1, ge=0, le=16)  # Tool registries built ahead of the first spawn
+    task_timeout_s: int = Field(default=15 * 60, ge=1, le=24 * 3600)
+    max_tool_priority: int = Field(default=0, ge=0, le=100)  # Cap on the priority the model may ask spawn for
+
+
 class AgentDefaults(BaseModel):
     """Default agent configuration."""
     workspace: str = "~/.miniclaw/workspace"
@@ -87,6 +98,7 @@ class AgentDefaults(BaseModel):
     timeout_seconds: int = 180
     stream_events: bool = True
     queue: QueueConfig = Field(default_factory=QueueConfig)
+    subagents: SubagentPoolConfig = Field(default_factory=SubagentPoolConfig)
     credential_scope: str = "shared"
     reply_shaping: bool = True
     no_reply_token: str = "NO_REPLY"
@@ -110,6 +122,7 @@ class AgentInstanceConfig(BaseModel):
     credential_scope: str | None = None
     reply_shaping: bool | None = None
     no_reply_token: str | None = None
+    replicas: int = Field(default=1, ge=1, le=64)  # Loops sharing this agent's sessions by consistent hash
 
 
 class AgentRoutingRule(BaseModel):
@@ -128,6 +141,7 @@ class AgentRoutingConfig(BaseModel):
     """Routing configuration for multi-agent dispatch."""
 
     rules: list[AgentRoutingRule] = Field(default_factory=list)
+    max_session_bindings: int = Field(default=10_000, ge=1)
 
 
 class AgentsConfig(BaseModel):
@@ -139,9 +153,6 @@ class AgentsConfig(BaseModel):
 
     @model_validator(mode="after")
     def validate_instances_and_routing(self) -> "AgentsConfig":
-        if len(self.instances) > 3:
-            raise ValueError("agents.instances supports at most 3 instances.")
-
         instance_ids = [inst.id.strip() for inst in self.instances]
         if any(not agent_id for agent_id in instance_ids):
             raise ValueError("agents.instances entries must have a non-empty id.")
@@ -261,6 +272,7 @@ class SessionsPolicyConfig(BaseModel):
 
     idle_reset_minutes: int = Field(default=0, ge=0)
     scheduled_reset_cron: str = ""
+    max_run_records: int = Field(default=5000, ge=0)  # Agent runs kept in runs.db; 0 keeps every run
 
 
 class RetentionConfig(BaseModel):
@@ -282,12 +294,37 @@ class PluginsConfig(BaseModel):
     signature_mode: Literal["off", "optional", "required"] = "optional"
 
 
+class HeartbeatConfig(BaseModel):
+    """Gateway heartbeat (HEARTBEAT.md) settings."""
+
+    enabled: bool = True
+    interval_s: int = Field(default=30 * 60, ge=60)
+    # Longest an unchanged HEARTBEAT.md and the files it references skip the agent; 0 never skips
+    max_skip_s: int = Field(default=60 * 60, ge=0)
+
+
+class CronConfig(BaseModel):
+    """Cron scheduler settings."""
+
+    max_concurrent: int = Field(default=4, ge=1)  # Jobs running at the same time
+    jitter_ms: int = Field(default=3000, ge=0)  # Max start offset for cron-expression jobs
+
+
 class WorkflowsConfig(BaseModel):
     """Workflow runtime settings."""
 
     enabled: bool = True
     path: str = "workspace/workflows"
     approval_session_key: str = "dashboard:approvals"
+    dag_scheduler: Literal["eager", "waves"] = "eager"  # "waves" is the old barrier-per-wave executor
+    keep_run_sessions: bool = False  # Keep per-run step sessions after a run finishes
+    checkpoint_runs: bool = True  # Persist run state after every step so runs can be resumed
+    max_stored_runs: int = Field(default=500, ge=0)  # 0 keeps every finished run
+    step_cache_enabled: bool = True  # Only steps with cache_ttl_s or memoized runs write entries
+    step_cache_record_all: bool = False  # Also record every other step so `workflow run --replay` can serve it
+    step_cache_max_entries: int = Field(default=2000, ge=1)
+    step_cache_max_mb: int = Field(default=64, ge=1)
+    step_cache_default_ttl_s: int = Field(default=7 * 86400, ge=1)  # For outputs recorded only for replays
 
 
 class DistributedMTLSConfig(BaseModel):
@@ -307,6 +344,11 @@ class DistributedConfig(BaseModel):
     peer_allowlist: list[str] = Field(default_factory=list)
     heartbeat_timeout_s: int = Field(default=90, ge=15, le=3600)
     max_tasks: int = Field(default=1000, ge=100, le=100_000)
+    task_lease_s: int = Field(default=300, ge=1, le=86_400)  # Claimed tasks requeue unless heartbeats renew
+    placement: Literal["first", "least_outstanding", "weighted", "power_of_two", "affinity"] = "least_outstanding"
+    # Send agent runs and/or subagent tasks to `miniclaw worker` nodes when one is online
+    remote_execution: Literal["off", "runs", "subagents", "all"] = "off"
+    remote_timeout_s: int = Field(default=900, ge=10, le=86_400)
     mtls: DistributedMTLSConfig = Field(default_factory=DistributedMTLSConfig)
 
 
@@ -413,6 +455,33 @@ class AuditConfig(BaseModel):
     """Audit logging configuration."""
     enabled: bool = False
     level: str = "standard"  # "minimal" | "standard" | "verbose"
+    flush_interval_ms: int = 200  # Max time an entry waits in the buffer
+    batch_size: int = 256  # Flush early once this many entries are pending
+    fsync_interval_ms: int = 1000  # 0 = fsync every batch, -1 = never fsync
+    max_bytes: int = 0  # Rotate when the live log would exceed this size (0 = off)
+    rotate_daily: bool = False
+    backup_count: int = 7  # Rotated files to keep
+
+
+class MetricsConfig(BaseModel):
+    """In-process metrics (served at the dashboard's /metrics endpoint)."""
+    enabled: bool = False
+
+
+class TracingConfig(BaseModel):
+    """Per-run span tracing (served at the dashboard's /api/runs/{run_id}/trace)."""
+    enabled: bool = False
+    exporter: str = "jsonl"  # "jsonl", "otlp" (OTLP/JSON file) or "" to keep traces in memory only
+    path: str = ""  # Defaults to <data_dir>/traces/spans.jsonl (or otlp.jsonl)
+    max_traces: int = 200
+
+
+class TokenLimitConfig(BaseModel):
+    """Sliding-window token budget for one scope."""
+    scope: Literal["user", "session", "model"] = "user"
+    max_tokens: int = 200_000
+    window_seconds: int = 3600
+    counter: Literal["total", "prompt", "completion"] = "total"
 
 
 class RateLimitConfig(BaseModel):
@@ -420,6 +489,10 @@ class RateLimitConfig(BaseModel):
     enabled: bool = False
     messages_per_minute: int = 20
     tool_calls_per_minute: int = 60
+    backend: str = "auto"  # auto (sqlite, shared by all processes), memory, snapshot (one process), sqlite
+    snapshot_interval_s: float = 5.0
+    token_limits: list[TokenLimitConfig] = Field(default_factory=list)
+    estimate_completion_tokens: int = 512  # Reserved per run until real usage is known
 
 
 class DashboardConfig(BaseModel):
@@ -503,10 +576,14 @@ class Config(BaseSettings):
     retention: RetentionConfig = Field(default_factory=RetentionConfig)
     plugins: PluginsConfig = Field(default_factory=PluginsConfig)
     workflows: WorkflowsConfig = Field(default_factory=WorkflowsConfig)
+    cron: CronConfig = Field(default_factory=CronConfig)
+    heartbeat: HeartbeatConfig = Field(default_factory=HeartbeatConfig)
     distributed: DistributedConfig = Field(default_factory=DistributedConfig)
     alerts: AlertsConfig = Field(default_factory=AlertsConfig)
     usage: UsageConfig = Field(default_factory=UsageConfig)
     audit: AuditConfig = Field(default_factory=AuditConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
     rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
     dashboard: DashboardConfig = Field(default_factory=DashboardConfig)
     transcription: TranscriptionConfig = Field(default_factory=TranscriptionConfig)
@@ -0,0 +1,137 @@
+"""Scheduler benchmark: heap-based next-fire lookup vs a linear scan.
+
+Run with::
+
+    python -m miniclaw.cron.benchmark --jobs 100000
+
+Adds `jobs` jobs (mostly ``every`` schedules, a fraction of cron
+expressions) to a `CronService` backed by a temporary directory, then times
+next-wake lookups, due-job ticks, enable/disable toggles and a cold reload
+from disk. Linear-scan timings over the same jobs show what the old
+scheduler paid per lookup. Times are in milliseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from miniclaw.cron.service import CronService
+from miniclaw.cron.types import CronSchedule
+
+
+def _linear_next_wake(service: CronService) -> int | None:
+    times = [j.state.next_run_at_ms for j in service._jobs.values() if j.enabled and j.state.next_run_at_ms]
+    return min(times) if times else None
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+async def run(
+    *,
+    jobs: int = 100_000,
+    lookups: int = 1000,
+    due: int = 1000,
+    toggles: int = 1000,
+    cron_ratio: float = 0.01,
+    seed: int = 0,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = Path(tmp) / "jobs.json"
+        service = CronService(store_path)
+
+        started = time.perf_counter()
+        for i in range(max(1, jobs)):
+            if rng.random() < cron_ratio:
+                schedule = CronSchedule(kind="cron", expr=f"{rng.randrange(60)} * * * *")
+            else:
+                schedule = CronSchedule(kind="every", every_ms=rng.randint(60_000, 86_400_000))
+            service.add_job(name=f"job{i}", schedule=schedule, message="ping")
+        add_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(lookups):
+            heap_wake = service._get_next_wake_ms()
+        heap_lookup_s = (time.perf_counter() - started) / max(1, lookups)
+
+        linear_rounds = max(1, min(lookups, 20))
+        started = time.perf_counter()
+        for _ in range(linear_rounds):
+            linear_wake = _linear_next_wake(service)
+        linear_lookup_s = (time.perf_counter() - started) / linear_rounds
+        if heap_wake != linear_wake:
+            raise RuntimeError(f"heap and linear next wake disagree: {heap_wake} != {linear_wake}")
+
+        ids = list(service._jobs)
+        now = int(time.time() * 1000)
+        for job_id in rng.sample(ids, min(due, len(ids))):
+            job = service._jobs[job_id]
+            job.state.next_run_at_ms = now - rng.randint(1, 1000)
+            service._schedule(job)
+        started = time.perf_counter()
+        await service._on_timer()
+        tick_s = time.perf_counter() - started
+        dispatched = len(service._active)
+        if service._active:
+            await asyncio.gather(*service._active.values(), return_exceptions=True)
+
+        sample = rng.sample(ids, min(toggles, len(ids)))
+        started = time.perf_counter()
+        for job_id in sample:
+            service.enable_job(job_id, enabled=False)
+            service.enable_job(job_id, enabled=True)
+        toggle_s = (time.perf_counter() - started) / max(1, 2 * len(sample))
+
+        service._persist_state()
+        started = time.perf_counter()
+        reloaded = CronService(store_path)
+        reloaded_jobs = len(reloaded.list_jobs(include_disabled=True))
+        reload_s = time.perf_counter() - started
+
+    return {
+        "jobs": jobs,
+        "add_total_ms": _ms(add_s),
+        "add_per_job_us": round(add_s / max(1, jobs) * 1e6, 2),
+        "next_wake_heap_us": round(heap_lookup_s * 1e6, 3),
+        "next_wake_linear_us": round(linear_lookup_s * 1e6, 3),
+        "tick_ms": _ms(tick_s),
+        "tick_dispatched": dispatched,
+        "toggle_us": round(toggle_s * 1e6, 2),
+        "reload_ms": _ms(reload_s),
+        "reloaded_jobs": reloaded_jobs,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--due", type=int, default=1000)
+    parser.add_argument("--toggles", type=int, default=1000)
+    parser.add_argument("--cron-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = asyncio.run(
+        run(
+            jobs=args.jobs,
+            lookups=args.lookups,
+            due=args.due,
+            toggles=args.toggles,
+            cron_ratio=args.cron_ratio,
+            seed=args.seed,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
+import hashlib
+import heapq
 import json
 import time
 import uuid
@@ -11,6 +13,8 @@ from loguru import logger
 
 from miniclaw.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
 
+OVERLAP_POLICIES = ("skip", "queue", "replace")
+
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
@@ -40,120 +44,243 @@ def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
 
 
 class CronService:
-    """Service for managing and executing scheduled jobs."""
-    
+    """Service for managing and executing scheduled jobs.
+
+    Due jobs are dispatched as tasks, at most `max_concurrent` running at a
+    time, so a slow or retrying job does not hold up the others. Upcoming
+    runs sit in a min-heap keyed on next run time; entries are invalidated
+    lazily (a popped entry only counts if it still matches the job), so
+    add, remove, enable and the next-wake lookup are O(log n).
+
+    Job definitions live in ``jobs.json``. Adds, removals and run-state
+    changes are appended to ``jobs.state.jsonl`` and folded back into
+    ``jobs.json`` once the journal outgrows both `STATE_JOURNAL_MAX` lines
+    and twice the job count, which keeps the rewrite cost amortized O(1).
+    """
+
+    STATE_JOURNAL_MAX = 500
+
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        *,
+        max_concurrent: int = 4,
+        jitter_ms: int = 0,
     ):
         self.store_path = store_path
+        self.state_path = store_path.with_name(f"{store_path.stem}.state.jsonl")
         self.on_job = on_job  # Callback to execute job, returns response text
+        self.max_concurrent = max(1, int(max_concurrent))
+        # Cron-expression jobs start up to this much after their minute
+        # boundary (a stable per-job offset) so they do not all fire at once.
+        self.jitter_ms = max(0, int(jitter_ms))
         self._store: CronStore | None = None
+        self._jobs: dict[str, CronJob] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        self._heap_seq = 0
         self._timer_task: asyncio.Task | None = None
+        self._armed_wake_ms: int | None = None
         self._running = False
-    
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._active: dict[str, asyncio.Task] = {}
+        self._queued: set[str] = set()
+        self._dirty: set[str] = set()
+        self._journal: list[dict[str, Any]] = []
+        self._journal_lines = 0
+
+    @staticmethod
+    def _job_from_dict(j: dict[str, Any]) -> CronJob:
+        return CronJob(
+            id=j["id"],
+            name=j["name"],
+            enabled=j.get("enabled", True),
+            schedule=CronSchedule(
+                kind=j["schedule"]["kind"],
+                at_ms=j["schedule"].get("atMs"),
+                every_ms=j["schedule"].get("everyMs"),
+                expr=j["schedule"].get("expr"),
+                tz=j["schedule"].get("tz"),
+            ),
+            payload=CronPayload(
+                kind=j["payload"].get("kind", "task"),
+                message=j["payload"].get("message", ""),
+                deliver=j["payload"].get("deliver", False),
+                channel=j["payload"].get("channel"),
+                to=j["payload"].get("to"),
+                isolated=j["payload"].get("isolated", False),
+                agent_id=j["payload"].get("agentId"),
+                model=j["payload"].get("model"),
+                retry_max_attempts=int(j["payload"].get("retryMaxAttempts", 1) or 1),
+                retry_backoff_ms=int(j["payload"].get("retryBackoffMs", 750) or 750),
+            ),
+            state=CronJobState(
+                next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
+                last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
+                last_status=j.get("state", {}).get("lastStatus"),
+                last_error=j.get("state", {}).get("lastError"),
+            ),
+            created_at_ms=j.get("createdAtMs", 0),
+            updated_at_ms=j.get("updatedAtMs", 0),
+            delete_after_run=j.get("deleteAfterRun", False),
+            overlap=j.get("overlap") if j.get("overlap") in OVERLAP_POLICIES else "skip",
+        )
+
+    @classmethod
+    def _job_to_dict(cls, j: CronJob) -> dict[str, Any]:
+        return {
+            "id": j.id,
+            "name": j.name,
+            "enabled": j.enabled,
+            "schedule": {
+                "kind": j.schedule.kind,
+                "atMs": j.schedule.at_ms,
+                "everyMs": j.schedule.every_ms,
+                "expr": j.schedule.expr,
+                "tz": j.schedule.tz,
+            },
+            "payload": {
+                "kind": j.payload.kind,
+                "message": j.payload.message,
+                "deliver": j.payload.deliver,
+                "channel": j.payload.channel,
+                "to": j.payload.to,
+                "isolated": j.payload.isolated,
+                "agentId": j.payload.agent_id,
+                "model": j.payload.model,
+                "retryMaxAttempts": j.payload.retry_max_attempts,
+                "retryBackoffMs": j.payload.retry_backoff_ms,
+            },
+            "state": cls._state_to_dict(j.state),
+            "createdAtMs": j.created_at_ms,
+            "updatedAtMs": j.updated_at_ms,
+            "deleteAfterRun": j.delete_after_run,
+            "overlap": j.overlap,
+        }
+
+    @staticmethod
+    def _state_to_dict(state: CronJobState) -> dict[str, Any]:
+        return {
+            "nextRunAtMs": state.next_run_at_ms,
+            "lastRunAtMs": state.last_run_at_ms,
+            "lastStatus": state.last_status,
+            "lastError": state.last_error,
+        }
+
     def _load_store(self) -> CronStore:
         """Load jobs from disk."""
         if self._store:
             return self._store
-        
+
+        self._jobs = {}
         if self.store_path.exists():
             try:
                 data = json.loads(self.store_path.read_text())
-                jobs = []
                 for j in data.get("jobs", []):
-                    jobs.append(CronJob(
-                        id=j["id"],
-                        name=j["name"],
-                        enabled=j.get("enabled", True),
-                        schedule=CronSchedule(
-                            kind=j["schedule"]["kind"],
-                            at_ms=j["schedule"].get("atMs"),
-                            every_ms=j["schedule"].get("everyMs"),
-                            expr=j["schedule"].get("expr"),
-                            tz=j["schedule"].get("tz"),
-                        ),
-                        payload=CronPayload(
-                            kind=j["payload"].get("kind", "task"),
-                            message=j["payload"].get("message", ""),
-                            deliver=j["payload"].get("deliver", False),
-                            channel=j["payload"].get("channel"),
-                            to=j["payload"].get("to"),
-                            isolated=j["payload"].get("isolated", False),
-                            agent_id=j["payload"].get("agentId"),
-                            model=j["payload"].get("model"),
-                            retry_max_attempts=int(j["payload"].get("retryMaxAttempts", 1) or 1),
-                            retry_backoff_ms=int(j["payload"].get("retryBackoffMs", 750) or 750),
-                        ),
-                        state=CronJobState(
-                            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
-                            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
-                            last_status=j.get("state", {}).get("lastStatus"),
-                            last_error=j.get("state", {}).get("lastError"),
-                        ),
-                        created_at_ms=j.get("createdAtMs", 0),
-                        updated_at_ms=j.get("updatedAtMs", 0),
-                        delete_after_run=j.get("deleteAfterRun", False),
-                    ))
-                self._store = CronStore(jobs=jobs)
+                    job = self._job_from_dict(j)
+                    self._jobs[job.id] = job
+                self._store = CronStore(version=data.get("version", 1))
             except Exception as e:
                 logger.warning(f"Failed to load cron store: {e}")
+                self._jobs = {}
                 self._store = CronStore()
         else:
             self._store = CronStore()
-        
+
+        self._replay_journal()
+        self._rebuild_heap()
         return self._store
-    
+
+    def _replay_journal(self) -> None:
+        """Apply the changes recorded since ``jobs.json`` was written."""
+        self._journal_lines = 0
+        if not self.state_path.exists():
+            return
+        try:
+            lines = self.state_path.read_text().splitlines()
+        except OSError as e:
+            logger.warning(f"Failed to read cron state journal: {e}")
+            return
+        for line in lines:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final line after a crash
+            self._journal_lines += 1
+            op = row.get("op", "state")
+            if op == "upsert":
+                job = self._job_from_dict(row["job"])
+                self._jobs[job.id] = job
+                continue
+            if op == "remove":
+                self._jobs.pop(row.get("id"), None)
+                continue
+            job = self._jobs.get(row.get("id"))
+            if job is None:
+                continue
+            state = row.get("state", {})
+            job.enabled = row.get("enabled", job.enabled)
+            job.updated_at_ms = row.get("updatedAtMs", job.updated_at_ms)
+            job.state = CronJobState(
+                next_run_at_ms=state.get("nextRunAtMs"),
+                last_run_at_ms=state.get("lastRunAtMs"),
+                last_status=state.get("lastStatus"),
+                last_error=state.get("lastError"),
+            )
+
+    def _mark(self, job: CronJob) -> None:
+        self._dirty.add(job.id)
+
+    def _persist_state(self) -> None:
+        """Append adds, removals and changed job state to the journal."""
+        if not self._store:
+            return
+        pending = len(self._journal) + len(self._dirty)
+        limit = max(self.STATE_JOURNAL_MAX, 2 * len(self._jobs))
+        if self._journal_lines + pending > limit:
+            self._save_store()
+            return
+        rows = self._journal
+        self._journal = []
+        for job_id in self._dirty:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                rows.append(
+                    {
+                        "id": job.id,
+                        "enabled": job.enabled,
+                        "updatedAtMs": job.updated_at_ms,
+                        "state": self._state_to_dict(job.state),
+                    }
+                )
+        self._dirty.clear()
+        if not rows:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows))
+        self._journal_lines += len(rows)
+
     def _save_store(self) -> None:
-        """Save jobs to disk."""
+        """Save jobs to disk and truncate the journal."""
         if not self._store:
             return
-        
+
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        data = {
-            "version": self._store.version,
-            "jobs": [
-                {
-                    "id": j.id,
-                    "name": j.name,
-                    "enabled": j.enabled,
-                    "schedule": {
-                        "kind": j.schedule.kind,
-                        "atMs": j.schedule.at_ms,
-                        "everyMs": j.schedule.every_ms,
-                        "expr": j.schedule.expr,
-                        "tz": j.schedule.tz,
-                    },
-                    "payload": {
-                        "kind": j.payload.kind,
-                        "message": j.payload.message,
-                        "deliver": j.payload.deliver,
-                        "channel": j.payload.channel,
-                        "to": j.payload.to,
-                        "isolated": j.payload.isolated,
-                        "agentId": j.payload.agent_id,
-                        "model": j.payload.model,
-                        "retryMaxAttempts": j.payload.retry_max_attempts,
-                        "retryBackoffMs": j.payload.retry_backoff_ms,
-                    },
-                    "state": {
-                        "nextRunAtMs": j.state.next_run_at_ms,
-                        "lastRunAtMs": j.state.last_run_at_ms,
-                        "lastStatus": j.state.last_status,
-                        "lastError": j.state.last_error,
-                    },
-                    "createdAtMs": j.created_at_ms,
-                    "updatedAtMs": j.updated_at_ms,
-                    "deleteAfterRun": j.delete_after_run,
-                }
-                for j in self._store.jobs
-            ]
-        }
-        
-        self.store_path.write_text(json.dumps(data, indent=2))
-    
+
+        # One job per line: still diffable, but encoded by the C JSON encoder
+        # (indent= falls back to the much slower pure-Python one).
+        jobs = ",\n".join(json.dumps(self._job_to_dict(j)) for j in self._jobs.values())
+        text = f'{{"version": {json.dumps(self._store.version)}, "jobs": [\n{jobs}\n]}}\n'
+
+        tmp_path = self.store_path.with_name(f"{self.store_path.name}.tmp")
+        tmp_path.write_text(text)
+        tmp_path.replace(self.store_path)
+        self.state_path.unlink(missing_ok=True)
+        self._journal_lines = 0
+        self._journal = []
+        self._dirty.clear()
+
     async def start(self) -> None:
         """Start the cron service."""
         self._running = True
@@ -161,70 +288,160 @@ class CronService:
         self._recompute_next_runs()
         self._save_store()
         self._arm_timer()
-        logger.info(f"Cron service started with {len(self._store.jobs if self._store else [])} jobs")
-    
+        logger.info(f"Cron service started with {len(self._jobs)} jobs")
+
     def stop(self) -> None:
-        """Stop the cron service."""
+        """Stop the cron service and cancel running jobs."""
         self._running = False
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
-    
+        self._armed_wake_ms = None
+        self._queued.clear()
+        for task in list(self._active.values()):
+            task.cancel()
+
+    def _next_run(self, job: CronJob, now_ms: int) -> int | None:
+        next_ms = _compute_next_run(job.schedule, now_ms)
+        if next_ms is None or job.schedule.kind != "cron" or not self.jitter_ms:
+            return next_ms
+        offset = int.from_bytes(hashlib.sha1(job.id.encode("utf-8")).digest()[:4], "big")
+        return next_ms + offset % (self.jitter_ms + 1)
+
     def _recompute_next_runs(self) -> None:
-        """Recompute next run times for all enabled jobs."""
-        if not self._store:
-            return
+        """Reschedule enabled jobs whose stored next run is missing or already past."""
         now = _now_ms()
-        for job in self._store.jobs:
-            if job.enabled:
-                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
-    
+        changed = False
+        for job in self._jobs.values():
+            if not job.enabled:
+                continue
+            if job.state.next_run_at_ms is None or job.state.next_run_at_ms <= now:
+                job.state.next_run_at_ms = self._next_run(job, now)
+                changed = True
+        if changed:
+            self._rebuild_heap()
+
+    # ========== Scheduling heap ==========
+
+    def _rebuild_heap(self) -> None:
+        self._heap = []
+        for job in self._jobs.values():
+            if job.enabled and job.state.next_run_at_ms:
+                self._heap_seq += 1
+                self._heap.append((job.state.next_run_at_ms, self._heap_seq, job.id))
+        heapq.heapify(self._heap)
+
+    def _schedule(self, job: CronJob) -> None:
+        """Push the job's current next run; older heap entries become stale."""
+        if not job.enabled or not job.state.next_run_at_ms:
+            return
+        self._heap_seq += 1
+        heapq.heappush(self._heap, (job.state.next_run_at_ms, self._heap_seq, job.id))
+        # Stale entries are dropped lazily; rebuild if they dominate the heap.
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._rebuild_heap()
+
+    def _is_current(self, entry: tuple[int, int, str]) -> bool:
+        job = self._jobs.get(entry[2])
+        return job is not None and job.enabled and job.state.next_run_at_ms == entry[0]
+
     def _get_next_wake_ms(self) -> int | None:
         """Get the earliest next run time across all jobs."""
-        if not self._store:
-            return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs 
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
-    
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _pop_due(self, now_ms: int) -> list[CronJob]:
+        due: list[CronJob] = []
+        seen: set[str] = set()
+        while self._heap and self._heap[0][0] <= now_ms:
+            entry = heapq.heappop(self._heap)
+            if entry[2] not in seen and self._is_current(entry):
+                seen.add(entry[2])
+                due.append(self._jobs[entry[2]])
+        return due
+
     def _arm_timer(self) -> None:
         """Schedule the next timer tick."""
+        next_wake = self._get_next_wake_ms() if self._running else None
+        if self._timer_task and not self._timer_task.done() and next_wake == self._armed_wake_ms:
+            return
         if self._timer_task:
             self._timer_task.cancel()
-        
-        next_wake = self._get_next_wake_ms()
-        if not next_wake or not self._running:
+            self._timer_task = None
+        self._armed_wake_ms = next_wake
+
+        if not next_wake:
             return
-        
+
         delay_ms = max(0, next_wake - _now_ms())
         delay_s = delay_ms / 1000
-        
+
         async def tick():
             await asyncio.sleep(delay_s)
+            self._timer_task = None
+            self._armed_wake_ms = None
             if self._running:
                 await self._on_timer()
-        
+
         self._timer_task = asyncio.create_task(tick())
-    
+
     async def _on_timer(self) -> None:
-        """Handle timer tick - run due jobs."""
+        """Handle timer tick - dispatch due jobs without waiting for them."""
         if not self._store:
             return
-        
+
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
-        
-        for job in due_jobs:
-            await self._execute_job(job)
-        
-        self._save_store()
+        for job in self._pop_due(now):
+            self._dispatch(job, now)
+
+        self._persist_state()
         self._arm_timer()
-    
-    async def _execute_job(self, job: CronJob) -> None:
-        """Execute a single job."""
+
+    def _dispatch(self, job: CronJob, now_ms: int) -> None:
+        # Advance the schedule first so the next tick does not see the job as due again.
+        job.state.next_run_at_ms = None if job.schedule.kind == "at" else self._next_run(job, now_ms)
+        self._schedule(job)
+        self._mark(job)
+
+        running = self._active.get(job.id)
+        if running is not None and not running.done():
+            if job.overlap == "queue":
+                self._queued.add(job.id)
+                logger.info(f"Cron: job '{job.name}' still running; queued one more run")
+                return
+            if job.overlap == "skip":
+                job.state.last_status = "skipped"
+                job.state.last_error = "previous run still in progress"
+                logger.warning(f"Cron: job '{job.name}' still running; skipped this occurrence")
+                return
+            logger.warning(f"Cron: job '{job.name}' still running; replacing it")
+            running.cancel()
+        self._start_job(job)
+
+    def _start_job(self, job: CronJob) -> None:
+        task = asyncio.create_task(self._run_job(job))
+        self._active[job.id] = task
+        task.add_done_callback(lambda t, job_id=job.id: self._on_job_done(job_id, t))
+
+    async def _run_job(self, job: CronJob) -> None:
+        async with self._slots:
+            await self._execute_job(job)
+
+    def _on_job_done(self, job_id: str, task: asyncio.Task) -> None:
+        if self._active.get(job_id) is task:
+            self._active.pop(job_id)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Cron: job {job_id} crashed: {task.exception()}")
+        job = self._jobs.get(job_id)
+        if job_id in self._queued and job_id not in self._active:
+            self._queued.discard(job_id)
+            if job is not None and self._running:
+                self._start_job(job)
+        self._persist_state()
+
+    async def _execute_job(self, job: CronJob, *, reschedule: bool = False) -> None:
+        """Execute a single job; `reschedule` also computes its next run."""
         start_ms = _now_ms()
         logger.info(f"Cron: executing job '{job.name}' ({job.id})")
 
@@ -260,24 +477,34 @@ class CronService:
 
         job.state.last_run_at_ms = start_ms
         job.updated_at_ms = _now_ms()
-        
+        self._mark(job)
+
         # Handle one-shot jobs
         if job.schedule.kind == "at":
             if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                self._forget(job.id)
             else:
                 job.enabled = False
                 job.state.next_run_at_ms = None
-        else:
-            # Compute next run
-            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+        elif reschedule:
+            job.state.next_run_at_ms = self._next_run(job, _now_ms())
+            self._schedule(job)
+
+    def _forget(self, job_id: str) -> bool:
+        if self._jobs.pop(job_id, None) is None:
+            return False
+        self._dirty.discard(job_id)
+        self._journal.append({"op": "remove", "id": job_id})
+        return True
     
     # ========== Public API ==========
     
     def list_jobs(self, include_disabled: bool = False) -> list[CronJob]:
         """List all jobs."""
-        store = self._load_store()
-        jobs = store.jobs if include_disabled else [j for j in store.jobs if j.enabled]
+        self._load_store()
+        jobs = list(self._jobs.values())
+        if not include_disabled:
+            jobs = [j for j in jobs if j.enabled]
         return sorted(jobs, key=lambda j: j.state.next_run_at_ms or float('inf'))
     
     def add_job(
@@ -295,13 +522,20 @@ class CronService:
         model: str | None = None,
         retry_max_attempts: int = 1,
         retry_backoff_ms: int = 750,
+        overlap: str = "skip",
     ) -> CronJob:
         """Add a new job."""
-        store = self._load_store()
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"overlap must be one of {', '.join(OVERLAP_POLICIES)}")
+        self._load_store()
         now = _now_ms()
 
+        job_id = str(uuid.uuid4())[:8]
+        while job_id in self._jobs:  # short ids collide at ~10^5 jobs
+            job_id = str(uuid.uuid4())[:8]
+
         job = CronJob(
-            id=str(uuid.uuid4())[:8],
+            id=job_id,
             name=name,
             enabled=True,
             schedule=schedule,
@@ -317,28 +551,30 @@ class CronService:
                 retry_max_attempts=max(1, int(retry_max_attempts)),
                 retry_backoff_ms=max(0, int(retry_backoff_ms)),
             ),
-            state=CronJobState(next_run_at_ms=_compute_next_run(schedule, now)),
             created_at_ms=now,
             updated_at_ms=now,
             delete_after_run=delete_after_run,
+            overlap=overlap,
         )
-        
-        store.jobs.append(job)
-        self._save_store()
+        job.state.next_run_at_ms = self._next_run(job, now)
+
+        self._jobs[job.id] = job
+        self._journal.append({"op": "upsert", "job": self._job_to_dict(job)})
+        self._persist_state()
+        self._schedule(job)
         self._arm_timer()
-        
+
+
         logger.info(f"Cron: added job '{name}' ({job.id})")
         return job
     
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
-        
+        self._load_store()
+        removed = self._forget(job_id)
         if removed:
-            self._save_store()
+            self._queued.discard(job_id)
+            self._persist_state()
             self._arm_timer()
             logger.info(f"Cron: removed job {job_id}")
         
@@ -346,38 +582,41 @@ class CronService:
     
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        self._load_store()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.enabled = enabled
+        job.updated_at_ms = _now_ms()
+        if enabled:
+            job.state.next_run_at_ms = self._next_run(job, _now_ms())
+            self._schedule(job)
+        else:
+            job.state.next_run_at_ms = None
+        self._mark(job)
+        self._persist_state()
+        self._arm_timer()
+        return job
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
         """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
-        return False
+        self._load_store()
+        job = self._jobs.get(job_id)
+        if job is None or (not force and not job.enabled):
+            return False
+        await self._execute_job(job, reschedule=True)
+        self._persist_state()
+        self._arm_timer()
+        return True
     
     def status(self) -> dict:
         """Get service status."""
-        store = self._load_store()
+        self._load_store()
         return {
             "enabled": self._running,
-            "jobs": len(store.jobs),
+            "jobs": len(self._jobs),
             "next_wake_at_ms": self._get_next_wake_ms(),
+            "running": len(self._active),
+            "queued": len(self._queued),
+            "max_concurrent": self.max_concurrent,
         }
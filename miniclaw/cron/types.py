@@ -59,6 +59,9 @@ class CronJob:
     created_at_ms: int = 0
     updated_at_ms: int = 0
     delete_after_run: bool = False
+    # What to do when the job comes due while its previous run is still going:
+    # "skip" this occurrence, "queue" one more run after it, or "replace" it.
+    overlap: Literal["skip", "queue", "replace"] = "skip"
 
 
 @dataclass
@@ -1,5 +1,6 @@
 """FastAPI dashboard backend for miniclaw."""
 
+import asyncio
 import json
 import os
 import re
@@ -9,16 +10,20 @@ import tempfile
 from pathlib import Path
 from typing import Any
 
-from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import Depends, FastAPI, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from miniclaw.api.webhooks import WebhookService, create_webhook_router
+from miniclaw.audit.logger import audit_log_files
 from miniclaw.dashboard.auth import require_token
 from miniclaw.distributed.manager import DistributedNodeManager
 from miniclaw.identity import IdentityStore
+from miniclaw.monitoring import metrics, tracing
 from miniclaw.plugins.manager import PluginManager, PluginValidationError
+from miniclaw.utils.jsonl import iter_json_reverse
 from miniclaw.workflows.runtime import LinearWorkflowRuntime
+from miniclaw.workflows.store import WorkflowRunStore, WorkflowStepCache
 
 STATIC_DIR = Path(__file__).parent / "static"
 
@@ -42,6 +47,7 @@ def create_app(
     usage_tracker: Any = None,
     compliance_service: Any = None,
     alert_service: Any = None,
+    startup_timeline: Any = None,
 ) -> FastAPI:
     """Create the dashboard FastAPI app."""
 
@@ -70,12 +76,34 @@ def create_app(
     recipe_root = Path(config.workflows.path)
     if not recipe_root.is_absolute():
         recipe_root = (config.workspace_path / recipe_root).resolve()
+    workflow_dir = config_path.parent / "workflows"
+    workflow_run_store = None
+    if config.workflows.checkpoint_runs:
+        workflow_run_store = WorkflowRunStore(
+            workflow_dir / "runs.db",
+            max_runs=config.workflows.max_stored_runs,
+        )
+    workflow_step_cache = None
+    if config.workflows.step_cache_enabled:
+        workflow_step_cache = WorkflowStepCache(
+            workflow_dir / "step_cache.db",
+            max_entries=config.workflows.step_cache_max_entries,
+            max_bytes=config.workflows.step_cache_max_mb * 1024 * 1024,
+            default_ttl_s=config.workflows.step_cache_default_ttl_s,
+        )
     workflow_runtime = LinearWorkflowRuntime(
         agent_runtime=agent_loop,
         bus=bus,
         workspace=config.workspace_path,
         recipe_root=recipe_root,
         approval_session_key=config.workflows.approval_session_key,
+        dag_scheduler=config.workflows.dag_scheduler,
+        keep_run_sessions=config.workflows.keep_run_sessions,
+        run_store=workflow_run_store,
+        step_cache=workflow_step_cache,
+        usage_tracker=usage_tracker,
+        default_model=config.agents.defaults.model,
+        record_for_replay=config.workflows.step_cache_record_all,
     )
     webhook_service = WebhookService(
         config=config,
@@ -142,6 +170,9 @@ def create_app(
                 }
             except Exception:
                 status["distributed"] = {"enabled": True, "nodes_online": 0}
+        subagent_stats = getattr(agent_loop, "subagent_stats", None)
+        if subagent_stats is not None:
+            status["subagents"] = subagent_stats()
         if agent_loop and hasattr(agent_loop, "list_runs"):
             runs = agent_loop.list_runs(limit=200)
             active = [r for r in runs if r.get("status") in ("queued", "running")]
@@ -159,8 +190,32 @@ def create_app(
                 status["usage"] = usage.get("overall", {}).get("totals", {})
             except Exception:
                 status["usage"] = {"events": 0, "total_tokens": 0, "cost_usd": 0.0}
+        if startup_timeline is not None:
+            status["startup"] = startup_timeline.snapshot()
         return status
 
+    @app.get("/metrics", dependencies=[Depends(auth)], response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        registry = metrics.REGISTRY
+        if not registry.enabled:
+            return PlainTextResponse("# metrics disabled\n")
+        # Queue depth is sampled at scrape time rather than on every publish.
+        bus_sizes = (
+            ("inbound", getattr(bus, "inbound_size", None)),
+            ("outbound", getattr(bus, "outbound_size", None)),
+        )
+        for queue_name, size in bus_sizes:
+            if isinstance(size, int):
+                metrics.BUS_QUEUE_DEPTH.set(size, queue=queue_name)
+        return PlainTextResponse(
+            registry.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @app.get("/api/metrics", dependencies=[Depends(auth)])
+    async def api_metrics():
+        return {"enabled": metrics.REGISTRY.enabled, "metrics": metrics.REGISTRY.snapshot()}
+
     @app.get("/api/config", dependencies=[Depends(auth)])
     async def api_get_config():
         if config_path.exists():
@@ -492,7 +547,7 @@ def create_app(
 
     @app.post("/api/workflows/run", dependencies=[Depends(auth)])
     async def api_run_workflow(body: dict):
-        if not agent_loop:
+        if not agent_loop and not body.get("replay"):
             return JSONResponse({"error": "agent runtime unavailable"}, status_code=400)
         recipe_ref = str(body.get("recipe") or body.get("name") or body.get("path") or "").strip()
         if not recipe_ref:
@@ -500,19 +555,64 @@ def create_app(
         model_override = str(body.get("model") or "").strip() or None
         vars_payload = body.get("vars")
         vars_dict = vars_payload if isinstance(vars_payload, dict) else {}
+        memoize = body.get("memoize")
         try:
             recipe = workflow_runtime.load_recipe(recipe_ref)
-            result = await workflow_runtime.run_recipe(
-                recipe,
+            run_kwargs = dict(
                 vars=vars_dict,
                 channel=str(body.get("channel") or "dashboard"),
                 chat_id=str(body.get("chat_id") or "workflow"),
                 model_override=model_override,
+                approval_session_key=str(body.get("approval_session_key") or "").strip() or None,
+                memoize=None if memoize is None else bool(memoize),
+                replay=bool(body.get("replay")),
             )
+            if body.get("background"):
+                run_id = workflow_runtime.start_recipe(recipe, **run_kwargs)
+                return {"ok": True, "run_id": run_id, "status": "running"}
+            result = await workflow_runtime.run_recipe(recipe, **run_kwargs)
             return {"ok": True, "result": result}
         except Exception as exc:
             return JSONResponse({"ok": False, "error": str(exc)}, status_code=400)
 
+    @app.get("/api/workflows/runs", dependencies=[Depends(auth)])
+    async def api_list_workflow_runs(status: str = "", limit: int = 50):
+        return workflow_runtime.list_runs(status=status or None, limit=max(1, min(limit, 500)))
+
+    @app.get("/api/workflows/cache", dependencies=[Depends(auth)])
+    async def api_workflow_cache_stats():
+        if workflow_step_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **workflow_step_cache.stats()}
+
+    @app.delete("/api/workflows/cache", dependencies=[Depends(auth)])
+    async def api_clear_workflow_cache(recipe: str = ""):
+        if workflow_step_cache is None:
+            return {"removed": 0}
+        return {"removed": workflow_step_cache.clear(recipe or None)}
+
+    @app.get("/api/workflows/runs/{run_id}", dependencies=[Depends(auth)])
+    async def api_get_workflow_run(run_id: str):
+        run = workflow_runtime.get_run(run_id)
+        if run is None:
+            return JSONResponse({"error": "workflow run not found"}, status_code=404)
+        return run
+
+    @app.post("/api/workflows/runs/{run_id}/resume", dependencies=[Depends(auth)])
+    async def api_resume_workflow_run(run_id: str, body: dict | None = None):
+        if not agent_loop:
+            return JSONResponse({"error": "agent runtime unavailable"}, status_code=400)
+        background = bool((body or {}).get("background"))
+        try:
+            result = await workflow_runtime.resume_run(run_id, background=background)
+        except KeyError as exc:
+            return JSONResponse({"ok": False, "error": str(exc.args[0])}, status_code=404)
+        except ValueError as exc:
+            return JSONResponse({"ok": False, "error": str(exc)}, status_code=409)
+        except Exception as exc:
+            return JSONResponse({"ok": False, "error": str(exc)}, status_code=400)
+        return {"ok": True, "result": result}
+
     @app.delete("/api/skills/{name}", dependencies=[Depends(auth)])
     async def api_delete_skill(name: str):
         if not skills_loader:
@@ -544,6 +644,8 @@ def create_app(
                 "schedule": j.schedule.kind,
                 "message": j.payload.message[:100],
                 "next_run_at_ms": j.state.next_run_at_ms,
+                "last_status": j.state.last_status,
+                "overlap": j.overlap,
             }
             for j in jobs
         ]
@@ -585,6 +687,9 @@ def create_app(
             schedule = CronSchedule(kind="cron", expr=cron_expr)
         else:
             return {"error": "every_seconds or cron_expr required"}
+        overlap = str(body.get("overlap") or "skip")
+        if overlap not in {"skip", "queue", "replace"}:
+            return JSONResponse({"error": "overlap must be skip, queue or replace"}, status_code=400)
         job = cron_service.add_job(
             name=message[:30],
             schedule=schedule,
@@ -598,6 +703,7 @@ def create_app(
             model=model,
             retry_max_attempts=retry_max_attempts or 1,
             retry_backoff_ms=retry_backoff_ms or 750,
+            overlap=overlap,
         )
         return {"ok": True, "id": job.id}
 
@@ -655,10 +761,54 @@ def create_app(
         return bus.list_pending_approvals()
 
     @app.get("/api/runs", dependencies=[Depends(auth)])
-    async def api_list_runs(limit: int = 100):
+    async def api_list_runs(
+        response: Response,
+        limit: int = 100,
+        cursor: str | None = None,
+        session_key: str | None = None,
+        channel: str | None = None,
+        status: str | None = None,
+        model: str | None = None,
+        agent: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ):
         if not agent_loop or not hasattr(agent_loop, "list_runs"):
             return []
-        return agent_loop.list_runs(limit=limit)
+        filters = {
+            "session_key": session_key,
+            "channel": channel,
+            "status": status,
+            "model": model,
+            "agent_id": agent,
+        }
+        filters = {key: value for key, value in filters.items() if value}
+        if not (filters or cursor or since or until) or not hasattr(agent_loop, "query_runs"):
+            return agent_loop.list_runs(limit=limit)
+        try:
+            page = agent_loop.query_runs(limit=limit, cursor=cursor, since=since, until=until, **filters)
+        except ValueError as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+        # The body stays a plain list; the next page cursor travels in a header.
+        if page.get("next_cursor"):
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
+        return page["items"]
+
+    @app.get("/api/runs/stats", dependencies=[Depends(auth)])
+    async def api_run_stats(
+        group_by: str = "model",
+        since: str | None = None,
+        until: str | None = None,
+        channel: str | None = None,
+        agent: str | None = None,
+    ):
+        if not agent_loop or not hasattr(agent_loop, "run_stats"):
+            return []
+        filters = {key: value for key, value in {"channel": channel, "agent_id": agent}.items() if value}
+        try:
+            return agent_loop.run_stats(group_by=group_by, since=since, until=until, **filters)
+        except ValueError as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
 
     @app.get("/api/runs/queue", dependencies=[Depends(auth)])
     async def api_runs_queue():
@@ -666,6 +816,21 @@ def create_app(
             return {"mode": "queue", "collect_window_ms": 0, "max_backlog": 0, "sessions": []}
         return agent_loop.get_queue_snapshot()
 
+    @app.get("/api/subagents", dependencies=[Depends(auth)])
+    async def api_subagents():
+        subagent_stats = getattr(agent_loop, "subagent_stats", None)
+        if subagent_stats is None:
+            return {"enabled": False}
+        return {"enabled": True, **subagent_stats()}
+
+    @app.get("/api/runs/{run_id}/trace", dependencies=[Depends(auth)])
+    async def api_run_trace(run_id: str):
+        waterfall = tracing.TRACER.waterfall(run_id)
+        if waterfall is None:
+            detail = "trace not found" if tracing.TRACER.enabled else "tracing disabled"
+            return JSONResponse({"error": detail}, status_code=404)
+        return waterfall
+
     @app.post("/api/runs/{run_id}/cancel", dependencies=[Depends(auth)])
     async def api_cancel_run(run_id: str):
         if not agent_loop or not hasattr(agent_loop, "cancel_run"):
@@ -780,6 +945,15 @@ def create_app(
             selected = [item.strip() for item in windows.split(",") if item.strip()]
         return usage_tracker.summary(windows=selected)
 
+    @app.get("/api/usage/breakdown", dependencies=[Depends(auth)])
+    async def api_usage_breakdown(dimension: str = "model", window: str | None = None, limit: int = 20):
+        if not usage_tracker or not hasattr(usage_tracker, "breakdown"):
+            return {"dimension": dimension, "window": window or "all", "items": [], "total_items": 0}
+        try:
+            return usage_tracker.breakdown(dimension=dimension, window=window, limit=limit)
+        except ValueError as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+
     @app.post("/api/data/export", dependencies=[Depends(auth)])
     async def api_data_export(body: dict):
         if not compliance_service:
@@ -855,11 +1029,13 @@ def create_app(
             return JSONResponse({"ok": False, "error": "distributed runtime disabled"}, status_code=400)
         capabilities = body.get("capabilities") if isinstance(body.get("capabilities"), list) else None
         metadata = body.get("metadata") if isinstance(body.get("metadata"), dict) else None
+        running = body.get("running_task_ids") if isinstance(body.get("running_task_ids"), list) else None
         try:
             node = distributed_manager.heartbeat(
                 node_id=node_id,
                 capabilities=[str(v) for v in capabilities] if capabilities is not None else None,
                 metadata=metadata,
+                running_task_ids=[str(v) for v in running] if running is not None else None,
             )
         except Exception as exc:
             return JSONResponse({"ok": False, "error": str(exc)}, status_code=400)
@@ -873,23 +1049,31 @@ def create_app(
         required = body.get("required_capabilities") if isinstance(body.get("required_capabilities"), list) else []
         preferred = str(body.get("preferred_node_id") or "").strip() or None
         kind = str(body.get("kind") or "generic")
+        affinity_key = str(body.get("affinity_key") or body.get("session_key") or "").strip() or None
         try:
             task = distributed_manager.dispatch_task(
                 payload=payload,
                 required_capabilities=[str(v) for v in required],
                 preferred_node_id=preferred,
                 kind=kind,
+                affinity_key=affinity_key,
             )
         except Exception as exc:
             return JSONResponse({"ok": False, "error": str(exc)}, status_code=400)
         return {"ok": True, "task": task}
 
     @app.post("/api/distributed/nodes/{node_id}/tasks/claim", dependencies=[Depends(auth)])
-    async def api_distributed_claim(node_id: str):
+    async def api_distributed_claim(node_id: str, wait_s: float = 0.0, limit: int = 1):
+        """Claim up to `limit` tasks; with `wait_s` > 0 this long-polls until work arrives."""
         if not distributed_manager or not config.distributed.enabled:
             return JSONResponse({"ok": False, "error": "distributed runtime disabled"}, status_code=400)
-        task = distributed_manager.claim_task(node_id=node_id)
-        return {"ok": True, "task": task}
+        limit = max(1, min(int(limit), 100))
+        wait_s = max(0.0, min(float(wait_s), 60.0))
+        if wait_s > 0:
+            tasks = await distributed_manager.wait_for_tasks(node_id=node_id, limit=limit, timeout_s=wait_s)
+        else:
+            tasks = distributed_manager.claim_tasks(node_id=node_id, limit=limit)
+        return {"ok": True, "task": tasks[0] if tasks else None, "tasks": tasks}
 
     @app.post("/api/distributed/tasks/{task_id}/complete", dependencies=[Depends(auth)])
     async def api_distributed_complete(task_id: str, body: dict):
@@ -911,6 +1095,25 @@ def create_app(
             return JSONResponse({"ok": False, "error": str(exc)}, status_code=400)
         return {"ok": True, "task": task}
 
+    @app.post("/api/distributed/tasks/{task_id}/events", dependencies=[Depends(auth)])
+    async def api_distributed_task_events(task_id: str, body: dict):
+        """Relay run events a worker streams while it executes a remote run."""
+        if not distributed_manager or not config.distributed.enabled:
+            return JSONResponse({"ok": False, "error": "distributed runtime disabled"}, status_code=400)
+        node_id = str(body.get("node_id") or "").strip()
+        if not node_id:
+            return JSONResponse({"ok": False, "error": "node_id is required"}, status_code=400)
+        events = body.get("events") if isinstance(body.get("events"), list) else []
+        try:
+            delivered = await distributed_manager.publish_task_events(
+                task_id=task_id,
+                node_id=node_id,
+                events=events,
+            )
+        except Exception as exc:
+            return JSONResponse({"ok": False, "error": str(exc)}, status_code=400)
+        return {"ok": True, "delivered": delivered}
+
     @app.get("/api/distributed/tasks/{task_id}", dependencies=[Depends(auth)])
     async def api_distributed_get_task(task_id: str):
         if not distributed_manager or not config.distributed.enabled:
@@ -933,15 +1136,13 @@ def create_app(
     @app.get("/api/audit", dependencies=[Depends(auth)])
     async def api_audit(limit: int = 100):
         audit_path = config_path.parent / "audit.log"
-        if not audit_path.exists():
-            return []
-        lines = audit_path.read_text(encoding="utf-8").strip().split("\n")
+        limit = max(1, min(5000, int(limit)))
         entries = []
-        for line in lines[-limit:]:
-            try:
-                entries.append(json.loads(line))
-            except json.JSONDecodeError:
-                pass
+        for entry in iter_json_reverse(reversed(audit_log_files(audit_path))):
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+        entries.reverse()
         return entries
 
     # === Memory API ===
@@ -1067,6 +1268,93 @@ def create_app(
         finally:
             bus.unregister_approval_listener(q)
 
+    @app.websocket("/ws/distributed/nodes/{node_id}/tasks")
+    async def ws_distributed_tasks(websocket: WebSocket, node_id: str):
+        """Push task channel for a worker node.
+
+        The worker sends ``{"type": "ready", "limit": n}`` when it has free
+        slots and receives ``{"type": "tasks", "tasks": [...]}`` as soon as
+        work is dispatched to it (an empty list is a keepalive). Results go
+        back as ``{"type": "complete", "task_id", "result"|"error"}`` and
+        ``{"type": "heartbeat", "metadata", "running_task_ids"}`` renews leases
+        and answers with the ids among them that were cancelled.
+        ``{"type": "events", "task_id", "events"}`` relays run events of a
+        remote run and is not acknowledged.
+        """
+        ws_token = websocket.query_params.get("token", "")
+        if ws_token != token:
+            await websocket.close(code=4001)
+            return
+        await websocket.accept()
+        if not distributed_manager or not config.distributed.enabled:
+            await websocket.send_json({"type": "error", "message": "distributed runtime disabled"})
+            await websocket.close()
+            return
+        send_lock = asyncio.Lock()
+        ready_task: asyncio.Task | None = None
+
+        async def send(message: dict[str, Any]) -> None:
+            async with send_lock:
+                await websocket.send_json(message)
+
+        async def push_tasks(limit: int, wait_s: float) -> None:
+            tasks = await distributed_manager.wait_for_tasks(node_id=node_id, limit=limit, timeout_s=wait_s)
+            try:
+                await send({"type": "tasks", "tasks": tasks})
+            except BaseException:
+                # Replaced by a newer ready or the socket went away before the
+                # worker saw these: put them back instead of leaving them running.
+                if tasks:
+                    distributed_manager.release_tasks(node_id=node_id, task_ids=[t["task_id"] for t in tasks])
+                raise
+
+        try:
+            while True:
+                msg = await websocket.receive_json()
+                kind = str(msg.get("type") or "") if isinstance(msg, dict) else ""
+                try:
+                    if kind == "ready":
+                        limit = max(1, min(int(msg.get("limit") or 1), 100))
+                        wait_s = max(0.0, min(float(msg.get("wait_s") or 25.0), 60.0))
+                        # Park the claim in the background so completions and
+                        # heartbeats keep flowing; a newer ready replaces it.
+                        if ready_task is not None and not ready_task.done():
+                            ready_task.cancel()
+                        ready_task = asyncio.create_task(push_tasks(limit, wait_s))
+                    elif kind == "complete":
+                        task = distributed_manager.complete_task(
+                            task_id=str(msg.get("task_id") or ""),
+                            node_id=node_id,
+                            result=msg.get("result") if isinstance(msg.get("result"), dict) else None,
+                            error=str(msg.get("error") or "").strip() or None,
+                        )
+                        await send({"type": "completed", "task": task})
+                    elif kind == "heartbeat":
+                        metadata = msg.get("metadata") if isinstance(msg.get("metadata"), dict) else None
+                        running = msg.get("running_task_ids") if isinstance(msg.get("running_task_ids"), list) else None
+                        node = distributed_manager.heartbeat(
+                            node_id=node_id,
+                            metadata=metadata,
+                            running_task_ids=[str(v) for v in running] if running is not None else None,
+                        )
+                        await send({"type": "heartbeat", "node": node})
+                    elif kind == "events":
+                        events = msg.get("events") if isinstance(msg.get("events"), list) else []
+                        await distributed_manager.publish_task_events(
+                            task_id=str(msg.get("task_id") or ""),
+                            node_id=node_id,
+                            events=events,
+                        )
+                    else:
+                        await send({"type": "error", "message": f"unknown message type '{kind}'"})
+                except (KeyError, ValueError) as exc:
+                    await send({"type": "error", "message": str(exc)})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if ready_task is not None and not ready_task.done():
+                ready_task.cancel()
+
     @app.websocket("/ws/runs")
     async def ws_runs(websocket: WebSocket):
         ws_token = websocket.query_params.get("token", "")
@@ -617,6 +617,10 @@ async function loadDashboard() {
     if (statusRes.heartbeat) {
       parts.push(dashboardStatusCard('Heartbeat', statusRes.heartbeat.running ? 'running' : 'stopped'));
     }
+    if (statusRes.subagents) {
+      const sub = statusRes.subagents;
+      parts.push(dashboardStatusCard('Subagents', `${sub.running}/${sub.max_concurrency} running, ${sub.queued} queued`));
+    }
     if (statusRes.channels) {
       for (const [name, st] of Object.entries(statusRes.channels)) {
         parts.push(dashboardStatusCard(`Channel: ${name}`, st.running ? 'running' : 'stopped'));
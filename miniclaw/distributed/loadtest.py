@@ -0,0 +1,137 @@
+"""Dispatch-to-start latency load test: polling workers vs long-poll workers.
+
+Run with::
+
+    python -m miniclaw.distributed.loadtest --tasks 200 --workers 4 --poll-interval 0.5
+
+Both modes use a fresh SQLite task store and the same dispatch schedule;
+the latency of a task is the time from `dispatch_task` returning to a
+worker holding the claimed task.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from miniclaw.distributed.manager import DistributedNodeManager
+
+
+def summarize(latencies_s: list[float]) -> dict[str, float]:
+    if not latencies_s:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(latencies_s)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * len(ordered))) - 1)]
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[(len(ordered) - 1) // 2] * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def _run_mode(
+    store_dir: Path,
+    *,
+    mode: str,
+    tasks: int,
+    workers: int,
+    poll_interval_s: float,
+    dispatch_interval_s: float,
+) -> list[float]:
+    manager = DistributedNodeManager(store_path=store_dir / f"{mode}.db", heartbeat_timeout_s=3600)
+    node_ids = [f"worker-{i}" for i in range(max(1, workers))]
+    for node_id in node_ids:
+        manager.register_node(node_id=node_id, capabilities=["agent"])
+    dispatched_at: dict[str, float] = {}
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def worker(node_id: str) -> None:
+        while not done.is_set():
+            if mode == "polling":
+                claimed = manager.claim_tasks(node_id=node_id, limit=1)
+                if not claimed:
+                    await asyncio.sleep(poll_interval_s)
+                    continue
+            else:
+                claimed = await manager.wait_for_tasks(node_id=node_id, limit=1, timeout_s=0.5)
+            started = time.perf_counter()
+            for task in claimed:
+                latencies.append(started - dispatched_at[task["task_id"]])
+                manager.complete_task(task_id=task["task_id"], node_id=node_id, result={})
+            if len(latencies) >= tasks:
+                done.set()
+
+    runners = [asyncio.create_task(worker(node_id)) for node_id in node_ids]
+    # Let every worker park (or start polling) before the first dispatch.
+    await asyncio.sleep(0.05)
+    for i in range(tasks):
+        task = manager.dispatch_task(payload={"n": i}, preferred_node_id=node_ids[i % len(node_ids)])
+        dispatched_at[task["task_id"]] = time.perf_counter()
+        await asyncio.sleep(dispatch_interval_s)
+    try:
+        await asyncio.wait_for(done.wait(), timeout=max(10.0, tasks * (poll_interval_s + dispatch_interval_s)))
+    finally:
+        done.set()
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        manager.close()
+    return latencies
+
+
+async def compare(
+    *,
+    tasks: int = 100,
+    workers: int = 4,
+    poll_interval_s: float = 0.5,
+    dispatch_interval_s: float = 0.01,
+) -> dict[str, Any]:
+    """Run both modes and return latency summaries keyed by mode."""
+    with tempfile.TemporaryDirectory(prefix="miniclaw-dispatch-") as tmp:
+        out: dict[str, Any] = {
+            "tasks": tasks,
+            "workers": workers,
+            "poll_interval_s": poll_interval_s,
+        }
+        for mode in ("polling", "long_poll"):
+            latencies = await _run_mode(
+                Path(tmp),
+                mode=mode,
+                tasks=tasks,
+                workers=workers,
+                poll_interval_s=poll_interval_s,
+                dispatch_interval_s=dispatch_interval_s,
+            )
+            out[mode] = summarize(latencies)
+        return out
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--dispatch-interval", type=float, default=0.01)
+    args = parser.parse_args(argv)
+    report = asyncio.run(
+        compare(
+            tasks=args.tasks,
+            workers=args.workers,
+            poll_interval_s=args.poll_interval,
+            dispatch_interval_s=args.dispatch_interval,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,95 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-import tempfile
+import sqlite3
+import threading
 import time
 import uuid
+from collections import deque
 from contextlib import contextmanager
 from pathlib import Path
-from threading import RLock
-from typing import Any
+from typing import Any, Awaitable, Callable, Iterator
 
 from loguru import logger
 
-try:
-    import fcntl
-except ImportError:  # pragma: no cover - unavailable on Windows.
-    fcntl = None
+from miniclaw.distributed.placement import get_strategy, place
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id TEXT PRIMARY KEY,
+    capabilities TEXT NOT NULL DEFAULT '[]',
+    metadata TEXT NOT NULL DEFAULT '{}',
+    address TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'online',
+    registered_at_ms INTEGER NOT NULL,
+    updated_at_ms INTEGER NOT NULL,
+    last_heartbeat_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL DEFAULT 'generic',
+    payload TEXT NOT NULL DEFAULT '{}',
+    required_capabilities TEXT NOT NULL DEFAULT '[]',
+    assigned_node_id TEXT NOT NULL,
+    affinity_key TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    created_at_ms INTEGER NOT NULL,
+    updated_at_ms INTEGER NOT NULL,
+    claimed_at_ms INTEGER,
+    lease_expires_at_ms INTEGER,
+    completed_at_ms INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks (assigned_node_id, status, created_at_ms);
+CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (status, lease_expires_at_ms);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at_ms);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks (status, updated_at_ms);
+CREATE TABLE IF NOT EXISTS task_count (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS tasks_count_insert AFTER INSERT ON tasks
+BEGIN UPDATE task_count SET total = total + 1 WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS tasks_count_delete AFTER DELETE ON tasks
+BEGIN UPDATE task_count SET total = total - 1 WHERE id = 0; END;
+INSERT OR IGNORE INTO task_count (id, total) SELECT 0, COUNT(*) FROM tasks;
+"""
+
+_TERMINAL_STATUSES = ("completed", "error")
+_ACTIVE_STATUSES = ("queued", "running")
+_PRUNE_EVERY = 32
+
+
+def _capability_list(values: list[str] | None) -> list[str]:
+    return sorted({str(c).strip() for c in (values or []) if str(c).strip()})
+
+
+def _resolve_waiter(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
 
 
 class DistributedNodeManager:
-    """Track remote workers and assign tasks by capabilities."""
+    """Track remote workers and assign tasks by capabilities.
+
+    State lives in a WAL-mode SQLite database so several gateway processes
+    can share it. Claims are a single compare-and-set on the indexed queue of
+    the claiming node; a claimed task holds a lease that the node's
+    heartbeats renew, and expired leases put the task back in the queue.
+
+    The node for a task comes from a placement strategy (see
+    `miniclaw.distributed.placement`). Tasks held by a node that stops
+    heartbeating are moved to another eligible node.
+
+    Workers may wait for work instead of polling: `wait_for_tasks` parks the
+    caller and a dispatch to that node wakes exactly one parked waiter.
+    Waiters still re-check the store periodically, so tasks dispatched by
+    another process are picked up too.
+    """
 
     def __init__(
         self,
@@ -30,90 +100,153 @@ class DistributedNodeManager:
         peer_allowlist: list[str] | None = None,
         heartbeat_timeout_s: int = 90,
         max_tasks: int = 1000,
+        task_lease_s: int = 300,
+        placement: str = "least_outstanding",
     ):
-        self.store_path = Path(store_path)
+        store_path = Path(store_path)
+        self.legacy_path = store_path if store_path.suffix == ".json" else None
+        self.store_path = store_path.with_suffix(".db") if self.legacy_path else store_path
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        self.lock_path = self.store_path.with_suffix(f"{self.store_path.suffix}.lock")
         self.local_node_id = str(local_node_id or "local-node").strip() or "local-node"
         self.peer_allowlist = {str(v).strip() for v in (peer_allowlist or []) if str(v).strip()}
         self.heartbeat_timeout_s = max(15, int(heartbeat_timeout_s))
         self.max_tasks = max(100, int(max_tasks))
-        self._lock = RLock()
-        self._state = self._load_from_disk()
-
-    @staticmethod
-    def _empty_state() -> dict[str, Any]:
-        return {"nodes": {}, "tasks": {}}
-
-    @classmethod
-    def _normalize_state(cls, value: Any) -> dict[str, Any]:
-        if not isinstance(value, dict):
-            return cls._empty_state()
-        nodes = value.get("nodes")
-        tasks = value.get("tasks")
-        out = {
-            "nodes": dict(nodes) if isinstance(nodes, dict) else {},
-            "tasks": dict(tasks) if isinstance(tasks, dict) else {},
-        }
-        return out
-
-    def _load_from_disk(self) -> dict[str, Any]:
-        if not self.store_path.exists():
-            return self._empty_state()
-        try:
-            raw = json.loads(self.store_path.read_text(encoding="utf-8"))
-        except Exception:
-            return self._empty_state()
-        return self._normalize_state(raw)
-
-    def _save_to_disk(self, state: dict[str, Any]) -> None:
-        normalized = self._normalize_state(state)
-        self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        payload = json.dumps(normalized, ensure_ascii=False, indent=2)
-        with tempfile.NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            dir=str(self.store_path.parent),
-            prefix=f"{self.store_path.name}.",
-            suffix=".tmp",
-            delete=False,
-        ) as tmp:
-            tmp.write(payload)
-            tmp_path = Path(tmp.name)
-        tmp_path.replace(self.store_path)
-
-    @contextmanager
-    def _file_lock(self):
-        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
-        handle = open(self.lock_path, "a+", encoding="utf-8")
-        try:
-            if fcntl is not None:
-                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
-            yield
-        finally:
-            if fcntl is not None:
-                try:
-                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
-                except Exception:
-                    pass
-            handle.close()
+        self.task_lease_s = max(1, int(task_lease_s))
+        get_strategy(placement)
+        self.placement = placement
+        self._last_reassign_ms = 0
+        self._lock = threading.RLock()
+        self._dispatches = 0
+        self._waiters: dict[str, deque[asyncio.Future[None]]] = {}
+        self._completion_waiters: dict[str, list[asyncio.Future[None]]] = {}
+        self._task_listeners: dict[str, Callable[[list[dict[str, Any]]], Awaitable[None]]] = {}
+        self._conn = sqlite3.connect(
+            str(self.store_path), timeout=10.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+            if "affinity_key" not in columns:
+                self._conn.execute("ALTER TABLE tasks ADD COLUMN affinity_key TEXT NOT NULL DEFAULT ''")
+        if self.legacy_path is not None:
+            self._migrate_json(self.legacy_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
     @contextmanager
-    def _state_guard(self, *, write: bool):
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; BEGIN IMMEDIATE serializes writers across processes."""
         with self._lock:
-            with self._file_lock():
-                state = self._load_from_disk()
-                try:
-                    yield state
-                finally:
-                    if write:
-                        self._save_to_disk(state)
-                    self._state = self._normalize_state(state)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _migrate_json(self, legacy: Path) -> None:
+        """Import nodes and tasks from the pre-SQLite ``state.json`` once."""
+        if not legacy.exists():
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM nodes UNION ALL SELECT 1 FROM tasks LIMIT 1").fetchone():
+                return
+        try:
+            raw = json.loads(legacy.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if not isinstance(raw, dict):
+            return
+        nodes = raw.get("nodes") if isinstance(raw.get("nodes"), dict) else {}
+        tasks = raw.get("tasks") if isinstance(raw.get("tasks"), dict) else {}
+        now_ms = self._now_ms()
+        with self._transaction() as conn:
+            for node_id, row in nodes.items():
+                if not isinstance(row, dict):
+                    continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        str(node_id),
+                        json.dumps(_capability_list(row.get("capabilities"))),
+                        json.dumps(row.get("metadata") or {}, ensure_ascii=False),
+                        str(row.get("address") or ""),
+                        str(row.get("status") or "online"),
+                        int(row.get("registered_at_ms") or now_ms),
+                        int(row.get("updated_at_ms") or now_ms),
+                        int(row.get("last_heartbeat_ms") or 0),
+                    ),
+                )
+            for task_id, row in tasks.items():
+                if not isinstance(row, dict):
+                    continue
+                status = str(row.get("status") or "queued")
+                conn.execute(
+                    "INSERT OR IGNORE INTO tasks (task_id, kind, payload, required_capabilities, "
+                    "assigned_node_id, status, created_at_ms, updated_at_ms, claimed_at_ms, "
+                    "lease_expires_at_ms, completed_at_ms, attempts, result, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        str(task_id),
+                        str(row.get("kind") or "generic"),
+                        json.dumps(row.get("payload") or {}, ensure_ascii=False),
+                        json.dumps(_capability_list(row.get("required_capabilities"))),
+                        str(row.get("assigned_node_id") or ""),
+                        status,
+                        int(row.get("created_at_ms") or now_ms),
+                        int(row.get("updated_at_ms") or now_ms),
+                        row.get("claimed_at_ms"),
+                        now_ms + self.task_lease_s * 1000 if status == "running" else None,
+                        row.get("completed_at_ms"),
+                        1 if row.get("claimed_at_ms") else 0,
+                        json.dumps(row["result"], ensure_ascii=False) if row.get("result") is not None else None,
+                        row.get("error"),
+                    ),
+                )
 
     @staticmethod
     def _now_ms() -> int:
         return int(time.time() * 1000)
 
+    @staticmethod
+    def _node_dict(row: sqlite3.Row) -> dict[str, Any]:
+        return {
+            "node_id": row["node_id"],
+            "capabilities": json.loads(row["capabilities"] or "[]"),
+            "metadata": json.loads(row["metadata"] or "{}"),
+            "address": row["address"],
+            "status": row["status"],
+            "registered_at_ms": row["registered_at_ms"],
+            "updated_at_ms": row["updated_at_ms"],
+            "last_heartbeat_ms": row["last_heartbeat_ms"],
+        }
+
+    @staticmethod
+    def _task_dict(row: sqlite3.Row) -> dict[str, Any]:
+        return {
+            "task_id": row["task_id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"] or "{}"),
+            "required_capabilities": json.loads(row["required_capabilities"] or "[]"),
+            "assigned_node_id": row["assigned_node_id"],
+            "affinity_key": row["affinity_key"],
+            "status": row["status"],
+            "created_at_ms": row["created_at_ms"],
+            "updated_at_ms": row["updated_at_ms"],
+            "claimed_at_ms": row["claimed_at_ms"],
+            "lease_expires_at_ms": row["lease_expires_at_ms"],
+            "completed_at_ms": row["completed_at_ms"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+        }
+
     def _enforce_allowlist(self, node_id: str) -> None:
         if not self.peer_allowlist:
             return
@@ -136,20 +269,37 @@ class DistributedNodeManager:
         self._enforce_allowlist(node_id)
 
         now_ms = self._now_ms()
-        with self._state_guard(write=True) as state:
-            existing = state["nodes"].get(node_id, {})
+        with self._transaction() as conn:
+            existing = conn.execute("SELECT * FROM nodes WHERE node_id = ?", (node_id,)).fetchone()
+            old = self._node_dict(existing) if existing else {}
             row = {
                 "node_id": node_id,
-                "capabilities": sorted({str(c).strip() for c in (capabilities or []) if str(c).strip()}),
-                "metadata": dict(metadata or existing.get("metadata") or {}),
-                "address": str(address or existing.get("address") or ""),
+                "capabilities": _capability_list(capabilities),
+                "metadata": dict(metadata or old.get("metadata") or {}),
+                "address": str(address or old.get("address") or ""),
                 "status": "online",
-                "registered_at_ms": int(existing.get("registered_at_ms") or now_ms),
+                "registered_at_ms": int(old.get("registered_at_ms") or now_ms),
                 "updated_at_ms": now_ms,
                 "last_heartbeat_ms": now_ms,
             }
-            state["nodes"][node_id] = row
-            return dict(row)
+            self._write_node(conn, row)
+            return row
+
+    @staticmethod
+    def _write_node(conn: sqlite3.Connection, row: dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                row["node_id"],
+                json.dumps(row["capabilities"]),
+                json.dumps(row["metadata"], ensure_ascii=False, default=str),
+                row["address"],
+                row["status"],
+                row["registered_at_ms"],
+                row["updated_at_ms"],
+                row["last_heartbeat_ms"],
+            ),
+        )
 
     def heartbeat(
         self,
@@ -157,19 +307,28 @@ class DistributedNodeManager:
         node_id: str,
         capabilities: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        running_task_ids: list[str] | None = None,
     ) -> dict[str, Any]:
+        """Mark the node online and renew the leases of the tasks it is running.
+
+        When the worker reports `running_task_ids`, only those leases are
+        renewed, so a task claimed but never delivered expires and is requeued.
+        The returned row then carries ``cancelled_task_ids``: the reported
+        tasks the node should stop because they were cancelled, failed or
+        moved to another node meanwhile.
+        """
         node_id = str(node_id or "").strip()
         if not node_id:
             raise ValueError("node_id is required.")
         self._enforce_allowlist(node_id)
 
         now_ms = self._now_ms()
-        with self._state_guard(write=True) as state:
-            existing = state["nodes"].get(node_id)
-            if not isinstance(existing, dict):
+        with self._transaction() as conn:
+            existing = conn.execute("SELECT * FROM nodes WHERE node_id = ?", (node_id,)).fetchone()
+            if existing is None:
                 row = {
                     "node_id": node_id,
-                    "capabilities": sorted({str(c).strip() for c in (capabilities or []) if str(c).strip()}),
+                    "capabilities": _capability_list(capabilities),
                     "metadata": dict(metadata or {}),
                     "address": "",
                     "status": "online",
@@ -177,58 +336,84 @@ class DistributedNodeManager:
                     "updated_at_ms": now_ms,
                     "last_heartbeat_ms": now_ms,
                 }
-                state["nodes"][node_id] = row
-                return dict(row)
-
-            if capabilities is not None:
-                existing["capabilities"] = sorted({str(c).strip() for c in capabilities if str(c).strip()})
-            if metadata is not None:
-                existing["metadata"] = dict(metadata)
-            existing["status"] = "online"
-            existing["last_heartbeat_ms"] = now_ms
-            existing["updated_at_ms"] = now_ms
-            return dict(existing)
-
-    def _list_nodes_from_state(self, state: dict[str, Any], *, include_stale: bool = False) -> list[dict[str, Any]]:
+            else:
+                row = self._node_dict(existing)
+                if capabilities is not None:
+                    row["capabilities"] = _capability_list(capabilities)
+                if metadata is not None:
+                    row["metadata"] = dict(metadata)
+                row["status"] = "online"
+                row["last_heartbeat_ms"] = now_ms
+                row["updated_at_ms"] = now_ms
+            self._write_node(conn, row)
+            lease_ms = now_ms + self.task_lease_s * 1000
+            if running_task_ids is None:
+                conn.execute(
+                    "UPDATE tasks SET lease_expires_at_ms = ? WHERE assigned_node_id = ? AND status = 'running'",
+                    (lease_ms, node_id),
+                )
+                return row
+            reported = list(dict.fromkeys(str(t) for t in running_task_ids))
+            placeholders = ",".join("?" * len(reported))
+            renewed = (
+                {
+                    r[0]
+                    for r in conn.execute(
+                        f"UPDATE tasks SET lease_expires_at_ms = ? WHERE assigned_node_id = ? "
+                        f"AND status = 'running' AND task_id IN ({placeholders}) RETURNING task_id",
+                        (lease_ms, node_id, *reported),
+                    )
+                }
+                if reported
+                else set()
+            )
+            return {**row, "cancelled_task_ids": [t for t in reported if t not in renewed]}
+
+    def _list_nodes(self, conn: sqlite3.Connection, *, include_stale: bool = False) -> list[dict[str, Any]]:
         now_ms = self._now_ms()
-        out: list[dict[str, Any]] = []
         timeout_ms = self.heartbeat_timeout_s * 1000
-        for node_id, row in state["nodes"].items():
-            if not isinstance(row, dict):
-                continue
-            last_hb = int(row.get("last_heartbeat_ms") or 0)
-            alive = (now_ms - last_hb) <= timeout_ms
-            item = dict(row)
-            item["alive"] = alive
-            item["node_id"] = node_id
-            if include_stale or alive:
+        out: list[dict[str, Any]] = []
+        for row in conn.execute("SELECT * FROM nodes ORDER BY updated_at_ms DESC"):
+            item = self._node_dict(row)
+            item["alive"] = (now_ms - int(item["last_heartbeat_ms"] or 0)) <= timeout_ms
+            if include_stale or item["alive"]:
                 out.append(item)
-        out.sort(key=lambda r: int(r.get("updated_at_ms") or 0), reverse=True)
         return out
 
     def list_nodes(self, *, include_stale: bool = False) -> list[dict[str, Any]]:
-        with self._state_guard(write=False) as state:
-            return self._list_nodes_from_state(state, include_stale=include_stale)
+        with self._lock:
+            return self._list_nodes(self._conn, include_stale=include_stale)
+
+    @staticmethod
+    def _outstanding(conn: sqlite3.Connection) -> dict[str, int]:
+        rows = conn.execute(
+            "SELECT assigned_node_id, COUNT(*) FROM tasks WHERE status IN (?, ?) GROUP BY assigned_node_id",
+            _ACTIVE_STATUSES,
+        )
+        return {str(node_id): int(count) for node_id, count in rows}
 
     def _select_node(
         self,
-        state: dict[str, Any],
+        conn: sqlite3.Connection,
         *,
         required_capabilities: list[str] | None = None,
         preferred_node_id: str | None = None,
+        affinity_key: str = "",
+        nodes: list[dict[str, Any]] | None = None,
+        outstanding: dict[str, int] | None = None,
     ) -> str | None:
-        required = {str(c).strip() for c in (required_capabilities or []) if str(c).strip()}
-        nodes = self._list_nodes_from_state(state, include_stale=False)
+        required = set(_capability_list(required_capabilities))
+        if nodes is None:
+            nodes = self._list_nodes(conn, include_stale=False)
+        candidates = [n for n in nodes if required.issubset(set(n.get("capabilities") or []))]
         if preferred_node_id:
-            preferred = next((n for n in nodes if n.get("node_id") == preferred_node_id), None)
-            if preferred and required.issubset(set(preferred.get("capabilities") or [])):
-                return str(preferred.get("node_id"))
-
-        for node in nodes:
-            caps = set(node.get("capabilities") or [])
-            if required.issubset(caps):
-                return str(node.get("node_id"))
-        return None
+            if any(n.get("node_id") == preferred_node_id for n in candidates):
+                return str(preferred_node_id)
+        if not candidates:
+            return None
+        if outstanding is None and self.placement != "first":
+            outstanding = self._outstanding(conn)
+        return place(self.placement, candidates, outstanding=outstanding, affinity_key=affinity_key)
 
     def dispatch_task(
         self,
@@ -237,12 +422,39 @@ class DistributedNodeManager:
         required_capabilities: list[str] | None = None,
         preferred_node_id: str | None = None,
         kind: str = "generic",
+        affinity_key: str | None = None,
     ) -> dict[str, Any]:
-        with self._state_guard(write=True) as state:
+        """Queue a task on a node chosen by the placement strategy.
+
+        `affinity_key` (typically a session key) keeps related tasks on the
+        same node under the ``affinity`` strategy.
+        """
+        self._maybe_reassign_stale()
+        row = self._insert_task(
+            payload=payload,
+            required_capabilities=required_capabilities,
+            preferred_node_id=preferred_node_id,
+            kind=kind,
+            affinity_key=str(affinity_key or ""),
+        )
+        self._wake_one(row["assigned_node_id"])
+        return row
+
+    def _insert_task(
+        self,
+        *,
+        payload: dict[str, Any],
+        required_capabilities: list[str] | None,
+        preferred_node_id: str | None,
+        kind: str,
+        affinity_key: str,
+    ) -> dict[str, Any]:
+        with self._transaction() as conn:
             node_id = self._select_node(
-                state,
+                conn,
                 required_capabilities=required_capabilities,
                 preferred_node_id=preferred_node_id,
+                affinity_key=affinity_key,
             )
             if not node_id:
                 raise ValueError("No eligible online node available for task dispatch.")
@@ -253,41 +465,166 @@ class DistributedNodeManager:
                 "task_id": task_id,
                 "kind": str(kind or "generic"),
                 "payload": dict(payload or {}),
-                "required_capabilities": sorted(
-                    {str(c).strip() for c in (required_capabilities or []) if str(c).strip()}
-                ),
+                "required_capabilities": _capability_list(required_capabilities),
                 "assigned_node_id": node_id,
+                "affinity_key": affinity_key,
                 "status": "queued",
                 "created_at_ms": now_ms,
                 "updated_at_ms": now_ms,
                 "claimed_at_ms": None,
+                "lease_expires_at_ms": None,
                 "completed_at_ms": None,
+                "attempts": 0,
                 "result": None,
                 "error": None,
             }
-            state["tasks"][task_id] = row
-            self._prune_tasks(state["tasks"])
-            return dict(row)
+            conn.execute(
+                "INSERT INTO tasks (task_id, kind, payload, required_capabilities, assigned_node_id, "
+                "affinity_key, status, created_at_ms, updated_at_ms) VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (
+                    task_id,
+                    row["kind"],
+                    json.dumps(row["payload"], ensure_ascii=False, default=str),
+                    json.dumps(row["required_capabilities"]),
+                    node_id,
+                    affinity_key,
+                    now_ms,
+                    now_ms,
+                ),
+            )
+            self._dispatches += 1
+            if self._dispatches % _PRUNE_EVERY == 0:
+                self._prune_tasks(conn)
+            return row
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now_ms: int) -> int:
+        cursor = conn.execute(
+            "UPDATE tasks SET status = 'queued', lease_expires_at_ms = NULL, updated_at_ms = ? "
+            "WHERE status = 'running' AND lease_expires_at_ms < ?",
+            (now_ms, now_ms),
+        )
+        if cursor.rowcount:
+            logger.info("Requeued {} distributed task(s) with expired leases", cursor.rowcount)
+        return cursor.rowcount
+
+    def reassign_stale_tasks(self) -> list[dict[str, Any]]:
+        """Move queued and running tasks off nodes that missed their heartbeat.
+
+        Each task goes back to ``queued`` on another eligible node chosen by
+        the placement strategy; tasks with no eligible node stay put.
+        Returns ``{"task_id", "from_node_id", "to_node_id"}`` rows.
+        """
+        moved: list[dict[str, Any]] = []
+        now_ms = self._now_ms()
+        with self._transaction() as conn:
+            self._last_reassign_ms = now_ms
+            nodes = self._list_nodes(conn, include_stale=True)
+            stale = [n["node_id"] for n in nodes if not n["alive"]]
+            if not stale:
+                return moved
+            alive = [n for n in nodes if n["alive"]]
+            outstanding = self._outstanding(conn)
+            for stale_id in stale:
+                rows = conn.execute(
+                    "SELECT task_id, required_capabilities, affinity_key FROM tasks "
+                    "WHERE assigned_node_id = ? AND status IN (?, ?)",
+                    (stale_id, *_ACTIVE_STATUSES),
+                ).fetchall()
+                for row in rows:
+                    target = self._select_node(
+                        conn,
+                        required_capabilities=json.loads(row["required_capabilities"] or "[]"),
+                        affinity_key=row["affinity_key"],
+                        nodes=alive,
+                        outstanding=outstanding,
+                    )
+                    if not target:
+                        continue
+                    conn.execute(
+                        "UPDATE tasks SET assigned_node_id = ?, status = 'queued', lease_expires_at_ms = NULL, "
+                        "updated_at_ms = ? WHERE task_id = ?",
+                        (target, now_ms, row["task_id"]),
+                    )
+                    outstanding[target] = outstanding.get(target, 0) + 1
+                    moved.append({"task_id": row["task_id"], "from_node_id": stale_id, "to_node_id": target})
+        for item in moved:
+            self._wake_one(item["to_node_id"])
+        if moved:
+            logger.info("Reassigned {} distributed task(s) from stale nodes", len(moved))
+        return moved
+
+    def _maybe_reassign_stale(self) -> None:
+        interval_ms = max(1000, self.heartbeat_timeout_s * 1000 // 3)
+        if self._now_ms() - self._last_reassign_ms >= interval_ms:
+            self.reassign_stale_tasks()
 
     def claim_task(self, *, node_id: str) -> dict[str, Any] | None:
+        claimed = self.claim_tasks(node_id=node_id, limit=1)
+        return claimed[0] if claimed else None
+
+    def claim_tasks(self, *, node_id: str, limit: int = 1) -> list[dict[str, Any]]:
+        """Claim up to `limit` of the node's oldest queued tasks in one transaction."""
         node_id = str(node_id or "").strip()
-        with self._state_guard(write=True) as state:
-            queued = [
-                row
-                for row in state["tasks"].values()
-                if isinstance(row, dict)
-                and str(row.get("assigned_node_id") or "") == node_id
-                and str(row.get("status") or "") == "queued"
-            ]
-            if not queued:
-                return None
-            queued.sort(key=lambda r: int(r.get("created_at_ms") or 0))
-            row = queued[0]
-            now_ms = self._now_ms()
-            row["status"] = "running"
-            row["claimed_at_ms"] = now_ms
-            row["updated_at_ms"] = now_ms
-            return dict(row)
+        self._maybe_reassign_stale()
+        now_ms = self._now_ms()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now_ms)
+            rows = conn.execute(
+                "UPDATE tasks SET status = 'running', claimed_at_ms = ?, updated_at_ms = ?, "
+                "lease_expires_at_ms = ?, attempts = attempts + 1 "
+                "WHERE task_id IN (SELECT task_id FROM tasks WHERE assigned_node_id = ? AND status = 'queued' "
+                "ORDER BY created_at_ms, task_id LIMIT ?) AND status = 'queued' RETURNING *",
+                (now_ms, now_ms, now_ms + self.task_lease_s * 1000, node_id, max(1, int(limit))),
+            ).fetchall()
+        tasks = [self._task_dict(row) for row in rows]
+        tasks.sort(key=lambda task: (task["created_at_ms"], task["task_id"]))
+        return tasks
+
+    async def wait_for_tasks(
+        self,
+        *,
+        node_id: str,
+        limit: int = 1,
+        timeout_s: float = 30.0,
+        recheck_s: float = 1.0,
+    ) -> list[dict[str, Any]]:
+        """Long-poll claim: return claimed tasks as soon as any are available, or [] on timeout."""
+        node_id = str(node_id or "").strip()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, float(timeout_s))
+        while True:
+            tasks = self.claim_tasks(node_id=node_id, limit=limit)
+            remaining = deadline - loop.time()
+            if tasks or remaining <= 0:
+                return tasks
+            waiter: asyncio.Future[None] = loop.create_future()
+            queue = self._waiters.setdefault(node_id, deque())
+            queue.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=min(remaining, max(0.01, float(recheck_s))))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+                if not queue:
+                    self._waiters.pop(node_id, None)
+
+    def waiting_count(self, node_id: str) -> int:
+        return sum(1 for waiter in self._waiters.get(str(node_id), ()) if not waiter.done())
+
+    def _wake_one(self, node_id: str) -> bool:
+        """Wake the longest-parked waiter of `node_id`, if any."""
+        queue = self._waiters.get(str(node_id))
+        while queue:
+            waiter = queue.popleft()
+            if waiter.done():
+                continue
+            waiter.get_loop().call_soon_threadsafe(_resolve_waiter, waiter)
+            return True
+        return False
 
     def complete_task(
         self,
@@ -297,31 +634,153 @@ class DistributedNodeManager:
         result: dict[str, Any] | None = None,
         error: str | None = None,
     ) -> dict[str, Any]:
-        with self._state_guard(write=True) as state:
-            row = state["tasks"].get(str(task_id))
-            if not isinstance(row, dict):
-                logger.warning(
-                    "Distributed task completion rejected: task not found (task_id={}, node_id={})",
-                    task_id,
-                    node_id,
-                )
+        """Record the node's result; a task that was already cancelled keeps its state."""
+        now_ms = self._now_ms()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, result = ?, completed_at_ms = ?, updated_at_ms = ?, "
+                "lease_expires_at_ms = NULL WHERE task_id = ? AND assigned_node_id = ? "
+                "AND status IN (?, ?) RETURNING *",
+                (
+                    "error" if error else "completed",
+                    str(error) if error else None,
+                    json.dumps(dict(result or {}), ensure_ascii=False, default=str) if result is not None else None,
+                    now_ms,
+                    now_ms,
+                    str(task_id),
+                    str(node_id),
+                    *_ACTIVE_STATUSES,
+                ),
+            ).fetchone()
+            if row is not None:
+                task = self._task_dict(row)
+                self._resolve_completion(task["task_id"])
+                return task
+            existing = conn.execute("SELECT * FROM tasks WHERE task_id = ?", (str(task_id),)).fetchone()
+        if existing is not None and existing["assigned_node_id"] == str(node_id):
+            return self._task_dict(existing)
+        if existing is None:
+            logger.warning(
+                "Distributed task completion rejected: task not found (task_id={}, node_id={})",
+                task_id,
+                node_id,
+            )
+            raise KeyError("Task not found.")
+        raise ValueError("Task is assigned to a different node.")
+
+    def release_tasks(self, *, node_id: str, task_ids: list[str]) -> int:
+        """Requeue tasks claimed by `node_id` that never reached the worker.
+
+        Claim attempts are given back too, so an undelivered claim does not
+        count as a try.
+        """
+        node_id = str(node_id or "").strip()
+        ids = [str(t) for t in task_ids]
+        if not ids:
+            return 0
+        placeholders = ",".join("?" * len(ids))
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'queued', lease_expires_at_ms = NULL, claimed_at_ms = NULL, "
+                "attempts = MAX(0, attempts - 1), updated_at_ms = ? "
+                f"WHERE assigned_node_id = ? AND status = 'running' AND task_id IN ({placeholders})",
+                (self._now_ms(), node_id, *ids),
+            )
+        if cursor.rowcount:
+            self._wake_one(node_id)
+        return cursor.rowcount
+
+    def cancel_task(self, task_id: str, *, reason: str = "cancelled") -> dict[str, Any] | None:
+        """Fail a queued or running task; returns None if it already finished.
+
+        The worker running it learns about the cancellation from its next
+        heartbeat and stops the task.
+        """
+        now_ms = self._now_ms()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "UPDATE tasks SET status = 'error', error = ?, completed_at_ms = ?, updated_at_ms = ?, "
+                "lease_expires_at_ms = NULL WHERE task_id = ? AND status IN (?, ?) RETURNING *",
+                (str(reason or "cancelled"), now_ms, now_ms, str(task_id), *_ACTIVE_STATUSES),
+            ).fetchone()
+        if row is None:
+            return None
+        self._resolve_completion(str(task_id))
+        return self._task_dict(row)
+
+    def _resolve_completion(self, task_id: str) -> None:
+        for waiter in self._completion_waiters.pop(task_id, []):
+            waiter.get_loop().call_soon_threadsafe(_resolve_waiter, waiter)
+
+    async def wait_for_completion(
+        self,
+        task_id: str,
+        *,
+        timeout_s: float | None = None,
+        recheck_s: float = 1.0,
+    ) -> dict[str, Any]:
+        """Wait until the task is completed or failed and return its row.
+
+        Raises ``asyncio.TimeoutError`` after `timeout_s` and KeyError if the
+        task disappears.
+        """
+        task_id = str(task_id)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout_s is None else loop.time() + max(0.0, float(timeout_s))
+        while True:
+            task = self.get_task(task_id)
+            if task is None:
                 raise KeyError("Task not found.")
-            if str(row.get("assigned_node_id") or "") != str(node_id):
-                raise ValueError("Task is assigned to a different node.")
-            now_ms = self._now_ms()
-            row["status"] = "error" if error else "completed"
-            row["error"] = str(error) if error else None
-            row["result"] = dict(result or {}) if result is not None else None
-            row["completed_at_ms"] = now_ms
-            row["updated_at_ms"] = now_ms
-            return dict(row)
+            if task["status"] in _TERMINAL_STATUSES:
+                return task
+            wait_s = max(0.01, float(recheck_s))
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Task {task_id} did not finish in time")
+                wait_s = min(wait_s, remaining)
+            waiter: asyncio.Future[None] = loop.create_future()
+            waiters = self._completion_waiters.setdefault(task_id, [])
+            waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=wait_s)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    self._completion_waiters.pop(task_id, None)
+
+    def set_task_listener(
+        self,
+        task_id: str,
+        listener: Callable[[list[dict[str, Any]]], Awaitable[None]] | None,
+    ) -> None:
+        """Receive events a worker streams for `task_id` (None removes the listener)."""
+        if listener is None:
+            self._task_listeners.pop(str(task_id), None)
+        else:
+            self._task_listeners[str(task_id)] = listener
+
+    async def publish_task_events(self, *, task_id: str, node_id: str, events: list[dict[str, Any]]) -> int:
+        """Forward worker events to the task's listener; returns how many were delivered."""
+        task = self.get_task(task_id)
+        if task is None:
+            raise KeyError("Task not found.")
+        if task["assigned_node_id"] != str(node_id):
+            raise ValueError("Task is assigned to a different node.")
+        listener = self._task_listeners.get(str(task_id))
+        rows = [event for event in events if isinstance(event, dict)]
+        if listener is None or not rows:
+            return 0
+        await listener(rows)
+        return len(rows)
 
     def get_task(self, task_id: str) -> dict[str, Any] | None:
-        with self._state_guard(write=False) as state:
-            row = state["tasks"].get(str(task_id))
-            if not isinstance(row, dict):
-                return None
-            return dict(row)
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM tasks WHERE task_id = ?", (str(task_id),)).fetchone()
+        return self._task_dict(row) if row is not None else None
 
     def list_tasks(
         self,
@@ -330,39 +789,40 @@ class DistributedNodeManager:
         node_id: str | None = None,
         limit: int = 200,
     ) -> list[dict[str, Any]]:
-        with self._state_guard(write=False) as state:
-            rows = []
-            for row in state["tasks"].values():
-                if not isinstance(row, dict):
-                    continue
-                if status and str(row.get("status") or "") != str(status):
-                    continue
-                if node_id and str(row.get("assigned_node_id") or "") != str(node_id):
-                    continue
-                rows.append(dict(row))
-            rows.sort(key=lambda r: int(r.get("created_at_ms") or 0), reverse=True)
-            return rows[: max(1, int(limit))]
-
-    def _prune_tasks(self, tasks: dict[str, Any]) -> None:
-        if len(tasks) <= self.max_tasks:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if status:
+            clauses.append("status = ?")
+            params.append(str(status))
+        if node_id:
+            clauses.append("assigned_node_id = ?")
+            params.append(str(node_id))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, int(limit)))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM tasks {where} ORDER BY created_at_ms DESC, task_id DESC LIMIT ?",
+                params,
+            ).fetchall()
+        return [self._task_dict(row) for row in rows]
+
+    def _prune_tasks(self, conn: sqlite3.Connection) -> None:
+        """Keep at most `max_tasks` rows, dropping the oldest finished tasks; active tasks are never dropped.
+
+        The row count is kept in `task_count` by triggers, and the delete walks
+        at most `excess` entries per terminal status on `idx_tasks_status_updated`.
+        """
+        total = conn.execute("SELECT total FROM task_count WHERE id = 0").fetchone()[0]
+        excess = total - self.max_tasks
+        if excess <= 0:
             return
-        rows = [(task_id, row) for task_id, row in tasks.items() if isinstance(row, dict)]
-        terminal_statuses = {"completed", "error"}
-        active_ids = {
-            task_id
-            for task_id, row in rows
-            if str(row.get("status") or "").strip().lower() not in terminal_statuses
-        }
-        terminal_rows = [
-            (task_id, row)
-            for task_id, row in rows
-            if str(row.get("status") or "").strip().lower() in terminal_statuses
-        ]
-        terminal_rows.sort(key=lambda item: int(item[1].get("updated_at_ms") or 0), reverse=True)
-
-        terminal_budget = max(0, self.max_tasks - len(active_ids))
-        keep = set(active_ids)
-        keep.update(task_id for task_id, _ in terminal_rows[:terminal_budget])
-        drop = [task_id for task_id in list(tasks.keys()) if task_id not in keep]
-        for task_id in drop:
-            tasks.pop(task_id, None)
+        oldest = " UNION ALL ".join(
+            "SELECT * FROM (SELECT task_id, updated_at_ms FROM tasks WHERE status = ? "
+            "ORDER BY updated_at_ms LIMIT ?)"
+            for _ in _TERMINAL_STATUSES
+        )
+        params = [value for status in _TERMINAL_STATUSES for value in (status, excess)]
+        conn.execute(
+            f"DELETE FROM tasks WHERE task_id IN (SELECT task_id FROM ({oldest}) ORDER BY updated_at_ms LIMIT ?)",
+            (*params, excess),
+        )
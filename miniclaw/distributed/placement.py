@@ -0,0 +1,105 @@
+"""Placement strategies for distributed task dispatch.
+
+A strategy picks one node out of the online nodes that have the required
+capabilities. Nodes describe themselves through heartbeat metadata:
+
+- ``capacity``: number of tasks the node runs concurrently (default 1).
+- ``load``: optional utilisation in [0, 1] (e.g. CPU), used as a tie-breaker.
+
+`outstanding` counts the queued and running tasks already assigned to each
+node by this store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from typing import Any, Callable
+
+Candidate = dict[str, Any]
+Strategy = Callable[[list[Candidate], dict[str, int], str], str]
+
+STRATEGIES = ("first", "least_outstanding", "weighted", "power_of_two", "affinity")
+
+
+def node_capacity(node: Candidate) -> float:
+    metadata = node.get("metadata") or {}
+    try:
+        return max(1.0, float(metadata.get("capacity") or 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def node_load(node: Candidate) -> float:
+    metadata = node.get("metadata") or {}
+    try:
+        return min(1.0, max(0.0, float(metadata.get("load") or 0.0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _node_id(node: Candidate) -> str:
+    return str(node.get("node_id") or "")
+
+
+def _weighted_score(node: Candidate, outstanding: dict[str, int]) -> tuple[float, float, str]:
+    return (outstanding.get(_node_id(node), 0) / node_capacity(node), node_load(node), _node_id(node))
+
+
+def _first(candidates: list[Candidate], outstanding: dict[str, int], affinity_key: str) -> str:
+    return _node_id(candidates[0])
+
+
+def _least_outstanding(candidates: list[Candidate], outstanding: dict[str, int], affinity_key: str) -> str:
+    return _node_id(min(candidates, key=lambda n: (outstanding.get(_node_id(n), 0), node_load(n), _node_id(n))))
+
+
+def _weighted(candidates: list[Candidate], outstanding: dict[str, int], affinity_key: str) -> str:
+    return _node_id(min(candidates, key=lambda n: _weighted_score(n, outstanding)))
+
+
+def _power_of_two(candidates: list[Candidate], outstanding: dict[str, int], affinity_key: str) -> str:
+    if len(candidates) <= 2:
+        return _weighted(candidates, outstanding, affinity_key)
+    return _weighted(random.sample(candidates, 2), outstanding, affinity_key)
+
+
+def _affinity(candidates: list[Candidate], outstanding: dict[str, int], affinity_key: str) -> str:
+    """Rendezvous hashing on the affinity key: a session keeps its node while it stays eligible."""
+    if not affinity_key:
+        return _weighted(candidates, outstanding, affinity_key)
+
+    def weight(node: Candidate) -> int:
+        digest = hashlib.blake2b(f"{affinity_key}\0{_node_id(node)}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    return _node_id(max(candidates, key=weight))
+
+
+_REGISTRY: dict[str, Strategy] = {
+    "first": _first,
+    "least_outstanding": _least_outstanding,
+    "weighted": _weighted,
+    "power_of_two": _power_of_two,
+    "affinity": _affinity,
+}
+
+
+def get_strategy(name: str) -> Strategy:
+    try:
+        return _REGISTRY[str(name or "least_outstanding")]
+    except KeyError:
+        raise ValueError(f"Unknown placement strategy: {name}") from None
+
+
+def place(
+    strategy: str,
+    candidates: list[Candidate],
+    *,
+    outstanding: dict[str, int] | None = None,
+    affinity_key: str = "",
+) -> str | None:
+    """Pick a node id from `candidates` (already filtered by capability), or None."""
+    if not candidates:
+        return None
+    return get_strategy(strategy)(candidates, dict(outstanding or {}), str(affinity_key or ""))
@@ -0,0 +1,102 @@
+"""Run agent dialogs and subagent tasks on remote worker nodes.
+
+The gateway dispatches a task of kind ``agent_run`` or ``subagent`` to a node
+that advertises the ``worker`` capability (see ``miniclaw worker``). While
+the task runs, the worker posts its run events back; they are republished
+on the gateway bus under the gateway's run id so dashboards and channels
+see one continuous run. The task result carries the final reply and usage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from loguru import logger
+
+from miniclaw.bus.queue import MessageBus
+from miniclaw.distributed.manager import DistributedNodeManager
+
+WORKER_CAPABILITY = "worker"
+REMOTE_MODES = ("off", "runs", "subagents", "all")
+
+
+class RemoteRunner:
+    """Dispatch work to ``worker`` nodes and wait for the result."""
+
+    def __init__(
+        self,
+        manager: DistributedNodeManager,
+        bus: MessageBus | None = None,
+        *,
+        mode: str = "all",
+        timeout_s: float = 900.0,
+    ):
+        self.manager = manager
+        self.bus = bus
+        self.mode = mode if mode in REMOTE_MODES else "off"
+        self.timeout_s = max(1.0, float(timeout_s))
+
+    def handles(self, kind: str) -> bool:
+        """Whether `kind` (``runs`` or ``subagents``) is sent to workers."""
+        return self.mode == "all" or self.mode == kind
+
+    async def run(
+        self,
+        *,
+        kind: str,
+        payload: dict[str, Any],
+        run_id: str = "",
+        affinity_key: str | None = None,
+        timeout_s: float | None = None,
+    ) -> dict[str, Any] | None:
+        """Run a task remotely and return its result.
+
+        Returns None when no worker node is online so the caller can fall
+        back to running locally. Raises RuntimeError when the worker reports
+        an error and ``asyncio.TimeoutError`` when it does not finish in time.
+        On timeout or cancellation the task is failed so the worker stops it.
+        """
+        try:
+            task = self.manager.dispatch_task(
+                payload=payload,
+                required_capabilities=[WORKER_CAPABILITY],
+                kind=kind,
+                affinity_key=affinity_key,
+            )
+        except ValueError:
+            logger.debug(f"No worker node online for remote {kind}; running locally")
+            return None
+
+        task_id = task["task_id"]
+
+        async def forward(events: list[dict[str, Any]]) -> None:
+            if self.bus is None:
+                return
+            for event in events:
+                out = dict(event)
+                if run_id:
+                    out["run_id"] = run_id
+                out["remote_task_id"] = task_id
+                out["remote_node_id"] = task["assigned_node_id"]
+                out.setdefault("ts", time.time())
+                await self.bus.publish_run_event(out)
+
+        self.manager.set_task_listener(task_id, forward)
+        try:
+            done = await self.manager.wait_for_completion(
+                task_id,
+                timeout_s=self.timeout_s if timeout_s is None else timeout_s,
+            )
+        except asyncio.TimeoutError:
+            self.manager.cancel_task(task_id, reason="timed out waiting for the worker")
+            raise
+        except asyncio.CancelledError:
+            self.manager.cancel_task(task_id, reason="cancelled by the gateway")
+            raise
+        finally:
+            self.manager.set_task_listener(task_id, None)
+        if done["status"] == "error":
+            raise RuntimeError(f"Remote {kind} failed on {done['assigned_node_id']}: {done['error']}")
+        return dict(done.get("result") or {})
@@ -0,0 +1,454 @@
+"""Headless worker that executes distributed tasks (``miniclaw worker``).
+
+A worker registers with the gateway under the ``worker`` capability,
+long-polls for tasks when it has free slots and runs up to `slots` of them
+concurrently. Supported task kinds:
+
+- ``agent_run``: one agent turn. The payload carries the gateway session
+  history, so the run is stateless on the worker; run events stream back
+  to the gateway while the turn executes.
+- ``subagent``: a background subagent task (``SubagentManager.run_task``).
+- ``tool``: a single tool call (``exec``, ``read_file``, ...) with no LLM.
+
+Two transports are provided: HTTP against the gateway dashboard API, and
+an in-process one over a `DistributedNodeManager` for embedding and tests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Protocol
+
+import httpx
+from loguru import logger
+
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import ToolApprovalConfig
+from miniclaw.distributed.manager import DistributedNodeManager
+from miniclaw.distributed.remote import WORKER_CAPABILITY
+from miniclaw.providers.base import LLMProvider
+
+EmitEvents = Callable[[list[dict[str, Any]]], Awaitable[None]]
+ProviderFactory = Callable[[str | None], LLMProvider]
+
+_END = object()
+
+
+def default_node_id() -> str:
+    return f"worker-{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkerTransport(Protocol):
+    async def register(self, node_id: str, capabilities: list[str], metadata: dict[str, Any]) -> None: ...
+
+    async def heartbeat(self, node_id: str, metadata: dict[str, Any], running: list[str]) -> list[str]:
+        """Renew leases; returns the ids in `running` the node should stop."""
+        ...
+
+    async def claim(self, node_id: str, *, limit: int, wait_s: float) -> list[dict[str, Any]]: ...
+
+    async def complete(
+        self,
+        node_id: str,
+        task_id: str,
+        *,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None: ...
+
+    async def publish_events(self, node_id: str, task_id: str, events: list[dict[str, Any]]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class LocalWorkerTransport:
+    """Talk to a `DistributedNodeManager` in the same process."""
+
+    def __init__(self, manager: DistributedNodeManager):
+        self.manager = manager
+
+    async def register(self, node_id: str, capabilities: list[str], metadata: dict[str, Any]) -> None:
+        self.manager.register_node(node_id=node_id, capabilities=capabilities, metadata=metadata, address="local")
+
+    async def heartbeat(self, node_id: str, metadata: dict[str, Any], running: list[str]) -> list[str]:
+        node = self.manager.heartbeat(node_id=node_id, metadata=metadata, running_task_ids=running)
+        return list(node.get("cancelled_task_ids") or [])
+
+    async def claim(self, node_id: str, *, limit: int, wait_s: float) -> list[dict[str, Any]]:
+        return await self.manager.wait_for_tasks(node_id=node_id, limit=limit, timeout_s=wait_s)
+
+    async def complete(
+        self,
+        node_id: str,
+        task_id: str,
+        *,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        self.manager.complete_task(task_id=task_id, node_id=node_id, result=result, error=error)
+
+    async def publish_events(self, node_id: str, task_id: str, events: list[dict[str, Any]]) -> None:
+        await self.manager.publish_task_events(task_id=task_id, node_id=node_id, events=events)
+
+    async def close(self) -> None:
+        return None
+
+
+class HttpWorkerTransport:
+    """Talk to a gateway over its dashboard API (bearer token auth)."""
+
+    def __init__(self, base_url: str, token: str, *, timeout_s: float = 30.0):
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=timeout_s,
+        )
+
+    async def _post(
+        self,
+        path: str,
+        body: dict[str, Any] | None = None,
+        *,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> dict[str, Any]:
+        response = await self._client.post(
+            path,
+            json=body or {},
+            params=params,
+            timeout=timeout_s if timeout_s is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if response.status_code >= 400 or not data.get("ok", False):
+            raise RuntimeError(f"{path}: {data.get('error') or response.status_code}")
+        return data
+
+    async def register(self, node_id: str, capabilities: list[str], metadata: dict[str, Any]) -> None:
+        await self._post(
+            "/api/distributed/nodes/register",
+            {"node_id": node_id, "capabilities": capabilities, "metadata": metadata, "address": socket.gethostname()},
+        )
+
+    async def heartbeat(self, node_id: str, metadata: dict[str, Any], running: list[str]) -> list[str]:
+        data = await self._post(
+            f"/api/distributed/nodes/{node_id}/heartbeat",
+            {"metadata": metadata, "running_task_ids": running},
+        )
+        return list((data.get("node") or {}).get("cancelled_task_ids") or [])
+
+    async def claim(self, node_id: str, *, limit: int, wait_s: float) -> list[dict[str, Any]]:
+        data = await self._post(
+            f"/api/distributed/nodes/{node_id}/tasks/claim",
+            params={"limit": limit, "wait_s": wait_s},
+            timeout_s=wait_s + 15.0,
+        )
+        return list(data.get("tasks") or [])
+
+    async def complete(
+        self,
+        node_id: str,
+        task_id: str,
+        *,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        await self._post(
+            f"/api/distributed/tasks/{task_id}/complete",
+            {"node_id": node_id, "result": result, "error": error},
+        )
+
+    async def publish_events(self, node_id: str, task_id: str, events: list[dict[str, Any]]) -> None:
+        await self._post(f"/api/distributed/tasks/{task_id}/events", {"node_id": node_id, "events": events})
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+_SANDBOX_OPTIONS = (
+    "sandbox_mode",
+    "sandbox_scope",
+    "sandbox_workspace_access",
+    "sandbox_image",
+    "sandbox_prune_idle_seconds",
+    "sandbox_prune_max_age_seconds",
+)
+
+
+def _refuse_approvals(config: ToolApprovalConfig | None) -> ToolApprovalConfig | None:
+    """Turn ``always_ask`` into ``always_deny``: a worker has nobody to ask."""
+    if config is None:
+        return None
+    return config.model_copy(
+        update={name: "always_deny" for name, mode in config.model_dump().items() if mode == "always_ask"}
+    )
+
+
+class TaskExecutor:
+    """Run one task of a supported kind and return its result dict.
+
+    `agent_options` are the `AgentLoop` keyword arguments of the gateway
+    (sandbox settings included). Tools that need interactive approval are
+    refused outright, since no user is attached to the worker's bus.
+    """
+
+    def __init__(
+        self,
+        *,
+        workspace: Path,
+        provider_factory: ProviderFactory | None = None,
+        agent_options: dict[str, Any] | None = None,
+        exec_timeout: int = 60,
+        restrict_to_workspace: bool = False,
+    ):
+        self.workspace = workspace
+        self.provider_factory = provider_factory
+        self.agent_options = dict(agent_options or {})
+        if "approval_config" in self.agent_options:
+            self.agent_options["approval_config"] = _refuse_approvals(self.agent_options["approval_config"])
+        self.sandbox_options = {k: self.agent_options[k] for k in _SANDBOX_OPTIONS if k in self.agent_options}
+        self.exec_timeout = exec_timeout
+        self.restrict_to_workspace = restrict_to_workspace
+        self._providers: dict[str, LLMProvider] = {}
+
+    def _provider(self, model: str | None) -> LLMProvider:
+        if self.provider_factory is None:
+            raise RuntimeError("This worker has no LLM provider configured.")
+        key = model or ""
+        if key not in self._providers:
+            self._providers[key] = self.provider_factory(model)
+        return self._providers[key]
+
+    async def execute(self, task: dict[str, Any], emit: EmitEvents) -> dict[str, Any]:
+        kind = task.get("kind")
+        payload = dict(task.get("payload") or {})
+        if kind == "agent_run":
+            return await self._agent_run(task["task_id"], payload, emit)
+        if kind == "subagent":
+            return await self._subagent(payload)
+        if kind == "tool":
+            return await self._tool(payload)
+        raise ValueError(f"Unsupported task kind: {kind}")
+
+    async def _agent_run(self, task_id: str, payload: dict[str, Any], emit: EmitEvents) -> dict[str, Any]:
+        from miniclaw.agent.loop import AgentLoop
+
+        model = str(payload.get("model") or "") or None
+        loop = AgentLoop(
+            bus=MessageBus(),
+            provider=self._provider(model),
+            workspace=self.workspace,
+            model=model,
+            agent_id=str(payload.get("agent_id") or "default"),
+            **self.agent_options,
+        )
+        session_key = f"remote:{task_id}"
+        session = loop.sessions.get_or_create(session_key)
+        session.messages = [dict(m) for m in payload.get("history") or [] if isinstance(m, dict)]
+
+        origin = {
+            "session_key": str(payload.get("session_key") or ""),
+            "channel": str(payload.get("channel") or "cli"),
+            "chat_id": str(payload.get("chat_id") or "direct"),
+        }
+        queue = loop.bus.register_run_listener()
+
+        async def pump() -> None:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                done = any(event is _END for event in batch)
+                # The gateway emits its own lifecycle events for the run.
+                rows = [
+                    {**event, **origin}
+                    for event in batch
+                    if event is not _END and event.get("kind") != "lifecycle"
+                ]
+                if rows:
+                    try:
+                        await emit(rows)
+                    except Exception as exc:
+                        logger.debug(f"Dropping {len(rows)} run events for {task_id}: {exc}")
+                if done:
+                    return
+
+        pumper = asyncio.create_task(pump())
+        try:
+            content = await loop.process_direct(
+                str(payload.get("content") or ""),
+                session_key=session_key,
+                channel=origin["channel"],
+                chat_id=origin["chat_id"],
+                model_override=model,
+            )
+        finally:
+            await queue.put(_END)  # type: ignore[arg-type]
+            await pumper
+            loop.bus.unregister_run_listener(queue)
+            loop.stop()
+            loop.sessions.delete(session_key)
+
+        runs = loop.list_runs(limit=1)
+        run = runs[0] if runs else {}
+        if run.get("status") == "error":
+            raise RuntimeError(str(run.get("error") or "remote run failed"))
+        return {
+            "content": content,
+            "usage": {
+                "prompt_tokens": int(run.get("usage_prompt_tokens") or 0),
+                "completion_tokens": int(run.get("usage_completion_tokens") or 0),
+                "total_tokens": int(run.get("usage_total_tokens") or 0),
+            },
+        }
+
+    async def _subagent(self, payload: dict[str, Any]) -> dict[str, Any]:
+        from miniclaw.agent.subagent import SubagentManager
+
+        model = str(payload.get("model") or "") or None
+        manager = SubagentManager(
+            provider=self._provider(model),
+            workspace=self.workspace,
+            bus=MessageBus(),
+            model=model,
+            brave_api_key=self.agent_options.get("brave_api_key"),
+            exec_config=self.agent_options.get("exec_config"),
+            restrict_to_workspace=self.restrict_to_workspace,
+            **self.sandbox_options,
+        )
+        content, usage = await manager.run_task(str(payload.get("task_id") or "remote"), str(payload.get("task") or ""))
+        return {"content": content, "usage": usage}
+
+    async def _tool(self, payload: dict[str, Any]) -> dict[str, Any]:
+        from miniclaw.agent.tools.filesystem import ListDirTool, ReadFileTool, WriteFileTool
+        from miniclaw.agent.tools.registry import ToolRegistry
+        from miniclaw.agent.tools.shell import ExecTool
+
+        allowed_dir = self.workspace if self.restrict_to_workspace else None
+        tools = ToolRegistry()
+        tools.register(ReadFileTool(allowed_dir=allowed_dir))
+        tools.register(WriteFileTool(allowed_dir=allowed_dir))
+        tools.register(ListDirTool(allowed_dir=allowed_dir))
+        tools.register(
+            ExecTool(
+                working_dir=str(self.workspace),
+                timeout=self.exec_timeout,
+                restrict_to_workspace=self.restrict_to_workspace,
+                **self.sandbox_options,
+            )
+        )
+        name = str(payload.get("tool") or "")
+        if not tools.has(name):
+            raise ValueError(f"Unknown tool: {name}")
+        arguments = payload.get("arguments") if isinstance(payload.get("arguments"), dict) else {}
+        return {"content": await tools.execute(name, arguments)}
+
+
+class Worker:
+    """Claim tasks for one node and run them with bounded concurrency."""
+
+    def __init__(
+        self,
+        transport: WorkerTransport,
+        executor: TaskExecutor,
+        *,
+        node_id: str | None = None,
+        capabilities: list[str] | None = None,
+        slots: int = 2,
+        heartbeat_s: float = 15.0,
+        claim_wait_s: float = 25.0,
+    ):
+        self.transport = transport
+        self.executor = executor
+        self.node_id = node_id or default_node_id()
+        self.capabilities = sorted({WORKER_CAPABILITY, *(capabilities or [])})
+        self.slots = max(1, int(slots))
+        self.heartbeat_s = max(0.5, float(heartbeat_s))
+        self.claim_wait_s = max(0.1, float(claim_wait_s))
+        self.completed = 0
+        self.cancelled = 0
+        self._active: set[asyncio.Task[None]] = set()
+        self._running: dict[str, asyncio.Task[None]] = {}
+        self._stop = asyncio.Event()
+
+    def _metadata(self) -> dict[str, Any]:
+        return {"capacity": self.slots, "load": round(len(self._active) / self.slots, 3), "worker": True}
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self) -> None:
+        await self.transport.register(self.node_id, self.capabilities, self._metadata())
+        logger.info(f"Worker {self.node_id} registered ({self.slots} slots, capabilities={self.capabilities})")
+        beat = asyncio.create_task(self._heartbeat_loop())
+        slot_freed = asyncio.Event()
+        try:
+            while not self._stop.is_set():
+                free = self.slots - len(self._active)
+                if free <= 0:
+                    slot_freed.clear()
+                    await slot_freed.wait()
+                    continue
+                try:
+                    tasks = await self.transport.claim(self.node_id, limit=free, wait_s=self.claim_wait_s)
+                except Exception as exc:
+                    logger.warning(f"Worker {self.node_id} claim failed: {exc}")
+                    await asyncio.sleep(1.0)
+                    continue
+                for task in tasks:
+                    task_id = task["task_id"]
+                    runner = asyncio.create_task(self._execute(task))
+                    self._active.add(runner)
+                    self._running[task_id] = runner
+                    runner.add_done_callback(self._active.discard)
+                    runner.add_done_callback(lambda _, task_id=task_id: self._running.pop(task_id, None))
+                    runner.add_done_callback(lambda _: slot_freed.set())
+        finally:
+            beat.cancel()
+            if self._active:
+                await asyncio.gather(*self._active, return_exceptions=True)
+            await asyncio.gather(beat, return_exceptions=True)
+            await self.transport.close()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            try:
+                cancelled = await self.transport.heartbeat(self.node_id, self._metadata(), list(self._running))
+            except Exception as exc:
+                logger.warning(f"Worker {self.node_id} heartbeat failed: {exc}")
+                continue
+            for task_id in cancelled:
+                runner = self._running.get(task_id)
+                if runner is not None and not runner.done():
+                    logger.info(f"Worker {self.node_id} stopping task {task_id}: cancelled by the gateway")
+                    runner.cancel()
+
+    async def _execute(self, task: dict[str, Any]) -> None:
+        task_id = task["task_id"]
+
+        async def emit(events: list[dict[str, Any]]) -> None:
+            await self.transport.publish_events(self.node_id, task_id, events)
+
+        result: dict[str, Any] | None = None
+        error: str | None = None
+        try:
+            result = await self.executor.execute(task, emit)
+            result["node_id"] = self.node_id
+        except asyncio.CancelledError:
+            # The gateway already failed the task; there is nothing to report.
+            self.cancelled += 1
+            raise
+        except Exception as exc:
+            logger.warning(f"Worker {self.node_id} task {task_id} ({task.get('kind')}) failed: {exc}")
+            error = str(exc) or type(exc).__name__
+        try:
+            await self.transport.complete(self.node_id, task_id, result=result, error=error)
+            self.completed += 1
+        except Exception as exc:
+            logger.warning(f"Worker {self.node_id} could not report task {task_id}: {exc}")
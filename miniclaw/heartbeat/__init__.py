@@ -1,5 +1,5 @@
 """Heartbeat service for miniclaw."""
 
-from miniclaw.heartbeat.service import HeartbeatService
+from miniclaw.heartbeat.service import HeartbeatService, HeartbeatTask, parse_heartbeat_tasks
 
-__all__ = ["HeartbeatService"]
+__all__ = ["HeartbeatService", "HeartbeatTask", "parse_heartbeat_tasks"]
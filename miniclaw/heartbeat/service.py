@@ -1,7 +1,12 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
 import asyncio
+import hashlib
+import json
+import re
 import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
@@ -18,6 +23,17 @@ If nothing needs attention, reply with just: HEARTBEAT_OK"""
 # Token that indicates "nothing to do"
 HEARTBEAT_OK_TOKEN = "HEARTBEAT_OK"
 
+# Re-ask the agent at least this often even if nothing we can see changed
+DEFAULT_MAX_SKIP_S = 60 * 60
+
+# Trailing due-time annotation on a task line, e.g. "- [ ] Check inbox @every 2h"
+_DUE_RE = re.compile(r"\s@(every|daily|at|cron)\s+(.+?)\s*$", re.IGNORECASE)
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(s|m|h|d|w)$", re.IGNORECASE)
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+# Workspace files a heartbeat refers to: markdown links and `code` spans
+_REF_RE = re.compile(r"\]\(([^)\s]+)\)|`([^`\s]+)`")
+_SKIP_LINES = {"- [ ]", "* [ ]", "- [x]", "* [x]"}
+
 
 def _is_heartbeat_empty(content: str | None) -> bool:
     """Check if HEARTBEAT.md has no actionable content."""
@@ -36,12 +52,105 @@ def _is_heartbeat_empty(content: str | None) -> bool:
     return True
 
 
+@dataclass
+class HeartbeatTask:
+    """One actionable line of HEARTBEAT.md, optionally with a due-time annotation.
+
+    Supported annotations (at the end of the line)::
+
+        @every 30m | 2h | 1d      interval since the task last ran
+        @daily 09:30              once a day at a local time
+        @at 2026-11-01 10:00      once, at a local date and time
+        @cron 0 9 * * 1           cron expression (local time)
+
+    Lines without an annotation are standing instructions.
+    """
+
+    key: str
+    text: str
+    kind: str | None = None
+    spec: str = ""
+
+    def last_slot(self, now: float) -> float | None:
+        """Latest scheduled time at or before `now` for @daily/@at/@cron tasks."""
+        try:
+            if self.kind == "daily":
+                hour, minute = (int(part) for part in self.spec.split(":", 1))
+                today = datetime.fromtimestamp(now).replace(hour=hour, minute=minute, second=0, microsecond=0)
+                slot = today if today.timestamp() <= now else today - timedelta(days=1)
+                return slot.timestamp()
+            if self.kind == "at":
+                at = datetime.fromisoformat(self.spec).timestamp()
+                return at if at <= now else None
+            if self.kind == "cron":
+                from croniter import croniter
+
+                return float(croniter(self.spec, datetime.fromtimestamp(now)).get_prev(float))
+        except (ValueError, KeyError, ImportError):
+            logger.warning(f"Heartbeat: cannot parse due time '@{self.kind} {self.spec}'")
+        return None
+
+    def is_due(self, now: float, last_done: float | None, first_seen: float) -> bool:
+        if self.kind == "every":
+            interval = parse_duration(self.spec)
+            return interval is not None and (last_done is None or now - last_done >= interval)
+        if self.kind == "at":
+            return last_done is None and self.last_slot(now) is not None
+        slot = self.last_slot(now)
+        # Recurring slots only count once the task was known, so a new
+        # "@daily 09:00" task added at noon waits for tomorrow.
+        return slot is not None and slot > (last_done if last_done is not None else first_seen)
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse "90s", "30m", "2h", "1d" or "1w" into seconds."""
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        return None
+    seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+    return seconds if seconds > 0 else None
+
+
+def parse_heartbeat_tasks(content: str | None) -> list[HeartbeatTask]:
+    """Split HEARTBEAT.md into actionable lines, skipping completed checkboxes."""
+    tasks: list[HeartbeatTask] = []
+    in_comment = False
+    for raw in (content or "").split("\n"):
+        line = raw.strip()
+        if in_comment:
+            in_comment = "-->" not in line
+            continue
+        if line.startswith("<!--"):
+            in_comment = "-->" not in line
+            continue
+        if not line or line.startswith("#") or line in _SKIP_LINES:
+            continue
+        if line[:5].lower() in {"- [x]", "* [x]"}:
+            continue
+        kind, spec = None, ""
+        match = _DUE_RE.search(line)
+        if match:
+            kind, spec = match.group(1).lower(), match.group(2)
+            line = line[: match.start()].rstrip()
+        key = hashlib.sha1(f"{kind or ''}\0{spec}\0{line}".encode("utf-8")).hexdigest()[:12]
+        tasks.append(HeartbeatTask(key=key, text=line, kind=kind, spec=spec))
+    return tasks
+
+
 class HeartbeatService:
     """
     Periodic heartbeat service that wakes the agent to check for tasks.
     
     The agent reads HEARTBEAT.md from the workspace and executes any
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
+
+    Ticks avoid LLM calls that cannot change the answer: tasks with a due
+    time (see `HeartbeatTask`) only wake the agent when due, and standing
+    instructions that reference workspace files are skipped while
+    HEARTBEAT.md and those files hash the same as at the last HEARTBEAT_OK
+    (re-checked at least every `max_skip_s`). Instructions that reference no
+    files depend on the outside world and are asked every tick. Task run times and that memo persist in
+    `state_path` when given.
     """
     
     def __init__(
@@ -50,16 +159,25 @@ class HeartbeatService:
         on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
+        state_path: Path | None = None,
+        max_skip_s: float = DEFAULT_MAX_SKIP_S,
     ):
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
         self.interval_s = interval_s
         self.enabled = enabled
+        self.state_path = Path(state_path) if state_path else None
+        self.max_skip_s = max_skip_s
         self._running = False
         self._task: asyncio.Task | None = None
         self._started_at: float | None = None
         self._last_run_at: float | None = None
         self._next_run_at: float | None = None
+        self._memo: dict[str, Any] = {}
+        self._tasks: dict[str, dict[str, float | None]] = {}
+        self._counters = {"llm_calls": 0, "skipped_unchanged": 0, "skipped_not_due": 0}
+        self._last_outcome: str | None = None
+        self._load_state()
     
     @property
     def heartbeat_file(self) -> Path:
@@ -73,6 +191,77 @@ class HeartbeatService:
             except Exception:
                 return None
         return None
+
+    def _load_state(self) -> None:
+        if not self.state_path or not self.state_path.exists():
+            return
+        try:
+            data = json.loads(self.state_path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load heartbeat state: {e}")
+            return
+        self._memo = dict(data.get("memo") or {})
+        self._tasks = dict(data.get("tasks") or {})
+        for name in self._counters:
+            self._counters[name] = int((data.get("counters") or {}).get(name) or 0)
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        data = {"memo": self._memo, "tasks": self._tasks, "counters": self._counters}
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_name(f"{self.state_path.name}.tmp")
+            tmp_path.write_text(json.dumps(data))
+            tmp_path.replace(self.state_path)
+        except OSError as e:
+            logger.warning(f"Failed to save heartbeat state: {e}")
+
+    def _fingerprint(self, content: str) -> str | None:
+        """Hash HEARTBEAT.md plus size and mtime of the workspace files it references.
+
+        Returns None when no referenced file exists: nothing we can watch
+        tells us whether the answer changed.
+        """
+        digest = hashlib.sha256(content.encode("utf-8"))
+        root = self.workspace.resolve()
+        refs = sorted({link or code for link, code in _REF_RE.findall(content)})
+        watched = 0
+        for ref in refs:
+            try:
+                path = (root / ref).resolve()
+                if not path.is_relative_to(root) or not path.is_file():
+                    continue
+                stat = path.stat()
+            except (OSError, ValueError):
+                continue
+            digest.update(f"\0{ref}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+            watched += 1
+        return digest.hexdigest() if watched else None
+
+    def _due_tasks(self, tasks: list[HeartbeatTask], now: float) -> list[HeartbeatTask]:
+        known = {task.key for task in tasks if task.kind}
+        for key in list(self._tasks):
+            if key not in known:
+                del self._tasks[key]
+        due = []
+        for task in tasks:
+            if not task.kind:
+                continue
+            entry = self._tasks.setdefault(task.key, {"first_seen": now, "last_done": None})
+            if task.is_due(now, entry.get("last_done"), float(entry.get("first_seen") or now)):
+                due.append(task)
+        return due
+
+    def _build_prompt(self, tasks: list[HeartbeatTask], due: list[HeartbeatTask]) -> str:
+        if not any(task.kind for task in tasks):
+            return HEARTBEAT_PROMPT
+        listed = "\n".join(task.text for task in due) or "(none)"
+        return (
+            f"{HEARTBEAT_PROMPT}\n\n"
+            "Lines ending in @every/@daily/@at/@cron are scheduled tasks; "
+            f"only handle the ones due now:\n{listed}"
+        )
     
     async def start(self) -> None:
         """Start the heartbeat service."""
@@ -114,24 +303,53 @@ class HeartbeatService:
         content = self._read_heartbeat_file()
         
         # Skip if HEARTBEAT.md is empty or doesn't exist
-        if _is_heartbeat_empty(content):
+        tasks = parse_heartbeat_tasks(content)
+        if _is_heartbeat_empty(content) or not tasks:
             logger.debug("Heartbeat: no tasks (HEARTBEAT.md empty)")
+            self._last_outcome = "empty"
             return
         
+        due = self._due_tasks(tasks, now)
+        fingerprint = self._fingerprint(content or "")
+        if not due:
+            standing = any(not task.kind for task in tasks)
+            unchanged = (
+                fingerprint is not None
+                and self._memo.get("fingerprint") == fingerprint
+                and self._memo.get("ok")
+                and now - float(self._memo.get("at") or 0) < self.max_skip_s
+            )
+            if not standing or unchanged:
+                counter = "skipped_unchanged" if standing else "skipped_not_due"
+                self._counters[counter] += 1
+                self._last_outcome = counter
+                logger.debug(f"Heartbeat: skipped LLM call ({counter})")
+                self._save_state()
+                return
+        
         logger.info("Heartbeat: checking for tasks...")
         
         if self.on_heartbeat:
             try:
-                response = await self.on_heartbeat(HEARTBEAT_PROMPT)
+                self._counters["llm_calls"] += 1
+                response = await self.on_heartbeat(self._build_prompt(tasks, due))
                 
                 # Check if agent said "nothing to do"
-                if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
+                ok = HEARTBEAT_OK_TOKEN.replace("_", "") in (response or "").upper().replace("_", "")
+                if ok:
                     logger.info("Heartbeat: OK (no action needed)")
                 else:
                     logger.info(f"Heartbeat: completed task")
+                self._memo = {"fingerprint": fingerprint, "ok": ok, "at": now}
+                for task in due:
+                    self._tasks[task.key]["last_done"] = now
+                self._last_outcome = "ok" if ok else "action"
                     
             except Exception as e:
                 logger.error(f"Heartbeat execution failed: {e}")
+                self._memo = {}
+                self._last_outcome = "error"
+            self._save_state()
     
     async def trigger_now(self) -> str | None:
         """Manually trigger a heartbeat."""
@@ -140,6 +358,7 @@ class HeartbeatService:
         if self._running:
             self._next_run_at = now + self.interval_s
         if self.on_heartbeat:
+            self._counters["llm_calls"] += 1
             return await self.on_heartbeat(HEARTBEAT_PROMPT)
         return None
 
@@ -154,4 +373,10 @@ class HeartbeatService:
             "started_at_ms": _to_ms(self._started_at),
             "last_run_at_ms": _to_ms(self._last_run_at),
             "next_run_at_ms": _to_ms(self._next_run_at),
+            "llm_calls": self._counters["llm_calls"],
+            "avoided_calls": self._counters["skipped_unchanged"] + self._counters["skipped_not_due"],
+            "skipped_unchanged": self._counters["skipped_unchanged"],
+            "skipped_not_due": self._counters["skipped_not_due"],
+            "scheduled_tasks": len(self._tasks),
+            "last_outcome": self._last_outcome,
         }
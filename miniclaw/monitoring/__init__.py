@@ -1,5 +1,8 @@
 """Monitoring and alerting services."""
 
 from miniclaw.monitoring.alerts import AlertService
+from miniclaw.monitoring.metrics import MetricsRegistry
+from miniclaw.monitoring.startup import StartupTimeline
+from miniclaw.monitoring.tracing import Tracer
 
-__all__ = ["AlertService"]
+__all__ = ["AlertService", "MetricsRegistry", "StartupTimeline", "Tracer"]
@@ -0,0 +1,326 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Metrics are module-level singletons registered on a default registry that is
+disabled until the gateway enables it, so instrumented hot paths cost a single
+attribute check when metrics are off.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Iterable
+
+# Log-linear ("HDR-style") histogram precision: sub-buckets per power of two.
+# 16 sub-buckets bounds relative bucket error to ~3%.
+_SUB_BUCKETS = 16
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: Iterable[str]):
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_text(self, key: tuple[str, ...], extra: dict[str, str] | None = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        body = ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{self._label_text(key)} {_fmt(value)}" for key, value in sorted(self._values.items())]
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "value": value}
+            for key, value in sorted(self._values.items())
+        ]
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        if not self._registry.enabled:
+            return
+        self._values[self._key(labels)] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "zero", "count", "sum", "min", "max")
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+
+def _bucket_index(value: float) -> int:
+    # Buckets are upper-inclusive like Prometheus ``le``: bucket edges are exact
+    # binary fractions, so stepping one ulp down moves only values that sit on
+    # an edge into the bucket that edge closes.
+    value = math.nextafter(value, 0.0) or value
+    mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, mantissa in [0.5, 1)
+    sub = min(_SUB_BUCKETS - 1, int((mantissa - 0.5) * 2 * _SUB_BUCKETS))
+    return exponent * _SUB_BUCKETS + sub
+
+
+def _bucket_upper(index: int) -> float:
+    exponent, sub = divmod(index, _SUB_BUCKETS)
+    return math.ldexp(0.5 + (sub + 1) / (2 * _SUB_BUCKETS), exponent)
+
+
+def _bucket_mid(index: int) -> float:
+    exponent, sub = divmod(index, _SUB_BUCKETS)
+    return math.ldexp(0.5 + (sub + 0.5) / (2 * _SUB_BUCKETS), exponent)
+
+
+class Histogram(_Metric):
+    """Log-linear histogram with bounded relative error and O(1) observe."""
+
+    kind = "histogram"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries()
+        value = float(value)
+        if value <= 0:
+            series.zero += 1
+        else:
+            index = _bucket_index(value)
+            series.buckets[index] = series.buckets.get(index, 0) + 1
+        series.count += 1
+        series.sum += value
+        series.min = min(series.min, value)
+        series.max = max(series.max, value)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+
+    def quantile(self, q: float, **labels: Any) -> float | None:
+        series = self._series.get(self._key(labels))
+        if series is None or series.count == 0:
+            return None
+        return self._quantile(series, q)
+
+    @staticmethod
+    def _quantile(series: _HistogramSeries, q: float) -> float:
+        rank = max(1, math.ceil(min(1.0, max(0.0, q)) * series.count))
+        seen = series.zero
+        if seen >= rank:
+            return 0.0
+        for index in sorted(series.buckets):
+            seen += series.buckets[index]
+            if seen >= rank:
+                return min(series.max, max(series.min, _bucket_mid(index)))
+        return series.max
+
+    def render(self) -> list[str]:
+        lines: list[str] = []
+        for key, series in sorted(self._series.items()):
+            cumulative = series.zero
+            if series.zero:
+                lines.append(f"{self.name}_bucket{self._label_text(key, {'le': '0'})} {cumulative}")
+            for index in sorted(series.buckets):
+                cumulative += series.buckets[index]
+                le = _fmt(_bucket_upper(index))
+                lines.append(f"{self.name}_bucket{self._label_text(key, {'le': le})} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._label_text(key, {'le': '+Inf'})} {series.count}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_fmt(series.sum)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {series.count}")
+        return lines
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        for key, series in sorted(self._series.items()):
+            out.append(
+                {
+                    "labels": dict(zip(self.labelnames, key)),
+                    "count": series.count,
+                    "sum": series.sum,
+                    "min": series.min if series.count else None,
+                    "max": series.max if series.count else None,
+                    "p50": self._quantile(series, 0.5),
+                    "p95": self._quantile(series, 0.95),
+                    "p99": self._quantile(series, 0.99),
+                }
+            )
+        return out
+
+    def reset(self) -> None:
+        self._series.clear()
+
+
+class MetricsRegistry:
+    """Container for named metrics; disabled registries drop all updates."""
+
+    def __init__(self, *, enabled: bool = False):
+        self.enabled = bool(enabled)
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls: type[_Metric], name: str, help_text: str, labels: Iterable[str]) -> Any:
+        existing = self._metrics.get(name)
+        if existing is not None:
+            if type(existing) is not cls:
+                raise ValueError(f"Metric '{name}' already registered as {existing.kind}")
+            return existing
+        metric = cls(self, name, help_text, labels)
+        self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str = "", labels: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", labels: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "", labels: Iterable[str] = ()) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels)
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            body = metric.render()
+            if not body:
+                continue
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(body)
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            name: {"type": metric.kind, "series": metric.snapshot()}
+            for name, metric in sorted(self._metrics.items())
+        }
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+def record_llm_call(model: str, duration_s: float, response: Any) -> None:
+    """Record latency and token usage for one provider call."""
+    if not REGISTRY.enabled:
+        return
+    error = getattr(response, "error", None)
+    if error is not None:
+        outcome = str(getattr(error, "kind", "error"))
+    else:
+        outcome = str(getattr(response, "finish_reason", "") or "stop")
+    LLM_REQUEST_DURATION.observe(duration_s, model=model, outcome=outcome)
+    usage = getattr(response, "usage", None) or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = int(usage.get(kind, 0) or 0)
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=model, kind=kind.removesuffix("_tokens"))
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+
+def configure(*, enabled: bool) -> MetricsRegistry:
+    """Enable or disable the default registry."""
+    REGISTRY.enabled = bool(enabled)
+    return REGISTRY
+
+
+# Well-known metrics instrumented across the runtime.
+RUNS_TOTAL = REGISTRY.counter("miniclaw_runs_total", "Agent runs finished, by status.", ("agent", "status"))
+RUN_DURATION = REGISTRY.histogram(
+    "miniclaw_run_duration_seconds", "Agent run wall time.", ("agent", "status")
+)
+ACTIVE_RUNS = REGISTRY.gauge("miniclaw_active_runs", "Agent runs currently executing.", ("agent",))
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "miniclaw_llm_request_duration_seconds", "LLM provider call latency.", ("model", "outcome")
+)
+LLM_TOKENS = REGISTRY.counter("miniclaw_llm_tokens_total", "LLM tokens consumed.", ("model", "kind"))
+TOOL_DURATION = REGISTRY.histogram(
+    "miniclaw_tool_duration_seconds", "Tool execution latency.", ("tool", "ok")
+)
+BUS_MESSAGES = REGISTRY.counter("miniclaw_bus_messages_total", "Messages published on the bus.", ("direction",))
+BUS_QUEUE_DEPTH = REGISTRY.gauge("miniclaw_bus_queue_depth", "Pending messages on the bus.", ("queue",))
+SUBAGENTS_ACTIVE = REGISTRY.gauge(
+    "miniclaw_subagents", "Subagents running or waiting in the pool queue.", ("agent", "state")
+)
+SUBAGENTS_TOTAL = REGISTRY.counter("miniclaw_subagents_total", "Subagent tasks finished, by status.", ("agent", "status"))
+SUBAGENT_QUEUE_WAIT = REGISTRY.histogram(
+    "miniclaw_subagent_queue_wait_seconds", "Time subagents spent queued before starting.", ("agent",)
+)
+CHANNEL_MESSAGES = REGISTRY.counter(
+    "miniclaw_channel_messages_total", "Messages handled by chat channels.", ("channel", "direction")
+)
@@ -0,0 +1,133 @@
+"""Startup timeline for gateway boot profiling."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+
+class StartupTimeline:
+    """Record one span per subsystem init/start step during gateway boot."""
+
+    def __init__(self, *, clock: Any = time.perf_counter):
+        self._clock = clock
+        self._origin = clock()
+        self._started_at = time.time()
+        self._spans: list[dict[str, Any]] = []
+        self._ready_at_ms: float | None = None
+
+    def _elapsed_ms(self) -> float:
+        return (self._clock() - self._origin) * 1000.0
+
+    def _open(self, name: str, phase: str) -> dict[str, Any]:
+        span = {
+            "name": name,
+            "phase": phase,
+            "start_ms": round(self._elapsed_ms(), 3),
+            "duration_ms": None,
+            "status": "running",
+        }
+        self._spans.append(span)
+        return span
+
+    def _close(self, span: dict[str, Any], error: BaseException | None = None) -> None:
+        span["duration_ms"] = round(self._elapsed_ms() - span["start_ms"], 3)
+        if error is None:
+            span["status"] = "ok"
+        else:
+            span["status"] = "error"
+            span["error"] = str(error)
+
+    @contextmanager
+    def span(self, name: str, *, phase: str = "init") -> Iterator[dict[str, Any]]:
+        """Time a synchronous initialization step."""
+        record = self._open(name, phase)
+        try:
+            yield record
+        except BaseException as exc:
+            self._close(record, exc)
+            raise
+        self._close(record)
+
+    @asynccontextmanager
+    async def async_span(self, name: str, *, phase: str = "start") -> AsyncIterator[dict[str, Any]]:
+        """Time an awaited startup step."""
+        record = self._open(name, phase)
+        try:
+            yield record
+        except BaseException as exc:
+            self._close(record, exc)
+            raise
+        self._close(record)
+
+    async def start_all(self, steps: dict[str, Awaitable[Any]]) -> dict[str, Any]:
+        """Run independent `start()` coroutines concurrently, one span each.
+
+        A failing step is recorded on its span and does not cancel its siblings;
+        the first failure is re-raised once every step has settled.
+        """
+
+        async def _run(name: str, awaitable: Awaitable[Any]) -> Any:
+            async with self.async_span(name, phase="start"):
+                return await awaitable
+
+        names = list(steps)
+        results = await asyncio.gather(
+            *(_run(name, steps[name]) for name in names),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return dict(zip(names, results))
+
+    async def wait_until(
+        self,
+        name: str,
+        condition: Callable[[], bool],
+        *,
+        poll_s: float = 0.02,
+        timeout_s: float = 60.0,
+    ) -> bool:
+        """Time how long a long-running service takes to report itself up.
+
+        For services whose `start()` never returns (channels, servers) the
+        span closes once `condition()` holds. A timeout is recorded on the
+        span and returns False instead of raising.
+        """
+        try:
+            async with self.async_span(name, phase="start"):
+                deadline = time.monotonic() + timeout_s
+                while not condition():
+                    if time.monotonic() >= deadline:
+                        raise asyncio.TimeoutError(f"not up after {timeout_s:g}s")
+                    await asyncio.sleep(poll_s)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def mark_ready(self) -> None:
+        if self._ready_at_ms is None:
+            self._ready_at_ms = round(self._elapsed_ms(), 3)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready_at_ms is not None
+
+    def snapshot(self) -> dict[str, Any]:
+        spans = [dict(span) for span in self._spans]
+        slowest = sorted(
+            (span for span in spans if span["duration_ms"] is not None),
+            key=lambda span: span["duration_ms"],
+            reverse=True,
+        )
+        return {
+            "started_at": self._started_at,
+            "ready": self.ready,
+            "ready_ms": self._ready_at_ms,
+            "elapsed_ms": round(self._elapsed_ms(), 3),
+            "spans": spans,
+            "slowest": [span["name"] for span in slowest[:5]],
+        }
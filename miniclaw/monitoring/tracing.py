@@ -0,0 +1,369 @@
+"""Per-run tracing spans with JSONL and OTLP-file exporters.
+
+Spans nest through a context variable, so every await inside a run task
+attaches to the innermost open span. The default tracer is disabled until the
+gateway enables it; disabled tracers hand out a shared no-op scope.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+from loguru import logger
+
+
+@dataclass
+class Span:
+    """A timed operation inside a trace."""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    start_ts: float
+    start_mono: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    end_ts: float | None = None
+    duration_ms: float | None = None
+    status: str = "running"
+    error: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        offset_ms = (time.monotonic() - self.start_mono) * 1000.0
+        self.events.append({"name": name, "offset_ms": round(offset_ms, 3), "attributes": attributes})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ts": self.start_ts,
+            "end_ts": self.end_ts,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": dict(self.attributes),
+            "events": list(self.events),
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("miniclaw_current_span", default=None)
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a JSONL file, one span per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def export(self, spans: list[Span]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+class OtlpJsonFileExporter:
+    """Write one OTLP/JSON `ExportTraceServiceRequest` per trace, one per line.
+
+    The output can be replayed into any OTLP collector with a file receiver.
+    """
+
+    def __init__(self, path: Path, service_name: str = "miniclaw"):
+        self.path = Path(path)
+        self.service_name = service_name
+
+    @staticmethod
+    def _hex_id(value: str, length: int) -> str:
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()[:length]
+
+    @staticmethod
+    def _attr(key: str, value: Any) -> dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _otlp_span(self, span: Span) -> dict[str, Any]:
+        start_ns = int(span.start_ts * 1e9)
+        end_ns = int((span.end_ts or span.start_ts) * 1e9)
+        attributes = [self._attr(k, v) for k, v in span.attributes.items()]
+        attributes.append(self._attr("miniclaw.trace_id", span.trace_id))
+        out: dict[str, Any] = {
+            "traceId": self._hex_id(span.trace_id, 32),
+            "spanId": self._hex_id(span.span_id, 16),
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": attributes,
+            "events": [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(start_ns + int(float(event["offset_ms"]) * 1e6)),
+                    "attributes": [self._attr(k, v) for k, v in (event.get("attributes") or {}).items()],
+                }
+                for event in span.events
+            ],
+            "status": {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1},
+        }
+        if span.parent_id:
+            out["parentSpanId"] = self._hex_id(span.parent_id, 16)
+        return out
+
+    def export(self, spans: list[Span]) -> None:
+        if not spans:
+            return
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [self._attr("service.name", self.service_name)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "miniclaw"},
+                            "spans": [self._otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False, default=str) + "\n")
+
+
+class _NoopScope:
+    span = None
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+    def end(self, error: BaseException | None = None) -> None:
+        return None
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+    __slots__ = ("_tracer", "span", "_token", "_ended")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self.span = span
+        self._token = _current_span.set(span)
+        self._ended = False
+
+    def __enter__(self) -> Span:
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> bool:
+        self.end(exc)
+        return False
+
+    def end(self, error: BaseException | None = None) -> None:
+        if self._ended:
+            return
+        self._ended = True
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Ended from a different context (e.g. a callback); fall back to the parent.
+            _current_span.set(self._tracer._spans_by_id.get(self.span.parent_id or ""))
+        self._tracer._finish(self.span, error)
+
+
+class Tracer:
+    """Collect span trees keyed by trace id (the run id for agent runs)."""
+
+    def __init__(self, *, enabled: bool = False, max_traces: int = 200, exporter: SpanExporter | None = None):
+        self.enabled = bool(enabled)
+        self.max_traces = max(1, int(max_traces))
+        self.exporter = exporter
+        self._traces: OrderedDict[str, list[Span]] = OrderedDict()
+        self._spans_by_id: dict[str, Span] = {}
+        self._export_lock = threading.Lock()
+        self._pending_exports: set[asyncio.Task[None]] = set()
+
+    def configure(
+        self,
+        *,
+        enabled: bool,
+        exporter: SpanExporter | None = None,
+        max_traces: int | None = None,
+    ) -> None:
+        self.enabled = bool(enabled)
+        self.exporter = exporter
+        if max_traces is not None:
+            self.max_traces = max(1, int(max_traces))
+
+    def start_span(self, name: str, *, trace_id: str | None = None, **attributes: Any) -> _SpanScope | _NoopScope:
+        """Open a span as a child of the current span (or as a root when `trace_id` is given).
+
+        Without a current span or explicit `trace_id` nothing is recorded, so
+        instrumented helpers stay silent outside of traced runs.
+        """
+        if not self.enabled:
+            return _NOOP_SCOPE
+        parent = _current_span.get()
+        if trace_id is None:
+            if parent is None:
+                return _NOOP_SCOPE
+            trace_id = parent.trace_id
+        elif parent is not None and parent.trace_id != trace_id:
+            parent = None
+        span = Span(
+            trace_id=trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            name=name,
+            start_ts=time.time(),
+            start_mono=time.monotonic(),
+            attributes=attributes,
+        )
+        spans = self._traces.get(trace_id)
+        if spans is None:
+            spans = self._traces[trace_id] = []
+            while len(self._traces) > self.max_traces:
+                _old_id, old_spans = self._traces.popitem(last=False)
+                for old in old_spans:
+                    self._spans_by_id.pop(old.span_id, None)
+        else:
+            self._traces.move_to_end(trace_id)
+        spans.append(span)
+        self._spans_by_id[span.span_id] = span
+        return _SpanScope(self, span)
+
+    def span(self, name: str, *, trace_id: str | None = None, **attributes: Any) -> _SpanScope | _NoopScope:
+        """Context-manager form of `start_span`; yields the Span (or None when not recording)."""
+        return self.start_span(name, trace_id=trace_id, **attributes)
+
+    def _finish(self, span: Span, error: BaseException | None) -> None:
+        span.end_ts = time.time()
+        span.duration_ms = round((time.monotonic() - span.start_mono) * 1000.0, 3)
+        if error is not None:
+            span.status = "error"
+            span.error = str(error) or type(error).__name__
+        elif span.status == "running":
+            span.status = "ok"
+        if span.parent_id is None and self.exporter is not None:
+            spans = list(self._traces.get(span.trace_id, []))
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._export(self.exporter, spans)
+                return
+            # File exporters block; keep them off the event loop.
+            task = loop.create_task(asyncio.to_thread(self._export, self.exporter, spans))
+            self._pending_exports.add(task)
+            task.add_done_callback(self._pending_exports.discard)
+
+    def _export(self, exporter: SpanExporter, spans: list[Span]) -> None:
+        with self._export_lock:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                logger.warning("Span export failed for trace {}: {}", spans[0].trace_id if spans else "?", e)
+
+    async def flush(self) -> None:
+        """Wait for root-span exports started on the event loop to land."""
+        while self._pending_exports:
+            await asyncio.gather(*list(self._pending_exports), return_exceptions=True)
+
+    def get_trace(self, trace_id: str) -> list[Span]:
+        return list(self._traces.get(trace_id, []))
+
+    def waterfall(self, trace_id: str) -> dict[str, Any] | None:
+        """Return spans ordered by start with depth and offsets for a waterfall view."""
+        spans = self._traces.get(trace_id)
+        if not spans:
+            return None
+        origin = min(span.start_mono for span in spans)
+        depth_cache: dict[str, int] = {}
+
+        def _depth(span: Span) -> int:
+            if span.span_id in depth_cache:
+                return depth_cache[span.span_id]
+            parent = self._spans_by_id.get(span.parent_id or "")
+            depth = 0 if parent is None else _depth(parent) + 1
+            depth_cache[span.span_id] = depth
+            return depth
+
+        now = time.monotonic()
+        rows: list[dict[str, Any]] = []
+        end_offsets: list[float] = []
+        for span in sorted(spans, key=lambda s: s.start_mono):
+            row = span.to_dict()
+            row["depth"] = _depth(span)
+            row["offset_ms"] = round((span.start_mono - origin) * 1000.0, 3)
+            duration = span.duration_ms
+            if duration is None:
+                duration = round((now - span.start_mono) * 1000.0, 3)
+            end_offsets.append(row["offset_ms"] + duration)
+            rows.append(row)
+        return {
+            "trace_id": trace_id,
+            "duration_ms": round(max(end_offsets), 3) if end_offsets else 0.0,
+            "span_count": len(rows),
+            "spans": rows,
+        }
+
+    def reset(self) -> None:
+        self._traces.clear()
+        self._spans_by_id.clear()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+TRACER = Tracer()
+
+
+def build_exporter(kind: str, path: Path) -> SpanExporter | None:
+    kind = (kind or "").strip().lower()
+    if kind == "jsonl":
+        return JsonlSpanExporter(path)
+    if kind in {"otlp", "otlp_file"}:
+        return OtlpJsonFileExporter(path)
+    return None
+
+
+def configure(config: Any, *, data_dir: Path) -> Tracer:
+    """Apply a `TracingConfig` to the default tracer."""
+    exporter = None
+    if config.enabled:
+        kind = (config.exporter or "").strip().lower()
+        default_name = "otlp.jsonl" if kind in {"otlp", "otlp_file"} else "spans.jsonl"
+        path = Path(config.path).expanduser() if config.path else Path(data_dir) / "traces" / default_name
+        exporter = build_exporter(kind, path)
+    TRACER.configure(enabled=config.enabled, exporter=exporter, max_traces=config.max_traces)
+    return TRACER
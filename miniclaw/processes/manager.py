@@ -17,6 +17,7 @@ from typing import Any
 from loguru import logger
 
 from miniclaw.utils.helpers import ensure_dir, get_data_path
+from miniclaw.utils.jsonl import tail_lines as read_tail_lines
 
 
 @dataclass
@@ -327,6 +328,5 @@ class ProcessManager:
             log_path = Path(record.log_path)
             if not log_path.exists():
                 return ""
-            lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines()
             tail = max(1, min(2000, int(tail_lines)))
-            return "\n".join(lines[-tail:])
+            return "\n".join(read_tail_lines(log_path, tail, skip_blank=False))
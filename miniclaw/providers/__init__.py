@@ -1,19 +1,48 @@
-"""LLM provider module for miniclaw."""
-
-from miniclaw.providers.base import LLMProvider, LLMResponse
-from miniclaw.providers.failover import FailoverProvider
-from miniclaw.providers.litellm_provider import LiteLLMProvider
-from miniclaw.providers.oauth import OAuthDeviceFlow, OAuthDeviceFlowAdapter, OAuthTokenSet
-from miniclaw.providers.transcription import (
-    GroqTranscriptionProvider,
-    TranscriptionManager,
-    WhisperCppTranscriptionProvider,
-)
-from miniclaw.providers.tts import KokoroTTSAdapter
+"""LLM provider module for miniclaw.
+
+Re-exports are resolved lazily so that importing a light submodule (for
+example ``miniclaw.providers.oauth``) does not pull in litellm.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from miniclaw.providers.base import LLMProvider, LLMResponse
+    from miniclaw.providers.errors import LLMError, classify_exception
+    from miniclaw.providers.failover import FailoverProvider
+    from miniclaw.providers.litellm_provider import LiteLLMProvider
+    from miniclaw.providers.oauth import OAuthDeviceFlow, OAuthDeviceFlowAdapter, OAuthTokenSet
+    from miniclaw.providers.transcription import (
+        GroqTranscriptionProvider,
+        TranscriptionManager,
+        WhisperCppTranscriptionProvider,
+    )
+    from miniclaw.providers.tts import KokoroTTSAdapter
+
+_EXPORTS = {
+    "LLMProvider": "miniclaw.providers.base",
+    "LLMResponse": "miniclaw.providers.base",
+    "LLMError": "miniclaw.providers.errors",
+    "classify_exception": "miniclaw.providers.errors",
+    "LiteLLMProvider": "miniclaw.providers.litellm_provider",
+    "FailoverProvider": "miniclaw.providers.failover",
+    "OAuthDeviceFlow": "miniclaw.providers.oauth",
+    "OAuthDeviceFlowAdapter": "miniclaw.providers.oauth",
+    "OAuthTokenSet": "miniclaw.providers.oauth",
+    "GroqTranscriptionProvider": "miniclaw.providers.transcription",
+    "WhisperCppTranscriptionProvider": "miniclaw.providers.transcription",
+    "TranscriptionManager": "miniclaw.providers.transcription",
+    "KokoroTTSAdapter": "miniclaw.providers.tts",
+}
 
 __all__ = [
     "LLMProvider",
     "LLMResponse",
+    "LLMError",
+    "classify_exception",
     "LiteLLMProvider",
     "FailoverProvider",
     "OAuthDeviceFlow",
@@ -24,3 +53,16 @@ __all__ = [
     "TranscriptionManager",
     "KokoroTTSAdapter",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -4,6 +4,8 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Any, AsyncIterator
 
+from miniclaw.providers.errors import OVERLOADED, LLMError, classify_exception
+
 
 @dataclass
 class ToolCallRequest:
@@ -20,12 +22,21 @@ class LLMResponse:
     tool_calls: list[ToolCallRequest] = field(default_factory=list)
     finish_reason: str = "stop"
     usage: dict[str, int] = field(default_factory=dict)
+    error: LLMError | None = None
     
     @property
     def has_tool_calls(self) -> bool:
         """Check if response contains tool calls."""
         return len(self.tool_calls) > 0
 
+    @classmethod
+    def from_exception(cls, exc: BaseException, prefix: str = "Error calling LLM") -> "LLMResponse":
+        """Build an error response carrying a classified `LLMError`."""
+        error = classify_exception(exc)
+        if error.kind == OVERLOADED:
+            return cls(content="", finish_reason="overloaded", error=error)
+        return cls(content=f"{prefix}: {exc}", finish_reason="error", error=error)
+
 
 @dataclass
 class LLMStreamEvent:
@@ -0,0 +1,208 @@
+"""Typed provider error classification."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+RATE_LIMITED = "rate_limited"
+OVERLOADED = "overloaded"
+CONTEXT_OVERFLOW = "context_overflow"
+AUTH = "auth"
+BAD_REQUEST = "bad_request"
+TIMEOUT = "timeout"
+SERVER_ERROR = "server_error"
+UNKNOWN = "unknown"
+
+# Kinds worth retrying against the same provider after a backoff.
+RETRYABLE_KINDS = frozenset({RATE_LIMITED, OVERLOADED, TIMEOUT, SERVER_ERROR, UNKNOWN})
+# Kinds where switching to another provider may help, but retrying the same one won't.
+FAILOVER_ONLY_KINDS = frozenset({AUTH})
+
+_CLASS_NAME_KINDS: tuple[tuple[str, str], ...] = (
+    ("ContextWindowExceededError", CONTEXT_OVERFLOW),
+    ("RateLimitError", RATE_LIMITED),
+    ("ServiceUnavailableError", OVERLOADED),
+    ("Timeout", TIMEOUT),
+    ("APITimeoutError", TIMEOUT),
+    ("TimeoutError", TIMEOUT),
+    ("AuthenticationError", AUTH),
+    ("PermissionDeniedError", AUTH),
+    ("BadRequestError", BAD_REQUEST),
+    ("UnprocessableEntityError", BAD_REQUEST),
+    ("NotFoundError", BAD_REQUEST),
+    ("InternalServerError", SERVER_ERROR),
+    ("APIConnectionError", SERVER_ERROR),
+)
+
+_CONTEXT_OVERFLOW_HINTS = (
+    "context length",
+    "context_length_exceeded",
+    "context window",
+    "maximum context",
+    "prompt is too long",
+    "too many tokens",
+)
+
+
+@dataclass
+class LLMError:
+    """Structured error attached to an `LLMResponse`."""
+
+    kind: str
+    message: str
+    status_code: int | None = None
+    retry_after_s: float | None = None
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE_KINDS
+
+    @property
+    def failover(self) -> bool:
+        """Whether another provider candidate should be tried."""
+        return self.kind in RETRYABLE_KINDS or self.kind in FAILOVER_ONLY_KINDS
+
+
+def classify_exception(exc: BaseException) -> LLMError:
+    """Map a provider exception onto an `LLMError` without importing the SDK."""
+    message = str(exc)
+    status_code = _status_code(exc)
+    retry_after = _retry_after_seconds(exc)
+    # litellm raises Anthropic's 529 "overloaded_error" as InternalServerError,
+    # so check for overload before the class mapping.
+    if status_code == 529 or "overload" in message.lower():
+        return LLMError(kind=OVERLOADED, message=message, status_code=status_code, retry_after_s=retry_after)
+    kind = _kind_from_class(exc)
+    if kind is None:
+        kind = _kind_from_status(status_code)
+    if kind is None:
+        kind = _kind_from_message(message.lower())
+    elif kind == BAD_REQUEST and _looks_like_context_overflow(message.lower()):
+        kind = CONTEXT_OVERFLOW
+    return LLMError(kind=kind, message=message, status_code=status_code, retry_after_s=retry_after)
+
+
+def parse_retry_after(value: Any) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _kind_from_class(exc: BaseException) -> str | None:
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    for name, kind in _CLASS_NAME_KINDS:
+        if name in names:
+            return kind
+    return None
+
+
+def _kind_from_status(status_code: int | None) -> str | None:
+    if status_code is None:
+        return None
+    if status_code == 429:
+        return RATE_LIMITED
+    if status_code in {503, 529}:
+        return OVERLOADED
+    if status_code in {408, 504}:
+        return TIMEOUT
+    if status_code in {401, 403}:
+        return AUTH
+    if status_code == 413:
+        return CONTEXT_OVERFLOW
+    if 400 <= status_code < 500:
+        return BAD_REQUEST
+    if status_code >= 500:
+        return SERVER_ERROR
+    return None
+
+
+def _kind_from_message(msg: str) -> str:
+    if _looks_like_context_overflow(msg):
+        return CONTEXT_OVERFLOW
+    if "rate limit" in msg or "too many requests" in msg or re.search(r"\b429\b", msg):
+        return RATE_LIMITED
+    if "overload" in msg or "service unavailable" in msg or re.search(r"\b(503|529)\b", msg):
+        return OVERLOADED
+    if "timed out" in msg or "timeout" in msg:
+        return TIMEOUT
+    if "unauthorized" in msg or "invalid api key" in msg or re.search(r"\b(401|403)\b", msg):
+        return AUTH
+    return UNKNOWN
+
+
+def _looks_like_context_overflow(msg: str) -> bool:
+    return any(hint in msg for hint in _CONTEXT_OVERFLOW_HINTS)
+
+
+def _status_code(exc: BaseException) -> int | None:
+    for attr in ("status_code", "status", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    if isinstance(value, int):
+        return value
+    return None
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    for headers in _candidate_headers(exc):
+        for key in ("retry-after-ms", "Retry-After-Ms"):
+            raw = _header_get(headers, key)
+            if raw is not None:
+                try:
+                    return max(0.0, float(raw) / 1000.0)
+                except (TypeError, ValueError):
+                    pass
+        for key in ("retry-after", "Retry-After"):
+            parsed = parse_retry_after(_header_get(headers, key))
+            if parsed is not None:
+                return parsed
+    return None
+
+
+def _candidate_headers(exc: BaseException) -> list[Any]:
+    out: list[Any] = []
+    headers = getattr(exc, "litellm_response_headers", None)
+    if headers:
+        out.append(headers)
+    headers = getattr(exc, "headers", None)
+    if headers:
+        out.append(headers)
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        out.append(headers)
+    return out
+
+
+def _header_get(headers: Any, key: str) -> Any:
+    try:
+        value = headers.get(key)
+    except Exception:
+        return None
+    if value is None and isinstance(headers, dict):
+        lowered = key.lower()
+        for name, candidate in headers.items():
+            if str(name).lower() == lowered:
+                return candidate
+    return value
@@ -9,6 +9,11 @@ from typing import Any, AsyncIterator
 
 from miniclaw.providers.base import LLMProvider, LLMResponse, LLMStreamEvent
 
+# Outcomes of inspecting a provider response.
+_DONE = "done"
+_RETRY = "retry"
+_NEXT_CANDIDATE = "next_candidate"
+
 
 @dataclass
 class FailoverCandidate:
@@ -19,7 +24,13 @@ class FailoverCandidate:
 
 
 class FailoverProvider(LLMProvider):
-    """Wrap multiple providers and fail over on retryable errors."""
+    """Wrap multiple providers and fail over on retryable errors.
+
+    Responses carrying a typed `LLMError` drive the policy: transient kinds
+    (rate limits, overload, timeouts) are retried with backoff that honors
+    Retry-After, auth errors skip straight to the next candidate, and request
+    errors such as context overflow are returned immediately.
+    """
 
     RETRYABLE_FINISH_REASONS = {"error", "overloaded"}
 
@@ -67,17 +78,19 @@ class FailoverProvider(LLMProvider):
                     )
                 except Exception as exc:  # pragma: no cover - provider implementations should return errors
                     fallback_error = str(exc)
-                    response = LLMResponse(
-                        content=f"Error calling LLM: {exc}",
-                        finish_reason="error",
-                    )
+                    response = LLMResponse.from_exception(exc)
 
-                if not self._is_retryable_response(response):
+                action = self._retry_action(response)
+                if action == _DONE:
                     return response
 
                 fallback_response = response
-                if attempt_index < attempts - 1:
-                    await asyncio.sleep(self._backoff_s(base_ms, max_ms, attempt_index))
+                if action == _NEXT_CANDIDATE or attempt_index >= attempts - 1:
+                    break
+                delay = self._retry_delay_s(response, base_ms, max_ms, attempt_index)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
 
         if fallback_response is not None:
             return fallback_response
@@ -130,21 +143,22 @@ class FailoverProvider(LLMProvider):
                             thinking=thinking,
                         )
                 except Exception as exc:  # pragma: no cover - defensive guard
-                    final_response = LLMResponse(
-                        content=f"Error calling LLM: {exc}",
-                        finish_reason="error",
-                    )
+                    final_response = LLMResponse.from_exception(exc)
 
                 if final_response is None:
                     continue
 
-                retryable = self._is_retryable_response(final_response)
+                action = self._retry_action(final_response)
                 fallback_final = final_response
-                if not retryable or had_delta:
+                if action == _DONE or had_delta:
                     yield LLMStreamEvent(type="final", response=final_response)
                     return
-                if attempt_index < attempts - 1:
-                    await asyncio.sleep(self._backoff_s(base_ms, max_ms, attempt_index))
+                if action == _NEXT_CANDIDATE or attempt_index >= attempts - 1:
+                    break
+                delay = self._retry_delay_s(final_response, base_ms, max_ms, attempt_index)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
 
         yield LLMStreamEvent(
             type="final",
@@ -172,12 +186,40 @@ class FailoverProvider(LLMProvider):
         raise RuntimeError("No provider candidates available for embeddings.")
 
     @staticmethod
-    def _is_retryable_response(response: LLMResponse) -> bool:
+    def _retry_action(response: LLMResponse) -> str:
+        error = response.error
+        if error is not None:
+            if error.retryable:
+                return _RETRY
+            if error.failover:
+                return _NEXT_CANDIDATE
+            return _DONE
+        # Untyped responses (custom providers): fall back to finish_reason/content sniffing.
         reason = str(response.finish_reason or "").strip().lower()
         if reason in FailoverProvider.RETRYABLE_FINISH_REASONS:
-            return True
+            return _RETRY
         content = str(response.content or "")
-        return content.strip().startswith("Error calling LLM:")
+        if content.strip().startswith("Error calling LLM:"):
+            return _RETRY
+        return _DONE
+
+    @classmethod
+    def _retry_delay_s(
+        cls,
+        response: LLMResponse,
+        base_ms: int,
+        max_ms: int,
+        attempt_index: int,
+    ) -> float | None:
+        """Delay before retrying the same candidate, or None to move on to the next one."""
+        backoff = cls._backoff_s(base_ms, max_ms, attempt_index)
+        retry_after = response.error.retry_after_s if response.error is not None else None
+        if retry_after is None:
+            return backoff
+        if retry_after * 1000.0 > max_ms:
+            # Waiting out the server's Retry-After exceeds our budget; fail over instead.
+            return None
+        return max(backoff, retry_after)
 
     def _policy_for(self, provider_name: str, model: str) -> tuple[int, int, int]:
         # Defaults if policy config is absent.
@@ -3,11 +3,30 @@
 import json
 from typing import Any
 
-import litellm
-from litellm import acompletion, aembedding
-
 from miniclaw.providers.base import LLMProvider, LLMResponse, LLMStreamEvent, ToolCallRequest
 
+_litellm: Any = None
+
+
+def _load_litellm() -> Any:
+    """Import litellm on first use; it dominates CLI startup time otherwise."""
+    global _litellm
+    if _litellm is None:
+        import litellm
+
+        # Disable LiteLLM logging noise
+        litellm.suppress_debug_info = True
+        _litellm = litellm
+    return _litellm
+
+
+async def acompletion(**kwargs: Any) -> Any:
+    return await _load_litellm().acompletion(**kwargs)
+
+
+async def aembedding(**kwargs: Any) -> Any:
+    return await _load_litellm().aembedding(**kwargs)
+
 
 class LiteLLMProvider(LLMProvider):
     """
@@ -49,9 +68,6 @@ class LiteLLMProvider(LLMProvider):
         
         # Track if using custom endpoint (vLLM, etc.)
         self.is_vllm = bool(api_base) and not self.is_openrouter and not self.is_aihubmix
-        
-        # Disable LiteLLM logging noise
-        litellm.suppress_debug_info = True
     
     async def chat(
         self,
@@ -89,14 +105,8 @@ class LiteLLMProvider(LLMProvider):
             response = await acompletion(**kwargs)
             return self._parse_response(response)
         except Exception as e:
-            msg = str(e).lower()
-            if "overload" in msg or "overloaded" in msg or "503" in msg or "service unavailable" in msg:
-                return LLMResponse(content="", finish_reason="overloaded")
-            # Return error as content for graceful handling
-            return LLMResponse(
-                content=f"Error calling LLM: {str(e)}",
-                finish_reason="error",
-            )
+            # Return error as content for graceful handling, with a typed classification.
+            return LLMResponse.from_exception(e)
 
     async def stream_chat(
         self,
@@ -120,14 +130,7 @@ class LiteLLMProvider(LLMProvider):
         try:
             stream = await acompletion(**kwargs)
         except Exception as e:
-            msg = str(e).lower()
-            if "overload" in msg or "overloaded" in msg or "503" in msg or "service unavailable" in msg:
-                yield LLMStreamEvent(type="final", response=LLMResponse(content="", finish_reason="overloaded"))
-                return
-            yield LLMStreamEvent(
-                type="final",
-                response=LLMResponse(content=f"Error calling LLM: {str(e)}", finish_reason="error"),
-            )
+            yield LLMStreamEvent(type="final", response=LLMResponse.from_exception(e))
             return
 
         content_parts: list[str] = []
@@ -163,7 +166,7 @@ class LiteLLMProvider(LLMProvider):
         except Exception as e:
             yield LLMStreamEvent(
                 type="final",
-                response=LLMResponse(content=f"Error parsing LLM stream: {str(e)}", finish_reason="error"),
+                response=LLMResponse.from_exception(e, prefix="Error parsing LLM stream"),
             )
             return
 
@@ -1,20 +1,36 @@
-"""Token bucket rate limiter."""
+"""Token bucket rate limiter.
+
+Buckets live behind a small backend interface:
+
+- ``memory``: sharded in-process buckets, nothing persisted.
+- ``snapshot``: the memory engine plus a periodic snapshot of dirty shards
+  to ``<store>.shard<N>.json``; state survives restarts of a single process.
+- ``sqlite``: one row per bucket in a WAL-mode SQLite database, updated in a
+  single short transaction per check; safe across gateway worker processes.
+
+Buckets hold only tokens and the last refill time; capacity and rate come
+from the limiter on every check, so changed limits apply to existing users.
+"""
 
 from __future__ import annotations
 
+import atexit
 import json
+import math
+import sqlite3
 import tempfile
+import threading
 import time
-from contextlib import contextmanager
+import zlib
 from dataclasses import dataclass, field
 from pathlib import Path
-from threading import RLock
+from threading import Lock
 from typing import Any
 
-try:
-    import fcntl
-except ImportError:  # pragma: no cover - unavailable on Windows.
-    fcntl = None
+BACKENDS = ("auto", "memory", "snapshot", "sqlite")
+
+_MAX_IDLE_SECONDS = 3600.0
+_PRUNE_EVERY = 1024
 
 
 @dataclass
@@ -24,13 +40,13 @@ class _Bucket:
     capacity: float
     rate: float  # tokens per second
 
-    def consume(self, now: float) -> bool:
-        """Try to consume one token. Returns True if allowed."""
+    def consume(self, now: float, amount: float = 1.0) -> bool:
+        """Try to consume `amount` tokens. Returns True if allowed."""
         elapsed = max(0.0, now - self.last_refill)
         self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
         self.last_refill = now
-        if self.tokens >= 1.0:
-            self.tokens -= 1.0
+        if self.tokens >= amount:
+            self.tokens -= amount
             return True
         return False
 
@@ -58,163 +74,323 @@ class _Bucket:
         }
 
 
-@dataclass
-class RateLimiter:
-    """Per-user and per-tool token bucket rate limiter."""
+def _legacy_rows(path: Path) -> list[tuple[str, str, float, float]]:
+    """(kind, key, tokens, last_refill) rows of a pre-backend ``state.json``."""
+    if not path.exists():
+        return []
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return []
+    if not isinstance(raw, dict):
+        return []
+    rows: list[tuple[str, str, float, float]] = []
+    for map_key, kind in (("user_buckets", "message"), ("tool_buckets", "tool")):
+        buckets = raw.get(map_key)
+        for key, row in (buckets.items() if isinstance(buckets, dict) else []):
+            try:
+                rows.append((kind, str(key), float(row["tokens"]), float(row["last_refill"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return rows
 
-    messages_per_minute: int = 20
-    tool_calls_per_minute: int = 60
-    store_path: Path | str | None = None
-    _user_buckets: dict[str, _Bucket] = field(default_factory=dict)
-    _tool_buckets: dict[str, _Bucket] = field(default_factory=dict)
-    _lock: RLock = field(default_factory=RLock, init=False, repr=False)
-    _lock_path: Path | None = field(default=None, init=False, repr=False)
 
-    def __post_init__(self) -> None:
-        self.messages_per_minute = max(1, int(self.messages_per_minute))
-        self.tool_calls_per_minute = max(1, int(self.tool_calls_per_minute))
-        if self.store_path is not None:
-            path = Path(self.store_path).expanduser()
-            path.parent.mkdir(parents=True, exist_ok=True)
-            self.store_path = path
-            self._lock_path = path.with_suffix(f"{path.suffix}.lock")
-        else:
-            self.store_path = None
+class _Shard:
+    __slots__ = ("lock", "buckets", "dirty")
 
-    def _bucket_params(self, *, tool: bool) -> tuple[float, float]:
-        cap = float(self.tool_calls_per_minute if tool else self.messages_per_minute)
-        return cap, cap / 60.0
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.buckets: dict[tuple[str, str], _Bucket] = {}
+        self.dirty = False
 
-    def _get_user_bucket(self, user_key: str) -> _Bucket:
-        if user_key not in self._user_buckets:
-            cap, rate = self._bucket_params(tool=False)
-            self._user_buckets[user_key] = _Bucket(
-                tokens=cap,
-                last_refill=time.time(),
-                capacity=cap,
-                rate=rate,
-            )
-        return self._user_buckets[user_key]
-
-    def _get_tool_bucket(self, user_key: str) -> _Bucket:
-        if user_key not in self._tool_buckets:
-            cap, rate = self._bucket_params(tool=True)
-            self._tool_buckets[user_key] = _Bucket(
-                tokens=cap,
-                last_refill=time.time(),
-                capacity=cap,
-                rate=rate,
-            )
-        return self._tool_buckets[user_key]
 
-    def _load_state(self) -> dict[str, Any]:
-        if self.store_path is None or not self.store_path.exists():
-            return {"user_buckets": {}, "tool_buckets": {}}
-        try:
-            raw = json.loads(self.store_path.read_text(encoding="utf-8"))
-        except Exception:
-            return {"user_buckets": {}, "tool_buckets": {}}
-        if not isinstance(raw, dict):
-            return {"user_buckets": {}, "tool_buckets": {}}
-        users = raw.get("user_buckets")
-        tools = raw.get("tool_buckets")
-        return {
-            "user_buckets": dict(users) if isinstance(users, dict) else {},
-            "tool_buckets": dict(tools) if isinstance(tools, dict) else {},
-        }
+class MemoryBucketStore:
+    """In-process buckets split across independently locked shards.
+
+    Checks for different users rarely contend on the same lock, and no check
+    touches the filesystem.
+    """
+
+    def __init__(self, *, shards: int = 16):
+        self._shards = [_Shard() for _ in range(max(1, int(shards)))]
+        self._checks = 0
+
+    def _shard_for(self, kind: str, key: str) -> _Shard:
+        return self._shards[zlib.crc32(f"{kind}\0{key}".encode("utf-8")) % len(self._shards)]
+
+    def consume(self, kind: str, key: str, *, capacity: float, rate: float, now: float, amount: float = 1.0) -> bool:
+        shard = self._shard_for(kind, key)
+        with shard.lock:
+            bucket = shard.buckets.get((kind, key))
+            if bucket is None:
+                bucket = shard.buckets[(kind, key)] = _Bucket(
+                    tokens=capacity, last_refill=now, capacity=capacity, rate=rate
+                )
+            else:
+                bucket.capacity, bucket.rate = capacity, rate
+                bucket.tokens = min(bucket.tokens, capacity)
+            allowed = bucket.consume(now, amount)
+            shard.dirty = True
+        self._checks += 1
+        if self._checks % _PRUNE_EVERY == 0:
+            self.prune(now)
+        return allowed
+
+    def prune(self, now: float, max_idle_seconds: float = _MAX_IDLE_SECONDS) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                stale = [k for k, b in shard.buckets.items() if now - b.last_refill > max_idle_seconds]
+                for k in stale:
+                    del shard.buckets[k]
+                if stale:
+                    shard.dirty = True
+
+    def flush(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class SnapshotBucketStore(MemoryBucketStore):
+    """Memory engine that periodically writes dirty shards to JSON files.
 
-    def _save_state(self, state: dict[str, Any]) -> None:
-        if self.store_path is None:
+    Each shard has its own file, so a snapshot rewrites only the shards that
+    changed since the last one. Intended for a single gateway process. A
+    legacy ``state.json`` at `legacy_json` is imported when no shard exists.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        shards: int = 16,
+        snapshot_interval_s: float = 5.0,
+        legacy_json: Path | None = None,
+    ):
+        super().__init__(shards=shards)
+        self.legacy_json = legacy_json
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.snapshot_interval_s = max(0.0, float(snapshot_interval_s))
+        self._last_snapshot = time.monotonic()
+        self._snapshot_lock = Lock()
+        self._load()
+        atexit.register(self.flush)
+
+    def shard_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.shard{index}{self.path.suffix}")
+
+    def _restore(self, kind: str, key: str, row: dict[str, Any], now: float) -> None:
+        # Capacity and rate are applied by the next check.
+        bucket = _Bucket.from_row(row, capacity=math.inf, rate=0.0, now=now)
+        # Shard count may have changed since the snapshot was taken.
+        self._shard_for(kind, key).buckets[(kind, key)] = bucket
+
+    def _load(self) -> None:
+        now = time.time()
+        shard_files = sorted(self.path.parent.glob(f"{self.path.stem}.shard*{self.path.suffix}"))
+        if not shard_files and self.legacy_json is not None:
+            for kind, key, tokens, last_refill in _legacy_rows(self.legacy_json):
+                self._restore(kind, key, {"tokens": tokens, "last_refill": last_refill}, now)
             return
-        payload = json.dumps(
-            {
-                "version": 1,
-                "updated_at": int(time.time()),
-                "user_buckets": state.get("user_buckets", {}),
-                "tool_buckets": state.get("tool_buckets", {}),
-            },
-            ensure_ascii=False,
-            indent=2,
-        )
+        for path in shard_files:
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            for row in raw.get("buckets", []) if isinstance(raw, dict) else []:
+                try:
+                    kind, key = str(row["kind"]), str(row["key"])
+                except (KeyError, TypeError):
+                    continue
+                self._restore(kind, key, row, now)
+
+    def consume(self, kind: str, key: str, *, capacity: float, rate: float, now: float, amount: float = 1.0) -> bool:
+        allowed = super().consume(kind, key, capacity=capacity, rate=rate, now=now, amount=amount)
+        if time.monotonic() - self._last_snapshot >= self.snapshot_interval_s:
+            self.flush()
+        return allowed
+
+    def _write_shard(self, index: int, rows: list[dict[str, Any]]) -> None:
+        path = self.shard_path(index)
+        payload = json.dumps({"version": 1, "updated_at": int(time.time()), "buckets": rows}, ensure_ascii=False)
         with tempfile.NamedTemporaryFile(
             mode="w",
             encoding="utf-8",
-            dir=str(self.store_path.parent),
-            prefix=f"{self.store_path.name}.",
+            dir=str(path.parent),
+            prefix=f"{path.name}.",
             suffix=".tmp",
             delete=False,
         ) as tmp:
             tmp.write(payload)
             tmp_path = Path(tmp.name)
-        tmp_path.replace(self.store_path)
+        tmp_path.replace(path)
+
+    def flush(self) -> None:
+        """Write every dirty shard to disk."""
+        with self._snapshot_lock:
+            self._last_snapshot = time.monotonic()
+            for index, shard in enumerate(self._shards):
+                with shard.lock:
+                    if not shard.dirty:
+                        continue
+                    rows = [{"kind": kind, "key": key, **b.to_row()} for (kind, key), b in shard.buckets.items()]
+                    shard.dirty = False
+                self._write_shard(index, rows)
+
+    def close(self) -> None:
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+class SqliteBucketStore:
+    """Buckets shared between processes through a WAL-mode SQLite database."""
+
+    def __init__(self, path: Path, *, legacy_json: Path | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._checks = 0
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " kind TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " tokens REAL NOT NULL,"
+                " last_refill REAL NOT NULL,"
+                " PRIMARY KEY (kind, key)"
+                ") WITHOUT ROWID"
+            )
+        if legacy_json is not None:
+            self._migrate_json(legacy_json)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
 
-    @contextmanager
-    def _file_lock(self):
-        if self.store_path is None or self._lock_path is None:
-            yield
+    def _migrate_json(self, legacy: Path) -> None:
+        """Import buckets from the pre-SQLite ``state.json`` once."""
+        if not legacy.exists():
+            return
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM buckets LIMIT 1").fetchone() is not None:
             return
-        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
-        handle = open(self._lock_path, "a+", encoding="utf-8")
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, ?)", _legacy_rows(legacy))
+
+    def consume(self, kind: str, key: str, *, capacity: float, rate: float, now: float, amount: float = 1.0) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            if fcntl is not None:
-                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
-            yield
-        finally:
-            if fcntl is not None:
-                try:
-                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
-                except Exception:
-                    pass
-            handle.close()
-
-    @staticmethod
-    def _prune_rows(rows: dict[str, Any], *, now: float, max_idle_seconds: float = 3600.0) -> None:
-        stale: list[str] = []
-        for key, row in rows.items():
-            if not isinstance(row, dict):
-                stale.append(key)
-                continue
-            try:
-                last_refill = float(row.get("last_refill", 0))
-            except Exception:
-                stale.append(key)
-                continue
-            if now - last_refill > max_idle_seconds:
-                stale.append(key)
-        for key in stale:
-            rows.pop(key, None)
-
-    def _consume_persistent(self, *, user_key: str, tool: bool) -> bool:
-        if self.store_path is None:
-            raise RuntimeError("Persistent store path is not configured.")
-        now = time.time()
-        bucket_map_key = "tool_buckets" if tool else "user_buckets"
-        cap, rate = self._bucket_params(tool=tool)
+            row = conn.execute(
+                "SELECT tokens, last_refill FROM buckets WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            current = {"tokens": row[0], "last_refill": row[1]} if row else None
+            bucket = _Bucket.from_row(current, capacity=capacity, rate=rate, now=now)
+            allowed = bucket.consume(now, amount)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                (kind, key, bucket.tokens, bucket.last_refill),
+            )
+            self._checks += 1
+            if self._checks % _PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM buckets WHERE last_refill < ?", (now - _MAX_IDLE_SECONDS,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed
 
-        with self._lock:
-            with self._file_lock():
-                state = self._load_state()
-                bucket_map = state.setdefault(bucket_map_key, {})
-                row = bucket_map.get(user_key)
-                bucket = _Bucket.from_row(row, capacity=cap, rate=rate, now=now)
-                allowed = bucket.consume(now)
-                bucket_map[user_key] = bucket.to_row()
-                self._prune_rows(bucket_map, now=now)
-                self._save_state(state)
-                return allowed
+    def flush(self) -> None:
+        return None
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+@dataclass
+class RateLimiter:
+    """Per-user and per-tool token bucket rate limiter.
+
+    `backend="auto"` keeps buckets in memory without a `store_path` and in
+    the shared SQLite store (``<store_path>.db``) with one, so the gateway
+    and ``miniclaw agent`` enforce the same limits. `backend="snapshot"`
+    trades that sharing for checks that never touch the disk.
+    """
+
+    messages_per_minute: int = 20
+    tool_calls_per_minute: int = 60
+    store_path: Path | str | None = None
+    backend: str = "auto"
+    snapshot_interval_s: float = 5.0
+    shards: int = 16
+    _store: Any = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.messages_per_minute = max(1, int(self.messages_per_minute))
+        self.tool_calls_per_minute = max(1, int(self.tool_calls_per_minute))
+        backend = str(self.backend or "auto").lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown rate limit backend: {self.backend}")
+        if self.store_path is not None:
+            self.store_path = Path(self.store_path).expanduser()
+        if backend == "auto":
+            backend = "sqlite" if self.store_path is not None else "memory"
+        if backend != "memory" and self.store_path is None:
+            raise ValueError(f"Rate limit backend '{backend}' requires a store_path")
+        self.backend = backend
+
+        if backend == "memory":
+            self._store = MemoryBucketStore(shards=self.shards)
+        elif backend == "snapshot":
+            self._store = SnapshotBucketStore(
+                self.store_path,
+                shards=self.shards,
+                snapshot_interval_s=self.snapshot_interval_s,
+                legacy_json=self.store_path,
+            )
+        else:
+            path = self.store_path
+            if path.suffix == ".db":
+                self._store = SqliteBucketStore(path)
+            else:
+                self._store = SqliteBucketStore(path.with_suffix(".db"), legacy_json=path)
+
+    def _bucket_params(self, *, tool: bool) -> tuple[float, float]:
+        cap = float(self.tool_calls_per_minute if tool else self.messages_per_minute)
+        return cap, cap / 60.0
+
+    def _consume(self, user_key: str, *, tool: bool) -> bool:
+        cap, rate = self._bucket_params(tool=tool)
+        return self._store.consume(
+            "tool" if tool else "message",
+            str(user_key or ""),
+            capacity=cap,
+            rate=rate,
+            now=time.time(),
+        )
 
     def check_message(self, user_key: str) -> bool:
         """Check if user can send a message. Returns True if allowed."""
-        key = str(user_key or "")
-        if self.store_path is None:
-            with self._lock:
-                return self._get_user_bucket(key).consume(time.time())
-        return self._consume_persistent(user_key=key, tool=False)
+        return self._consume(user_key, tool=False)
 
     def check_tool_call(self, user_key: str) -> bool:
         """Check if user can make a tool call. Returns True if allowed."""
-        key = str(user_key or "")
-        if self.store_path is None:
-            with self._lock:
-                return self._get_tool_bucket(key).consume(time.time())
-        return self._consume_persistent(user_key=key, tool=True)
+        return self._consume(user_key, tool=True)
+
+    def flush(self) -> None:
+        """Persist any buffered state (snapshot backend)."""
+        self._store.flush()
+
+    def close(self) -> None:
+        self._store.close()
@@ -0,0 +1,277 @@
+"""Sliding-window token budgets per user, session and model.
+
+Runs are admitted up front against an estimate; once the real prompt and
+completion counts are known the reservation is reconciled, so the windows
+always reflect actual usage.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Iterable
+
+SCOPES = ("user", "session", "model")
+COUNTERS = ("total", "prompt", "completion")
+
+_PRUNE_EVERY = 256
+
+
+@dataclass(frozen=True)
+class TokenLimit:
+    """At most `max_tokens` of `counter` per `scope` key over `window_seconds`."""
+
+    scope: str
+    max_tokens: int
+    window_seconds: float
+    counter: str = "total"
+
+    def __post_init__(self) -> None:
+        if self.scope not in SCOPES:
+            raise ValueError(f"Unknown token limit scope: {self.scope}")
+        if self.counter not in COUNTERS:
+            raise ValueError(f"Unknown token limit counter: {self.counter}")
+
+
+class _Entry:
+    __slots__ = ("ts", "prompt", "completion", "live")
+
+    def __init__(self, ts: float, prompt: int, completion: int):
+        self.ts = ts
+        self.prompt = prompt
+        self.completion = completion
+        self.live = True
+
+
+class _Window:
+    """Entries inside one sliding window with running sums."""
+
+    __slots__ = ("seconds", "entries", "prompt", "completion")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.entries: deque[_Entry] = deque()
+        self.prompt = 0
+        self.completion = 0
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.seconds
+        while self.entries and self.entries[0].ts <= cutoff:
+            entry = self.entries.popleft()
+            entry.live = False
+            self.prompt -= entry.prompt
+            self.completion -= entry.completion
+
+    def used(self, counter: str) -> int:
+        if counter == "prompt":
+            return self.prompt
+        if counter == "completion":
+            return self.completion
+        return self.prompt + self.completion
+
+    def add(self, entry: _Entry) -> None:
+        self.entries.append(entry)
+        self.prompt += entry.prompt
+        self.completion += entry.completion
+
+    def adjust(self, entry: _Entry, prompt: int, completion: int) -> None:
+        if entry.live:
+            self.prompt += prompt - entry.prompt
+            self.completion += completion - entry.completion
+        entry.prompt = prompt
+        entry.completion = completion
+
+
+def _amount(counter: str, prompt: int, completion: int) -> int:
+    if counter == "prompt":
+        return prompt
+    if counter == "completion":
+        return completion
+    return prompt + completion
+
+
+@dataclass
+class TokenReservation:
+    """Admitted estimate, to be passed back to `TokenRateLimiter.reconcile`."""
+
+    user: str
+    session: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    _entries: list[tuple[_Window, _Entry]] = field(default_factory=list, repr=False)
+    reconciled: bool = False
+
+
+def usage_counts(usage: dict[str, Any] | None) -> tuple[int, int]:
+    """Prompt and completion tokens from a usage dict (as built by `_merge_usage`)."""
+    raw = usage or {}
+    prompt = int(raw.get("prompt_tokens") or raw.get("input_tokens") or 0)
+    completion = int(raw.get("completion_tokens") or raw.get("output_tokens") or 0)
+    total = int(raw.get("total_tokens") or 0)
+    if prompt + completion == 0 and total > 0:
+        prompt = total
+    return prompt, completion
+
+
+def estimate_text_tokens(text: Any) -> int:
+    """Rough token count for admission (about four characters per token)."""
+    return max(1, len(str(text or "")) // 4)
+
+
+class TokenRateLimiter:
+    """Token budgets over sliding windows, shared by the agent loop and the API."""
+
+    def __init__(
+        self,
+        limits: Iterable[TokenLimit],
+        *,
+        estimate_completion_tokens: int = 512,
+        max_tracked_sessions: int = 10_000,
+    ):
+        self.limits = list(limits)
+        self.estimate_completion_tokens = max(0, int(estimate_completion_tokens))
+        self.max_tracked_sessions = max(1, int(max_tracked_sessions))
+        self._windows: dict[tuple[int, str], _Window] = {}
+        # Last observed prompt size per session, least recently used first.
+        self._last_prompt: OrderedDict[str, int] = OrderedDict()
+        self._lock = Lock()
+        self._admissions = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "TokenRateLimiter | None":
+        """Build from `RateLimitConfig`; None when no token limits are configured."""
+        limits = [
+            TokenLimit(
+                scope=str(item.scope),
+                max_tokens=max(1, int(item.max_tokens)),
+                window_seconds=max(1.0, float(item.window_seconds)),
+                counter=str(item.counter),
+            )
+            for item in (getattr(config, "token_limits", None) or [])
+        ]
+        if not limits:
+            return None
+        return cls(limits, estimate_completion_tokens=getattr(config, "estimate_completion_tokens", 512))
+
+    def estimate(self, text: Any, *, session: str = "") -> tuple[int, int]:
+        """Estimated (prompt, completion) tokens for a run on `session`.
+
+        A session's prompt carries its history, so the last observed prompt
+        size for that session is used when it is larger than the text alone.
+        """
+        prompt = estimate_text_tokens(text)
+        if session:
+            prompt = max(prompt, self._last_prompt.get(session, 0))
+        return prompt, self.estimate_completion_tokens
+
+    def _keys(self, *, user: str, session: str, model: str) -> dict[str, str]:
+        return {"user": user, "session": session, "model": model}
+
+    def _window(self, index: int, key: str) -> _Window:
+        window = self._windows.get((index, key))
+        if window is None:
+            window = self._windows[(index, key)] = _Window(self.limits[index].window_seconds)
+        return window
+
+    def admit(
+        self,
+        *,
+        user: str = "",
+        session: str = "",
+        model: str = "",
+        prompt_tokens: int,
+        completion_tokens: int = 0,
+    ) -> TokenReservation | None:
+        """Reserve the estimate in every applicable window, or return None if any is full."""
+        keys = self._keys(user=str(user or ""), session=str(session or ""), model=str(model or ""))
+        prompt = max(0, int(prompt_tokens))
+        completion = max(0, int(completion_tokens))
+        now = time.time()
+        with self._lock:
+            targets: list[_Window] = []
+            for index, limit in enumerate(self.limits):
+                key = keys[limit.scope]
+                if not key:
+                    continue
+                window = self._window(index, key)
+                window.expire(now)
+                used = window.used(limit.counter)
+                # An idle window always admits, so one oversized estimate cannot block a key forever.
+                if used > 0 and used + _amount(limit.counter, prompt, completion) > limit.max_tokens:
+                    return None
+                targets.append(window)
+            reservation = TokenReservation(
+                user=keys["user"],
+                session=keys["session"],
+                model=keys["model"],
+                prompt_tokens=prompt,
+                completion_tokens=completion,
+            )
+            for window in targets:
+                entry = _Entry(now, prompt, completion)
+                window.add(entry)
+                reservation._entries.append((window, entry))
+            self._admissions += 1
+            if self._admissions % _PRUNE_EVERY == 0:
+                self._prune(now)
+        return reservation
+
+    def reconcile(self, reservation: TokenReservation, usage: dict[str, Any] | None) -> None:
+        """Replace the reserved estimate with the actual usage."""
+        if reservation.reconciled:
+            return
+        prompt, completion = usage_counts(usage)
+        with self._lock:
+            for window, entry in reservation._entries:
+                window.adjust(entry, prompt, completion)
+            reservation.prompt_tokens = prompt
+            reservation.completion_tokens = completion
+            reservation.reconciled = True
+            if reservation.session and prompt > 0:
+                self._last_prompt[reservation.session] = prompt
+                self._last_prompt.move_to_end(reservation.session)
+                while len(self._last_prompt) > self.max_tracked_sessions:
+                    self._last_prompt.popitem(last=False)
+
+    def record(self, *, user: str = "", session: str = "", model: str = "", usage: dict[str, Any] | None) -> None:
+        """Account usage that was not admitted up front."""
+        prompt, completion = usage_counts(usage)
+        keys = self._keys(user=str(user or ""), session=str(session or ""), model=str(model or ""))
+        now = time.time()
+        with self._lock:
+            for index, limit in enumerate(self.limits):
+                key = keys[limit.scope]
+                if key:
+                    window = self._window(index, key)
+                    window.expire(now)
+                    window.add(_Entry(now, prompt, completion))
+
+    def usage(self, scope: str, key: str) -> dict[str, int]:
+        """Tokens used by `key` in the widest configured window for `scope`."""
+        now = time.time()
+        best: _Window | None = None
+        with self._lock:
+            for index, limit in enumerate(self.limits):
+                if limit.scope != scope:
+                    continue
+                window = self._window(index, key)
+                window.expire(now)
+                if best is None or window.seconds > best.seconds:
+                    best = window
+        if best is None:
+            return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        return {
+            "prompt_tokens": best.prompt,
+            "completion_tokens": best.completion,
+            "total_tokens": best.prompt + best.completion,
+        }
+
+    def _prune(self, now: float) -> None:
+        for window_key in list(self._windows):
+            window = self._windows[window_key]
+            window.expire(now)
+            if not window.entries:
+                del self._windows[window_key]
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import base64
 import json
+import math
+import sqlite3
+import threading
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
@@ -11,61 +16,313 @@ from loguru import logger
 from miniclaw.session.manager import RunState
 from miniclaw.utils.helpers import ensure_dir, get_data_path
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    agent_id TEXT NOT NULL DEFAULT '',
+    session_key TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    duration_ms REAL,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_session ON runs (session_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_channel ON runs (channel, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_model_duration ON runs (model, duration_ms);
+CREATE INDEX IF NOT EXISTS idx_runs_agent ON runs (agent_id, created_at);
+"""
+
+_FILTER_COLUMNS = ("agent_id", "session_key", "channel", "status", "model")
+_GROUP_COLUMNS = ("model", "channel", "agent_id", "status")
+_ERROR_STATUSES = ("error",)
+
+
+def run_store_timestamp(value: Any) -> float | None:
+    """Accept epoch seconds or an ISO timestamp."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError as exc:
+        raise ValueError(f"Invalid timestamp '{value}'") from exc
+
+
+def _encode_cursor(created_at: float, run_id: str) -> str:
+    raw = json.dumps([created_at, run_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, run_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(created_at), str(run_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
 
 class RunStore:
-    """Append-only JSONL store for run history."""
+    """SQLite-backed run history with indexed filters and keyset pagination."""
+
+    def __init__(self, path: Path | None = None, max_records: int = 0):
+        self.max_records = max(0, int(max_records))
+        self.dir = ensure_dir(Path(path).parent if path else get_data_path() / "runs")
+        self.path = Path(path) if path else self.dir / "runs.db"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        self._migrate_jsonl()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
-    def __init__(self, max_records: int = 5000):
-        self.max_records = max(100, int(max_records))
-        self.dir = ensure_dir(get_data_path() / "runs")
-        self.path = self.dir / "runs.jsonl"
-        self._append_since_trim = 0
+    @staticmethod
+    def _row_values(data: dict[str, Any], agent_id: str) -> tuple[Any, ...]:
+        created = run_store_timestamp(data.get("created_at")) or 0.0
+        started = run_store_timestamp(data.get("started_at"))
+        ended = run_store_timestamp(data.get("ended_at"))
+        duration_ms = (ended - started) * 1000.0 if started is not None and ended is not None else None
+        stored = dict(data)
+        if agent_id:
+            stored["agent_id"] = agent_id
+        return (
+            str(data.get("run_id") or ""),
+            agent_id or str(data.get("agent_id") or ""),
+            str(data.get("session_key") or ""),
+            str(data.get("channel") or ""),
+            str(data.get("model") or ""),
+            str(data.get("status") or ""),
+            created,
+            duration_ms,
+            int(data.get("usage_total_tokens") or 0),
+            json.dumps(stored, ensure_ascii=False, default=str),
+        )
 
-    def append(self, run: RunState) -> None:
-        data = run.to_dict()
+    def append(self, run: RunState, agent_id: str = "") -> None:
         try:
-            with open(self.path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(data, ensure_ascii=False, default=str) + "\n")
-            self._append_since_trim += 1
-            if self._append_since_trim >= 100:
-                self._append_since_trim = 0
-                self._trim()
+            values = self._row_values(run.to_dict(), agent_id)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO runs (run_id, agent_id, session_key, channel, model, status, "
+                    "created_at, duration_ms, total_tokens, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    values,
+                )
+                if self.max_records:
+                    self._conn.execute(
+                        "DELETE FROM runs WHERE run_id IN (SELECT run_id FROM runs "
+                        "ORDER BY created_at DESC, run_id DESC LIMIT -1 OFFSET ?)",
+                        (self.max_records,),
+                    )
         except Exception as exc:
             logger.warning(f"Failed appending run record: {exc}")
 
-    def load_recent(self, limit: int = 200) -> list[dict[str, Any]]:
+    def load_recent(self, limit: int = 200, agent_id: str | None = None) -> list[dict[str, Any]]:
         limit = max(1, min(5000, int(limit)))
-        if not self.path.exists():
-            return []
         try:
-            lines = self.path.read_text(encoding="utf-8").splitlines()
-            rows: list[dict[str, Any]] = []
-            for line in reversed(lines):
-                if not line.strip():
-                    continue
-                try:
-                    obj = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if isinstance(obj, dict):
-                    rows.append(obj)
-                if len(rows) >= limit:
-                    break
-            return rows
+            filters: dict[str, Any] = {}
+            if agent_id is not None:
+                filters["agent_id"] = [agent_id, ""]
+            return self.query(limit=limit, **filters)["items"]
         except Exception as exc:
             logger.warning(f"Failed loading run history: {exc}")
             return []
 
-    def _trim(self) -> None:
-        if not self.path.exists():
+    def _where(self, filters: dict[str, Any], since: Any, until: Any) -> tuple[list[str], list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        for column in _FILTER_COLUMNS:
+            value = filters.get(column)
+            if value is None or value == "":
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(str(v) for v in values)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+        since_ts = run_store_timestamp(since)
+        until_ts = run_store_timestamp(until)
+        if since_ts is not None:
+            clauses.append("created_at >= ?")
+            params.append(since_ts)
+        if until_ts is not None:
+            clauses.append("created_at < ?")
+            params.append(until_ts)
+        return clauses, params
+
+    def query(
+        self,
+        *,
+        limit: int = 50,
+        cursor: str | None = None,
+        since: Any = None,
+        until: Any = None,
+        **filters: Any,
+    ) -> dict[str, Any]:
+        """Newest-first page of runs matching `filters`.
+
+        Filters: agent_id, session_key, channel, status, model (a value or a
+        list of values). Pass the returned `next_cursor` to fetch the next page.
+        """
+        unknown = set(filters) - set(_FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown run filter(s): {', '.join(sorted(unknown))}")
+        limit = max(1, min(5000, int(limit)))
+        clauses, params = self._where(filters, since, until)
+        if cursor:
+            created_at, run_id = _decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND run_id < ?))")
+            params.extend([created_at, created_at, run_id])
+        sql = "SELECT run_id, created_at, data FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC, run_id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        items = [json.loads(row["data"]) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = _encode_cursor(float(last["created_at"]), str(last["run_id"]))
+        return {"items": items, "next_cursor": next_cursor}
+
+    def stats(
+        self,
+        *,
+        group_by: str = "model",
+        since: Any = None,
+        until: Any = None,
+        **filters: Any,
+    ) -> list[dict[str, Any]]:
+        """Run count, error rate and p50/p95 duration per `group_by` value."""
+        if group_by not in _GROUP_COLUMNS:
+            raise ValueError(f"Cannot group runs by '{group_by}'")
+        unknown = set(filters) - set(_FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown run filter(s): {', '.join(sorted(unknown))}")
+        clauses, params = self._where(filters, since, until)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        error_marks = ", ".join("?" for _ in _ERROR_STATUSES)
+        sql = (
+            f"SELECT {group_by} AS grp, COUNT(*) AS runs, "
+            f"SUM(CASE WHEN status IN ({error_marks}) THEN 1 ELSE 0 END) AS errors, "
+            "COUNT(duration_ms) AS timed, AVG(duration_ms) AS avg_ms, SUM(total_tokens) AS tokens "
+            f"FROM runs{where} GROUP BY {group_by} ORDER BY runs DESC"
+        )
+        out: list[dict[str, Any]] = []
+        with self._lock:
+            groups = self._conn.execute(sql, [*_ERROR_STATUSES, *params]).fetchall()
+            for group in groups:
+                timed = int(group["timed"] or 0)
+                group_clauses = [*clauses, f"{group_by} = ?", "duration_ms IS NOT NULL"]
+                group_params = [*params, group["grp"]]
+                out.append(
+                    {
+                        group_by: group["grp"],
+                        "runs": int(group["runs"]),
+                        "errors": int(group["errors"] or 0),
+                        "error_rate": round(int(group["errors"] or 0) / int(group["runs"]), 4),
+                        "total_tokens": int(group["tokens"] or 0),
+                        "avg_duration_ms": round(float(group["avg_ms"]), 3) if group["avg_ms"] is not None else None,
+                        "p50_duration_ms": self._percentile(group_clauses, group_params, timed, 0.50),
+                        "p95_duration_ms": self._percentile(group_clauses, group_params, timed, 0.95),
+                    }
+                )
+        return out
+
+    def _percentile(self, clauses: list[str], params: list[Any], count: int, q: float) -> float | None:
+        # Nearest-rank percentile; an index walk on (group column, duration_ms) rather than a sort in Python.
+        if count <= 0:
+            return None
+        offset = max(0, min(count - 1, math.ceil(q * count) - 1))
+        sql = (
+            "SELECT duration_ms FROM runs WHERE " + " AND ".join(clauses)
+            + " ORDER BY duration_ms LIMIT 1 OFFSET ?"
+        )
+        row = self._conn.execute(sql, [*params, offset]).fetchone()
+        return round(float(row[0]), 3) if row else None
+
+    def purge(
+        self,
+        *,
+        session_key: str | None = None,
+        user_id: str | None = None,
+        before_ts: float | None = None,
+    ) -> int:
+        """Delete runs by session (exact), user (substring of session key) and/or age."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if session_key:
+            clauses.append("session_key = ?")
+            params.append(session_key)
+        if user_id:
+            clauses.append("instr(session_key, ?) > 0")
+            params.append(user_id)
+        if before_ts is not None:
+            clauses.append("created_at < ?")
+            params.append(float(before_ts))
+        if not clauses:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM runs WHERE " + " AND ".join(clauses), params)
+        return int(cursor.rowcount or 0)
+
+    def export_jsonl(self, dest: Path) -> int:
+        """Write every run (oldest first) to a JSONL file."""
+        count = 0
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM runs ORDER BY created_at, run_id").fetchall()
+        with open(dest, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(row["data"] + "\n")
+                count += 1
+        return count
+
+    def _migrate_jsonl(self) -> None:
+        """Import a pre-SQLite runs.jsonl history once."""
+        legacy = self.dir / "runs.jsonl"
+        if not legacy.exists():
             return
-        try:
-            lines = self.path.read_text(encoding="utf-8").splitlines()
-            if len(lines) <= self.max_records:
-                return
-            trimmed = lines[-self.max_records :]
-            tmp = self.path.with_suffix(".tmp")
-            tmp.write_text("\n".join(trimmed) + "\n", encoding="utf-8")
-            tmp.replace(self.path)
-        except Exception as exc:
-            logger.debug(f"Run history trim skipped: {exc}")
+        values: list[tuple[Any, ...]] = []
+        for line in legacy.read_text(encoding="utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(obj, dict) and obj.get("run_id"):
+                try:
+                    values.append(self._row_values(obj, ""))
+                except ValueError:
+                    continue
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO runs (run_id, agent_id, session_key, channel, model, status, "
+                "created_at, duration_ms, total_tokens, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values,
+            )
+        legacy.unlink(missing_ok=True)
+        logger.info(f"Migrated {len(values)} run record(s) into {self.path.name}")
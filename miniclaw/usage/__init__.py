@@ -1,5 +1,6 @@
 """Usage tracking and aggregation utilities."""
 
+from miniclaw.usage.rollups import UsageRollups
 from miniclaw.usage.service import UsageTracker
 
-__all__ = ["UsageTracker"]
+__all__ = ["UsageRollups", "UsageTracker"]
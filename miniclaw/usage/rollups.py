@@ -0,0 +1,186 @@
+"""Pre-aggregated usage rollups (per minute, hour and day)."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+MINUTE_MS = 60_000
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+
+GRANULARITIES: dict[str, int] = {"minute": MINUTE_MS, "hour": HOUR_MS, "day": DAY_MS}
+
+# How long fine-grained buckets are kept; coarser buckets answer older queries.
+DEFAULT_RETENTION_MS: dict[str, int | None] = {
+    "minute": 2 * DAY_MS,
+    "hour": 90 * DAY_MS,
+    "day": None,
+}
+
+DIMENSIONS = ("model", "source", "session", "user")
+TOTAL_DIMENSION = "all"
+
+# Stat vector layout: events, prompt, completion, total, cost.
+_EVENTS, _PROMPT, _COMPLETION, _TOTAL_TOKENS, _COST = range(5)
+
+
+def _event_keys(event: dict[str, Any]) -> list[tuple[str, str]]:
+    keys = [(TOTAL_DIMENSION, "")]
+    values = {
+        "model": str(event.get("model") or "unknown"),
+        "source": str(event.get("source") or "unknown"),
+        "session": str(event.get("session_key") or ""),
+        "user": str(event.get("user_id") or ""),
+    }
+    for dim in DIMENSIONS:
+        if values[dim]:
+            keys.append((dim, values[dim]))
+    return keys
+
+
+def _event_stats(event: dict[str, Any]) -> list[float]:
+    prompt = int(event.get("prompt_tokens") or 0)
+    completion = int(event.get("completion_tokens") or 0)
+    total = int(event.get("total_tokens") or 0)
+    if total <= 0:
+        total = prompt + completion
+    return [1, prompt, completion, total, float(event.get("cost_usd") or 0.0)]
+
+
+class UsageRollups:
+    """Incrementally maintained usage counters bucketed by time and dimension.
+
+    Layout: granularity -> bucket start (ms) -> dimension -> key -> stats.
+    """
+
+    def __init__(self, *, retention_ms: dict[str, int | None] | None = None):
+        self.retention_ms = dict(DEFAULT_RETENTION_MS)
+        if retention_ms:
+            self.retention_ms.update(retention_ms)
+        self._buckets: dict[str, dict[int, dict[str, dict[str, list[float]]]]] = {
+            name: {} for name in GRANULARITIES
+        }
+
+    def add(self, event: dict[str, Any], *, sign: int = 1) -> None:
+        """Apply (or with `sign=-1`, retract) one usage event."""
+        ts_ms = int(event.get("ts_ms") or 0)
+        stats = _event_stats(event)
+        keys = _event_keys(event)
+        for name, size in GRANULARITIES.items():
+            start = ts_ms - (ts_ms % size)
+            bucket = self._buckets[name].get(start)
+            if bucket is None:
+                if sign < 0:
+                    continue
+                bucket = self._buckets[name][start] = {}
+            for dim, key in keys:
+                rows = bucket.setdefault(dim, {})
+                row = rows.get(key)
+                if row is None:
+                    if sign < 0:
+                        continue
+                    row = rows[key] = [0, 0, 0, 0, 0.0]
+                for i, value in enumerate(stats):
+                    row[i] += sign * value
+                if sign < 0 and row[_EVENTS] <= 0:
+                    del rows[key]
+
+    def drop_before(self, cutoff_ms: int) -> None:
+        """Drop every bucket that ends at or before `cutoff_ms`."""
+        for name, size in GRANULARITIES.items():
+            buckets = self._buckets[name]
+            for start in [start for start in buckets if start + size <= cutoff_ms]:
+                del buckets[start]
+
+    def prune(self, now_ms: int) -> None:
+        """Expire fine-grained buckets past their retention."""
+        for name, size in GRANULARITIES.items():
+            retention = self.retention_ms.get(name)
+            if retention is None:
+                continue
+            cutoff = now_ms - retention
+            buckets = self._buckets[name]
+            for start in [start for start in buckets if start + size <= cutoff]:
+                del buckets[start]
+
+    def resolution_for(self, start_ms: int, now_ms: int) -> str:
+        """Finest granularity whose buckets still cover `start_ms`."""
+        for name in GRANULARITIES:
+            retention = self.retention_ms.get(name)
+            if retention is None or start_ms >= now_ms - retention + GRANULARITIES[name]:
+                return name
+        return "day"
+
+    def plan(self, start_ms: int, end_ms: int, resolution: str) -> list[tuple[str, int]]:
+        """Cover [start_ms, end_ms] with as few buckets as possible.
+
+        `start_ms` is aligned down to `resolution`; the trailing bucket holding
+        `end_ms` is included, so the range is exact up to `end_ms`.
+        """
+        names = list(GRANULARITIES)
+        finest = names.index(resolution)
+        cursor = start_ms - (start_ms % GRANULARITIES[resolution])
+        out: list[tuple[str, int]] = []
+        while cursor <= end_ms:
+            chosen = names[finest]
+            # Climb to the coarsest granularity aligned at cursor that fits entirely.
+            for name in reversed(names[finest:]):
+                size = GRANULARITIES[name]
+                if cursor % size == 0 and cursor + size - 1 <= end_ms:
+                    chosen = name
+                    break
+            out.append((chosen, cursor))
+            cursor += GRANULARITIES[chosen]
+        return out
+
+    def aligned_start(self, start_ms: int, resolution: str) -> int:
+        return start_ms - (start_ms % GRANULARITIES[resolution])
+
+    def query(self, buckets: Iterable[tuple[str, int]], dimension: str) -> dict[str, list[float]]:
+        out: dict[str, list[float]] = {}
+        for name, start in buckets:
+            bucket = self._buckets[name].get(start)
+            if not bucket:
+                continue
+            for key, stats in bucket.get(dimension, {}).items():
+                row = out.get(key)
+                if row is None:
+                    out[key] = list(stats)
+                else:
+                    for i, value in enumerate(stats):
+                        row[i] += value
+        return out
+
+    def all_time(self, dimension: str) -> dict[str, list[float]]:
+        return self.query((("day", start) for start in self._buckets["day"]), dimension)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            name: {str(start): bucket for start, bucket in buckets.items()}
+            for name, buckets in self._buckets.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], *, retention_ms: dict[str, int | None] | None = None) -> "UsageRollups":
+        rollups = cls(retention_ms=retention_ms)
+        for name in GRANULARITIES:
+            raw = data.get(name) or {}
+            rollups._buckets[name] = {
+                int(start): {
+                    dim: {key: list(stats) for key, stats in rows.items()}
+                    for dim, rows in bucket.items()
+                }
+                for start, bucket in raw.items()
+            }
+        return rollups
+
+
+def stats_row(stats: list[float]) -> dict[str, Any]:
+    return {
+        "events": int(stats[_EVENTS]),
+        "prompt_tokens": int(stats[_PROMPT]),
+        "completion_tokens": int(stats[_COMPLETION]),
+        "total_tokens": int(stats[_TOTAL_TOKENS]),
+        "cost_usd": round(float(stats[_COST]), 8),
+    }
+
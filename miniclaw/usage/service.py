@@ -2,15 +2,28 @@
 
 from __future__ import annotations
 
+import calendar
 import json
+import tempfile
 import threading
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from miniclaw.usage.rollups import DAY_MS, DIMENSIONS, TOTAL_DIMENSION, UsageRollups, stats_row
 
 
 class UsageTracker:
-    """Append-only token usage tracker with aggregation helpers."""
+    """Token usage ledger with pre-aggregated rollups.
+
+    Raw events are appended to day partitions under ``<store dir>/segments``
+    (UTC, one JSONL file per day). Per-minute/hour/day rollups by model,
+    source, session and user are updated on every `record` and snapshotted
+    next to the ledger together with the byte offset covered in each
+    segment, so a restart only replays segment tails.
+    """
+
+    SNAPSHOT_EVERY = 200
 
     def __init__(
         self,
@@ -21,6 +34,8 @@ class UsageTracker:
     ):
         self.store_path = Path(store_path)
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self.segments_dir = self.store_path.parent / "segments"
+        self.rollups_path = self.store_path.with_name(f"{self.store_path.stem}.rollups.json")
         self._pricing = self._normalize_pricing(pricing or {})
         self._aggregation_windows = [
             item
@@ -28,6 +43,11 @@ class UsageTracker:
             if self._window_seconds(item) is not None
         ]
         self._lock = threading.Lock()
+        self._offsets: dict[str, int] = {}
+        self._dirty = 0
+        with self._lock:
+            self._migrate_legacy_ledger()
+            self._rollups = self._load_rollups()
 
     @property
     def aggregation_windows(self) -> list[str]:
@@ -77,34 +97,81 @@ class UsageTracker:
         *,
         windows: list[str] | None = None,
     ) -> dict[str, Any]:
-        """Return overall and windowed usage summary."""
+        """Return overall and windowed usage summary.
+
+        Window starts are aligned down to the finest rollup granularity still
+        retained for that range (minute for recent windows).
+        """
         now_ms = int(time.time() * 1000)
         selected_windows = [
             item for item in (windows or self._aggregation_windows)
             if self._window_seconds(item) is not None
         ]
 
-        all_events = self._load_events()
-        out = {
-            "generated_at_ms": now_ms,
-            "overall": self._aggregate_events(all_events, window="all", start_ms=None, end_ms=now_ms),
-            "windows": {},
-            "pricing_models": sorted(self._pricing.keys()),
-        }
-        for window in selected_windows:
-            seconds = self._window_seconds(window)
-            if seconds is None:
-                continue
-            start_ms = now_ms - (seconds * 1000)
-            scoped = [event for event in all_events if int(event.get("ts_ms") or 0) >= start_ms]
-            out["windows"][window] = self._aggregate_events(
-                scoped,
-                window=window,
-                start_ms=start_ms,
-                end_ms=now_ms,
-            )
+        with self._lock:
+            out = {
+                "generated_at_ms": now_ms,
+                "overall": self._aggregate(None, window="all", start_ms=None, end_ms=now_ms),
+                "windows": {},
+                "pricing_models": sorted(self._pricing.keys()),
+            }
+            for window in selected_windows:
+                seconds = self._window_seconds(window)
+                if seconds is None:
+                    continue
+                requested_start = now_ms - (seconds * 1000)
+                resolution = self._rollups.resolution_for(requested_start, now_ms)
+                buckets = self._rollups.plan(requested_start, now_ms, resolution)
+                out["windows"][window] = self._aggregate(
+                    buckets,
+                    window=window,
+                    start_ms=self._rollups.aligned_start(requested_start, resolution),
+                    end_ms=now_ms,
+                )
         return out
 
+    def breakdown(
+        self,
+        *,
+        dimension: str = "model",
+        window: str | None = None,
+        limit: int = 20,
+    ) -> dict[str, Any]:
+        """Top keys for one rollup dimension (model, source, session or user)."""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown usage dimension '{dimension}'")
+        now_ms = int(time.time() * 1000)
+        seconds = self._window_seconds(window or "") if window else None
+        with self._lock:
+            if seconds is None:
+                rows = self._rollups.all_time(dimension)
+                start_ms = None
+            else:
+                requested_start = now_ms - (seconds * 1000)
+                resolution = self._rollups.resolution_for(requested_start, now_ms)
+                rows = self._rollups.query(self._rollups.plan(requested_start, now_ms, resolution), dimension)
+                start_ms = self._rollups.aligned_start(requested_start, resolution)
+        items = self._rows(rows, label=dimension)
+        return {
+            "dimension": dimension,
+            "window": window if seconds is not None else "all",
+            "start_ms": start_ms,
+            "end_ms": now_ms,
+            "items": items[: max(1, int(limit))],
+            "total_items": len(items),
+        }
+
+    def segment_paths(self) -> list[Path]:
+        """Raw ledger partitions, oldest first."""
+        if not self.segments_dir.exists():
+            return []
+        return sorted(self.segments_dir.glob("*.jsonl"))
+
+    def flush(self) -> None:
+        """Persist the rollup snapshot."""
+        with self._lock:
+            self._save_rollups()
+
     def purge(
         self,
         *,
@@ -112,36 +179,72 @@ class UsageTracker:
         user_id: str | None = None,
         before_ts_ms: int | None = None,
     ) -> int:
-        """Delete matching usage events from the ledger."""
-        if not self.store_path.exists():
-            return 0
+        """Delete matching usage events from the ledger.
 
+        Only partitions that can contain matches are read: a pure date cutoff
+        drops whole days and rewrites at most the partition holding the cutoff.
+        """
         session_filter = str(session_key or "").strip()
         user_filter = str(user_id or "").strip()
         cutoff = int(before_ts_ms) if before_ts_ms is not None else None
+        if not (session_filter or user_filter or cutoff is not None):
+            return 0
 
+        removed = 0
         with self._lock:
-            lines = self.store_path.read_text(encoding="utf-8").splitlines()
-            kept: list[str] = []
-            removed = 0
-            for line in lines:
-                if not line.strip():
+            for path in self.segment_paths():
+                day_start = self._segment_day_start(path)
+                if day_start is None:
                     continue
-                try:
-                    obj = json.loads(line)
-                except json.JSONDecodeError:
-                    kept.append(line)
+                if cutoff is not None and day_start >= cutoff:
                     continue
-                if self._matches_purge_filter(
-                    obj=obj,
+                whole_day_expired = cutoff is not None and day_start + DAY_MS <= cutoff
+                if whole_day_expired and not (session_filter or user_filter):
+                    removed += self._count_lines(path)
+                    path.unlink(missing_ok=True)
+                    self._offsets.pop(path.name, None)
+                    self._rollups.drop_before(day_start + DAY_MS)
+                    continue
+                removed += self._purge_segment(
+                    path,
                     session_key=session_filter,
                     user_id=user_filter,
                     before_ts_ms=cutoff,
-                ):
-                    removed += 1
-                    continue
+                )
+            if removed:
+                self._save_rollups()
+        return removed
+
+    def _purge_segment(self, path: Path, *, session_key: str, user_id: str, before_ts_ms: int | None) -> int:
+        lines = path.read_text(encoding="utf-8").splitlines()
+        kept: list[str] = []
+        removed = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
                 kept.append(line)
-            self._rewrite_lines(kept)
+                continue
+            if isinstance(obj, dict) and self._matches_purge_filter(
+                obj=obj,
+                session_key=session_key,
+                user_id=user_id,
+                before_ts_ms=before_ts_ms,
+            ):
+                removed += 1
+                self._rollups.add(obj, sign=-1)
+                continue
+            kept.append(line)
+        if not removed:
+            return 0
+        if kept:
+            path.write_text("\n".join(kept) + "\n", encoding="utf-8")
+            self._offsets[path.name] = path.stat().st_size
+        else:
+            path.unlink(missing_ok=True)
+            self._offsets.pop(path.name, None)
         return removed
 
     def _matches_purge_filter(
@@ -170,94 +273,162 @@ class UsageTracker:
         return bool(session_key or user_id or before_ts_ms is not None)
 
     def _append(self, event: dict[str, Any]) -> None:
+        path = self._segment_path(int(event["ts_ms"]))
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
         with self._lock:
-            with open(self.store_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous = self._offsets.get(path.name, 0)
+            with open(path, "ab") as f:
+                f.write(line)
+                end = f.tell()
+            if end == previous + len(line):
+                self._rollups.add(event)
+            else:
+                # Another process appended since our last write: fold its lines
+                # (and ours) in from the last offset we accounted for.
+                for replayed in self._iter_events(path, previous, end):
+                    self._rollups.add(replayed)
+            self._offsets[path.name] = end
+            self._dirty += 1
+            if self._dirty >= self.SNAPSHOT_EVERY:
+                self._rollups.prune(int(event["ts_ms"]))
+                self._save_rollups()
+
+    def _segment_path(self, ts_ms: int) -> Path:
+        day = time.strftime("%Y-%m-%d", time.gmtime(ts_ms / 1000))
+        return self.segments_dir / f"{day}.jsonl"
+
+    @staticmethod
+    def _segment_day_start(path: Path) -> int | None:
+        try:
+            parsed = time.strptime(path.stem, "%Y-%m-%d")
+        except ValueError:
+            return None
+        return calendar.timegm(parsed) * 1000
+
+    @staticmethod
+    def _count_lines(path: Path) -> int:
+        count = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    count += 1
+        return count
+
+    @staticmethod
+    def _iter_events(path: Path, offset: int = 0, end: int | None = None) -> Iterator[dict[str, Any]]:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            lines = f if end is None else f.read(max(0, end - offset)).splitlines()
+            for raw in lines:
+                if not raw.strip():
+                    continue
+                try:
+                    obj = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(obj, dict):
+                    yield obj
 
-    def _load_events(self) -> list[dict[str, Any]]:
+    def _migrate_legacy_ledger(self) -> None:
+        """Split a pre-partitioning single-file ledger into day segments."""
         if not self.store_path.exists():
-            return []
-        with self._lock:
-            lines = self.store_path.read_text(encoding="utf-8").splitlines()
-        events: list[dict[str, Any]] = []
-        for line in lines:
-            if not line.strip():
-                continue
+            return
+        by_day: dict[Path, list[str]] = {}
+        for event in self._iter_events(self.store_path):
+            path = self._segment_path(int(event.get("ts_ms") or 0))
+            by_day.setdefault(path, []).append(json.dumps(event, ensure_ascii=False))
+        for path, lines in sorted(by_day.items()):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        self.store_path.unlink(missing_ok=True)
+
+    def _load_rollups(self) -> UsageRollups:
+        rollups = UsageRollups()
+        offsets: dict[str, int] = {}
+        if self.rollups_path.exists():
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
+                data = json.loads(self.rollups_path.read_text(encoding="utf-8"))
+                rollups = UsageRollups.from_dict(data.get("rollups") or {})
+                offsets = {str(k): int(v) for k, v in (data.get("offsets") or {}).items()}
+            except (json.JSONDecodeError, OSError, TypeError, ValueError, AttributeError):
+                rollups, offsets = UsageRollups(), {}
+
+        segments = {path.name: path for path in self.segment_paths()}
+        stale = any(
+            name not in segments or segments[name].stat().st_size < offset
+            for name, offset in offsets.items()
+        )
+        if stale:
+            # A segment was removed or rewritten behind our back: rebuild from raw events.
+            rollups, offsets = UsageRollups(), {}
+
+        replayed = 0
+        for name, path in segments.items():
+            start = offsets.get(name, 0)
+            size = path.stat().st_size
+            if size <= start:
                 continue
-            if isinstance(obj, dict):
-                events.append(obj)
-        return events
+            for event in self._iter_events(path, start):
+                rollups.add(event)
+                replayed += 1
+            offsets[name] = size
+        self._offsets = offsets
+        self._rollups = rollups
+        if replayed or stale:
+            rollups.prune(int(time.time() * 1000))
+            self._save_rollups()
+        return rollups
 
-    def _rewrite_lines(self, lines: list[str]) -> None:
-        if lines:
-            self.store_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
-        else:
-            self.store_path.write_text("", encoding="utf-8")
+    def _save_rollups(self) -> None:
+        payload = json.dumps(
+            {"version": 1, "offsets": self._offsets, "rollups": self._rollups.to_dict()},
+            ensure_ascii=False,
+        )
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            encoding="utf-8",
+            dir=str(self.rollups_path.parent),
+            prefix=f"{self.rollups_path.name}.",
+            suffix=".tmp",
+            delete=False,
+        ) as tmp:
+            tmp.write(payload)
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(self.rollups_path)
+        self._dirty = 0
 
-    def _aggregate_events(
+    def _aggregate(
         self,
-        events: list[dict[str, Any]],
+        buckets: list[tuple[str, int]] | None,
         *,
         window: str,
         start_ms: int | None,
         end_ms: int,
     ) -> dict[str, Any]:
-        totals = {
-            "events": 0,
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_tokens": 0,
-            "cost_usd": 0.0,
-        }
-        by_model: dict[str, dict[str, Any]] = {}
-
-        for event in events:
-            model = str(event.get("model") or "unknown")
-            prompt = int(event.get("prompt_tokens") or 0)
-            completion = int(event.get("completion_tokens") or 0)
-            total = int(event.get("total_tokens") or 0)
-            if total <= 0:
-                total = prompt + completion
-            cost = float(event.get("cost_usd") or 0.0)
-
-            totals["events"] += 1
-            totals["prompt_tokens"] += prompt
-            totals["completion_tokens"] += completion
-            totals["total_tokens"] += total
-            totals["cost_usd"] += cost
-
-            row = by_model.setdefault(
-                model,
-                {
-                    "model": model,
-                    "events": 0,
-                    "prompt_tokens": 0,
-                    "completion_tokens": 0,
-                    "total_tokens": 0,
-                    "cost_usd": 0.0,
-                },
-            )
-            row["events"] += 1
-            row["prompt_tokens"] += prompt
-            row["completion_tokens"] += completion
-            row["total_tokens"] += total
-            row["cost_usd"] += cost
-
-        totals["cost_usd"] = round(float(totals["cost_usd"]), 8)
-        models = sorted(by_model.values(), key=lambda item: item["cost_usd"], reverse=True)
-        for row in models:
-            row["cost_usd"] = round(float(row["cost_usd"]), 8)
+        def _rows(dimension: str) -> dict[str, list[float]]:
+            if buckets is None:
+                return self._rollups.all_time(dimension)
+            return self._rollups.query(buckets, dimension)
+
+        total_stats = _rows(TOTAL_DIMENSION).get("")
+        totals = stats_row(total_stats) if total_stats else stats_row([0, 0, 0, 0, 0.0])
         return {
             "window": window,
             "start_ms": start_ms,
             "end_ms": end_ms,
             "totals": totals,
-            "models": models,
+            "models": self._rows(_rows("model"), label="model"),
+            "sources": self._rows(_rows("source"), label="source"),
         }
 
+    @staticmethod
+    def _rows(rows: dict[str, list[float]], *, label: str) -> list[dict[str, Any]]:
+        out = [{label: key, **stats_row(stats)} for key, stats in rows.items()]
+        out.sort(key=lambda item: (item["cost_usd"], item["total_tokens"]), reverse=True)
+        return out
+
     @staticmethod
     def _window_seconds(window: str) -> int | None:
         raw = str(window or "").strip().lower()
@@ -0,0 +1,75 @@
+"""Tail-oriented helpers for append-only line files."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+_BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reverse(
+    path: Path,
+    *,
+    block_size: int = _BLOCK_SIZE,
+    skip_blank: bool = True,
+) -> Iterator[str]:
+    """Yield the lines of `path` from last to first, reading fixed-size blocks from the end.
+
+    Cost is proportional to the bytes actually consumed, not the file size.
+    Undecodable bytes are replaced.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        at_end = True
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step) + remainder
+            lines = block.split(b"\n")
+            if at_end:
+                at_end = False
+                if lines[-1] == b"":
+                    lines.pop()  # trailing newline terminates the last line
+            # The first piece may be the tail of a line that starts in an earlier block.
+            remainder = lines.pop(0) if lines else b""
+            for raw in reversed(lines):
+                if raw.strip() or not skip_blank:
+                    yield raw.decode("utf-8", errors="replace").rstrip("\r")
+        if remainder.strip() or (remainder and not skip_blank):
+            yield remainder.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def tail_lines(path: Path, count: int, *, skip_blank: bool = True) -> list[str]:
+    """Return the last `count` lines of `path` in file order."""
+    out: list[str] = []
+    if count <= 0:
+        return out
+    for line in iter_lines_reverse(path, skip_blank=skip_blank):
+        out.append(line)
+        if len(out) >= count:
+            break
+    out.reverse()
+    return out
+
+
+def iter_json_reverse(paths: Iterable[Path]) -> Iterator[dict[str, Any]]:
+    """Yield JSON objects newest-first across `paths` (given newest file first)."""
+    for path in paths:
+        for line in iter_lines_reverse(path):
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(obj, dict):
+                yield obj
+
@@ -1,5 +1,6 @@
 """Workflow runtime package."""
 
 from miniclaw.workflows.runtime import LinearWorkflowRuntime, WorkflowRecipe, WorkflowStep
+from miniclaw.workflows.store import WorkflowRunStore, WorkflowStepCache
 
-__all__ = ["WorkflowStep", "WorkflowRecipe", "LinearWorkflowRuntime"]
+__all__ = ["WorkflowStep", "WorkflowRecipe", "LinearWorkflowRuntime", "WorkflowRunStore", "WorkflowStepCache"]
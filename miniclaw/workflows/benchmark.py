@@ -0,0 +1,129 @@
+"""Critical-path benchmark: wave DAG scheduler vs eager DAG scheduler.
+
+Run with::
+
+    python -m miniclaw.workflows.benchmark --steps 40 --max-deps 3 --runs 5
+
+Each run builds a random DAG whose steps sleep for a random duration instead
+of calling a model, then executes it with both schedulers. The critical
+path (longest chain of step durations) is the lower bound for any scheduler
+with enough parallelism; the report shows how close each one gets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Any
+
+from miniclaw.workflows.runtime import LinearWorkflowRuntime, WorkflowRecipe
+
+
+class SleepRuntime:
+    """Agent runtime stand-in: a prompt ``sleep:<seconds>`` sleeps that long."""
+
+    async def process_direct(
+        self,
+        content: str,
+        session_key: str = "workflow:benchmark",
+        channel: str = "system",
+        chat_id: str = "workflow",
+        model_override: str | None = None,
+    ) -> str:
+        await asyncio.sleep(float(content.split(":", 1)[1]))
+        return "ok"
+
+
+def random_recipe(
+    *,
+    steps: int = 30,
+    max_deps: int = 3,
+    fast_s: float = 0.01,
+    slow_s: float = 0.1,
+    slow_ratio: float = 0.2,
+    max_parallel: int = 64,
+    seed: int = 0,
+) -> tuple[WorkflowRecipe, float]:
+    """Build a random DAG recipe and return it with its critical path in seconds."""
+    rng = random.Random(seed)
+    rows: list[dict[str, Any]] = []
+    finish: dict[str, float] = {}
+    for i in range(max(1, steps)):
+        step_id = f"s{i}"
+        earlier = [row["id"] for row in rows]
+        deps = rng.sample(earlier, rng.randint(0, min(max_deps, len(earlier)))) if earlier else []
+        duration = slow_s if rng.random() < slow_ratio else fast_s
+        finish[step_id] = duration + max((finish[dep] for dep in deps), default=0.0)
+        rows.append({"id": step_id, "prompt": f"sleep:{duration}", "depends_on": deps})
+    recipe = WorkflowRecipe.from_dict(
+        {"name": f"benchmark-{seed}", "mode": "dag", "max_parallel": max_parallel, "steps": rows}
+    )
+    return recipe, max(finish.values())
+
+
+async def _makespan(recipe: WorkflowRecipe, scheduler: str) -> float:
+    runtime = LinearWorkflowRuntime(agent_runtime=SleepRuntime(), dag_scheduler=scheduler)  # type: ignore[arg-type]
+    started = time.perf_counter()
+    result = await runtime.run_recipe(recipe)
+    if result["status"] != "completed":
+        raise RuntimeError(f"benchmark recipe did not complete: {result['status']}")
+    return time.perf_counter() - started
+
+
+async def compare(
+    *,
+    steps: int = 30,
+    max_deps: int = 3,
+    runs: int = 3,
+    fast_s: float = 0.01,
+    slow_s: float = 0.1,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Run both schedulers on `runs` random DAGs; times are in milliseconds."""
+    rows = []
+    for i in range(max(1, runs)):
+        recipe, critical_s = random_recipe(steps=steps, max_deps=max_deps, fast_s=fast_s, slow_s=slow_s, seed=seed + i)
+        rows.append(
+            {
+                "critical_path_ms": round(critical_s * 1000, 2),
+                "waves_ms": round(await _makespan(recipe, "waves") * 1000, 2),
+                "eager_ms": round(await _makespan(recipe, "eager") * 1000, 2),
+            }
+        )
+    return {
+        "steps": steps,
+        "max_deps": max_deps,
+        "runs": rows,
+        "mean_waves_over_critical": round(statistics.fmean(r["waves_ms"] / r["critical_path_ms"] for r in rows), 3),
+        "mean_eager_over_critical": round(statistics.fmean(r["eager_ms"] / r["critical_path_ms"] for r in rows), 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--max-deps", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--fast", type=float, default=0.01)
+    parser.add_argument("--slow", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = asyncio.run(
+        compare(
+            steps=args.steps,
+            max_deps=args.max_deps,
+            runs=args.runs,
+            fast_s=args.fast,
+            slow_s=args.slow,
+            seed=args.seed,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
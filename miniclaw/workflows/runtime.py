@@ -3,13 +3,18 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import json
 import time
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Literal
 
+from loguru import logger
+
+from miniclaw.workflows.store import WorkflowRunStore, WorkflowStepCache
+
 
 @dataclass
 class WorkflowStep:
@@ -22,9 +27,13 @@ class WorkflowStep:
     require_approval: bool = False
     on_failure: Literal["stop", "continue"] = "stop"
     depends_on: list[str] = field(default_factory=list)
+    # "step": own session per run, "run": one session shared by the run's
+    # "run" steps, "shared": one session per step id across all runs.
+    session: Literal["step", "run", "shared"] = "step"
+    cache_ttl_s: int = 0  # > 0 opts the step into the step cache
 
     @classmethod
-    def from_dict(cls, data: dict[str, Any], *, index: int) -> "WorkflowStep":
+    def from_dict(cls, data: dict[str, Any], *, index: int, default_cache_ttl_s: int = 0) -> "WorkflowStep":
         raw_deps = data.get("depends_on", data.get("dependsOn", []))
         if isinstance(raw_deps, str):
             deps = [raw_deps.strip()] if raw_deps.strip() else []
@@ -41,6 +50,8 @@ class WorkflowStep:
             require_approval=bool(data.get("require_approval", data.get("requireApproval", False))),
             on_failure=str(data.get("on_failure", data.get("onFailure", "stop")) or "stop").lower(),
             depends_on=deps,
+            session=str(data.get("session") or "step").strip().lower(),
+            cache_ttl_s=max(0, int(data.get("cache_ttl_s", data.get("cacheTtlS", default_cache_ttl_s)) or 0)),
         )
 
 
@@ -53,6 +64,8 @@ class WorkflowRecipe:
     metadata: dict[str, Any] = field(default_factory=dict)
     mode: Literal["linear", "dag"] = "linear"
     max_parallel: int = 4
+    memoize: bool = False  # Serve every step whose rendered prompt is unchanged from the step cache
+    version: str = ""  # Part of the step cache key; bump it to invalidate cached outputs
 
     @classmethod
     def from_dict(cls, data: dict[str, Any], *, fallback_name: str = "workflow") -> "WorkflowRecipe":
@@ -61,7 +74,12 @@ class WorkflowRecipe:
         if not isinstance(raw_steps, list):
             raise ValueError("Workflow recipe requires a list field 'steps'.")
 
-        steps = [WorkflowStep.from_dict(step, index=i + 1) for i, step in enumerate(raw_steps) if isinstance(step, dict)]
+        default_ttl = max(0, int(data.get("cache_ttl_s", data.get("cacheTtlS", 0)) or 0))
+        steps = [
+            WorkflowStep.from_dict(step, index=i + 1, default_cache_ttl_s=default_ttl)
+            for i, step in enumerate(raw_steps)
+            if isinstance(step, dict)
+        ]
         if not steps:
             raise ValueError("Workflow recipe has no valid steps.")
 
@@ -74,6 +92,8 @@ class WorkflowRecipe:
             seen_ids.add(step.id)
             if step.on_failure not in {"stop", "continue"}:
                 step.on_failure = "stop"
+            if step.session not in {"step", "run", "shared"}:
+                step.session = "step"
             step.depends_on = list(dict.fromkeys(step.depends_on))
 
         raw_mode = str(data.get("mode") or "").strip().lower()
@@ -93,11 +113,16 @@ class WorkflowRecipe:
             metadata=dict(data.get("metadata") or {}),
             mode=mode,
             max_parallel=max_parallel,
+            memoize=bool(data.get("memoize", False)),
+            version=str(data.get("version") or ""),
         )
         recipe._validate_dependencies()
         recipe._ensure_acyclic()
         return recipe
 
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
     def _validate_dependencies(self) -> None:
         ids = {step.id for step in self.steps}
         for step in self.steps:
@@ -135,6 +160,13 @@ class LinearWorkflowRuntime:
         recipe_root: Path | None = None,
         approval_session_key: str = "dashboard:approvals",
         approval_timeout_s: float = 300.0,
+        dag_scheduler: Literal["eager", "waves"] = "eager",
+        keep_run_sessions: bool = False,
+        run_store: WorkflowRunStore | None = None,
+        step_cache: WorkflowStepCache | None = None,
+        usage_tracker: Any | None = None,
+        default_model: str = "",
+        record_for_replay: bool = False,
     ):
         self.agent_runtime = agent_runtime
         self.bus = bus
@@ -142,7 +174,25 @@ class LinearWorkflowRuntime:
         self.recipe_root = Path(recipe_root) if recipe_root else None
         self.approval_session_key = approval_session_key
         self.approval_timeout_s = max(1.0, float(approval_timeout_s))
-        self._approval_lock = asyncio.Lock()
+        self.dag_scheduler = dag_scheduler if dag_scheduler in {"eager", "waves"} else "eager"
+        self.keep_run_sessions = keep_run_sessions
+        # Approvals are sequential within a run but independent across runs.
+        self._approval_locks: dict[str, asyncio.Lock] = {}
+        self._approval_keys: dict[str, str] = {}
+        self.run_store = run_store
+        if run_store is not None:
+            # With the owner lock, anything still "running" was cut off by a restart.
+            interrupted = run_store.mark_interrupted()
+            if interrupted:
+                logger.info(f"Marked {interrupted} workflow run(s) left running by a previous process as interrupted")
+        self._runs: dict[str, dict[str, Any]] = {}
+        self._background: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self.step_cache = step_cache
+        self.usage_tracker = usage_tracker
+        # Model used in cache keys when there is no override and no agent to ask.
+        self.default_model = default_model
+        # Also record steps that did not opt in to caching, so `--replay` can serve them.
+        self.record_for_replay = record_for_replay
 
     def load_recipe(self, name_or_path: str | Path) -> WorkflowRecipe:
         path = self._resolve_recipe_path(name_or_path)
@@ -157,28 +207,228 @@ class LinearWorkflowRuntime:
         channel: str = "system",
         chat_id: str = "workflow",
         model_override: str | None = None,
+        approval_session_key: str | None = None,
+        memoize: bool | None = None,
+        replay: bool = False,
+    ) -> dict[str, Any]:
+        """Run a recipe; concurrent runs of one recipe use separate sessions.
+
+        `approval_session_key` puts this run's approval prompts on its own
+        channel instead of the runtime-wide one. `memoize` (default: the
+        recipe's setting) serves steps whose rendered prompt and model are
+        unchanged from the step cache, whether or not they set
+        ``cache_ttl_s``. `replay` serves every step from the
+        step cache, expired entries included, without calling the agent or
+        asking for approvals; a step with no cached output fails.
+        """
+        state = self._new_state(
+            recipe,
+            vars=vars,
+            channel=channel,
+            chat_id=chat_id,
+            model_override=model_override,
+            approval_session_key=approval_session_key,
+            memoize=recipe.memoize if memoize is None else memoize,
+            replay=replay,
+        )
+        return await self._run(recipe, state)
+
+    def start_recipe(self, recipe: WorkflowRecipe, **kwargs: Any) -> str:
+        """Start `run_recipe` in the background and return the run id."""
+        state = self._new_state(
+            recipe,
+            vars=kwargs.get("vars"),
+            channel=kwargs.get("channel", "system"),
+            chat_id=kwargs.get("chat_id", "workflow"),
+            model_override=kwargs.get("model_override"),
+            approval_session_key=kwargs.get("approval_session_key"),
+            memoize=recipe.memoize if kwargs.get("memoize") is None else bool(kwargs["memoize"]),
+            replay=bool(kwargs.get("replay", False)),
+        )
+        return self._spawn(recipe, state)
+
+    async def resume_run(self, run_id: str, *, background: bool = False) -> dict[str, Any]:
+        """Continue a checkpointed run, skipping the steps that already succeeded.
+
+        Failed, blocked and skipped steps run again. Raises KeyError for an
+        unknown run and ValueError if the run is active or completed.
+        """
+        if run_id in self._runs:
+            raise ValueError(f"Workflow run {run_id} is already running.")
+        state = self.run_store.get(run_id) if self.run_store else None
+        if state is None:
+            raise KeyError(f"Workflow run not found: {run_id}")
+        if state.get("status") == "completed":
+            raise ValueError(f"Workflow run {run_id} already completed.")
+        recipe = WorkflowRecipe.from_dict(state["recipe"])
+        state["status"] = "running"
+        state["resumes"] = int(state.get("resumes") or 0) + 1
+        if background:
+            self._spawn(recipe, state)
+            return {"id": run_id, "name": recipe.name, "status": "running"}
+        return await self._run(recipe, state)
+
+    def get_run(self, run_id: str) -> dict[str, Any] | None:
+        state = self._runs.get(run_id)
+        if state is not None:
+            return json.loads(json.dumps(state, default=str))
+        return self.run_store.get(run_id) if self.run_store else None
+
+    def list_runs(self, *, status: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        if self.run_store is not None:
+            return self.run_store.list_runs(status=status, limit=limit)
+        rows = [
+            {
+                "run_id": state["run_id"],
+                "recipe": state["recipe"]["name"],
+                "status": state["status"],
+                "created_at": state["created_at"],
+                "updated_at": state.get("updated_at", state["created_at"]),
+            }
+            for state in self._runs.values()
+            if not status or state["status"] == status
+        ]
+        return sorted(rows, key=lambda row: row["created_at"], reverse=True)[:limit]
+
+    def _new_state(
+        self,
+        recipe: WorkflowRecipe,
+        *,
+        vars: dict[str, Any] | None,
+        channel: str,
+        chat_id: str,
+        model_override: str | None,
+        approval_session_key: str | None,
+        memoize: bool,
+        replay: bool = False,
     ) -> dict[str, Any]:
-        run_id = f"wf_{uuid.uuid4().hex[:12]}"
         scoped_vars = dict(vars or {})
         scoped_vars.setdefault("workflow_name", recipe.name)
+        return {
+            "run_id": f"wf_{uuid.uuid4().hex[:12]}",
+            "recipe": recipe.to_dict(),
+            "status": "running",
+            "channel": channel,
+            "chat_id": chat_id,
+            "model_override": model_override,
+            "approval_session_key": approval_session_key,
+            "memoize": bool(memoize),
+            "replay": bool(replay),
+            "scoped_vars": scoped_vars,
+            "steps": {},
+            "created_at": time.time(),
+        }
+
+    def _spawn(self, recipe: WorkflowRecipe, state: dict[str, Any]) -> str:
+        run_id = state["run_id"]
+        self._runs[run_id] = state  # visible to get_run before the task starts
+        task = asyncio.create_task(self._run(recipe, state))
+        self._background[run_id] = task
+        task.add_done_callback(lambda _: self._background.pop(run_id, None))
+        return run_id
+
+    async def _run(self, recipe: WorkflowRecipe, state: dict[str, Any]) -> dict[str, Any]:
+        run_id = state["run_id"]
+        self._runs[run_id] = state
+        self._approval_locks[run_id] = asyncio.Lock()
+        self._approval_keys[run_id] = state.get("approval_session_key") or self.approval_session_key
+        done = {
+            step_id: record
+            for step_id, record in state["steps"].items()
+            if record.get("status") == "ok"
+        }
+        state["steps"] = dict(done)
+        cache_stats = state.setdefault("cache", {"hits": 0, "misses": 0, "tokens_saved": 0})
+        cache_before = dict(cache_stats)
+        self._save(state)
 
         if recipe.mode == "dag":
-            return await self._run_dag_recipe(
+            run = self._run_dag_waves if self.dag_scheduler == "waves" else self._run_dag_recipe
+        else:
+            run = self._run_linear_recipe
+        try:
+            result = await run(
                 recipe=recipe,
                 run_id=run_id,
-                scoped_vars=scoped_vars,
-                channel=channel,
-                chat_id=chat_id,
-                model_override=model_override,
+                scoped_vars=state["scoped_vars"],
+                channel=state["channel"],
+                chat_id=state["chat_id"],
+                model_override=state.get("model_override"),
+                done=done,
             )
-        return await self._run_linear_recipe(
-            recipe=recipe,
-            run_id=run_id,
-            scoped_vars=scoped_vars,
-            channel=channel,
-            chat_id=chat_id,
-            model_override=model_override,
-        )
+            if self.step_cache is not None or state.get("replay"):
+                result["cache"] = dict(cache_stats)
+            state["status"] = result["status"]
+            state["steps"] = {row["id"]: row for row in result["steps"]}
+            state["result"] = result
+            return result
+        except BaseException as exc:
+            # Cancelled or crashed runs stay resumable from their last checkpoint.
+            state["status"] = "interrupted"
+            state["error"] = str(exc) or type(exc).__name__
+            raise
+        finally:
+            self._record_cache_usage(recipe, state, cache_before)
+            self._save(state)
+            if self.run_store is not None:
+                self.run_store.prune()
+            self._runs.pop(run_id, None)
+            self._approval_locks.pop(run_id, None)
+            self._approval_keys.pop(run_id, None)
+            if not self.keep_run_sessions and state["status"] != "interrupted":
+                self._drop_run_sessions(recipe, run_id, channel=state["channel"], chat_id=state["chat_id"])
+
+    def _record_cache_usage(self, recipe: WorkflowRecipe, state: dict[str, Any], before: dict[str, int]) -> None:
+        """Report this attempt's step-cache hits, misses and saved tokens."""
+        delta = {key: int(state["cache"].get(key, 0)) - int(before.get(key, 0)) for key in before}
+        if self.usage_tracker is None or not (delta["hits"] or delta["misses"]):
+            return
+        try:
+            self.usage_tracker.record(
+                source="workflow_cache",
+                model=state.get("cache_model") or state.get("model_override") or self.default_model,
+                run_id=state["run_id"],
+                session_key=f"workflow:{recipe.name}",
+                metadata={"recipe": recipe.name, "replay": bool(state.get("replay")), **delta},
+            )
+        except Exception as exc:
+            logger.debug(f"Usage tracking failed for workflow run {state['run_id']}: {exc}")
+
+    def _save(self, state: dict[str, Any]) -> None:
+        if self.run_store is None:
+            return
+        try:
+            self.run_store.save(state)
+        except Exception as exc:
+            logger.warning(f"Failed to checkpoint workflow run {state['run_id']}: {exc}")
+
+    def _checkpoint(self, run_id: str, record: dict[str, Any]) -> None:
+        """Persist a finished step (scoped vars are shared with the live state)."""
+        state = self._runs.get(run_id)
+        if state is None:
+            return
+        state["steps"][record["id"]] = record
+        self._save(state)
+
+    @staticmethod
+    def step_session_key(recipe: WorkflowRecipe, step: WorkflowStep, run_id: str) -> str:
+        if step.session == "shared":
+            return f"workflow:{recipe.name}:{step.id}"
+        if step.session == "run":
+            return f"workflow:{recipe.name}:{run_id}"
+        return f"workflow:{recipe.name}:{run_id}:{step.id}"
+
+    def _drop_run_sessions(self, recipe: WorkflowRecipe, run_id: str, *, channel: str, chat_id: str) -> None:
+        # AgentRouter namespaces session keys per agent, so deletes go through the runtime.
+        delete = getattr(self.agent_runtime, "delete_session", None)
+        if delete is None:
+            return
+        keys = {self.step_session_key(recipe, step, run_id) for step in recipe.steps if step.session != "shared"}
+        for key in keys:
+            try:
+                delete(key, channel=channel, chat_id=chat_id)
+            except Exception:
+                continue
 
     async def _run_linear_recipe(
         self,
@@ -189,12 +439,17 @@ class LinearWorkflowRuntime:
         channel: str,
         chat_id: str,
         model_override: str | None,
+        done: dict[str, dict[str, Any]] | None = None,
     ) -> dict[str, Any]:
         started = time.time()
         records: list[dict[str, Any]] = []
         final_status = "completed"
 
+        done = done or {}
         for step in recipe.steps:
+            if step.id in done:
+                records.append(done[step.id])
+                continue
             record = await self._execute_step(
                 run_id=run_id,
                 recipe=recipe,
@@ -205,9 +460,11 @@ class LinearWorkflowRuntime:
                 model_override=model_override,
             )
             records.append(record)
-
             if record["status"] == "ok":
                 scoped_vars[f"{step.id}_output"] = record.get("output", "")
+            self._checkpoint(run_id, record)
+
+            if record["status"] == "ok":
                 continue
             if record["status"] == "blocked":
                 final_status = "blocked"
@@ -234,14 +491,144 @@ class LinearWorkflowRuntime:
         channel: str,
         chat_id: str,
         model_override: str | None,
+        done: dict[str, dict[str, Any]] | None = None,
     ) -> dict[str, Any]:
+        """Start every step as soon as its last dependency finishes.
+
+        Each step keeps a counter of unfinished dependencies; a finished step
+        decrements its dependents and those reaching zero become ready (in
+        recipe order), so a slow branch never holds back an unrelated one.
+        At most `recipe.max_parallel` steps run at once.
+        """
         started = time.time()
         step_map = {step.id: step for step in recipe.steps}
         step_order = [step.id for step in recipe.steps]
         order_index = {step_id: idx for idx, step_id in enumerate(step_order)}
+        records_by_id: dict[str, dict[str, Any]] = dict(done or {})
+        dependents: dict[str, list[str]] = {step_id: [] for step_id in step_order}
+        remaining: dict[str, int] = {}
+        for step in recipe.steps:
+            remaining[step.id] = sum(1 for dep in step.depends_on if dep not in records_by_id)
+            for dep in step.depends_on:
+                dependents[dep].append(step.id)
+
+        ready = [
+            (order_index[step_id], step_id)
+            for step_id in step_order
+            if remaining[step_id] == 0 and step_id not in records_by_id
+        ]
+        running: dict[asyncio.Task[dict[str, Any]], str] = {}
+        final_status = "completed"
+        stop_requested = False
 
-        records_by_id: dict[str, dict[str, Any]] = {}
-        pending: set[str] = set(step_order)
+        def resolve(step_id: str) -> None:
+            """Release dependents of a step that has a record."""
+            nonlocal final_status
+            for child_id in dependents[step_id]:
+                remaining[child_id] -= 1
+                if remaining[child_id] or child_id in records_by_id:
+                    continue
+                child = step_map[child_id]
+                failed_dep = next(
+                    (dep for dep in child.depends_on if records_by_id[dep].get("status") != "ok"),
+                    "",
+                )
+                if not failed_dep:
+                    heapq.heappush(ready, (order_index[child_id], child_id))
+                    continue
+                records_by_id[child_id] = {
+                    "id": child_id,
+                    "attempts": 0,
+                    "status": "skipped",
+                    "reason": "dependency_failed",
+                    "dependency": failed_dep,
+                    "output": "",
+                }
+                if final_status == "completed":
+                    final_status = "failed"
+                resolve(child_id)
+
+        try:
+            while ready or running:
+                while ready and not stop_requested and len(running) < recipe.max_parallel:
+                    _, step_id = heapq.heappop(ready)
+                    task = asyncio.create_task(
+                        self._execute_step(
+                            run_id=run_id,
+                            recipe=recipe,
+                            step=step_map[step_id],
+                            scoped_vars=scoped_vars,
+                            channel=channel,
+                            chat_id=chat_id,
+                            model_override=model_override,
+                        )
+                    )
+                    running[task] = step_id
+                if not running:
+                    break
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(finished, key=lambda t: order_index[running[t]]):
+                    step_id = running.pop(task)
+                    record = task.result()
+                    records_by_id[step_id] = record
+                    status = str(record.get("status") or "")
+                    if status == "ok":
+                        scoped_vars[f"{step_id}_output"] = record.get("output", "")
+                    self._checkpoint(run_id, record)
+                    if status == "blocked":
+                        if step_map[step_id].on_failure == "stop":
+                            final_status = "blocked"
+                            stop_requested = True
+                        elif final_status == "completed":
+                            final_status = "failed"
+                    elif status == "failed":
+                        if final_status == "completed":
+                            final_status = "failed"
+                        if step_map[step_id].on_failure == "stop":
+                            stop_requested = True
+                    resolve(step_id)
+        finally:
+            for task in running:
+                task.cancel()
+
+        for step_id in step_order:
+            if step_id not in records_by_id:
+                records_by_id[step_id] = {
+                    "id": step_id,
+                    "attempts": 0,
+                    "status": "skipped",
+                    "reason": "workflow_stopped",
+                    "output": "",
+                }
+        records = [records_by_id[step_id] for step_id in step_order]
+        return self._build_result(
+            run_id=run_id,
+            recipe=recipe,
+            status=final_status,
+            records=records,
+            started=started,
+        )
+
+    async def _run_dag_waves(
+        self,
+        *,
+        recipe: WorkflowRecipe,
+        run_id: str,
+        scoped_vars: dict[str, Any],
+        channel: str,
+        chat_id: str,
+        model_override: str | None,
+        done: dict[str, dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        started = time.time()
+        step_map = {step.id: step for step in recipe.steps}
+        step_order = [step.id for step in recipe.steps]
+        order_index = {step_id: idx for idx, step_id in enumerate(step_order)}
+
+        # Baseline scheduler: runs every ready step as one wave and waits for
+        # the whole wave before recomputing readiness.
+        records_by_id: dict[str, dict[str, Any]] = dict(done or {})
+        pending: set[str] = set(step_order) - set(records_by_id)
         final_status = "completed"
         stop_requested = False
         semaphore = asyncio.Semaphore(recipe.max_parallel)
@@ -327,6 +714,8 @@ class LinearWorkflowRuntime:
                 status = str(record.get("status") or "")
                 if status == "ok":
                     scoped_vars[f"{step_id}_output"] = record.get("output", "")
+                self._checkpoint(run_id, record)
+                if status == "ok":
                     continue
                 if status == "blocked":
                     if step_map[step_id].on_failure == "stop":
@@ -365,8 +754,26 @@ class LinearWorkflowRuntime:
         if not rendered_prompt.strip():
             return {"id": step.id, "attempts": 0, "status": "skipped", "reason": "empty_prompt", "output": ""}
 
+        state = self._runs.get(run_id) or {}
+        cache_stats = state.setdefault("cache", {"hits": 0, "misses": 0, "tokens_saved": 0})
+        cache_key = None
+        session_key = self.step_session_key(recipe, step, run_id)
+        target, target_key = self._direct_target(session_key, channel=channel, chat_id=chat_id, content=rendered_prompt)
+        model = model_override or str(getattr(target, "model", "") or self.default_model)
+        state["cache_model"] = model
+        if self.step_cache is not None:
+            cache_key = WorkflowStepCache.make_key(recipe.name, recipe.version, step.id, rendered_prompt, model)
+        if state.get("replay"):
+            entry = self.step_cache.get(cache_key, include_expired=True) if cache_key else None
+            if entry is None:
+                cache_stats["misses"] += 1
+                return {"id": step.id, "attempts": 0, "status": "failed", "reason": "cache_miss", "output": ""}
+            cache_stats["hits"] += 1
+            cache_stats["tokens_saved"] += int(entry["total_tokens"])
+            return {"id": step.id, "attempts": 0, "status": "ok", "output": entry["output"], "cached": True}
+
         if step.require_approval:
-            async with self._approval_lock:
+            async with self._approval_locks.setdefault(run_id, asyncio.Lock()):
                 approved = await self._wait_for_approval(
                     run_id=run_id,
                     recipe=recipe,
@@ -382,30 +789,72 @@ class LinearWorkflowRuntime:
                     "output": "",
                 }
 
+        # Memoized runs reuse outputs of steps that did not opt in to caching too.
+        if cache_key is not None and (step.cache_ttl_s > 0 or state.get("memoize")):
+            entry = self.step_cache.get(cache_key)
+            if entry is not None:
+                cache_stats["hits"] += 1
+                cache_stats["tokens_saved"] += int(entry["total_tokens"])
+                return {"id": step.id, "attempts": 0, "status": "ok", "output": entry["output"], "cached": True}
+            cache_stats["misses"] += 1
+
         step_record: dict[str, Any] = {
             "id": step.id,
             "attempts": 0,
             "status": "failed",
             "output": "",
         }
+        tokens = 0
         for attempt in range(1, step.retry_max_attempts + 1):
             step_record["attempts"] = attempt
             response = await self.agent_runtime.process_direct(
                 content=rendered_prompt,
-                session_key=f"workflow:{recipe.name}:{step.id}",
+                session_key=session_key,
                 channel=channel,
                 chat_id=chat_id,
                 model_override=model_override,
             )
+            tokens += self._last_run_tokens(target, target_key)
             if response and str(response).strip():
                 output = str(response).strip()
                 step_record["status"] = "ok"
                 step_record["output"] = output
+                if cache_key is not None and (
+                    step.cache_ttl_s > 0 or state.get("memoize") or self.record_for_replay
+                ):
+                    self.step_cache.put(
+                        cache_key,
+                        recipe=recipe.name,
+                        step_id=step.id,
+                        output=output,
+                        model=model,
+                        total_tokens=tokens,
+                        ttl_s=step.cache_ttl_s or None,
+                    )
                 return step_record
             if attempt < step.retry_max_attempts and step.retry_backoff_ms > 0:
                 await asyncio.sleep(step.retry_backoff_ms / 1000.0)
         return step_record
 
+    def _direct_target(self, session_key: str, *, channel: str, chat_id: str, content: str) -> tuple[Any, str]:
+        """The agent loop and session key that `process_direct` will use for a step."""
+        resolve = getattr(self.agent_runtime, "direct_target", None)
+        if resolve is None:
+            return self.agent_runtime, session_key
+        return resolve(session_key, channel=channel, chat_id=chat_id, content=content)
+
+    @staticmethod
+    def _last_run_tokens(loop: Any, session_key: str) -> int:
+        """Tokens of the agent run that just finished on `session_key`, if known."""
+        sessions = getattr(loop, "sessions", None)
+        if sessions is None:
+            return 0
+        try:
+            last_run = sessions.get_or_create(session_key).metadata.get("last_run") or {}
+        except Exception:
+            return 0
+        return int(last_run.get("usage_total_tokens") or 0)
+
     @staticmethod
     def _build_result(
         *,
@@ -490,12 +939,13 @@ class LinearWorkflowRuntime:
         if not self.bus or not hasattr(self.bus, "wait_for_response"):
             return True
 
+        session_key = self._approval_keys.get(run_id, self.approval_session_key)
         approval_id = f"approval_{uuid.uuid4().hex[:10]}"
         event = {
             "type": "workflow_approval",
             "id": approval_id,
             "run_id": run_id,
-            "session_key": self.approval_session_key,
+            "session_key": session_key,
             "workflow": recipe.name,
             "step_id": step.id,
             "prompt_preview": prompt[:500],
@@ -507,7 +957,7 @@ class LinearWorkflowRuntime:
             await self.bus.publish_approval(event)
 
         response = await self.bus.wait_for_response(
-            self.approval_session_key,
+            session_key,
             timeout=self.approval_timeout_s,
             approval_id=approval_id,
         )
@@ -516,6 +966,6 @@ class LinearWorkflowRuntime:
         if hasattr(self.bus, "resolve_pending_approval"):
             self.bus.resolve_pending_approval(
                 approval_id=approval_id,
-                session_key=self.approval_session_key,
+                session_key=session_key,
             )
         return approved
@@ -0,0 +1,279 @@
+"""Persistent workflow run checkpoints and the step output cache."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, TextIO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - unavailable on Windows.
+    fcntl = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    run_id TEXT PRIMARY KEY,
+    recipe TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_workflow_runs_created ON workflow_runs (created_at, run_id);
+CREATE INDEX IF NOT EXISTS idx_workflow_runs_status ON workflow_runs (status, created_at);
+-- Memoized outputs now live in the step cache.
+DROP TABLE IF EXISTS step_outputs;
+"""
+
+
+class WorkflowRunStore:
+    """SQLite store for workflow run state, checkpointed after every step.
+
+    A run row holds the recipe, vars, scoped vars and step records, so a
+    run interrupted by a restart can be resumed from its last checkpoint.
+    Step outputs reused across runs live in `WorkflowStepCache`.
+    """
+
+    def __init__(self, path: Path, max_runs: int = 500):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_runs = max(0, int(max_runs))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        self._owner_handle: TextIO | None = None
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+            if self._owner_handle is not None:
+                self._owner_handle.close()
+                self._owner_handle = None
+
+    def acquire_owner(self) -> bool:
+        """Hold the store's owner lock (``<path>.owner``) until `close`.
+
+        Only one open store at a time owns the database, so only the owner may
+        treat ``running`` rows as left behind by a dead process.
+        """
+        with self._lock:
+            if self._owner_handle is not None:
+                return True
+            if fcntl is None:
+                return True
+            handle = open(self.path.with_name(f"{self.path.name}.owner"), "a+", encoding="utf-8")
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            self._owner_handle = handle
+            return True
+
+    def save(self, state: dict[str, Any]) -> None:
+        now = time.time()
+        state["updated_at"] = now
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO workflow_runs (run_id, recipe, status, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(run_id) DO UPDATE SET "
+                "status = excluded.status, updated_at = excluded.updated_at, data = excluded.data",
+                (
+                    str(state["run_id"]),
+                    str(state.get("recipe", {}).get("name") or ""),
+                    str(state.get("status") or "running"),
+                    float(state.get("created_at") or now),
+                    now,
+                    json.dumps(state, ensure_ascii=False, default=str),
+                ),
+            )
+
+    def mark_interrupted(self, error: str = "process exited while the run was active") -> int:
+        """Flag runs left ``running`` by a previous process as resumable ``interrupted`` runs.
+
+        Does nothing unless this store can take the owner lock: while another
+        process has the database open, its running runs are live.
+        """
+        if not self.acquire_owner():
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE workflow_runs SET status = 'interrupted', "
+                "data = json_set(data, '$.status', 'interrupted', '$.error', ?) WHERE status = 'running'",
+                (error,),
+            )
+            return cursor.rowcount
+
+    def prune(self) -> int:
+        """Drop the oldest finished runs beyond `max_runs`."""
+        if not self.max_runs:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM workflow_runs WHERE run_id IN (SELECT run_id FROM workflow_runs "
+                "WHERE status != 'running' ORDER BY created_at DESC, run_id DESC LIMIT -1 OFFSET ?)",
+                (self.max_runs,),
+            )
+            return cursor.rowcount
+
+    def get(self, run_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM workflow_runs WHERE run_id = ?", (str(run_id),)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def list_runs(self, *, status: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        """Newest first; rows omit scoped vars and step outputs."""
+        sql = "SELECT run_id, recipe, status, created_at, updated_at FROM workflow_runs"
+        params: list[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC, run_id DESC LIMIT ?"
+        params.append(max(1, min(int(limit), 500)))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS step_cache (
+    key TEXT PRIMARY KEY,
+    recipe TEXT NOT NULL,
+    step_id TEXT NOT NULL,
+    output TEXT NOT NULL,
+    model TEXT NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_step_cache_recipe ON step_cache (recipe, step_id);
+"""
+
+
+class WorkflowStepCache:
+    """TTL- and size-bounded cache of workflow step outputs.
+
+    Entries are keyed on recipe name and version, step id, model and the
+    rendered prompt. This is the only store of reusable step outputs: steps
+    that opt in with ``cache_ttl_s`` and memoized runs both read from it.
+    Expired entries are misses for normal runs but stay
+    on disk (replays may still serve them) until eviction needs the room:
+    past `max_entries` or `max_bytes`, expired entries go first, then the
+    least recently used.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_entries: int = 2000,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl_s: float = 7 * 86400,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.default_ttl_s = max(1.0, float(default_ttl_s))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_CACHE_SCHEMA)
+
+    @staticmethod
+    def make_key(recipe: str, version: str, step_id: str, prompt: str, model: str | None = None) -> str:
+        parts = (recipe, version, step_id, model or "", prompt)
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str, *, include_expired: bool = False) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT output, model, total_tokens, created_at, expires_at FROM step_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or (row["expires_at"] <= now and not include_expired):
+                return None
+            self._conn.execute("UPDATE step_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        return dict(row)
+
+    def put(
+        self,
+        key: str,
+        *,
+        recipe: str,
+        step_id: str,
+        output: str,
+        model: str = "",
+        total_tokens: int = 0,
+        ttl_s: float | None = None,
+    ) -> None:
+        now = time.time()
+        ttl = self.default_ttl_s if not ttl_s or ttl_s <= 0 else float(ttl_s)
+        size = len(output.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO step_cache "
+                "(key, recipe, step_id, output, model, total_tokens, size, created_at, expires_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, recipe, step_id, output, model or "", max(0, int(total_tokens)), size, now, now + ttl, now),
+            )
+            self._evict_locked(now)
+
+    def evict(self) -> int:
+        with self._lock, self._conn:
+            return self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float) -> int:
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM step_cache").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return 0
+        victims: list[str] = []
+        rows = self._conn.execute(
+            "SELECT key, size FROM step_cache ORDER BY expires_at > ?, last_used_at, created_at",
+            (now,),
+        ).fetchall()
+        for row in rows:
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            victims.append(row["key"])
+            count -= 1
+            size -= row["size"]
+        self._conn.executemany("DELETE FROM step_cache WHERE key = ?", [(key,) for key in victims])
+        return len(victims)
+
+    def clear(self, recipe: str | None = None) -> int:
+        with self._lock, self._conn:
+            if recipe:
+                cursor = self._conn.execute("DELETE FROM step_cache WHERE recipe = ?", (recipe,))
+            else:
+                cursor = self._conn.execute("DELETE FROM step_cache")
+            return cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes, "
+                "COALESCE(SUM(expires_at <= ?), 0) AS expired FROM step_cache",
+                (now,),
+            ).fetchone()
+        return {**dict(row), "max_entries": self.max_entries, "max_bytes": self.max_bytes}
@@ -80,20 +80,17 @@ async def _wait_until(predicate, timeout_s: float = 1.0) -> None:
     raise AssertionError("Timed out waiting for condition")
 
 
-def test_agents_config_validates_max_three_instances() -> None:
-    with pytest.raises(ValidationError):
-        Config.model_validate(
-            {
-                "agents": {
-                    "instances": [
-                        {"id": "default"},
-                        {"id": "a"},
-                        {"id": "b"},
-                        {"id": "c"},
-                    ]
-                }
+def test_agents_config_allows_many_instances_and_replicas() -> None:
+    config = Config.model_validate(
+        {
+            "agents": {
+                "instances": [{"id": "default", "replicas": 4}] + [{"id": f"a{i}"} for i in range(10)],
+                "routing": {"rules": [{"agent": "a9", "channel": "telegram"}]},
             }
-        )
+        }
+    )
+    assert len(config.agents.instances) == 11
+    assert config.agents.instances[0].replicas == 4
 
 
 def test_agents_config_requires_default_when_instances_present() -> None:
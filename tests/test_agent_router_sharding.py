@@ -0,0 +1,168 @@
+import asyncio
+import random
+from contextlib import suppress
+from pathlib import Path
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.agent.router import AgentRouter
+from miniclaw.bus.events import InboundMessage
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import AgentRoutingRule
+from miniclaw.providers.base import LLMProvider, LLMResponse
+
+
+class _FakeAgent:
+    def __init__(self, agent_id: str):
+        self.agent_id = agent_id
+        self.inbound: list[InboundMessage] = []
+
+    def submit_inbound(self, msg: InboundMessage, publish_outbound: bool = True) -> str:
+        self.inbound.append(msg)
+        return f"{self.agent_id}-{len(self.inbound)}"
+
+    def stop(self) -> None:
+        pass
+
+
+def _linear_match(rules: list[AgentRoutingRule], msg: InboundMessage) -> str | None:
+    def ok(value, actual):
+        return value is None or actual in (value if isinstance(value, list) else [value])
+
+    for rule in rules:
+        is_group = bool((msg.metadata or {}).get("is_group"))
+        if (
+            ok(rule.channel, msg.channel)
+            and ok(rule.chat_id, msg.chat_id)
+            and ok(rule.sender_id, msg.sender_id)
+            and (rule.is_group is None or rule.is_group == is_group)
+        ):
+            return rule.agent
+    return None
+
+
+def test_many_agents_and_indexed_rules_match_linear_order() -> None:
+    rng = random.Random(3)
+    agents = {"default": _FakeAgent("default"), **{f"a{i}": _FakeAgent(f"a{i}") for i in range(12)}}
+    channels, chats, senders = ["telegram", "whatsapp", "cli"], [str(i) for i in range(8)], ["u1", "u2", "u3"]
+
+    def pick(values):
+        roll = rng.random()
+        if roll < 0.5:
+            return None
+        return rng.sample(values, 2) if roll < 0.7 else rng.choice(values)
+
+    rules = [
+        AgentRoutingRule(
+            agent=rng.choice(list(agents)),
+            channel=pick(channels),
+            chat_id=pick(chats),
+            sender_id=pick(senders),
+            is_group=rng.choice([None, None, True, False]),
+        )
+        for _ in range(60)
+    ]
+    router = AgentRouter(bus=MessageBus(), agents=agents, routing_rules=rules)
+    for _ in range(500):
+        msg = InboundMessage(
+            channel=rng.choice(channels),
+            sender_id=rng.choice(senders),
+            chat_id=rng.choice(chats),
+            content="x",
+            metadata={"is_group": rng.random() < 0.5},
+        )
+        rule = router._match_rule(msg)
+        assert (rule.agent if rule else None) == _linear_match(rules, msg)
+
+
+def test_session_bindings_are_lru_bounded() -> None:
+    router = AgentRouter(
+        bus=MessageBus(),
+        agents={"default": _FakeAgent("default"), "helper": _FakeAgent("helper")},
+        routing_rules=[AgentRoutingRule(agent="helper", channel="telegram")],
+        max_session_bindings=2,
+    )
+
+    def resolve(key: str) -> str:
+        channel, chat_id = key.split(":")
+        msg = InboundMessage(channel=channel, sender_id="u", chat_id=chat_id, content="x")
+        return router._resolve_agent_id(msg=msg, binding_key=key)
+
+    assert resolve("telegram:1") == "helper"
+    resolve("telegram:2")
+    resolve("telegram:1")  # refreshes telegram:1
+    resolve("cli:3")
+    assert list(router._session_bindings) == ["telegram:1", "cli:3"]
+
+
+def test_consistent_hash_spreads_and_keeps_sessions_on_replicas() -> None:
+    primary, *extra = [_FakeAgent(f"r{i}") for i in range(4)]
+    router = AgentRouter(bus=MessageBus(), agents={"default": primary}, replicas={"default": extra})
+    keys = [f"agent:default:telegram:{i}" for i in range(2000)]
+    owners = {key: router.loop_for("default", key).agent_id for key in keys}
+
+    counts = {agent_id: list(owners.values()).count(agent_id) for agent_id in ("r0", "r1", "r2", "r3")}
+    assert all(300 < n < 700 for n in counts.values()), counts
+    assert all(router.loop_for("default", key).agent_id == owners[key] for key in keys)
+
+    # A fifth replica takes roughly a fifth of the sessions and leaves the rest in place.
+    grown = AgentRouter(
+        bus=MessageBus(), agents={"default": primary}, replicas={"default": extra + [_FakeAgent("r4")]}
+    )
+    moved = [key for key in keys if grown.loop_for("default", key).agent_id != owners[key]]
+    assert all(grown.loop_for("default", key).agent_id == "r4" for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.3
+    assert grown.replica_counts() == {"default": 5}
+
+
+async def test_router_dispatches_each_chat_to_one_replica() -> None:
+    bus = MessageBus()
+    replicas = [_FakeAgent(f"r{i}") for i in range(3)]
+    router = AgentRouter(bus=bus, agents={"default": replicas[0]}, replicas={"default": replicas[1:]})
+    task = asyncio.create_task(router.run())
+    try:
+        for round_ in range(3):
+            for chat in range(10):
+                await bus.publish_inbound(
+                    InboundMessage(channel="telegram", sender_id="u", chat_id=str(chat), content=f"m{round_}")
+                )
+        for _ in range(100):
+            if sum(len(agent.inbound) for agent in replicas) == 30:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        router.stop()
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    seen: dict[str, str] = {}
+    for agent in replicas:
+        for msg in agent.inbound:
+            assert seen.setdefault(msg.chat_id, agent.agent_id) == agent.agent_id
+    assert len(seen) == 10
+    assert len({agent_id for agent_id in seen.values()}) > 1
+
+
+class _EchoProvider(LLMProvider):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        return LLMResponse(content=f"echo {messages[-1]['content']}")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_replicas_share_one_session_cache(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    bus = MessageBus()
+    primary = AgentLoop(bus=bus, provider=_EchoProvider(), workspace=tmp_path)
+    replicas = [
+        AgentLoop(bus=bus, provider=_EchoProvider(), workspace=tmp_path, session_manager=primary.sessions)
+        for _ in range(2)
+    ]
+    router = AgentRouter(bus=bus, agents={"default": primary}, replicas={"default": replicas})
+    key = next(f"cli:{i}" for i in range(100) if router.loop_for("default", f"cli:{i}") is not primary)
+
+    # The dashboard reads through the primary loop and may have cached the session already.
+    assert primary.sessions.get_or_create(key).messages == []
+    await router.loop_for("default", key).process_direct("hello", session_key=key)
+    assert [m["content"] for m in primary.sessions.get_or_create(key).messages] == ["hello", "echo hello"]
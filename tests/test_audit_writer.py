@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import time
+
+from miniclaw.audit.logger import AuditLogger, audit_log_files
+
+# Minimum buffered enqueue throughput (entries/second); override on slow CI machines.
+DEFAULT_MIN_BUFFERED_EPS = 20_000
+
+
+def _rows(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+async def test_buffered_writer_flushes_on_interval_and_stop(tmp_path) -> None:
+    log_path = tmp_path / "audit.log"
+    audit = AuditLogger(log_path, flush_interval_ms=20, batch_size=1000)
+    await audit.start()
+    for i in range(5):
+        audit.log_event("tick", {"i": i})
+    assert not log_path.exists() or _rows(log_path) == []
+
+    await asyncio.sleep(0.15)
+    assert [row["data"]["i"] for row in _rows(log_path)] == [0, 1, 2, 3, 4]
+
+    audit.log_event("last")
+    await audit.stop()
+    assert _rows(log_path)[-1]["event"] == "last"
+    assert not audit.buffered
+
+
+async def test_batch_size_triggers_early_flush(tmp_path) -> None:
+    log_path = tmp_path / "audit.log"
+    audit = AuditLogger(log_path, flush_interval_ms=60_000, batch_size=10, fsync_interval_ms=0)
+    await audit.start()
+    for i in range(10):
+        audit.log_message("inbound", "cli", length=i)
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if log_path.exists() and len(_rows(log_path)) == 10:
+            break
+    assert len(_rows(log_path)) == 10
+    assert audit.stats["batches"] == 1
+    assert audit.stats["fsyncs"] >= 1
+    await audit.stop()
+
+
+async def test_size_rotation_keeps_backup_count(tmp_path) -> None:
+    log_path = tmp_path / "audit.log"
+    audit = AuditLogger(log_path, flush_interval_ms=5, batch_size=1, max_bytes=400, backup_count=2)
+    await audit.start()
+    for i in range(40):
+        audit.log_event("e", {"i": i, "pad": "x" * 40})
+        await asyncio.sleep(0)
+    await audit.stop()
+
+    files = audit_log_files(log_path)
+    assert files[-1] == log_path
+    assert len(files) <= 3
+    assert audit.stats["rotations"] >= 2
+    assert all(path.stat().st_size <= 400 for path in files)
+    seen = [row["data"]["i"] for path in files for row in _rows(path)]
+    assert seen == sorted(seen) and seen[-1] == 39
+
+
+def test_flush_writes_pending_entries_without_loop(tmp_path) -> None:
+    log_path = tmp_path / "audit.log"
+    audit = AuditLogger(log_path)
+    audit._buffer.append(json.dumps({"type": "event", "event": "pending"}) + "\n")
+    audit.flush()
+    audit.close()
+    assert _rows(log_path)[0]["event"] == "pending"
+
+
+async def test_remove_entries_covers_buffered_and_concurrent_appends(tmp_path) -> None:
+    log_path = tmp_path / "audit.log"
+    audit = AuditLogger(log_path, flush_interval_ms=1, batch_size=1)
+    await audit.start()
+    for i in range(200):
+        audit.log_event("e", {"i": i, "old": i % 2 == 0})
+
+    async def keep_logging() -> None:
+        for i in range(200, 400):
+            audit.log_event("e", {"i": i, "old": False})
+            await asyncio.sleep(0)
+
+    writer = asyncio.create_task(keep_logging())
+    removed = await asyncio.to_thread(audit.remove_entries, lambda row: row["data"]["old"])
+    await writer
+    await audit.stop()
+
+    assert removed == 100
+    seen = [row["data"]["i"] for path in audit_log_files(log_path) for row in _rows(path)]
+    assert seen == [i for i in range(400) if i >= 200 or i % 2]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+async def test_buffered_throughput_beats_write_through(tmp_path) -> None:
+    n = 5000
+    min_eps = int(os.environ.get("MINICLAW_AUDIT_MIN_EPS", DEFAULT_MIN_BUFFERED_EPS))
+
+    direct = AuditLogger(tmp_path / "direct.log")
+    started = time.perf_counter()
+    for i in range(n):
+        direct.log_tool("exec", params={"cmd": "ls"}, duration_ms=1.0)
+    direct_s = time.perf_counter() - started
+
+    buffered = AuditLogger(tmp_path / "buffered.log", flush_interval_ms=50, batch_size=512, fsync_interval_ms=-1)
+    await buffered.start()
+    started = time.perf_counter()
+    for i in range(n):
+        buffered.log_tool("exec", params={"cmd": "ls"}, duration_ms=1.0)
+    buffered_s = time.perf_counter() - started
+    await buffered.stop()
+
+    assert len(_rows(tmp_path / "buffered.log")) == n
+    assert n / buffered_s >= min_eps, f"buffered audit throughput {n / buffered_s:.0f}/s below {min_eps}/s"
+    assert buffered_s < direct_s
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from miniclaw.cron.service import CronService
+from miniclaw.cron.types import CronJob, CronSchedule
+
+
+def _due_now(service: CronService) -> None:
+    now = int(time.time() * 1000)
+    for job in service.list_jobs():
+        job.state.next_run_at_ms = now - 1
+        service._schedule(job)
+
+
+async def _wait_idle(service: CronService, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while (service._active or service._queued) and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+
+async def test_due_jobs_run_concurrently_under_global_limit(tmp_path: Path) -> None:
+    running = 0
+    peak = 0
+
+    async def on_job(job: CronJob) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.1)
+        running -= 1
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.json", on_job=on_job, max_concurrent=3)
+    for i in range(6):
+        service.add_job(name=f"j{i}", schedule=CronSchedule(kind="every", every_ms=60_000), message="hi")
+    await service.start()
+    _due_now(service)
+
+    started = time.perf_counter()
+    await service._on_timer()
+    dispatch_s = time.perf_counter() - started
+    await _wait_idle(service)
+    service.stop()
+
+    assert dispatch_s < 0.05
+    assert peak == 3
+    assert all(job.state.last_status == "ok" for job in service.list_jobs())
+
+
+async def test_overlap_policies(tmp_path: Path) -> None:
+    release = asyncio.Event()
+    runs: dict[str, int] = {}
+    cancelled: list[str] = []
+
+    async def on_job(job: CronJob) -> str:
+        runs[job.name] = runs.get(job.name, 0) + 1
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.append(job.name)
+            raise
+        return "ok"
+
+    service = CronService(tmp_path / "jobs.json", on_job=on_job)
+    for policy in ("skip", "queue", "replace"):
+        service.add_job(
+            name=policy, schedule=CronSchedule(kind="every", every_ms=60_000), message="hi", overlap=policy
+        )
+    await service.start()
+    _due_now(service)
+    await service._on_timer()
+    await asyncio.sleep(0.01)
+
+    # Every job comes due twice more while its first run is still going.
+    for _ in range(2):
+        _due_now(service)
+        await service._on_timer()
+        await asyncio.sleep(0.01)
+    skip = next(job for job in service.list_jobs() if job.name == "skip")
+    assert skip.state.last_status == "skipped"
+
+    release.set()
+    await _wait_idle(service)
+    service.stop()
+
+    assert runs == {"skip": 1, "queue": 2, "replace": 3}
+    assert cancelled == ["replace", "replace"]
+
+
+async def test_ticks_journal_only_changed_state(tmp_path: Path) -> None:
+    async def on_job(job: CronJob) -> str:
+        return "ok"
+
+    store_path = tmp_path / "jobs.json"
+    service = CronService(store_path, on_job=on_job)
+    for i in range(3):
+        service.add_job(name=f"j{i}", schedule=CronSchedule(kind="every", every_ms=60_000), message="hi")
+    await service.start()
+    definitions = store_path.read_text()
+
+    job = service.list_jobs()[0]
+    job.state.next_run_at_ms = int(time.time() * 1000) - 1
+    service._schedule(job)
+    await service._on_timer()
+    await _wait_idle(service)
+    service.stop()
+
+    assert store_path.read_text() == definitions
+    rows = [json.loads(line) for line in service.state_path.read_text().splitlines()]
+    assert {row["id"] for row in rows} == {job.id}
+    assert rows[-1]["state"]["lastStatus"] == "ok"
+
+    reloaded = CronService(store_path)
+    restored = next(j for j in reloaded.list_jobs() if j.id == job.id)
+    assert restored.state.last_status == "ok"
+    assert restored.state.next_run_at_ms == job.state.next_run_at_ms
+
+    # Removals are journaled too; a long journal is folded back into jobs.json.
+    reloaded.remove_job(next(j.id for j in reloaded.list_jobs() if j.id != job.id))
+    assert store_path.read_text() == definitions
+    assert len(CronService(store_path).list_jobs()) == 2
+    reloaded.STATE_JOURNAL_MAX = 2
+    reloaded.enable_job(job.id, enabled=True)
+    reloaded.enable_job(job.id, enabled=False)
+    assert not reloaded.state_path.exists()
+    saved = {j["id"]: j for j in json.loads(store_path.read_text())["jobs"]}
+    assert len(saved) == 2
+    assert saved[job.id]["enabled"] is False
+    assert saved[job.id]["state"]["lastStatus"] == "ok"
+
+
+def test_cron_jitter_is_stable_and_bounded(tmp_path: Path) -> None:
+    service = CronService(tmp_path / "jobs.json", jitter_ms=5000)
+    offsets = set()
+    for i in range(20):
+        job = service.add_job(name=f"j{i}", schedule=CronSchedule(kind="cron", expr="* * * * *"), message="hi")
+        offset = job.state.next_run_at_ms % 60_000
+        assert 0 <= offset <= 5000
+        assert service._next_run(job, 0) % 60_000 == offset
+        offsets.add(offset)
+    assert len(offsets) > 10
+
+    every = service.add_job(name="every", schedule=CronSchedule(kind="every", every_ms=1000), message="hi")
+    assert service._next_run(every, 0) == 1000
@@ -0,0 +1,82 @@
+import random
+from pathlib import Path
+
+from miniclaw.cron import benchmark
+from miniclaw.cron.service import CronService
+from miniclaw.cron.types import CronSchedule
+
+
+def _linear_next_wake(service: CronService) -> int | None:
+    times = [j.state.next_run_at_ms for j in service._jobs.values() if j.enabled and j.state.next_run_at_ms]
+    return min(times) if times else None
+
+
+def test_heap_next_wake_tracks_add_remove_and_enable(tmp_path: Path) -> None:
+    rng = random.Random(7)
+    service = CronService(tmp_path / "jobs.json")
+    ids = [
+        service.add_job(
+            name=f"j{i}", schedule=CronSchedule(kind="every", every_ms=rng.randint(1000, 10**7)), message="hi"
+        ).id
+        for i in range(300)
+    ]
+    assert service._get_next_wake_ms() == _linear_next_wake(service)
+
+    for _ in range(200):
+        job_id = rng.choice(ids)
+        action = rng.random()
+        if action < 0.3 and job_id in service._jobs:
+            service.remove_job(job_id)
+        elif action < 0.7:
+            service.enable_job(job_id, enabled=rng.random() < 0.5)
+        else:
+            ids.append(
+                service.add_job(name="extra", schedule=CronSchedule(kind="every", every_ms=500), message="hi").id
+            )
+        assert service._get_next_wake_ms() == _linear_next_wake(service)
+
+    # Lazy invalidation must not let stale entries pile up.
+    assert len(service._heap) <= 2 * len(service._jobs) + 64
+
+
+def test_pop_due_skips_stale_entries(tmp_path: Path) -> None:
+    service = CronService(tmp_path / "jobs.json")
+    jobs = [
+        service.add_job(name=f"j{i}", schedule=CronSchedule(kind="every", every_ms=60_000), message="hi")
+        for i in range(5)
+    ]
+    for job in jobs:
+        job.state.next_run_at_ms = 1000
+        service._schedule(job)
+    service.enable_job(jobs[0].id, enabled=False)
+    service.remove_job(jobs[1].id)
+    jobs[2].state.next_run_at_ms = 10**15
+    service._schedule(jobs[2])
+
+    due = service._pop_due(2000)
+    assert sorted(job.id for job in due) == sorted(job.id for job in jobs[3:])
+    assert service._pop_due(2000) == []
+
+
+def test_reload_replays_journaled_adds_and_removals(tmp_path: Path) -> None:
+    store_path = tmp_path / "jobs.json"
+    service = CronService(store_path)
+    kept = service.add_job(name="kept", schedule=CronSchedule(kind="every", every_ms=60_000), message="hi")
+    gone = service.add_job(name="gone", schedule=CronSchedule(kind="every", every_ms=60_000), message="hi")
+    service.remove_job(gone.id)
+    service.enable_job(kept.id, enabled=False)
+    assert service.state_path.exists()
+
+    reloaded = CronService(store_path)
+    jobs = reloaded.list_jobs(include_disabled=True)
+    assert [job.id for job in jobs] == [kept.id]
+    assert jobs[0].enabled is False
+    assert reloaded._get_next_wake_ms() is None
+
+
+def test_benchmark_smoke() -> None:
+    import asyncio
+
+    report = asyncio.run(benchmark.run(jobs=500, lookups=10, due=20, toggles=20))
+    assert report["reloaded_jobs"] == 500
+    assert report["tick_dispatched"] == 20
@@ -0,0 +1,129 @@
+import asyncio
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from miniclaw.config.schema import Config
+from miniclaw.dashboard.app import create_app
+from miniclaw.distributed.loadtest import compare
+from miniclaw.distributed.manager import DistributedNodeManager
+
+
+def _manager(tmp_path: Path) -> DistributedNodeManager:
+    manager = DistributedNodeManager(store_path=tmp_path / "distributed" / "state.db")
+    manager.register_node(node_id="worker-1", capabilities=["agent"])
+    return manager
+
+
+def test_batch_claim_returns_oldest_first(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    ids = [manager.dispatch_task(payload={"n": i})["task_id"] for i in range(5)]
+    first = manager.claim_tasks(node_id="worker-1", limit=3)
+    assert len(first) == 3
+    rest = manager.claim_tasks(node_id="worker-1", limit=10)
+    assert {t["task_id"] for t in first + rest} == set(ids)
+    assert all(t["status"] == "running" for t in first + rest)
+
+
+def test_released_claims_go_back_to_the_queue(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    task = manager.dispatch_task(payload={})
+    [claimed] = manager.claim_tasks(node_id="worker-1")
+    assert manager.release_tasks(node_id="worker-2", task_ids=[task["task_id"]]) == 0
+    assert manager.release_tasks(node_id="worker-1", task_ids=[task["task_id"]]) == 1
+
+    [reclaimed] = manager.claim_tasks(node_id="worker-1")
+    assert reclaimed["task_id"] == claimed["task_id"]
+    assert reclaimed["attempts"] == 1
+
+
+async def test_dispatch_wakes_exactly_one_waiter(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    waiters = [
+        asyncio.create_task(manager.wait_for_tasks(node_id="worker-1", timeout_s=0.5, recheck_s=5.0))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.02)
+    assert manager.waiting_count("worker-1") == 2
+
+    task = manager.dispatch_task(payload={})
+    done, pending = await asyncio.wait(waiters, timeout=0.2)
+    assert len(done) == 1
+    assert [t["task_id"] for t in done.pop().result()] == [task["task_id"]]
+    assert manager.waiting_count("worker-1") == 1
+    assert await pending.pop() == []
+
+
+def _client(tmp_path: Path) -> TestClient:
+    config = Config()
+    config.agents.defaults.workspace = str(tmp_path / "workspace")
+    config.distributed.enabled = True
+    manager = _manager(tmp_path)
+    app = create_app(
+        config=config,
+        config_path=tmp_path / "config.json",
+        token="t",
+        bus=None,
+        distributed_manager=manager,
+    )
+    return TestClient(app)
+
+
+def test_long_poll_endpoint_batches(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    headers = {"Authorization": "Bearer t"}
+    for i in range(3):
+        client.post("/api/distributed/tasks/dispatch", headers=headers, json={"payload": {"n": i}})
+
+    body = client.post("/api/distributed/nodes/worker-1/tasks/claim?limit=2&wait_s=1", headers=headers).json()
+    assert len(body["tasks"]) == 2
+    assert body["task"] == body["tasks"][0]
+    body = client.post("/api/distributed/nodes/worker-1/tasks/claim?limit=5&wait_s=0.05", headers=headers).json()
+    assert len(body["tasks"]) == 1
+    body = client.post("/api/distributed/nodes/worker-1/tasks/claim?wait_s=0.05", headers=headers).json()
+    assert body == {"ok": True, "task": None, "tasks": []}
+
+
+def test_websocket_task_channel(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    headers = {"Authorization": "Bearer t"}
+    task = client.post("/api/distributed/tasks/dispatch", headers=headers, json={"payload": {"x": 1}}).json()["task"]
+
+    with client.websocket_connect("/ws/distributed/nodes/worker-1/tasks?token=t") as ws:
+        ws.send_json({"type": "ready", "limit": 4, "wait_s": 1})
+        pushed = ws.receive_json()
+        assert pushed["type"] == "tasks"
+        assert [t["task_id"] for t in pushed["tasks"]] == [task["task_id"]]
+        ws.send_json({"type": "heartbeat", "metadata": {"load": 1}})
+        assert ws.receive_json()["node"]["metadata"] == {"load": 1}
+        ws.send_json({"type": "complete", "task_id": task["task_id"], "result": {"ok": True}})
+        assert ws.receive_json()["task"]["status"] == "completed"
+        ws.send_json({"type": "complete", "task_id": "missing"})
+        assert ws.receive_json()["type"] == "error"
+
+
+def test_websocket_handles_completions_while_ready_is_parked(tmp_path: Path) -> None:
+    client = _client(tmp_path)
+    headers = {"Authorization": "Bearer t"}
+    first = client.post("/api/distributed/tasks/dispatch", headers=headers, json={"payload": {}}).json()["task"]
+
+    with client.websocket_connect("/ws/distributed/nodes/worker-1/tasks?token=t") as ws:
+        ws.send_json({"type": "ready", "limit": 1, "wait_s": 1})
+        assert [t["task_id"] for t in ws.receive_json()["tasks"]] == [first["task_id"]]
+        # The queue is empty now, so this ready parks for up to 30 seconds.
+        ws.send_json({"type": "ready", "limit": 1, "wait_s": 30})
+        ws.send_json({"type": "complete", "task_id": first["task_id"], "result": {"ok": True}})
+        assert ws.receive_json()["task"]["status"] == "completed"
+        ws.send_json({"type": "heartbeat"})
+        assert ws.receive_json()["type"] == "heartbeat"
+
+        second = client.post("/api/distributed/tasks/dispatch", headers=headers, json={"payload": {}}).json()["task"]
+        pushed = ws.receive_json()
+        assert pushed["type"] == "tasks"
+        assert [t["task_id"] for t in pushed["tasks"]] == [second["task_id"]]
+
+
+async def test_loadtest_long_poll_beats_polling() -> None:
+    report = await compare(tasks=10, workers=2, poll_interval_s=0.1, dispatch_interval_s=0.005)
+    assert report["polling"]["count"] == report["long_poll"]["count"] == 10
+    assert report["long_poll"]["p50_ms"] < report["polling"]["p50_ms"]
@@ -0,0 +1,89 @@
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from miniclaw.distributed.manager import DistributedNodeManager
+from miniclaw.distributed.placement import place
+
+
+def _manager(tmp_path: Path, placement: str, **kwargs) -> DistributedNodeManager:
+    return DistributedNodeManager(
+        store_path=tmp_path / "distributed" / "state.db",
+        placement=placement,
+        heartbeat_timeout_s=kwargs.pop("heartbeat_timeout_s", 60),
+        **kwargs,
+    )
+
+
+def test_least_outstanding_spreads_work(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, "least_outstanding")
+    for node_id in ("w1", "w2", "w3"):
+        manager.register_node(node_id=node_id, capabilities=["agent"])
+    assigned = Counter(manager.dispatch_task(payload={})["assigned_node_id"] for _ in range(9))
+    assert assigned == {"w1": 3, "w2": 3, "w3": 3}
+
+    legacy = _manager(tmp_path / "legacy", "first")
+    for node_id in ("w1", "w2"):
+        legacy.register_node(node_id=node_id, capabilities=["agent"])
+    assert len({legacy.dispatch_task(payload={})["assigned_node_id"] for _ in range(4)}) == 1
+
+
+def test_weighted_uses_reported_capacity(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, "weighted")
+    manager.register_node(node_id="big", capabilities=["agent"])
+    manager.register_node(node_id="small", capabilities=["agent"])
+    manager.heartbeat(node_id="big", metadata={"capacity": 3})
+    manager.heartbeat(node_id="small", metadata={"capacity": 1})
+    assigned = Counter(manager.dispatch_task(payload={})["assigned_node_id"] for _ in range(8))
+    assert assigned == {"big": 6, "small": 2}
+
+
+def test_power_of_two_and_capability_filter() -> None:
+    nodes = [{"node_id": f"w{i}", "metadata": {}} for i in range(5)]
+    outstanding = {"w0": 9, "w1": 9, "w2": 9, "w3": 9, "w4": 0}
+    random.seed(7)
+    picks = Counter(place("power_of_two", nodes, outstanding=outstanding) for _ in range(200))
+    # w4 wins whenever sampled, so it takes far more than a uniform fifth.
+    assert picks["w4"] > 60
+    assert place("least_outstanding", [], outstanding={}) is None
+    with pytest.raises(ValueError):
+        place("round_robin", nodes)
+
+
+def test_affinity_keeps_session_on_one_node(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, "affinity")
+    for node_id in ("w1", "w2", "w3"):
+        manager.register_node(node_id=node_id, capabilities=["agent"])
+    by_session = {
+        key: {manager.dispatch_task(payload={}, affinity_key=key)["assigned_node_id"] for _ in range(3)}
+        for key in ("telegram:1", "telegram:2", "cli:x", "cli:y", "cli:z")
+    }
+    assert all(len(nodes) == 1 for nodes in by_session.values())
+    assert len(set().union(*by_session.values())) > 1
+
+
+def test_stale_node_tasks_are_reassigned(tmp_path: Path, monkeypatch) -> None:
+    now = [10_000_000]
+    monkeypatch.setattr(DistributedNodeManager, "_now_ms", staticmethod(lambda: now[0]))
+    manager = _manager(tmp_path, "least_outstanding", heartbeat_timeout_s=30)
+    manager.register_node(node_id="w1", capabilities=["agent"])
+    manager.register_node(node_id="w2", capabilities=["gpu"])
+    task = manager.dispatch_task(payload={}, required_capabilities=["agent"], affinity_key="s")
+    assert manager.claim_task(node_id="w1")["task_id"] == task["task_id"]
+
+    now[0] += 20_000
+    manager.heartbeat(node_id="w2")
+    assert manager.reassign_stale_tasks() == []
+
+    now[0] += 15_000  # w1 is now stale, w2 lacks the capability
+    manager.heartbeat(node_id="w2")
+    assert manager.reassign_stale_tasks() == []
+    manager.register_node(node_id="w3", capabilities=["agent"])
+    moved = manager.reassign_stale_tasks()
+    assert moved == [{"task_id": task["task_id"], "from_node_id": "w1", "to_node_id": "w3"}]
+    claimed = manager.claim_task(node_id="w3")
+    assert claimed["task_id"] == task["task_id"]
+    assert claimed["attempts"] == 2
+    assert claimed["affinity_key"] == "s"
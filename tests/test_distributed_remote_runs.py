@@ -0,0 +1,314 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.agent.subagent import SubagentManager
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import ToolApprovalConfig
+from miniclaw.distributed.manager import DistributedNodeManager
+from miniclaw.distributed.remote import RemoteRunner
+from miniclaw.distributed.worker import LocalWorkerTransport, TaskExecutor, Worker
+from miniclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+class _WorkerProvider(LLMProvider):
+    """Lists the workspace once, then reports how many messages it was sent."""
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        if not any(m.get("role") == "tool" for m in messages):
+            return LLMResponse(
+                content="",
+                tool_calls=[ToolCallRequest(id="c1", name="list_dir", arguments={"path": "."})],
+                usage={"prompt_tokens": 10, "completion_tokens": 2},
+            )
+        seen = sum(1 for m in messages if m.get("role") in {"user", "assistant"} and m.get("content"))
+        return LLMResponse(content=f"remote saw {seen}", usage={"prompt_tokens": 20, "completion_tokens": 5})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+class _GatewayProvider(LLMProvider):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        return LLMResponse(content="local reply")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _manager(tmp_path: Path) -> DistributedNodeManager:
+    return DistributedNodeManager(store_path=tmp_path / "distributed" / "state.db")
+
+
+def _worker(manager: DistributedNodeManager, tmp_path: Path, node_id: str = "w1") -> Worker:
+    workspace = tmp_path / node_id
+    workspace.mkdir(parents=True, exist_ok=True)
+    executor = TaskExecutor(workspace=workspace, provider_factory=lambda model: _WorkerProvider())
+    return Worker(LocalWorkerTransport(manager), executor, node_id=node_id, slots=2, claim_wait_s=0.2)
+
+
+async def _start(worker: Worker, manager: DistributedNodeManager) -> asyncio.Task[None]:
+    runner = asyncio.create_task(worker.run())
+    for _ in range(100):
+        if manager.list_nodes():
+            break
+        await asyncio.sleep(0.01)
+    return runner
+
+
+async def _stop(worker: Worker, runner: asyncio.Task[None]) -> None:
+    worker.stop()
+    await asyncio.wait_for(runner, timeout=5)
+
+
+async def test_agent_run_executes_on_worker_and_streams_events(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    manager = _manager(tmp_path)
+    worker = _worker(manager, tmp_path)
+    runner = await _start(worker, manager)
+
+    bus = MessageBus()
+    events = bus.register_run_listener()
+    agent = AgentLoop(
+        bus=bus,
+        provider=_GatewayProvider(),
+        workspace=tmp_path / "gateway",
+        remote_runner=RemoteRunner(manager, bus, mode="runs"),
+    )
+    session = agent.sessions.get_or_create("cli:remote")
+    session.add_message("user", "earlier question")
+    session.add_message("assistant", "earlier answer")
+    agent.sessions.save(session)
+
+    reply = await agent.process_direct("list files", session_key="cli:remote")
+    await _stop(worker, runner)
+
+    assert reply == "remote saw 3"
+    run = agent.list_runs(limit=1)[0]
+    assert run["usage_total_tokens"] == 37
+    assert [m["content"] for m in agent.sessions.get_or_create("cli:remote").messages][-2:] == [
+        "list files",
+        "remote saw 3",
+    ]
+    received = []
+    while not events.empty():
+        received.append(events.get_nowait())
+    remote = [e for e in received if e.get("remote_node_id") == "w1"]
+    assert any(e.get("type") == "tool_end" for e in remote)
+    assert {e["run_id"] for e in remote} == {run["run_id"]}
+    assert all(e["session_key"] == "cli:remote" for e in remote)
+    # The worker's own session copy is discarded.
+    assert not any(s["key"].startswith("remote:") for s in agent.sessions.list_sessions())
+
+
+async def test_runs_fall_back_to_local_without_workers(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    manager = _manager(tmp_path)
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=_GatewayProvider(),
+        workspace=tmp_path / "gateway",
+        remote_runner=RemoteRunner(manager, mode="all"),
+    )
+    assert await agent.process_direct("hi") == "local reply"
+    assert manager.list_tasks() == []
+
+
+async def test_subagent_runs_remotely(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    worker = _worker(manager, tmp_path)
+    runner = await _start(worker, manager)
+    bus = MessageBus()
+    subagents = SubagentManager(
+        provider=_GatewayProvider(),
+        workspace=tmp_path / "gateway",
+        bus=bus,
+        remote_runner=RemoteRunner(manager, bus, mode="subagents"),
+    )
+    await subagents.spawn("look around")
+    announced = await asyncio.wait_for(bus.consume_inbound(), timeout=5)
+    await _stop(worker, runner)
+
+    assert "remote saw 1" in announced.content
+    assert "total=37 tokens" in announced.content
+    assert [t["kind"] for t in manager.list_tasks()] == ["subagent"]
+
+
+async def test_remote_errors_surface_to_caller(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    worker = _worker(manager, tmp_path)
+    runner = await _start(worker, manager)
+    remote = RemoteRunner(manager, mode="all")
+    with pytest.raises(RuntimeError, match="Unknown tool"):
+        await remote.run(kind="tool", payload={"tool": "nope"}, timeout_s=5)
+    result = await remote.run(kind="tool", payload={"tool": "list_dir", "arguments": {"path": "."}}, timeout_s=5)
+    await _stop(worker, runner)
+    assert result["node_id"] == "w1"
+
+
+class _HangingExecutor(TaskExecutor):
+    def __init__(self, workspace: Path):
+        super().__init__(workspace=workspace)
+        self.started = asyncio.Event()
+        self.stopped = asyncio.Event()
+
+    async def execute(self, task, emit):
+        self.started.set()
+        try:
+            await asyncio.sleep(60)
+        finally:
+            self.stopped.set()
+        return {}
+
+
+async def test_timed_out_and_cancelled_remote_tasks_stop_on_worker(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    executor = _HangingExecutor(tmp_path)
+    worker = Worker(
+        LocalWorkerTransport(manager), executor, node_id="w1", slots=2, heartbeat_s=0.5, claim_wait_s=0.2
+    )
+    runner = await _start(worker, manager)
+    remote = RemoteRunner(manager, mode="all")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await remote.run(kind="tool", payload={"tool": "list_dir"}, timeout_s=0.3)
+    [task] = manager.list_tasks()
+    assert task["status"] == "error" and "timed out" in task["error"]
+    await asyncio.wait_for(executor.stopped.wait(), timeout=5)
+
+    executor.started.clear()
+    executor.stopped.clear()
+    call = asyncio.create_task(remote.run(kind="tool", payload={"tool": "list_dir"}, timeout_s=30))
+    await asyncio.wait_for(executor.started.wait(), timeout=5)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    await asyncio.wait_for(executor.stopped.wait(), timeout=5)
+    await _stop(worker, runner)
+
+    assert all(t["status"] == "error" for t in manager.list_tasks())
+    assert worker.cancelled == 2 and worker.completed == 0
+    # A late completion from the worker does not overwrite the cancellation.
+    done = manager.complete_task(task_id=task["task_id"], node_id="w1", result={"content": "late"})
+    assert done["status"] == "error"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _ExecProvider(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.tool_results: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        self.tool_results = [m["content"] for m in messages if m.get("role") == "tool"]
+        if not self.tool_results:
+            return LLMResponse(
+                content="",
+                tool_calls=[ToolCallRequest(id="c1", name="exec", arguments={"command": "echo hi"})],
+            )
+        return LLMResponse(content="done")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_worker_keeps_gateway_sandbox_and_refuses_approval_gated_tools(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    provider = _ExecProvider()
+    executor = TaskExecutor(
+        workspace=tmp_path,
+        provider_factory=lambda model: provider,
+        agent_options={"approval_config": ToolApprovalConfig(), "sandbox_mode": "all", "sandbox_image": "img"},
+    )
+    assert executor.sandbox_options == {"sandbox_mode": "all", "sandbox_image": "img"}
+    assert executor.agent_options["approval_config"].web_fetch == "always_allow"
+
+    async def emit(rows):
+        return None
+
+    result = await asyncio.wait_for(
+        executor.execute({"task_id": "t1", "kind": "agent_run", "payload": {"content": "run it"}}, emit),
+        timeout=10,
+    )
+    assert result["content"] == "done"
+    assert provider.tool_results == ["Error: Tool 'exec' is not allowed by policy"]
+
+
+def test_worker_processes_share_tool_tasks(tmp_path: Path) -> None:
+    import uvicorn
+
+    from miniclaw.config.loader import save_config
+    from miniclaw.config.schema import Config
+    from miniclaw.dashboard.app import create_app
+
+    config = Config()
+    config.agents.defaults.workspace = str(tmp_path / "workspace")
+    config.distributed.enabled = True
+    # Workers apply the configured sandbox; there is no docker here.
+    config.tools.sandbox.mode = "off"
+    save_config(config, tmp_path / ".miniclaw" / "config.json")
+    manager = _manager(tmp_path)
+    app = create_app(config=config, config_path=tmp_path / "config.json", token="t", bus=None, distributed_manager=manager)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    env = {**os.environ, "HOME": str(tmp_path), "MINICLAW_GATEWAY_TOKEN": "t"}
+    workers = [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "miniclaw", "worker",
+                "--gateway", f"http://127.0.0.1:{port}",
+                "--node-id", f"proc-{i}",
+                "--slots", "1",
+                "--heartbeat", "1",
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for i in range(2)
+    ]
+    try:
+        deadline = time.monotonic() + 60
+        while len(manager.list_nodes()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert {n["node_id"] for n in manager.list_nodes()} == {"proc-0", "proc-1"}
+
+        tasks = [
+            manager.dispatch_task(
+                kind="tool",
+                payload={"tool": "exec", "arguments": {"command": f"echo task-{i}"}},
+                required_capabilities=["worker"],
+            )
+            for i in range(6)
+        ]
+        while time.monotonic() < deadline:
+            done = [manager.get_task(t["task_id"]) for t in tasks]
+            if all(t["status"] in {"completed", "error"} for t in done):
+                break
+            time.sleep(0.1)
+        assert [t["status"] for t in done] == ["completed"] * 6
+        assert {t["result"]["node_id"] for t in done} == {"proc-0", "proc-1"}
+        assert all(f"task-{i}" in t["result"]["content"] for i, t in enumerate(done))
+    finally:
+        for proc in workers:
+            proc.terminate()
+        for proc in workers:
+            proc.wait(timeout=10)
+        server.should_exit = True
+        thread.join(timeout=10)
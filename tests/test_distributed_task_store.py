@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from miniclaw.distributed.manager import DistributedNodeManager
+
+
+def _manager(tmp_path: Path, **kwargs) -> DistributedNodeManager:
+    return DistributedNodeManager(store_path=tmp_path / "distributed" / "state.json", **kwargs)
+
+
+def test_claims_are_exclusive_across_instances(tmp_path: Path) -> None:
+    manager_a = _manager(tmp_path)
+    manager_b = _manager(tmp_path)
+    manager_a.register_node(node_id="worker-1", capabilities=["agent"])
+    first = manager_a.dispatch_task(payload={"n": 1}, required_capabilities=["agent"])
+    second = manager_b.dispatch_task(payload={"n": 2}, required_capabilities=["agent"])
+
+    claimed_a = manager_a.claim_task(node_id="worker-1")
+    claimed_b = manager_b.claim_task(node_id="worker-1")
+    assert {claimed_a["task_id"], claimed_b["task_id"]} == {first["task_id"], second["task_id"]}
+    assert claimed_a["attempts"] == 1
+    assert manager_a.claim_task(node_id="worker-1") is None
+    assert (tmp_path / "distributed" / "state.db").exists()
+
+
+def test_expired_lease_requeues_and_heartbeat_renews(tmp_path: Path, monkeypatch) -> None:
+    now = [1_000_000]
+    monkeypatch.setattr(DistributedNodeManager, "_now_ms", staticmethod(lambda: now[0]))
+    manager = _manager(tmp_path, task_lease_s=10, heartbeat_timeout_s=3600)
+    manager.register_node(node_id="worker-1", capabilities=["agent"])
+    task = manager.dispatch_task(payload={}, required_capabilities=["agent"])
+    assert manager.claim_task(node_id="worker-1")["lease_expires_at_ms"] == now[0] + 10_000
+
+    now[0] += 8_000
+    manager.heartbeat(node_id="worker-1")
+    now[0] += 8_000
+    assert manager.claim_task(node_id="worker-1") is None
+    assert manager.get_task(task["task_id"])["status"] == "running"
+
+    now[0] += 10_001
+    reclaimed = manager.claim_task(node_id="worker-1")
+    assert reclaimed["task_id"] == task["task_id"]
+    assert reclaimed["attempts"] == 2
+
+
+def test_reported_running_ids_limit_lease_renewal(tmp_path: Path, monkeypatch) -> None:
+    now = [1_000_000]
+    monkeypatch.setattr(DistributedNodeManager, "_now_ms", staticmethod(lambda: now[0]))
+    manager = _manager(tmp_path, task_lease_s=10, heartbeat_timeout_s=3600)
+    manager.register_node(node_id="worker-1", capabilities=["agent"])
+    lost = manager.dispatch_task(payload={"n": 1}, required_capabilities=["agent"])
+    kept = manager.dispatch_task(payload={"n": 2}, required_capabilities=["agent"])
+    manager.claim_task(node_id="worker-1")
+    manager.claim_task(node_id="worker-1")
+
+    for _ in range(3):
+        now[0] += 6_000
+        row = manager.heartbeat(node_id="worker-1", running_task_ids=[kept["task_id"]])
+        assert row["cancelled_task_ids"] == []
+
+    assert manager.get_task(kept["task_id"])["status"] == "running"
+    reclaimed = manager.claim_task(node_id="worker-1")
+    assert reclaimed["task_id"] == lost["task_id"]
+    assert reclaimed["attempts"] == 2
+
+
+def test_complete_errors_and_list_filters(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    manager.register_node(node_id="worker-1", capabilities=["agent"])
+    task = manager.dispatch_task(payload={}, kind="job")
+    with pytest.raises(ValueError):
+        manager.complete_task(task_id=task["task_id"], node_id="worker-2")
+    with pytest.raises(KeyError):
+        manager.complete_task(task_id="missing", node_id="worker-1")
+    done = manager.complete_task(task_id=task["task_id"], node_id="worker-1", error="boom")
+    assert done["status"] == "error"
+    assert [row["task_id"] for row in manager.list_tasks(status="error", node_id="worker-1")] == [task["task_id"]]
+    assert manager.list_tasks(status="queued") == []
+
+
+def test_migrates_legacy_json_state(tmp_path: Path) -> None:
+    legacy = tmp_path / "distributed" / "state.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(
+        json.dumps(
+            {
+                "nodes": {"worker-1": {"capabilities": ["agent"], "last_heartbeat_ms": 1, "registered_at_ms": 1}},
+                "tasks": {
+                    "task_old": {
+                        "task_id": "task_old",
+                        "assigned_node_id": "worker-1",
+                        "status": "queued",
+                        "payload": {"x": 1},
+                        "created_at_ms": 5,
+                    }
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    manager = DistributedNodeManager(store_path=legacy)
+    assert [n["node_id"] for n in manager.list_nodes(include_stale=True)] == ["worker-1"]
+    claimed = manager.claim_task(node_id="worker-1")
+    assert claimed["task_id"] == "task_old"
+    assert claimed["payload"] == {"x": 1}
+
+
+def test_claim_and_complete_use_indexes(tmp_path: Path) -> None:
+    manager = _manager(tmp_path)
+    conn = manager._conn
+    plans = [
+        " ".join(
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT task_id FROM tasks WHERE assigned_node_id = ? AND status = 'queued' "
+                "ORDER BY created_at_ms, task_id LIMIT 1",
+                ("w",),
+            )
+        ),
+        " ".join(
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT task_id FROM tasks WHERE status = 'running' AND lease_expires_at_ms < ?",
+                (1,),
+            )
+        ),
+    ]
+    assert "idx_tasks_queue" in plans[0]
+    assert "idx_tasks_lease" in plans[1]
+    assert all("SCAN tasks" not in plan for plan in plans)
@@ -0,0 +1,116 @@
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from miniclaw.heartbeat.service import HeartbeatService, parse_heartbeat_tasks
+
+
+class _Agent:
+    def __init__(self, reply: str = "HEARTBEAT_OK") -> None:
+        self.reply = reply
+        self.prompts: list[str] = []
+
+    async def __call__(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.reply
+
+
+async def test_unchanged_heartbeat_skips_llm_call(tmp_path: Path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("# Tasks\n- Watch `notes/todo.txt` for new items\n")
+    (tmp_path / "notes").mkdir()
+    todo = tmp_path / "notes" / "todo.txt"
+    todo.write_text("nothing yet")
+    agent = _Agent()
+    hb = HeartbeatService(tmp_path, on_heartbeat=agent, state_path=tmp_path / "state.json")
+
+    await hb._tick()
+    await hb._tick()
+    assert len(agent.prompts) == 1
+
+    # A referenced file changing invalidates the memo.
+    todo.write_text("call the bank")
+    await hb._tick()
+    await hb._tick()
+    assert len(agent.prompts) == 2
+
+    # Work done last time (no HEARTBEAT_OK) is never memoized.
+    agent.reply = "Called the bank."
+    (tmp_path / "HEARTBEAT.md").write_text("# Tasks\n- Call the bank\n")
+    await hb._tick()
+    await hb._tick()
+    assert len(agent.prompts) == 4
+
+    status = hb.status()
+    assert status["llm_calls"] == 4
+    assert status["avoided_calls"] == status["skipped_unchanged"] == 2
+
+    # Memo and counters survive a restart.
+    agent.reply = "HEARTBEAT_OK"
+    (tmp_path / "HEARTBEAT.md").write_text("# Tasks\n- Watch `notes/todo.txt` for new items\n")
+    await hb._tick()
+    restarted = HeartbeatService(tmp_path, on_heartbeat=agent, state_path=tmp_path / "state.json")
+    await restarted._tick()
+    assert len(agent.prompts) == 5
+    assert restarted.status()["avoided_calls"] == 3
+
+
+async def test_max_skip_forces_a_periodic_check(tmp_path: Path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- Watch `todo.txt`\n")
+    (tmp_path / "todo.txt").write_text("nothing yet")
+    agent = _Agent()
+    hb = HeartbeatService(tmp_path, on_heartbeat=agent, max_skip_s=0)
+    await hb._tick()
+    await hb._tick()
+    assert len(agent.prompts) == 2
+
+
+async def test_instructions_without_watched_files_are_asked_every_tick(tmp_path: Path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- Check the weather\n- Watch `missing.txt`\n")
+    agent = _Agent()
+    hb = HeartbeatService(tmp_path, on_heartbeat=agent)
+    await hb._tick()
+    await hb._tick()
+    assert len(agent.prompts) == 2
+    assert hb.status()["skipped_unchanged"] == 0
+
+
+async def test_only_due_scheduled_tasks_wake_the_agent(tmp_path: Path) -> None:
+    past = (datetime.now() - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M")
+    future = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d %H:%M")
+    (tmp_path / "HEARTBEAT.md").write_text(
+        "# Tasks\n"
+        "- [ ] Rotate logs @every 1h\n"
+        f"- [ ] Renew domain @at {past}\n"
+        f"- [ ] File taxes @at {future}\n"
+        "- [ ] Weekly report @cron 0 9 * * 1\n"
+        "- [x] Finished thing @every 1m\n"
+    )
+    agent = _Agent()
+    hb = HeartbeatService(tmp_path, on_heartbeat=agent)
+
+    await hb._tick()
+    assert len(agent.prompts) == 1
+    due = agent.prompts[0].split("only handle the ones due now:\n", 1)[1]
+    assert due.splitlines() == ["- [ ] Rotate logs", "- [ ] Renew domain"]
+
+    # Nothing is due again until an hour has passed.
+    await hb._tick()
+    assert len(agent.prompts) == 1
+    assert hb.status()["skipped_not_due"] == 1
+
+    key = next(t.key for t in parse_heartbeat_tasks((tmp_path / "HEARTBEAT.md").read_text()) if t.kind == "every")
+    hb._tasks[key]["last_done"] = time.time() - 3601
+    await hb._tick()
+    assert len(agent.prompts) == 2
+    assert "- [ ] Rotate logs" in agent.prompts[1] and "Renew domain" not in agent.prompts[1].split("due now:")[1]
+
+
+def test_parse_heartbeat_tasks() -> None:
+    tasks = parse_heartbeat_tasks(
+        "# Title\n<!-- note\nstill a comment -->\n- [ ] Stand-up @daily 09:30\nFree text\n- [x] done\n"
+    )
+    assert [(t.text, t.kind, t.spec) for t in tasks] == [
+        ("- [ ] Stand-up", "daily", "09:30"),
+        ("Free text", None, ""),
+    ]
+    assert parse_heartbeat_tasks("- [ ] Stand-up @daily 09:30")[0].key == tasks[0].key
@@ -55,3 +55,21 @@ def test_litellm_provider_passes_api_key_and_base_per_request(monkeypatch) -> No
     assert response.content == "ok"
     assert captured.get("api_key") == "sk-test"
     assert captured.get("api_base") == "https://example.invalid/v1"
+
+
+def test_litellm_provider_classifies_errors(monkeypatch) -> None:
+    class ContextWindowExceededError(Exception):
+        status_code = 400
+
+    async def fake_acompletion(**kwargs):
+        raise ContextWindowExceededError("prompt is too long")
+
+    monkeypatch.setattr("miniclaw.providers.litellm_provider.acompletion", fake_acompletion)
+    provider = LiteLLMProvider(default_model="openai/gpt-4o-mini")
+
+    response = asyncio.run(provider.chat(messages=[{"role": "user", "content": "hi"}]))
+    assert response.finish_reason == "error"
+    assert response.error is not None
+    assert response.error.kind == "context_overflow"
+    assert response.error.status_code == 400
+    assert response.content.startswith("Error calling LLM:")
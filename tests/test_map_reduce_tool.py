@@ -0,0 +1,125 @@
+import asyncio
+from pathlib import Path
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.agent.subagent import SubagentManager
+from miniclaw.agent.tools import map_reduce
+from miniclaw.agent.tools.map_reduce import MapReduceTool
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import SubagentPoolConfig
+from miniclaw.providers.base import LLMProvider, LLMResponse
+
+
+class _ItemProvider(LLMProvider):
+    """Echoes the last line of each subagent task; fails tasks mentioning "bad"."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.running = 0
+        self.peak = 0
+        self.tasks: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        task = messages[-1]["content"]
+        self.tasks.append(task)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if "bad" in task:
+            raise RuntimeError("fetch failed")
+        if task.startswith("Combine"):
+            return LLMResponse(content="combined", usage={"prompt_tokens": 5, "completion_tokens": 5})
+        return LLMResponse(content=f"summary of {task.splitlines()[-1]}", usage={"prompt_tokens": 6, "completion_tokens": 4})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _tool(tmp_path: Path, provider: LLMProvider, events: list | None = None, **pool) -> MapReduceTool:
+    manager = SubagentManager(
+        provider=provider, workspace=tmp_path, bus=MessageBus(), pool_config=SubagentPoolConfig(**pool)
+    )
+    tool = MapReduceTool(manager, emit_event=events.append if events is not None else None)
+    tool.set_registry_context(channel="cli", chat_id="direct", session_key="cli:direct", user_key="", run_id="run1")
+    return tool
+
+
+async def test_map_reduce_runs_items_under_limit_and_reduces(tmp_path: Path) -> None:
+    provider = _ItemProvider()
+    events: list[dict] = []
+    tool = _tool(tmp_path, provider, events, max_concurrency=8)
+    urls = [f"https://example.com/{i}" for i in range(10)]
+
+    output = await tool.execute(
+        inputs=urls, instruction="Summarize {item}", reduce_instruction="Combine the summaries", concurrency=3
+    )
+    assert provider.peak == 3
+    assert output.startswith("Map-reduce: 10/10 items ok, 0 failed, 0 skipped, 110 tokens")
+    assert output.endswith("combined")
+    reduce_task = provider.tasks[-1]
+    assert reduce_task.startswith("Combine the summaries") and "summary of Summarize https://example.com/9" in reduce_task
+
+    phases = [e["phase"] for e in events]
+    assert phases[0] == "start" and phases[-2:] == ["reduce", "done"]
+    assert phases.count("item") == 10
+    assert all(e["type"] == "map_reduce_progress" and e["run_id"] == "run1" for e in events)
+    assert events[-1]["ok"] == 10 and events[-1]["tokens"] == 110
+
+
+async def test_partial_failures_are_retried_reported_and_can_abort(tmp_path: Path) -> None:
+    provider = _ItemProvider()
+    tool = _tool(tmp_path, provider)
+    output = await tool.execute(inputs=["a", "bad-1", "c"], instruction="Fetch", retries=1)
+    assert "2/3 items ok, 1 failed" in output
+    assert "- [2] bad-1: error: Error: fetch failed" in output
+    assert "## [1] a\nsummary of a" in output and "## [3] c\nsummary of c" in output
+    assert sum("bad-1" in task for task in provider.tasks) == 2
+
+    provider.tasks.clear()
+    output = await tool.execute(
+        inputs=["bad-1", "bad-2", "x", "y"], instruction="Fetch", concurrency=1, max_failures=1, retries=0
+    )
+    assert "0/4 items ok, 2 failed, 2 skipped" in output
+    assert "(aborted after 2 failures)" in output
+    assert "Error: every item failed or was skipped." in output
+
+
+async def test_token_budget_stops_new_items_and_skips_reduce(tmp_path: Path) -> None:
+    provider = _ItemProvider()
+    tool = _tool(tmp_path, provider)
+    output = await tool.execute(
+        inputs=["a", "b", "c", "d"], instruction="Fetch", reduce_instruction="Combine", concurrency=1, token_budget=15
+    )
+    assert "2/4 items ok, 0 failed, 2 skipped, 20 tokens" in output
+    assert "Reduce skipped: token budget exhausted" in output
+    assert not any(task.startswith("Combine") for task in provider.tasks)
+
+
+async def test_fan_out_shares_conversation_limit_and_backs_off_when_queue_is_full(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(map_reduce, "REJECT_BACKOFF_S", 0.005)
+    provider = _ItemProvider()
+    tool = _tool(tmp_path, provider, max_concurrency=1, max_queue=0, max_per_parent=4)
+    manager = tool._manager
+    other = asyncio.create_task(manager.spawn_many(["other work"], origin_channel="cli", origin_chat_id="direct"))
+    await asyncio.sleep(0)
+    assert manager.parent_headroom("cli:direct") == 3
+
+    output = await tool.execute(inputs=["a", "b", "c"], instruction="Fetch", concurrency=10, retries=0)
+    await other
+    assert "3/3 items ok" in output
+    assert provider.peak == 1
+    # Items beyond the single pool slot were rejected and retried after a pause.
+    assert manager.stats()["rejected"] >= 1
+    assert manager.parent_headroom("cli:direct") == 4
+
+    manager._max_per_parent = 1
+    blocker = asyncio.create_task(manager.spawn_many(["busy"], origin_channel="cli", origin_chat_id="direct"))
+    await asyncio.sleep(0)
+    assert (await tool.execute(inputs=["a"], instruction="Fetch")).startswith("Error: this conversation already has 1")
+    await blocker
+
+
+def test_agent_registers_map_reduce(tmp_path: Path) -> None:
+    agent = AgentLoop(bus=MessageBus(), provider=_ItemProvider(), workspace=tmp_path)
+    assert agent.tools.has("map_reduce")
@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import Config
+from miniclaw.dashboard.app import create_app
+from miniclaw.monitoring import metrics
+from miniclaw.monitoring.metrics import MetricsRegistry
+from miniclaw.providers.base import LLMProvider, LLMResponse
+
+
+class _Provider(LLMProvider):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        return LLMResponse(content="hello", usage={"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.REGISTRY.reset()
+    metrics.configure(enabled=True)
+    yield metrics.REGISTRY
+    metrics.configure(enabled=False)
+    metrics.REGISTRY.reset()
+
+
+def test_disabled_registry_drops_updates() -> None:
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter("c_total", labels=("k",))
+    hist = registry.histogram("h_seconds")
+    counter.inc(k="a")
+    hist.observe(1.0)
+    assert counter.value(k="a") == 0
+    assert hist.count() == 0
+    assert registry.render_prometheus() == ""
+
+
+def test_histogram_quantiles_are_within_bucket_error() -> None:
+    registry = MetricsRegistry(enabled=True)
+    hist = registry.histogram("latency_seconds", labels=("op",))
+    for i in range(1, 1001):
+        hist.observe(i / 1000.0, op="x")
+    assert hist.count(op="x") == 1000
+    p50 = hist.quantile(0.5, op="x")
+    p99 = hist.quantile(0.99, op="x")
+    assert p50 == pytest.approx(0.5, rel=0.04)
+    assert p99 == pytest.approx(0.99, rel=0.04)
+
+
+def test_histogram_buckets_are_upper_inclusive_on_edges() -> None:
+    registry = MetricsRegistry(enabled=True)
+    hist = registry.histogram("edge_seconds")
+    for value in (1.0, 0.5, 1.0625, 1.0625 + 1e-9):
+        hist.observe(value)
+
+    buckets = {
+        line.split('le="')[1].split('"')[0]: int(line.rsplit(" ", 1)[1])
+        for line in registry.render_prometheus().splitlines()
+        if line.startswith("edge_seconds_bucket")
+    }
+    assert buckets["0.5"] == 1
+    assert buckets["1"] == 2
+    assert buckets["1.0625"] == 3
+    assert buckets["+Inf"] == 4
+
+
+def test_prometheus_exposition_format() -> None:
+    registry = MetricsRegistry(enabled=True)
+    registry.counter("reqs_total", "Requests.", labels=("route",)).inc(2, route='a"b')
+    registry.gauge("depth", labels=("queue",)).set(4, queue="inbound")
+    hist = registry.histogram("dur_seconds")
+    hist.observe(0.25)
+    hist.observe(0.0)
+
+    text = registry.render_prometheus()
+    assert "# HELP reqs_total Requests." in text
+    assert "# TYPE reqs_total counter" in text
+    assert 'reqs_total{route="a\\"b"} 2' in text
+    assert 'depth{queue="inbound"} 4' in text
+    assert 'dur_seconds_bucket{le="0"} 1' in text
+    assert 'dur_seconds_bucket{le="+Inf"} 2' in text
+    assert "dur_seconds_count 2" in text
+
+    with pytest.raises(ValueError):
+        registry.gauge("reqs_total")
+
+
+async def test_agent_loop_records_run_llm_and_bus_metrics(enabled_metrics, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    agent = AgentLoop(bus=MessageBus(), provider=_Provider(), workspace=workspace)
+
+    assert await agent.process_direct("hi", session_key="cli:m", channel="cli", chat_id="m") == "hello"
+
+    assert metrics.RUNS_TOTAL.value(agent="default", status="completed") == 1
+    assert metrics.RUN_DURATION.count(agent="default", status="completed") == 1
+    assert metrics.ACTIVE_RUNS.value(agent="default") == 0
+    assert metrics.LLM_REQUEST_DURATION.count(model=agent.model, outcome="stop") == 1
+    assert metrics.LLM_TOKENS.value(model=agent.model, kind="prompt") == 7
+    assert metrics.LLM_TOKENS.value(model=agent.model, kind="completion") == 3
+
+
+def test_dashboard_metrics_endpoint(enabled_metrics) -> None:
+    metrics.TOOL_DURATION.observe(0.12, tool="exec", ok="true")
+    app = create_app(config=Config(), config_path=Path("/tmp/miniclaw-config.json"), token="t", bus=MessageBus())
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer t"}
+
+    assert client.get("/metrics").status_code == 401
+    resp = client.get("/metrics", headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'miniclaw_tool_duration_seconds_count{tool="exec",ok="true"} 1' in resp.text
+    assert 'miniclaw_bus_queue_depth{queue="inbound"} 0' in resp.text
+
+    snapshot = client.get("/api/metrics", headers=headers).json()
+    assert snapshot["enabled"] is True
+    assert snapshot["metrics"]["miniclaw_tool_duration_seconds"]["series"][0]["count"] == 1
@@ -168,3 +168,28 @@ def test_distributed_prune_never_drops_active_tasks(tmp_path: Path) -> None:
     )
     assert completed_protected["status"] == "completed"
     assert manager.get_task(protected["task_id"]) is not None
+
+
+def test_distributed_prune_keeps_newest_finished_tasks_across_restarts(tmp_path: Path) -> None:
+    store = tmp_path / "distributed" / "state.json"
+
+    def run_batch(manager: DistributedNodeManager, start: int, count: int) -> None:
+        for idx in range(start, start + count):
+            manager.dispatch_task(payload={"job": idx}, preferred_node_id="worker-1", kind="batch")
+            claimed = manager.claim_task(node_id="worker-1")
+            assert claimed is not None
+            manager.complete_task(task_id=claimed["task_id"], node_id="worker-1", result={"ok": idx})
+
+    first = DistributedNodeManager(store_path=store, local_node_id="local-node", max_tasks=100)
+    first.register_node(node_id="worker-1", capabilities=["agent"])
+    run_batch(first, 0, 90)
+    first.close()
+
+    second = DistributedNodeManager(store_path=store, local_node_id="local-node", max_tasks=100)
+    run_batch(second, 90, 70)
+    tasks = second.list_tasks(limit=1000)
+    jobs = sorted(task["payload"]["job"] for task in tasks)
+    assert 100 <= len(tasks) < 100 + 32
+    assert jobs[-1] == 159 and jobs == list(range(jobs[0], 160))
+    total = second._conn.execute("SELECT total FROM task_count").fetchone()[0]
+    assert total == len(tasks)
@@ -1,5 +1,16 @@
+from types import SimpleNamespace
+
 from miniclaw.config.schema import Config
 from miniclaw.providers.base import LLMProvider, LLMResponse
+from miniclaw.providers.errors import (
+    AUTH,
+    CONTEXT_OVERFLOW,
+    OVERLOADED,
+    RATE_LIMITED,
+    TIMEOUT,
+    LLMError,
+    classify_exception,
+)
 from miniclaw.providers.failover import FailoverCandidate, FailoverProvider
 
 
@@ -73,3 +84,116 @@ async def test_failover_retries_same_provider_before_switch() -> None:
     assert response.content == "recovered"
     assert p1.calls == 2
     assert p2.calls == 0
+
+
+async def test_failover_returns_context_overflow_without_retry() -> None:
+    overflow = LLMResponse(
+        content="Error calling LLM: too long",
+        finish_reason="error",
+        error=LLMError(kind=CONTEXT_OVERFLOW, message="too long", status_code=400),
+    )
+    p1 = ScriptProvider([overflow])
+    p2 = ScriptProvider([LLMResponse(content="never-used", finish_reason="stop")])
+    config = Config()
+    config.providers.failover.default.max_attempts = 3
+    config.providers.failover.default.base_backoff_ms = 0
+    wrapper = FailoverProvider(
+        candidates=[FailoverCandidate("openai", p1), FailoverCandidate("anthropic", p2)],
+        default_model="test/model",
+        failover_policy=config.providers.failover,
+    )
+
+    response = await wrapper.chat(messages=[{"role": "user", "content": "hi"}], model="test/model")
+    assert response.error is not None and response.error.kind == CONTEXT_OVERFLOW
+    assert p1.calls == 1
+    assert p2.calls == 0
+
+
+async def test_failover_auth_error_skips_remaining_attempts() -> None:
+    auth = LLMResponse(
+        content="Error calling LLM: bad key",
+        finish_reason="error",
+        error=LLMError(kind=AUTH, message="bad key", status_code=401),
+    )
+    p1 = ScriptProvider([auth, LLMResponse(content="never-used", finish_reason="stop")])
+    p2 = ScriptProvider([LLMResponse(content="ok", finish_reason="stop")])
+    config = Config()
+    config.providers.failover.default.max_attempts = 3
+    config.providers.failover.default.base_backoff_ms = 0
+    wrapper = FailoverProvider(
+        candidates=[FailoverCandidate("openai", p1), FailoverCandidate("anthropic", p2)],
+        default_model="test/model",
+        failover_policy=config.providers.failover,
+    )
+
+    response = await wrapper.chat(messages=[{"role": "user", "content": "hi"}], model="test/model")
+    assert response.content == "ok"
+    assert p1.calls == 1
+    assert p2.calls == 1
+
+
+async def test_failover_honors_retry_after(monkeypatch) -> None:
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr("miniclaw.providers.failover.asyncio.sleep", fake_sleep)
+    limited = LLMResponse(
+        content="Error calling LLM: slow down",
+        finish_reason="error",
+        error=LLMError(kind=RATE_LIMITED, message="slow down", status_code=429, retry_after_s=2.0),
+    )
+    too_long = LLMResponse(
+        content="Error calling LLM: slow down",
+        finish_reason="error",
+        error=LLMError(kind=RATE_LIMITED, message="slow down", status_code=429, retry_after_s=600.0),
+    )
+    p1 = ScriptProvider([limited, too_long])
+    p2 = ScriptProvider([LLMResponse(content="ok", finish_reason="stop")])
+    config = Config()
+    config.providers.failover.default.max_attempts = 3
+    config.providers.failover.default.base_backoff_ms = 10
+    config.providers.failover.default.max_backoff_ms = 5000
+    wrapper = FailoverProvider(
+        candidates=[FailoverCandidate("openai", p1), FailoverCandidate("anthropic", p2)],
+        default_model="test/model",
+        failover_policy=config.providers.failover,
+    )
+
+    response = await wrapper.chat(messages=[{"role": "user", "content": "hi"}], model="test/model")
+    assert response.content == "ok"
+    assert sleeps == [2.0]
+    assert p1.calls == 2
+    assert p2.calls == 1
+
+
+def test_classify_exception_uses_status_and_retry_after_headers() -> None:
+    class RateLimitError(Exception):
+        status_code = 429
+
+        def __init__(self):
+            super().__init__("Too many requests")
+            self.response = SimpleNamespace(status_code=429, headers={"retry-after": "7"})
+
+    class BadRequestError(Exception):
+        status_code = 400
+
+    limited = classify_exception(RateLimitError())
+    assert limited.kind == RATE_LIMITED
+    assert limited.retry_after_s == 7.0
+    assert limited.retryable
+
+    overflow = classify_exception(BadRequestError("This model's maximum context length is 8192 tokens"))
+    assert overflow.kind == CONTEXT_OVERFLOW
+    assert not overflow.retryable
+
+    assert classify_exception(RuntimeError("503 Service Unavailable")).kind == OVERLOADED
+
+    class InternalServerError(Exception):
+        status_code = 500
+
+    overloaded = InternalServerError('AnthropicException - {"type":"overloaded_error"}')
+    assert classify_exception(overloaded).kind == OVERLOADED
+    assert LLMResponse.from_exception(overloaded).finish_reason == "overloaded"
+    assert classify_exception(TimeoutError("read timed out")).kind == TIMEOUT
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from miniclaw.ratelimit.limiter import RateLimiter
+
+DEFAULT_MIN_MEMORY_CPS = 50_000
+DEFAULT_MIN_SQLITE_CPS = 1_000
+
+
+def _checks_per_second(limiter: RateLimiter, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        limiter.check_message(f"user-{i % 64}")
+    return n / (time.perf_counter() - started)
+
+
+def test_memory_backend_is_default_without_store() -> None:
+    limiter = RateLimiter(messages_per_minute=2)
+    assert limiter.backend == "memory"
+    assert limiter.check_message("u") is True
+    assert limiter.check_message("u") is True
+    assert limiter.check_message("u") is False
+    assert limiter.check_message("other") is True
+
+
+def test_auto_backend_shares_buckets_with_store(tmp_path: Path) -> None:
+    limiter = RateLimiter(messages_per_minute=1, store_path=tmp_path / "ratelimit" / "state.json")
+    assert limiter.backend == "sqlite"
+    assert (tmp_path / "ratelimit" / "state.db").exists()
+    limiter.close()
+
+
+@pytest.mark.parametrize("backend", ["snapshot", "sqlite"])
+def test_raised_limits_apply_to_restored_buckets(tmp_path: Path, backend: str) -> None:
+    store = tmp_path / "ratelimit" / "state.json"
+    first = RateLimiter(messages_per_minute=2, store_path=store, backend=backend)
+    assert [first.check_message("user-1") for _ in range(3)] == [True, True, False]
+    first.close()
+
+    raised = RateLimiter(messages_per_minute=6000, store_path=store, backend=backend)
+    time.sleep(0.05)
+    assert all(raised.check_message("user-1") for _ in range(5))
+    raised.close()
+
+
+def test_backend_requires_store_path() -> None:
+    with pytest.raises(ValueError):
+        RateLimiter(backend="sqlite")
+    with pytest.raises(ValueError):
+        RateLimiter(backend="mmap")
+
+
+def test_snapshot_backend_survives_restart(tmp_path: Path) -> None:
+    store = tmp_path / "ratelimit" / "state.json"
+    first = RateLimiter(messages_per_minute=1, store_path=store, backend="snapshot", snapshot_interval_s=60, shards=4)
+    assert first.check_message("user-1") is True
+    assert first.check_message("user-1") is False
+    # Nothing hits disk between snapshots.
+    assert list(store.parent.glob("state.shard*.json")) == []
+
+    first.flush()
+    assert len(list(store.parent.glob("state.shard*.json"))) == 1
+    restarted = RateLimiter(messages_per_minute=1, store_path=store, backend="snapshot", shards=8)
+    assert restarted.check_message("user-1") is False
+    assert restarted.check_message("user-2") is True
+    first.close()
+    restarted.close()
+
+
+def test_sqlite_backend_migrates_legacy_json(tmp_path: Path) -> None:
+    store = tmp_path / "ratelimit" / "state.json"
+    store.parent.mkdir(parents=True)
+    store.write_text(
+        json.dumps({"user_buckets": {"user-1": {"tokens": 0.0, "last_refill": time.time()}}, "tool_buckets": {}}),
+        encoding="utf-8",
+    )
+    limiter = RateLimiter(messages_per_minute=1, store_path=store, backend="sqlite")
+    assert limiter.backend == "sqlite"
+    assert (tmp_path / "ratelimit" / "state.db").exists()
+    assert limiter.check_message("user-1") is False
+    assert limiter.check_message("user-3") is True
+    limiter.close()
+
+
+def test_snapshot_backend_migrates_legacy_json(tmp_path: Path) -> None:
+    store = tmp_path / "ratelimit" / "state.json"
+    store.parent.mkdir(parents=True)
+    store.write_text(
+        json.dumps({"user_buckets": {}, "tool_buckets": {"user-1": {"tokens": 0.0, "last_refill": time.time()}}}),
+        encoding="utf-8",
+    )
+    limiter = RateLimiter(tool_calls_per_minute=1, store_path=store, backend="snapshot")
+    assert limiter.check_tool_call("user-1") is False
+    assert limiter.check_tool_call("user-2") is True
+    limiter.close()
+
+
+def test_checks_per_second_benchmark(tmp_path: Path) -> None:
+    min_memory = int(os.environ.get("MINICLAW_RATELIMIT_MIN_MEMORY_CPS", DEFAULT_MIN_MEMORY_CPS))
+    min_sqlite = int(os.environ.get("MINICLAW_RATELIMIT_MIN_SQLITE_CPS", DEFAULT_MIN_SQLITE_CPS))
+
+    memory_cps = _checks_per_second(RateLimiter(messages_per_minute=10_000), 20_000)
+    sqlite_limiter = RateLimiter(messages_per_minute=10_000, store_path=tmp_path / "state.db", backend="sqlite")
+    sqlite_cps = _checks_per_second(sqlite_limiter, 2_000)
+    sqlite_limiter.close()
+
+    assert memory_cps >= min_memory, f"memory backend: {memory_cps:.0f} checks/s"
+    assert sqlite_cps >= min_sqlite, f"sqlite backend: {sqlite_cps:.0f} checks/s"
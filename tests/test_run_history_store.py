@@ -0,0 +1,153 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import Config, SessionsPolicyConfig
+from miniclaw.dashboard.app import create_app
+from miniclaw.session.manager import RunState
+from miniclaw.session.run_store import RunStore
+
+
+def _run(i: int, *, model: str, status: str = "completed", duration_s: float = 1.0, channel: str = "cli") -> RunState:
+    created = datetime(2026, 1, 1) + timedelta(minutes=i)
+    return RunState(
+        run_id=f"r{i:03d}",
+        session_key=f"{channel}:{i % 3}",
+        channel=channel,
+        chat_id=str(i % 3),
+        model=model,
+        status=status,
+        created_at=created,
+        started_at=created,
+        ended_at=created + timedelta(seconds=duration_s),
+    )
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> RunStore:
+    store = RunStore(path=tmp_path / "runs.db")
+    for i in range(30):
+        store.append(
+            _run(
+                i,
+                model="a" if i % 2 else "b",
+                status="error" if i % 5 == 0 else "completed",
+                duration_s=float(i + 1),
+                channel="telegram" if i >= 20 else "cli",
+            ),
+            agent_id="default",
+        )
+    yield store
+    store.close()
+
+
+def test_filters_and_cursor_pagination(store: RunStore) -> None:
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page = store.query(limit=4, cursor=cursor, model="a")
+        seen.extend(item["run_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"r{i:03d}" for i in range(29, 0, -2)]
+
+    telegram_errors = store.query(channel="telegram", status="error")["items"]
+    assert [item["run_id"] for item in telegram_errors] == ["r025", "r020"]
+    assert telegram_errors[0]["agent_id"] == "default"
+
+    window = store.query(since="2026-01-01T00:10:00", until="2026-01-01T00:12:00")["items"]
+    assert [item["run_id"] for item in window] == ["r011", "r010"]
+
+    with pytest.raises(ValueError):
+        store.query(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        store.query(color="red")
+
+
+def test_stats_by_model(store: RunStore) -> None:
+    rows = {row["model"]: row for row in store.stats(group_by="model")}
+    # Model "b" ran i = 0, 2, ..., 28 -> durations 1, 3, ..., 29 s; errors at i = 0, 10, 20.
+    assert rows["b"]["runs"] == 15
+    assert rows["b"]["errors"] == 3
+    assert rows["b"]["error_rate"] == 0.2
+    assert rows["b"]["p50_duration_ms"] == 15_000.0
+    assert rows["b"]["p95_duration_ms"] == 29_000.0
+    assert rows["a"]["errors"] == 3
+    with pytest.raises(ValueError):
+        store.stats(group_by="session_key; DROP TABLE runs")
+
+
+def test_purge_and_legacy_migration(tmp_path: Path) -> None:
+    legacy = tmp_path / "runs.jsonl"
+    legacy.write_text(json.dumps(_run(1, model="a").to_dict()) + "\n")
+    store = RunStore(path=tmp_path / "runs.db")
+    assert not legacy.exists()
+    assert [item["run_id"] for item in store.load_recent()] == ["r001"]
+
+    store.append(_run(2, model="a", channel="telegram"))
+    assert store.purge(user_id="telegram:") == 1
+    assert store.purge(before_ts=datetime(2027, 1, 1).timestamp()) == 1
+    assert store.load_recent() == []
+
+
+def test_agent_run_history_is_bounded_by_config(tmp_path: Path, monkeypatch) -> None:
+    from miniclaw.providers.base import LLMProvider
+
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+
+    class _Provider(LLMProvider):
+        async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+            raise NotImplementedError
+
+        def get_default_model(self) -> str:
+            return "test-model"
+
+    loop = AgentLoop(bus=MessageBus(), provider=_Provider(), workspace=tmp_path)
+    assert loop._run_store.max_records == 5000
+    policy = SessionsPolicyConfig(max_run_records=2)
+    loop = AgentLoop(bus=MessageBus(), provider=_Provider(), workspace=tmp_path, session_policy=policy)
+    for i in range(4):
+        loop._run_store.append(_run(i, model="a"))
+    assert [item["run_id"] for item in loop._run_store.load_recent()] == ["r003", "r002"]
+
+
+def test_dashboard_runs_filters_use_history(tmp_path: Path, store: RunStore) -> None:
+    class _Loop:
+        def list_runs(self, limit=50):
+            return [{"run_id": "in-memory"}]
+
+        def query_runs(self, **kwargs):
+            return store.query(**kwargs)
+
+        def run_stats(self, **kwargs):
+            return store.stats(**kwargs)
+
+    app = create_app(
+        config=Config(),
+        config_path=Path("/tmp/miniclaw-config.json"),
+        token="t",
+        bus=MessageBus(),
+        agent_loop=_Loop(),
+    )
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer t"}
+
+    assert client.get("/api/runs", headers=headers).json() == [{"run_id": "in-memory"}]
+    resp = client.get("/api/runs", params={"status": "error", "limit": 2}, headers=headers)
+    assert [item["run_id"] for item in resp.json()] == ["r025", "r020"]
+    next_page = client.get(
+        "/api/runs",
+        params={"status": "error", "limit": 2, "cursor": resp.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    assert [item["run_id"] for item in next_page.json()] == ["r015", "r010"]
+
+    stats = client.get("/api/runs/stats", params={"group_by": "channel"}, headers=headers).json()
+    assert {row["channel"] for row in stats} == {"cli", "telegram"}
+    assert client.get("/api/runs/stats", params={"group_by": "nope"}, headers=headers).status_code == 400
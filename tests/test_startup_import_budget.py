@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+# Wall-clock budget for `python -X importtime -m miniclaw --help`, summed over top-level imports.
+# Override with MINICLAW_IMPORT_BUDGET_MS on slow CI machines.
+DEFAULT_IMPORT_BUDGET_MS = 1500
+
+HEAVY_MODULES = ("litellm", "fastapi", "uvicorn", "telegram", "readability", "lxml", "pypdf")
+
+
+def _run_importtime(*args: str) -> tuple[dict[str, int], set[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        env={**os.environ, "NO_COLOR": "1"},
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    top_level: dict[str, int] = {}
+    loaded: set[str] = set()
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        loaded.add(name.strip())
+        # Top-level imports have exactly one space after the separator.
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level[name.strip()] = int(parts[1].strip())
+    return top_level, loaded
+
+
+def test_cli_help_does_not_import_heavy_dependencies() -> None:
+    _top_level, loaded = _run_importtime("-m", "miniclaw", "--help")
+    heavy = sorted(name for name in loaded if name.split(".", 1)[0] in HEAVY_MODULES)
+    assert heavy == []
+
+
+def test_light_submodules_do_not_import_litellm() -> None:
+    _top_level, loaded = _run_importtime(
+        "-c",
+        "import miniclaw.providers.oauth, miniclaw.agent.tools.filesystem, miniclaw.cron.service",
+    )
+    assert not any(name.split(".", 1)[0] == "litellm" for name in loaded)
+
+
+def test_cli_help_import_time_within_budget() -> None:
+    budget_ms = int(os.environ.get("MINICLAW_IMPORT_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS))
+    top_level, _loaded = _run_importtime("-m", "miniclaw", "--help")
+    total_ms = sum(top_level.values()) / 1000.0
+    assert total_ms <= budget_ms, f"import time {total_ms:.0f}ms exceeds budget {budget_ms}ms"
+
+
+def test_lazy_package_exports_resolve() -> None:
+    import miniclaw.agent as agent_pkg
+    import miniclaw.providers as providers_pkg
+
+    assert providers_pkg.LLMResponse.__name__ == "LLMResponse"
+    assert agent_pkg.ContextBuilder.__name__ == "ContextBuilder"
+    assert "LiteLLMProvider" in dir(providers_pkg)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from miniclaw.config.schema import Config
+from miniclaw.dashboard.app import create_app
+from miniclaw.monitoring.startup import StartupTimeline
+
+
+class _Bus:
+    def list_pending_approvals(self):
+        return []
+
+
+def test_timeline_records_sync_spans_and_errors() -> None:
+    timeline = StartupTimeline()
+    with timeline.span("config"):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with timeline.span("broken"):
+            raise RuntimeError("boom")
+
+    snapshot = timeline.snapshot()
+    spans = {span["name"]: span for span in snapshot["spans"]}
+    assert spans["config"]["status"] == "ok"
+    assert spans["config"]["duration_ms"] >= 10
+    assert spans["broken"]["status"] == "error"
+    assert spans["broken"]["error"] == "boom"
+    assert snapshot["ready"] is False
+
+
+async def test_start_all_runs_steps_concurrently() -> None:
+    timeline = StartupTimeline()
+
+    async def _slow(value: str) -> str:
+        await asyncio.sleep(0.1)
+        return value
+
+    began = time.perf_counter()
+    results = await timeline.start_all({"cron": _slow("c"), "heartbeat": _slow("h"), "alerts": _slow("a")})
+    elapsed = time.perf_counter() - began
+    timeline.mark_ready()
+
+    assert results == {"cron": "c", "heartbeat": "h", "alerts": "a"}
+    assert elapsed < 0.25
+    snapshot = timeline.snapshot()
+    assert snapshot["ready"] is True
+    assert [span["phase"] for span in snapshot["spans"]] == ["start", "start", "start"]
+
+
+async def test_start_all_settles_siblings_before_raising() -> None:
+    timeline = StartupTimeline()
+    finished: list[str] = []
+
+    async def _ok() -> None:
+        await asyncio.sleep(0.02)
+        finished.append("ok")
+
+    async def _fail() -> None:
+        raise ValueError("bad start")
+
+    with pytest.raises(ValueError):
+        await timeline.start_all({"ok": _ok(), "fail": _fail()})
+    assert finished == ["ok"]
+    statuses = {span["name"]: span["status"] for span in timeline.snapshot()["spans"]}
+    assert statuses == {"ok": "ok", "fail": "error"}
+
+
+async def test_wait_until_spans_service_startup_and_records_timeouts() -> None:
+    timeline = StartupTimeline()
+    flags = {"up": False}
+
+    async def bring_up() -> None:
+        await asyncio.sleep(0.03)
+        flags["up"] = True
+
+    asyncio.create_task(bring_up())
+    assert await timeline.wait_until("channels", lambda: flags["up"], poll_s=0.005) is True
+    assert await timeline.wait_until("servers", lambda: False, poll_s=0.005, timeout_s=0.02) is False
+
+    spans = {span["name"]: span for span in timeline.snapshot()["spans"]}
+    assert spans["channels"]["status"] == "ok"
+    assert spans["channels"]["duration_ms"] >= 25
+    assert spans["servers"]["status"] == "error"
+    assert "not up" in spans["servers"]["error"]
+
+
+def test_dashboard_status_exposes_startup_timeline() -> None:
+    timeline = StartupTimeline()
+    with timeline.span("config"):
+        pass
+    timeline.mark_ready()
+    app = create_app(
+        config=Config(),
+        config_path=Path("/tmp/miniclaw-config.json"),
+        token="t",
+        bus=_Bus(),
+        startup_timeline=timeline,
+    )
+    client = TestClient(app)
+
+    body = client.get("/api/status", headers={"Authorization": "Bearer t"}).json()
+    assert body["startup"]["ready"] is True
+    assert body["startup"]["spans"][0]["name"] == "config"
@@ -0,0 +1,153 @@
+import asyncio
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.agent.router import AgentRouter
+from miniclaw.agent.subagent import SubagentManager
+from miniclaw.agent.tools.spawn import SpawnTool
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import Config, SubagentPoolConfig
+from miniclaw.dashboard.app import create_app
+from miniclaw.providers.base import LLMProvider, LLMResponse
+
+
+class _GatedProvider(LLMProvider):
+    """Answers each subagent with its task text once `release` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self.started: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        task = messages[-1]["content"]
+        self.started.append(task)
+        await self.release.wait()
+        return LLMResponse(content=f"done {task}", usage={"prompt_tokens": 3, "completion_tokens": 2})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _manager(tmp_path: Path, provider: LLMProvider, **pool) -> SubagentManager:
+    return SubagentManager(
+        provider=provider, workspace=tmp_path, bus=MessageBus(), pool_config=SubagentPoolConfig(**pool)
+    )
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_spawns_queue_by_priority_instead_of_rejecting(tmp_path: Path) -> None:
+    provider = _GatedProvider()
+    manager = _manager(tmp_path, provider, max_concurrency=1, max_queue=2)
+
+    assert "started" in await manager.spawn("first")
+    assert "queued" in await manager.spawn("low", priority=0)
+    assert "queued" in await manager.spawn("high", priority=5)
+    assert "queue full" in await manager.spawn("overflow")
+    await _settle()
+    assert provider.started == ["first"]
+
+    stats = manager.stats()
+    assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 2, 1)
+    assert stats["queued_by_priority"] == {"5": 1, "0": 1}
+
+    provider.release.set()
+    for _ in range(3):
+        await asyncio.wait_for(manager.bus.consume_inbound(), timeout=2)
+    await _settle()
+    assert provider.started == ["first", "high", "low"]
+    stats = manager.stats()
+    assert (stats["running"], stats["queued"], stats["enqueued"], stats["completed"]) == (0, 0, 2, 3)
+    assert stats["parents"] == {}
+
+
+async def test_spawn_many_gathers_results_in_order_with_fan_out_limit(tmp_path: Path) -> None:
+    provider = _GatedProvider()
+    provider.release.set()
+    manager = _manager(tmp_path, provider, max_concurrency=2, max_per_parent=3, prewarm=2)
+    assert manager.stats()["idle_tool_registries"] == 2
+
+    results = await manager.spawn_many(["a", "b", {"task": "c", "label": "third"}, "d"])
+    assert [row["status"] for row in results] == ["ok", "ok", "ok", "rejected"]
+    assert [row["result"] for row in results[:3]] == ["done a", "done b", "done c"]
+    assert results[2]["label"] == "third"
+    assert results[0]["usage"]["total_tokens"] == 5
+    assert "fan-out limit" in results[3]["result"]
+    # Nothing is announced for gathered subtasks, and registries are reused.
+    assert manager.bus.inbound_size == 0
+    assert manager.stats()["idle_tool_registries"] == 2
+
+    tool = SpawnTool(manager)
+    output = await tool.execute(tasks=["x", "y"])
+    assert "## [1] x (ok)\ndone x" in output and "## [2] y (ok)\ndone y" in output
+
+
+async def test_cancelled_spawn_many_releases_the_pool(tmp_path: Path) -> None:
+    provider = _GatedProvider()
+    manager = _manager(tmp_path, provider, max_concurrency=1)
+    waiter = asyncio.create_task(manager.spawn_many(["a", "b", "c"]))
+    await _settle()
+    assert manager.stats()["queued"] == 2
+
+    waiter.cancel()
+    await asyncio.sleep(0.05)
+    stats = manager.stats()
+    assert (stats["running"], stats["queued"], stats["parents"]) == (0, 0, {})
+
+
+async def test_spawn_tool_caps_model_chosen_priority(tmp_path: Path) -> None:
+    provider = _GatedProvider()
+    manager = _manager(tmp_path, provider, max_concurrency=1, max_tool_priority=2)
+    tool = SpawnTool(manager)
+
+    await tool.execute(task="first")
+    await tool.execute(task="pushy", priority=1000)
+    await tool.execute(task="polite", priority=-1)
+    assert manager.stats()["queued_by_priority"] == {"2": 1, "-1": 1}
+    provider.release.set()
+    await asyncio.sleep(0.05)
+
+
+def test_dashboard_exposes_subagent_pool(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=_GatedProvider(),
+        workspace=tmp_path,
+        subagent_config=SubagentPoolConfig(max_concurrency=5, max_queue=7),
+    )
+    client = TestClient(create_app(config=Config(), config_path=tmp_path / "config.json", token="t", agent_loop=agent))
+    headers = {"Authorization": "Bearer t"}
+
+    body = client.get("/api/subagents", headers=headers).json()
+    assert body["enabled"] is True
+    assert (body["max_concurrency"], body["max_queue"], body["queued"]) == (5, 7, 0)
+    assert client.get("/api/status", headers=headers).json()["subagents"]["max_queue"] == 7
+
+
+def test_dashboard_sums_subagent_pools_across_routed_agents(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    bus = MessageBus()
+    agents = {
+        agent_id: AgentLoop(
+            bus=bus,
+            provider=_GatedProvider(),
+            workspace=tmp_path,
+            agent_id=agent_id,
+            subagent_config=SubagentPoolConfig(max_concurrency=concurrency),
+        )
+        for agent_id, concurrency in (("default", 2), ("ops", 3))
+    }
+    router = AgentRouter(bus=bus, agents=agents)
+    client = TestClient(create_app(config=Config(), config_path=tmp_path / "config.json", token="t", agent_loop=router))
+
+    body = client.get("/api/subagents", headers={"Authorization": "Bearer t"}).json()
+    assert body["enabled"] is True
+    assert (body["max_concurrency"], body["running"], body["spawned"]) == (5, 0, 0)
+    assert sorted(pool["agent_id"] for pool in body["agents"]) == ["default", "ops"]
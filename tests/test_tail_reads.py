@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from miniclaw.utils.jsonl import iter_lines_reverse, tail_lines
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 64 * 1024])
+def test_reverse_reader_handles_block_boundaries(tmp_path: Path, block_size: int) -> None:
+    path = tmp_path / "log.txt"
+    lines = ["first", "", "ünïcode ✓", "x" * 50, "last"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    assert list(iter_lines_reverse(path, block_size=block_size)) == ["last", "x" * 50, "ünïcode ✓", "first"]
+    assert list(iter_lines_reverse(path, block_size=block_size, skip_blank=False)) == list(reversed(lines))
+    assert tail_lines(path, 2) == ["x" * 50, "last"]
+
+
+def test_reverse_reader_without_trailing_newline_and_missing_file(tmp_path: Path) -> None:
+    path = tmp_path / "log.txt"
+    path.write_text("a\nb", encoding="utf-8")
+    assert tail_lines(path, 5) == ["a", "b"]
+    assert tail_lines(tmp_path / "missing.txt", 5) == []
+
+
+def test_tail_read_touches_only_the_end_of_large_files(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "big.log"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(200_000):
+            f.write(f"line {i}\n")
+
+    reads: list[int] = []
+    real_open = open
+
+    class _CountingFile:
+        def __init__(self, handle):
+            self._handle = handle
+
+        def read(self, size=-1):
+            data = self._handle.read(size)
+            reads.append(len(data))
+            return data
+
+        def __getattr__(self, name):
+            return getattr(self._handle, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self._handle.close()
+
+    monkeypatch.setattr("builtins.open", lambda *a, **kw: _CountingFile(real_open(*a, **kw)))
+    assert tail_lines(path, 3) == ["line 199997", "line 199998", "line 199999"]
+    assert sum(reads) <= 64 * 1024
+    assert path.stat().st_size > 10 * sum(reads)
+
@@ -0,0 +1,146 @@
+import hashlib
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.api.openai_compat import create_openai_compat_app
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import Config, RateLimitConfig, TokenLimitConfig
+from miniclaw.providers.base import LLMProvider, LLMResponse
+from miniclaw.providers.tts import KokoroTTSAdapter
+from miniclaw.ratelimit.tokens import TokenLimit, TokenRateLimiter
+
+
+class _UsageProvider(LLMProvider):
+    def __init__(self, prompt: int, completion: int) -> None:
+        super().__init__()
+        self.prompt = prompt
+        self.completion = completion
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        self.calls += 1
+        return LLMResponse(
+            content="ok",
+            usage={"prompt_tokens": self.prompt, "completion_tokens": self.completion},
+        )
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def test_admit_and_reconcile_track_actual_usage() -> None:
+    limiter = TokenRateLimiter(
+        [TokenLimit("user", 1000, 60), TokenLimit("model", 10_000, 60, counter="completion")],
+        estimate_completion_tokens=100,
+    )
+    reservation = limiter.admit(user="u", model="m", prompt_tokens=50, completion_tokens=100)
+    assert reservation is not None
+    assert limiter.usage("user", "u")["total_tokens"] == 150
+
+    limiter.reconcile(reservation, {"prompt_tokens": 700, "completion_tokens": 200, "total_tokens": 900})
+    assert limiter.usage("user", "u") == {"prompt_tokens": 700, "completion_tokens": 200, "total_tokens": 900}
+    assert limiter.usage("model", "m")["completion_tokens"] == 200
+
+    assert limiter.admit(user="u", model="m", prompt_tokens=50, completion_tokens=100) is None
+    assert limiter.admit(user="other", model="m", prompt_tokens=50, completion_tokens=100) is not None
+
+
+def test_idle_window_admits_oversized_estimate_and_windows_slide(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("miniclaw.ratelimit.tokens.time.time", lambda: now[0])
+    limiter = TokenRateLimiter([TokenLimit("session", 100, 10)])
+
+    assert limiter.admit(session="s", prompt_tokens=500) is not None
+    assert limiter.admit(session="s", prompt_tokens=1) is None
+    now[0] += 11
+    assert limiter.admit(session="s", prompt_tokens=1) is not None
+
+
+def test_session_estimate_uses_last_prompt_size() -> None:
+    limiter = TokenRateLimiter([TokenLimit("session", 10_000, 60)], estimate_completion_tokens=64)
+    assert limiter.estimate("abcd" * 10, session="s") == (10, 64)
+    reservation = limiter.admit(session="s", prompt_tokens=10)
+    limiter.reconcile(reservation, {"prompt_tokens": 3000, "completion_tokens": 10})
+    assert limiter.estimate("hi", session="s") == (3000, 64)
+
+
+def test_last_prompt_sizes_are_bounded_lru() -> None:
+    limiter = TokenRateLimiter([TokenLimit("session", 10_000, 60)], max_tracked_sessions=2)
+    for session in ("a", "b", "a", "c"):
+        reservation = limiter.admit(session=session, prompt_tokens=1)
+        limiter.reconcile(reservation, {"prompt_tokens": 500})
+    assert list(limiter._last_prompt) == ["a", "c"]
+    assert limiter.estimate("hi", session="b")[0] == 1
+
+
+def test_from_config() -> None:
+    assert TokenRateLimiter.from_config(RateLimitConfig()) is None
+    limiter = TokenRateLimiter.from_config(
+        RateLimitConfig(token_limits=[TokenLimitConfig(scope="model", max_tokens=5, window_seconds=30)])
+    )
+    assert limiter.limits == [TokenLimit("model", 5, 30.0)]
+
+
+async def test_agent_loop_reconciles_and_blocks_user(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    provider = _UsageProvider(prompt=900, completion=300)
+    limiter = TokenRateLimiter([TokenLimit("user", 1000, 3600)], estimate_completion_tokens=10)
+    agent = AgentLoop(bus=MessageBus(), provider=provider, workspace=workspace, token_limiter=limiter)
+
+    assert await agent.process_direct("hello", session_key="cli:a", channel="cli", chat_id="a") == "ok"
+    assert limiter.usage("user", "user") == {"prompt_tokens": 900, "completion_tokens": 300, "total_tokens": 1200}
+    assert agent._token_reservations == {}
+
+    reply = await agent.process_direct("again", session_key="cli:b", channel="cli", chat_id="b")
+    assert "token allowance" in reply
+    assert provider.calls == 1
+
+
+def test_openai_chat_completions_use_token_limiter(tmp_path) -> None:
+    config = Config()
+    config.agents.defaults.workspace = str(tmp_path)
+    config.api.openai_compat.auth_token = "token-123"
+    limiter = TokenRateLimiter([TokenLimit("user", 1000, 3600)], estimate_completion_tokens=50)
+    app = create_openai_compat_app(
+        config=config,
+        provider=_UsageProvider(prompt=800, completion=400),
+        agent_runtime=None,
+        tts_adapter=KokoroTTSAdapter(output_dir=tmp_path / "tts"),
+        transcription_manager=object(),
+        token_limiter=limiter,
+    )
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer token-123"}
+    body = {"model": "m", "user": "bob", "messages": [{"role": "user", "content": "hi"}]}
+
+    assert client.post("/v1/chat/completions", json=body, headers=headers).status_code == 200
+    # The budget belongs to the bearer token, not the client-chosen "user" field.
+    principal = "openai:" + hashlib.sha256(b"token-123").hexdigest()[:12]
+    assert limiter.usage("user", principal)["total_tokens"] == 1200
+    assert limiter.usage("user", "bob")["total_tokens"] == 0
+    resp = client.post("/v1/chat/completions", json=body, headers=headers)
+    assert resp.status_code == 429
+    resp = client.post("/v1/chat/completions", json={**body, "user": "eve"}, headers=headers)
+    assert resp.status_code == 429
+
+
+def test_openai_token_limiter_replaces_the_estimate_window(tmp_path) -> None:
+    config = Config()
+    config.agents.defaults.workspace = str(tmp_path)
+    config.api.openai_compat.auth_token = "token-123"
+    config.api.openai_compat.rate_limits.tokens_per_minute = 1
+    app = create_openai_compat_app(
+        config=config,
+        provider=_UsageProvider(prompt=10, completion=5),
+        agent_runtime=None,
+        tts_adapter=KokoroTTSAdapter(output_dir=tmp_path / "tts"),
+        transcription_manager=object(),
+        token_limiter=TokenRateLimiter([TokenLimit("user", 1000, 3600)]),
+    )
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    resp = TestClient(app).post("/v1/chat/completions", json=body, headers={"Authorization": "Bearer token-123"})
+    assert resp.status_code == 200
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.bus.queue import MessageBus
+from miniclaw.config.schema import Config, TracingConfig
+from miniclaw.dashboard.app import create_app
+from miniclaw.monitoring import tracing
+from miniclaw.monitoring.tracing import JsonlSpanExporter, OtlpJsonFileExporter, Tracer
+from miniclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+class _ToolThenReplyProvider(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        self.calls += 1
+        if self.calls == 1:
+            return LLMResponse(
+                content="",
+                tool_calls=[ToolCallRequest(id="t1", name="list_dir", arguments={"path": "."})],
+                usage={"prompt_tokens": 5, "completion_tokens": 2},
+            )
+        return LLMResponse(content="done", usage={"prompt_tokens": 9, "completion_tokens": 1})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+@pytest.fixture
+def enabled_tracer():
+    tracing.TRACER.reset()
+    tracing.TRACER.configure(enabled=True)
+    yield tracing.TRACER
+    tracing.TRACER.configure(enabled=False)
+    tracing.TRACER.reset()
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    tracer = Tracer(enabled=False)
+    with tracer.span("run", trace_id="r1") as span:
+        assert span is None
+    assert tracer.get_trace("r1") == []
+    assert tracer.waterfall("r1") is None
+
+
+def test_child_spans_without_root_are_not_recorded() -> None:
+    tracer = Tracer(enabled=True)
+    with tracer.span("tool") as span:
+        assert span is None
+    with tracer.span("run", trace_id="r1") as root:
+        with tracer.span("tool", tool="exec") as child:
+            assert child.parent_id == root.span_id
+        assert tracing.current_span() is root
+    assert tracing.current_span() is None
+    assert [s.name for s in tracer.get_trace("r1")] == ["run", "tool"]
+
+
+def test_error_marks_span_and_trace_eviction() -> None:
+    tracer = Tracer(enabled=True, max_traces=2)
+    with pytest.raises(RuntimeError):
+        with tracer.span("run", trace_id="a"):
+            raise RuntimeError("boom")
+    assert tracer.get_trace("a")[0].status == "error"
+    assert tracer.get_trace("a")[0].error == "boom"
+    for trace_id in ("b", "c"):
+        with tracer.span("run", trace_id=trace_id):
+            pass
+    assert tracer.get_trace("a") == []
+    assert tracer.waterfall("c")["span_count"] == 1
+
+
+async def test_agent_run_produces_span_tree(enabled_tracer, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    agent = AgentLoop(bus=MessageBus(), provider=_ToolThenReplyProvider(), workspace=workspace)
+
+    assert await agent.process_direct("hi", session_key="cli:t", channel="cli", chat_id="t") == "done"
+
+    run_id = agent.list_runs()[0]["run_id"]
+    waterfall = enabled_tracer.waterfall(run_id)
+    assert waterfall is not None
+    by_name: dict[str, list[dict]] = {}
+    for row in waterfall["spans"]:
+        by_name.setdefault(row["name"], []).append(row)
+
+    root = by_name["run"][0]
+    assert root["depth"] == 0
+    assert root["attributes"]["status"] == "completed"
+    assert len(by_name["dialog.iteration"]) == 2
+    assert all(row["parent_id"] == root["span_id"] for row in by_name["dialog.iteration"])
+    llm_calls = by_name["llm.call"]
+    assert len(llm_calls) == 2
+    assert llm_calls[0]["attributes"]["prompt_tokens"] == 5
+    assert llm_calls[0]["depth"] == 2
+    tool = by_name["tool"][0]
+    assert tool["attributes"]["tool"] == "list_dir"
+    assert tool["parent_id"] == by_name["dialog.iteration"][0]["span_id"]
+    assert {row["attributes"]["hook_event"] for row in by_name["hook"]} >= {"SessionStart"}
+    assert "session.save" in by_name
+    assert all(row["status"] == "ok" for row in waterfall["spans"])
+
+
+def test_dashboard_trace_endpoint(enabled_tracer) -> None:
+    with enabled_tracer.span("run", trace_id="run-1"):
+        with enabled_tracer.span("llm.call", model="m"):
+            pass
+    app = create_app(config=Config(), config_path=Path("/tmp/miniclaw-config.json"), token="t", bus=MessageBus())
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer t"}
+
+    assert client.get("/api/runs/run-1/trace").status_code == 401
+    resp = client.get("/api/runs/run-1/trace", headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["span_count"] == 2
+    assert [row["depth"] for row in body["spans"]] == [0, 1]
+    assert client.get("/api/runs/missing/trace", headers=headers).status_code == 404
+
+
+def test_jsonl_and_otlp_exporters(tmp_path) -> None:
+    jsonl_path = tmp_path / "spans.jsonl"
+    tracer = Tracer(enabled=True, exporter=JsonlSpanExporter(jsonl_path))
+    with tracer.span("run", trace_id="r1"):
+        with tracer.span("tool", tool="exec") as child:
+            child.add_event("first_token")
+    lines = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["run", "tool"]
+    assert lines[1]["events"][0]["name"] == "first_token"
+
+    otlp_path = tmp_path / "otlp.jsonl"
+    tracer = Tracer(enabled=True, exporter=OtlpJsonFileExporter(otlp_path))
+    with tracer.span("run", trace_id="r2"):
+        with tracer.span("hook", hook_event="PreToolUse"):
+            pass
+    payload = json.loads(otlp_path.read_text().splitlines()[0])
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(spans) == 2
+    assert len(spans[0]["traceId"]) == 32 and spans[0]["traceId"] == spans[1]["traceId"]
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+
+
+def test_exports_inside_a_loop_run_off_the_loop_and_log_failures(tmp_path) -> None:
+    class _RecordingExporter:
+        def __init__(self) -> None:
+            self.threads: list[str] = []
+
+        def export(self, spans) -> None:
+            self.threads.append(threading.current_thread().name)
+            if spans[0].trace_id == "broken":
+                raise OSError("disk full")
+
+    exporter = _RecordingExporter()
+    tracer = Tracer(enabled=True, exporter=exporter)
+    messages: list[str] = []
+    sink = logger.add(messages.append, level="WARNING")
+
+    async def main() -> None:
+        with tracer.span("run", trace_id="ok"):
+            pass
+        with tracer.span("run", trace_id="broken"):
+            pass
+        await tracer.flush()
+
+    try:
+        asyncio.run(main())
+    finally:
+        logger.remove(sink)
+    assert len(exporter.threads) == 2
+    assert threading.main_thread().name not in exporter.threads
+    assert any("broken" in message and "disk full" in message for message in messages)
+
+
+def test_configure_from_config(tmp_path) -> None:
+    tracer = tracing.configure(TracingConfig(enabled=True, exporter="otlp"), data_dir=tmp_path)
+    try:
+        assert isinstance(tracer.exporter, OtlpJsonFileExporter)
+        assert tracer.exporter.path == tmp_path / "traces" / "otlp.jsonl"
+    finally:
+        tracing.TRACER.configure(enabled=False)
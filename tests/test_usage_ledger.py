@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from miniclaw.usage import UsageRollups, UsageTracker
+from miniclaw.usage.rollups import DAY_MS, HOUR_MS, MINUTE_MS
+
+
+def _tracker(tmp_path: Path) -> UsageTracker:
+    return UsageTracker(
+        store_path=tmp_path / "usage" / "events.jsonl",
+        pricing={"m1": {"input_per_1m_tokens_usd": 1.0, "output_per_1m_tokens_usd": 2.0}},
+        aggregation_windows=["1h", "1d", "30d"],
+    )
+
+
+def _record_at(tracker: UsageTracker, monkeypatch, ts: float, **kwargs) -> None:
+    monkeypatch.setattr(time, "time", lambda: ts)
+    tracker.record(**kwargs)
+
+
+def test_record_writes_day_partitions_and_rollups(tmp_path: Path, monkeypatch) -> None:
+    tracker = _tracker(tmp_path)
+    now = time.time()
+    _record_at(tracker, monkeypatch, now - 3 * 86400, source="agent", model="m1", total_tokens=100, session_key="s:old")
+    _record_at(tracker, monkeypatch, now - 120, source="agent", model="m1", prompt_tokens=10, completion_tokens=5,
+               session_key="s:a", user_id="u1")
+    _record_at(tracker, monkeypatch, now, source="api", model="m2", total_tokens=7, session_key="s:a")
+
+    assert len(tracker.segment_paths()) >= 2
+    summary = tracker.summary()
+    assert summary["overall"]["totals"]["events"] == 3
+    assert summary["overall"]["totals"]["total_tokens"] == 122
+    assert summary["windows"]["1h"]["totals"]["events"] == 2
+    assert summary["windows"]["1h"]["totals"]["total_tokens"] == 22
+    assert summary["windows"]["30d"]["totals"]["events"] == 3
+    assert {row["source"] for row in summary["windows"]["1h"]["sources"]} == {"agent", "api"}
+
+    by_session = tracker.breakdown(dimension="session", window="1d")
+    assert by_session["items"][0]["session"] == "s:a"
+    assert by_session["items"][0]["events"] == 2
+    assert tracker.breakdown(dimension="user")["items"][0]["user"] == "u1"
+    with pytest.raises(ValueError):
+        tracker.breakdown(dimension="nope")
+
+
+def test_rollups_survive_restart_and_replay_tail(tmp_path: Path) -> None:
+    tracker = _tracker(tmp_path)
+    tracker.record(source="agent", model="m1", total_tokens=10)
+    tracker.flush()
+    # Written after the snapshot: must be replayed from the segment tail.
+    tracker.record(source="agent", model="m1", total_tokens=5)
+
+    reopened = _tracker(tmp_path)
+    assert reopened.summary()["overall"]["totals"]["total_tokens"] == 15
+    snapshot = json.loads(reopened.rollups_path.read_text())
+    assert sum(snapshot["offsets"].values()) == sum(p.stat().st_size for p in reopened.segment_paths())
+
+
+def test_interleaved_writers_do_not_skip_each_others_events(tmp_path: Path) -> None:
+    first = _tracker(tmp_path)
+    second = _tracker(tmp_path)
+    first.record(source="agent", model="m1", total_tokens=1)
+    second.record(source="agent", model="m1", total_tokens=10)
+    first.record(source="agent", model="m1", total_tokens=100)
+    first.flush()
+
+    assert first.summary()["overall"]["totals"]["total_tokens"] == 111
+    reopened = _tracker(tmp_path)
+    assert reopened.summary()["overall"]["totals"]["total_tokens"] == 111
+
+
+def test_legacy_single_file_ledger_is_migrated(tmp_path: Path) -> None:
+    legacy = tmp_path / "usage" / "events.jsonl"
+    legacy.parent.mkdir(parents=True)
+    now_ms = int(time.time() * 1000)
+    legacy.write_text(
+        "\n".join(
+            json.dumps({"ts_ms": ts, "source": "agent", "model": "m1", "total_tokens": 4, "session_key": "s"})
+            for ts in (now_ms - 2 * DAY_MS, now_ms)
+        )
+        + "\n"
+    )
+    tracker = _tracker(tmp_path)
+    assert not legacy.exists()
+    assert len(tracker.segment_paths()) == 2
+    assert tracker.summary()["overall"]["totals"]["total_tokens"] == 8
+
+
+def test_purge_touches_only_relevant_partitions(tmp_path: Path, monkeypatch) -> None:
+    tracker = _tracker(tmp_path)
+    now = time.time()
+    for days_ago in (10, 5, 0):
+        _record_at(tracker, monkeypatch, now - days_ago * 86400, source="agent", model="m1", total_tokens=1,
+                   session_key="s:keep")
+    _record_at(tracker, monkeypatch, now, source="agent", model="m1", total_tokens=1, session_key="s:gone")
+    monkeypatch.undo()
+
+    today = tracker.segment_paths()[-1]
+    today_mtime = today.stat().st_mtime_ns
+    cutoff_ms = int((now - 3 * 86400) * 1000)
+    assert tracker.purge(before_ts_ms=cutoff_ms) == 2
+    assert today.stat().st_mtime_ns == today_mtime
+    assert len(tracker.segment_paths()) == 1
+
+    assert tracker.purge(session_key="s:gone") == 1
+    summary = tracker.summary()
+    assert summary["overall"]["totals"]["events"] == 1
+    assert tracker.breakdown(dimension="session")["items"] == [
+        {"session": "s:keep", "events": 1, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 1,
+         "cost_usd": 0.0}
+    ]
+    assert _tracker(tmp_path).summary()["overall"]["totals"]["events"] == 1
+
+
+def test_rollup_plan_uses_coarse_buckets() -> None:
+    rollups = UsageRollups()
+    now_ms = 100 * DAY_MS + 5 * HOUR_MS + 7 * MINUTE_MS + 1234
+
+    # Older than minute retention: hour-aligned, whole days in the middle.
+    start_ms = now_ms - 3 * DAY_MS
+    assert rollups.resolution_for(start_ms, now_ms) == "hour"
+    plan = rollups.plan(start_ms, now_ms, "hour")
+    assert [name for name, _start in plan].count("day") == 2
+    assert plan[-1] == ("hour", now_ms - now_ms % HOUR_MS)
+
+    start_ms = now_ms - HOUR_MS
+    assert rollups.resolution_for(start_ms, now_ms) == "minute"
+    plan = rollups.plan(start_ms, now_ms, "minute")
+    assert len(plan) <= 61
+    assert plan[-1] == ("minute", now_ms - now_ms % MINUTE_MS)
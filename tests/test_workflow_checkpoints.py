@@ -0,0 +1,176 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from miniclaw.workflows.runtime import LinearWorkflowRuntime, WorkflowRecipe
+from miniclaw.workflows.store import WorkflowRunStore, WorkflowStepCache
+
+
+class _ScriptedRuntime:
+    """Agent runtime stand-in that counts calls and can fail or hang on a prompt."""
+
+    def __init__(self) -> None:
+        self.model = "model-a"
+        self.calls: list[str] = []
+        self.fail: set[str] = set()
+        self.hang: set[str] = set()
+
+    async def process_direct(self, content: str, **kwargs) -> str:
+        self.calls.append(content)
+        if content in self.hang:
+            await asyncio.sleep(60)
+        return "" if content in self.fail else f"done: {content}"
+
+
+def _recipe(mode: str = "linear", **extra) -> WorkflowRecipe:
+    return WorkflowRecipe.from_dict(
+        {
+            "name": "pipeline",
+            "mode": mode,
+            "steps": [
+                {"id": "fetch", "prompt": "fetch {topic}"},
+                {"id": "summarize", "prompt": "summarize {fetch_output}", "depends_on": ["fetch"]},
+                {"id": "publish", "prompt": "publish {summarize_output}", "depends_on": ["summarize"]},
+            ],
+            **extra,
+        }
+    )
+
+
+@pytest.mark.parametrize("mode", ["linear", "dag"])
+async def test_resume_skips_checkpointed_steps(tmp_path: Path, mode: str) -> None:
+    store = WorkflowRunStore(tmp_path / "runs.db")
+    runtime = _ScriptedRuntime()
+    runtime.fail.add("summarize done: fetch x")
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path, run_store=store)
+
+    result = await wf.run_recipe(_recipe(mode), vars={"topic": "x"})
+    assert result["status"] == "failed"
+    saved = store.get(result["id"])
+    assert saved["status"] == "failed"
+    assert saved["steps"]["fetch"]["status"] == "ok"
+    assert saved["scoped_vars"]["fetch_output"] == "done: fetch x"
+
+    runtime.fail.clear()
+    runtime.calls.clear()
+    resumed = await wf.resume_run(result["id"])
+    assert resumed["status"] == "completed"
+    assert resumed["id"] == result["id"]
+    assert runtime.calls == ["summarize done: fetch x", "publish done: summarize done: fetch x"]
+    assert [row["id"] for row in resumed["steps"]] == ["fetch", "summarize", "publish"]
+    assert store.get(result["id"])["resumes"] == 1
+
+    with pytest.raises(ValueError):
+        await wf.resume_run(result["id"])
+    with pytest.raises(KeyError):
+        await wf.resume_run("wf_missing")
+
+
+async def test_memoized_rerun_only_calls_changed_steps(tmp_path: Path) -> None:
+    store = WorkflowRunStore(tmp_path / "runs.db")
+    cache = WorkflowStepCache(tmp_path / "cache.db")
+    runtime = _ScriptedRuntime()
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path, run_store=store, step_cache=cache)
+
+    # A plain run writes nothing: no step opted in to caching.
+    await wf.run_recipe(_recipe(), vars={"topic": "x"})
+    assert cache.stats()["entries"] == 0
+
+    runtime.calls.clear()
+    first = await wf.run_recipe(_recipe(memoize=True), vars={"topic": "x"})
+    assert first["status"] == "completed"
+    assert len(runtime.calls) == 3
+
+    runtime.calls.clear()
+    again = await wf.run_recipe(_recipe(memoize=True), vars={"topic": "x"})
+    assert again["status"] == "completed"
+    assert runtime.calls == []
+    assert all(row.get("cached") for row in again["steps"])
+    # One store, one entry per step and prompt.
+    assert cache.stats()["entries"] == 3
+    assert [row["output"] for row in again["steps"]] == [row["output"] for row in first["steps"]]
+
+    # Editing the second prompt re-runs it and everything that consumes its output.
+    edited = _recipe(memoize=True)
+    edited.steps[1].prompt = "summarize briefly {fetch_output}"
+    await wf.run_recipe(edited, vars={"topic": "x"})
+    assert runtime.calls == ["summarize briefly done: fetch x", "publish done: summarize briefly done: fetch x"]
+
+    runtime.calls.clear()
+    await wf.run_recipe(_recipe(), vars={"topic": "x"}, memoize=False)
+    assert len(runtime.calls) == 3
+
+    # Outputs are keyed on the model that produced them, not only on the override.
+    runtime.calls.clear()
+    runtime.model = "model-b"
+    await wf.run_recipe(_recipe(memoize=True), vars={"topic": "x"})
+    assert len(runtime.calls) == 3
+    runtime.calls.clear()
+    await wf.run_recipe(_recipe(memoize=True), vars={"topic": "x"}, model_override="model-a")
+    assert runtime.calls == []
+
+
+async def test_cancelled_run_is_resumable_after_restart(tmp_path: Path) -> None:
+    runtime = _ScriptedRuntime()
+    runtime.hang.add("summarize done: fetch x")
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path, run_store=WorkflowRunStore(tmp_path / "runs.db"))
+
+    run_id = wf.start_recipe(_recipe(), vars={"topic": "x"})
+    assert wf.get_run(run_id)["status"] == "running"
+    for _ in range(100):
+        if len(runtime.calls) == 2:
+            break
+        await asyncio.sleep(0.01)
+    wf._background[run_id].cancel()
+    await asyncio.sleep(0.05)
+    assert wf.list_runs(status="interrupted")[0]["run_id"] == run_id
+
+    # A fresh runtime over the same database picks the run up where it stopped.
+    runtime.hang.clear()
+    runtime.calls.clear()
+    restarted = LinearWorkflowRuntime(
+        agent_runtime=runtime, workspace=tmp_path, run_store=WorkflowRunStore(tmp_path / "runs.db")
+    )
+    result = await restarted.resume_run(run_id)
+    assert result["status"] == "completed"
+    assert runtime.calls == ["summarize done: fetch x", "publish done: summarize done: fetch x"]
+
+
+def test_store_prunes_oldest_finished_runs(tmp_path: Path) -> None:
+    store = WorkflowRunStore(tmp_path / "runs.db", max_runs=2)
+    for i in range(4):
+        store.save({"run_id": f"wf_{i}", "recipe": {"name": "r"}, "status": "completed", "created_at": 1.0 + i})
+    store.save({"run_id": "wf_live", "recipe": {"name": "r"}, "status": "running", "created_at": 1.0})
+
+    assert store.prune() == 2
+    assert {row["run_id"] for row in store.list_runs()} == {"wf_2", "wf_3", "wf_live"}
+
+
+async def test_runs_left_running_by_a_crash_become_interrupted(tmp_path: Path) -> None:
+    store = WorkflowRunStore(tmp_path / "runs.db", max_runs=1)
+    runtime = _ScriptedRuntime()
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path, run_store=store)
+    state = wf._new_state(
+        _recipe(),
+        vars={"topic": "x"},
+        channel="system",
+        chat_id="workflow",
+        model_override=None,
+        approval_session_key=None,
+        memoize=False,
+    )
+    store.save(state)  # checkpointed, then the process died
+    other = WorkflowRunStore(tmp_path / "runs.db")
+    assert other.mark_interrupted() == 0  # the first store still owns the database
+    other.close()
+    store.close()
+
+    restarted = LinearWorkflowRuntime(
+        agent_runtime=runtime, workspace=tmp_path, run_store=WorkflowRunStore(tmp_path / "runs.db", max_runs=1)
+    )
+    assert restarted.get_run(state["run_id"])["status"] == "interrupted"
+    assert (await restarted.resume_run(state["run_id"]))["status"] == "completed"
+    # Finished now, so it is prunable like any other run.
+    newer = await restarted.run_recipe(_recipe(), vars={"topic": "y"})
+    assert [row["run_id"] for row in restarted.list_runs()] == [newer["id"]]
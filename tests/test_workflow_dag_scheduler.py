@@ -0,0 +1,105 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from miniclaw.workflows.benchmark import SleepRuntime, compare
+from miniclaw.workflows.runtime import LinearWorkflowRuntime, WorkflowRecipe
+
+
+class StampingRuntime(SleepRuntime):
+    """Sleeps like `SleepRuntime` and records when each prompt starts."""
+
+    def __init__(self, fail: set[str] | None = None):
+        self.started: dict[str, float] = {}
+        self.running = 0
+        self.max_running = 0
+        self.fail = fail or set()
+
+    async def process_direct(self, content: str, **kwargs) -> str:
+        name = content.split("|", 1)[0]
+        self.started[name] = time.perf_counter()
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await super().process_direct(content.split("|", 1)[1], **kwargs)
+        finally:
+            self.running -= 1
+        return "" if name in self.fail else f"{name} ok"
+
+
+def _recipe(steps: list[dict], **extra) -> WorkflowRecipe:
+    return WorkflowRecipe.from_dict({"name": "sched", "mode": "dag", "steps": steps, **extra})
+
+
+@pytest.mark.parametrize("scheduler", ["eager", "waves"])
+async def test_successor_of_fast_step_waits_only_for_its_dependency(tmp_path: Path, scheduler: str) -> None:
+    runtime = StampingRuntime()
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path, dag_scheduler=scheduler)
+    recipe = _recipe(
+        [
+            {"id": "slow", "prompt": "slow|sleep:0.3"},
+            {"id": "fast", "prompt": "fast|sleep:0.01"},
+            {"id": "after_fast", "prompt": "after_fast|sleep:0.01", "depends_on": ["fast"]},
+        ]
+    )
+    started = time.perf_counter()
+    result = await wf.run_recipe(recipe)
+
+    assert result["status"] == "completed"
+    delay = runtime.started["after_fast"] - started
+    if scheduler == "eager":
+        assert delay < 0.2
+    else:
+        assert delay >= 0.3
+
+
+async def test_eager_honors_max_parallel_and_recipe_order(tmp_path: Path) -> None:
+    runtime = StampingRuntime()
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path)
+    recipe = _recipe([{"id": f"s{i}", "prompt": f"s{i}|sleep:0.02"} for i in range(6)], max_parallel=2)
+    result = await wf.run_recipe(recipe)
+
+    assert result["status"] == "completed"
+    assert runtime.max_running == 2
+    assert sorted(runtime.started, key=runtime.started.get) == [f"s{i}" for i in range(6)]
+
+
+async def test_eager_failure_semantics(tmp_path: Path) -> None:
+    runtime = StampingRuntime(fail={"bad", "stopper"})
+    wf = LinearWorkflowRuntime(agent_runtime=runtime, workspace=tmp_path)
+    recipe = _recipe(
+        [
+            {"id": "bad", "prompt": "bad|sleep:0.01", "on_failure": "continue"},
+            {"id": "child", "prompt": "child|sleep:0.01", "depends_on": ["bad"]},
+            {"id": "grandchild", "prompt": "grandchild|sleep:0.01", "depends_on": ["child"]},
+            {"id": "ok", "prompt": "ok|sleep:0.01"},
+        ]
+    )
+    result = await wf.run_recipe(recipe)
+    rows = {row["id"]: row for row in result["steps"]}
+    assert result["status"] == "failed"
+    assert rows["child"]["reason"] == "dependency_failed"
+    assert rows["grandchild"]["dependency"] == "child"
+    assert rows["ok"]["status"] == "ok"
+
+    recipe = _recipe(
+        [
+            {"id": "stopper", "prompt": "stopper|sleep:0.01"},
+            {"id": "long", "prompt": "long|sleep:0.05"},
+            {"id": "later", "prompt": "later|sleep:0.01", "depends_on": ["long"]},
+        ]
+    )
+    result = await wf.run_recipe(recipe)
+    rows = {row["id"]: row for row in result["steps"]}
+    assert result["status"] == "failed"
+    # In-flight steps finish, nothing new starts after a stopping failure.
+    assert rows["long"]["status"] == "ok"
+    assert rows["later"]["reason"] == "workflow_stopped"
+    assert [row["id"] for row in result["steps"]] == ["stopper", "long", "later"]
+
+
+async def test_benchmark_eager_tracks_critical_path() -> None:
+    report = await compare(steps=20, max_deps=2, runs=2, fast_s=0.005, slow_s=0.05)
+    assert report["mean_eager_over_critical"] <= report["mean_waves_over_critical"] + 0.05
+    assert all(row["eager_ms"] >= row["critical_path_ms"] for row in report["runs"])
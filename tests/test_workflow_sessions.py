@@ -0,0 +1,114 @@
+import asyncio
+import time
+from pathlib import Path
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.agent.router import AgentRouter
+from miniclaw.bus.queue import MessageBus
+from miniclaw.providers.base import LLMProvider, LLMResponse
+from miniclaw.workflows.runtime import LinearWorkflowRuntime, WorkflowRecipe
+
+
+class _SlowProvider(LLMProvider):
+    """Replies after a fixed delay with the number of user turns it was sent."""
+
+    def __init__(self, delay_s: float) -> None:
+        super().__init__()
+        self.delay_s = delay_s
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        await asyncio.sleep(self.delay_s)
+        users = sum(1 for m in messages if m.get("role") == "user")
+        return LLMResponse(content=f"users={users}")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _recipe(session: str) -> WorkflowRecipe:
+    return WorkflowRecipe.from_dict(
+        {
+            "name": "parallel",
+            "steps": [
+                {"id": "draft", "prompt": "draft for {who}", "session": session},
+                {"id": "review", "prompt": "review {draft_output}", "session": session},
+            ],
+        }
+    )
+
+
+async def test_parallel_runs_of_one_recipe_do_not_serialize(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    agent = AgentLoop(bus=MessageBus(), provider=_SlowProvider(0.1), workspace=tmp_path)
+    wf = LinearWorkflowRuntime(agent_runtime=agent, workspace=tmp_path)
+    recipe = _recipe("run")
+
+    started = time.perf_counter()
+    single = await wf.run_recipe(recipe, vars={"who": "solo"})
+    one_run_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(wf.run_recipe(recipe, vars={"who": f"user{i}"}) for i in range(6)))
+    parallel_s = time.perf_counter() - started
+
+    assert single["status"] == "completed"
+    assert all(r["status"] == "completed" for r in results)
+    assert parallel_s < one_run_s * 2.5
+    # "run" steps share one session within a run and see nothing from the others.
+    assert [s["output"] for s in results[0]["steps"]] == ["users=1", "users=2"]
+    assert not [s for s in agent.sessions.list_sessions() if s["key"].startswith("workflow:")]
+
+
+async def test_run_sessions_are_dropped_through_the_agent_router(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    bus = MessageBus()
+    primary = AgentLoop(bus=bus, provider=_SlowProvider(0.0), workspace=tmp_path)
+    replica = AgentLoop(bus=bus, provider=_SlowProvider(0.0), workspace=tmp_path, session_manager=primary.sessions)
+    router = AgentRouter(bus=bus, agents={"default": primary}, replicas={"default": [replica]})
+    wf = LinearWorkflowRuntime(agent_runtime=router, workspace=tmp_path)
+
+    for who in ("a", "b", "c"):
+        assert (await wf.run_recipe(_recipe("step"), vars={"who": who}))["status"] == "completed"
+    assert not [s for s in primary.sessions.list_sessions() if "workflow:" in s["key"]]
+    assert not router._session_bindings
+
+
+async def test_step_sessions_are_isolated_and_shared_sessions_persist(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    agent = AgentLoop(bus=MessageBus(), provider=_SlowProvider(0.0), workspace=tmp_path)
+    wf = LinearWorkflowRuntime(agent_runtime=agent, workspace=tmp_path)
+
+    result = await wf.run_recipe(_recipe("step"), vars={"who": "a"})
+    assert [s["output"] for s in result["steps"]] == ["users=1", "users=1"]
+
+    for who in ("a", "b"):
+        result = await wf.run_recipe(_recipe("shared"), vars={"who": who})
+    assert [s["output"] for s in result["steps"]] == ["users=2", "users=2"]
+    keys = {s["key"] for s in agent.sessions.list_sessions()}
+    assert {"workflow:parallel:draft", "workflow:parallel:review"} <= keys
+
+
+async def test_approvals_of_concurrent_runs_do_not_block_each_other(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    bus = MessageBus()
+    agent = AgentLoop(bus=bus, provider=_SlowProvider(0.0), workspace=tmp_path)
+    wf = LinearWorkflowRuntime(agent_runtime=agent, bus=bus, workspace=tmp_path)
+    recipe = WorkflowRecipe.from_dict(
+        {"name": "gated", "steps": [{"id": "go", "prompt": "go {who}", "require_approval": True}]}
+    )
+    runs = [
+        asyncio.create_task(wf.run_recipe(recipe, vars={"who": "a"}, approval_session_key="webhook:a")),
+        asyncio.create_task(wf.run_recipe(recipe, vars={"who": "b"})),
+    ]
+    for _ in range(100):
+        if len(bus.list_pending_approvals()) == 2:
+            break
+        await asyncio.sleep(0.01)
+    pending = bus.list_pending_approvals()
+    assert sorted(p["session_key"] for p in pending) == ["dashboard:approvals", "webhook:a"]
+    assert len({p["run_id"] for p in pending}) == 2
+
+    for event in reversed(pending):
+        assert bus.submit_response(event["session_key"], "approve", approval_id=event["id"])
+    results = await asyncio.wait_for(asyncio.gather(*runs), timeout=5)
+    assert [r["status"] for r in results] == ["completed", "completed"]
@@ -0,0 +1,172 @@
+import json
+import time
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from miniclaw.agent.loop import AgentLoop
+from miniclaw.agent.router import AgentRouter
+from miniclaw.bus.queue import MessageBus
+from miniclaw.cli import commands as cli_commands
+from miniclaw.config.loader import load_config
+from miniclaw.providers.base import LLMProvider, LLMResponse
+from miniclaw.usage import UsageTracker
+from miniclaw.workflows.runtime import LinearWorkflowRuntime, WorkflowRecipe
+from miniclaw.workflows.store import WorkflowStepCache
+
+
+class _CountingProvider(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7, thinking=None):
+        self.calls += 1
+        return LLMResponse(content=f"answer {self.calls}", usage={"prompt_tokens": 30, "completion_tokens": 12})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _recipe(**extra) -> WorkflowRecipe:
+    return WorkflowRecipe.from_dict(
+        {
+            "name": "daily",
+            "steps": [
+                {"id": "collect", "prompt": "collect {day}", "cache_ttl_s": 3600},
+                {"id": "report", "prompt": "report {collect_output}"},
+            ],
+            **extra,
+        }
+    )
+
+
+async def test_cached_steps_skip_the_agent_and_report_saved_tokens(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    provider = _CountingProvider()
+    agent = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path)
+    tracker = UsageTracker(store_path=tmp_path / "usage" / "events.jsonl")
+    wf = LinearWorkflowRuntime(
+        agent_runtime=agent,
+        workspace=tmp_path,
+        step_cache=WorkflowStepCache(tmp_path / "cache.db"),
+        usage_tracker=tracker,
+    )
+
+    first = await wf.run_recipe(_recipe(), vars={"day": "mon"})
+    assert first["cache"] == {"hits": 0, "misses": 1, "tokens_saved": 0}
+    assert provider.calls == 2
+
+    second = await wf.run_recipe(_recipe(), vars={"day": "mon"})
+    assert second["cache"] == {"hits": 1, "misses": 0, "tokens_saved": 42}
+    assert second["steps"][0]["cached"] is True
+    assert second["steps"][0]["output"] == first["steps"][0]["output"]
+    # "report" did not opt in, so it runs again and is never recorded.
+    assert provider.calls == 3
+    assert wf.step_cache.stats()["entries"] == 1
+
+    await wf.run_recipe(_recipe(), vars={"day": "tue"})
+    await wf.run_recipe(_recipe(version="2"), vars={"day": "mon"})
+    assert provider.calls == 7
+
+    sources = {row["source"]: row for row in tracker.breakdown(dimension="source")["items"]}
+    assert sources["workflow_cache"]["events"] == 4
+    events = [json.loads(line) for path in tracker.segment_paths() for line in path.read_text().splitlines()]
+    saved = [e["metadata"]["tokens_saved"] for e in events if e["source"] == "workflow_cache"]
+    assert saved == [0, 42, 0, 0]
+
+
+async def test_replay_serves_every_step_from_cache(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    provider = _CountingProvider()
+    cache = WorkflowStepCache(tmp_path / "cache.db")
+    agent = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path)
+    recipe = WorkflowRecipe.from_dict(
+        {
+            "name": "gated",
+            "steps": [
+                {"id": "a", "prompt": "a {x}"},
+                {"id": "b", "prompt": "b {a_output}", "require_approval": True},
+            ],
+        }
+    )
+    live = LinearWorkflowRuntime(agent_runtime=agent, workspace=tmp_path, step_cache=cache, record_for_replay=True)
+    await live.run_recipe(recipe, vars={"x": "1"})
+    assert provider.calls == 2
+
+    # No agent and a bus nobody answers: replays must not need either.
+    replay = LinearWorkflowRuntime(
+        agent_runtime=None, bus=MessageBus(), step_cache=cache, approval_timeout_s=1, default_model="test-model"
+    )
+    result = await replay.run_recipe(recipe, vars={"x": "1"}, replay=True)
+    assert result["status"] == "completed"
+    assert [row["output"] for row in result["steps"]] == ["answer 1", "answer 2"]
+    assert result["cache"] == {"hits": 2, "misses": 0, "tokens_saved": 84}
+
+    result = await replay.run_recipe(recipe, vars={"x": "2"}, replay=True)
+    assert result["status"] == "failed"
+    assert result["steps"][0]["reason"] == "cache_miss"
+    assert provider.calls == 2
+
+
+async def test_router_runs_use_the_agent_model_and_report_saved_tokens(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    bus = MessageBus()
+    provider = _CountingProvider()
+    agent = AgentLoop(bus=bus, provider=provider, workspace=tmp_path, model="gateway-model")
+    router = AgentRouter(bus=bus, agents={"default": agent})
+    cache = WorkflowStepCache(tmp_path / "cache.db")
+    wf = LinearWorkflowRuntime(agent_runtime=router, workspace=tmp_path, step_cache=cache)
+
+    await wf.run_recipe(_recipe(), vars={"day": "mon"})
+    second = await wf.run_recipe(_recipe(), vars={"day": "mon"})
+    assert second["cache"] == {"hits": 1, "misses": 0, "tokens_saved": 42}
+
+    # The CLI replays with the configured default model and finds the gateway's entry.
+    replay = LinearWorkflowRuntime(agent_runtime=None, step_cache=cache, default_model="gateway-model")
+    collect_only = _recipe(steps=[{"id": "collect", "prompt": "collect {day}"}])
+    result = await replay.run_recipe(collect_only, vars={"day": "mon"}, replay=True)
+    assert result["status"] == "completed"
+    assert result["cache"]["hits"] == 1
+
+
+def test_step_cache_ttl_and_eviction(tmp_path: Path) -> None:
+    cache = WorkflowStepCache(tmp_path / "cache.db", max_entries=3, max_bytes=1000)
+    cache.put("short", recipe="r", step_id="s", output="x", ttl_s=0.05)
+    cache.put("a", recipe="r", step_id="s", output="a")
+    cache.put("b", recipe="r", step_id="s", output="b")
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get("short", include_expired=True)["output"] == "x"
+
+    # Over the entry bound the expired entry goes first, then the least recently used.
+    assert cache.get("a") is not None
+    cache.put("c", recipe="r", step_id="s", output="c")
+    assert cache.get("short", include_expired=True) is None
+    cache.put("d", recipe="r", step_id="s", output="d")
+    assert cache.get("b") is None
+    assert {key for key in "acd" if cache.get(key)} == {"a", "c", "d"}
+
+    cache.put("big", recipe="r", step_id="s", output="z" * 990)
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert cache.get("big") is not None
+    assert cache.clear("r") == stats["entries"]
+
+
+def test_cli_replay(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: tmp_path))
+    recipe_path = tmp_path / "daily.json"
+    recipe_path.write_text(json.dumps({"name": "daily", "steps": [{"id": "collect", "prompt": "collect {day}"}]}))
+    cache = WorkflowStepCache(tmp_path / ".miniclaw" / "workflows" / "step_cache.db")
+    key = WorkflowStepCache.make_key("daily", "", "collect", "collect mon", load_config().agents.defaults.model)
+    cache.put(key, recipe="daily", step_id="collect", output="recorded", total_tokens=10)
+
+    runner = CliRunner()
+    result = runner.invoke(cli_commands.app, ["workflow", "run", str(recipe_path), "--var", "day=mon", "--replay"])
+    assert result.exit_code == 0, result.output
+    assert "recorded" in result.output
+    assert "1 hits, 0 misses, 10 tokens saved" in result.output
+
+    result = runner.invoke(cli_commands.app, ["workflow", "run", str(recipe_path), "--var", "day=tue", "--replay"])
+    assert result.exit_code == 1